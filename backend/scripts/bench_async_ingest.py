@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""Compare ingest over the threadpool (sync handlers) with the native asyncio path.
+
+Both apps share the same services; only the handler and dependency style
+differ. Requests are driven in-process through httpx's ASGI transport so the
+numbers reflect server-side overhead rather than socket I/O.
+
+Usage: PYTHONPATH=src:. python scripts/bench_async_ingest.py [--requests N] [--concurrency C] [--wal-dir DIR]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Any, Dict
+from uuid import UUID
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from anom.core.wal import FsyncPolicy, WriteAheadLog
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.domain import EventIngestRequest
+from anom.modules.ingestion.service import IngestionService
+from tests.factories import build_ingestion
+
+
+def _service(wal):
+    setup = build_ingestion("bench", [("latency", FieldDataType.INTEGER)], wal=wal)
+    return setup.business_id, setup.service
+
+
+def _threadpool_app(service):
+    app = FastAPI()
+
+    def provide() -> IngestionService:
+        return service
+
+    @app.post("/ingest/{business_id}")
+    def ingest(
+        business_id: UUID, payload: EventIngestRequest, svc: IngestionService = Depends(provide)
+    ) -> Dict[str, Any]:
+        event, alerts = svc.ingest(business_id, payload)
+        return {"event": event, "alerts": alerts}
+
+    return app
+
+
+def _async_app(service):
+    app = FastAPI()
+
+    async def provide() -> IngestionService:
+        return service
+
+    @app.post("/ingest/{business_id}")
+    async def ingest(
+        business_id: UUID, payload: EventIngestRequest, svc: IngestionService = Depends(provide)
+    ) -> Dict[str, Any]:
+        event, alerts = await svc.ingest_async(business_id, payload)
+        return {"event": event, "alerts": alerts}
+
+    return app
+
+
+async def _drive(app, business_id, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i):
+            async with semaphore:
+                response = await client.post(f"/ingest/{business_id}", json={"payload": {"latency": i}})
+                response.raise_for_status()
+
+        began = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return requests / (time.perf_counter() - began)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--wal-dir", default=None, help="log to a WAL (group commit) in this directory")
+    args = parser.parse_args()
+
+    print(f"{'path':<11} {'wal':<6} {'req/s':>10}")
+    for use_wal in (False, True):
+        for name, build in (("threadpool", _threadpool_app), ("asyncio", _async_app)):
+            with tempfile.TemporaryDirectory(dir=args.wal_dir) as directory:
+                wal = WriteAheadLog(directory, policy=FsyncPolicy.GROUP, group_commit_ms=2) if use_wal else None
+                business_id, service = _service(wal)
+                rate = asyncio.run(_drive(build(service), business_id, args.requests, args.concurrency))
+                if wal is not None:
+                    wal.close()
+            print(f"{name:<11} {'group' if use_wal else 'off':<6} {rate:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
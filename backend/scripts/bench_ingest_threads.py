@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Measure ingest throughput as the number of threads grows.
+
+Usage: PYTHONPATH=src:. python scripts/bench_ingest_threads.py [--events N] [--businesses B]
+"""
+import argparse
+import threading
+import time
+
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.domain import EventIngestRequest
+from anom.modules.ingestion.series import TimeSeriesStore
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+from tests.factories import build_ingestion
+
+FIELDS = [("latency", FieldDataType.INTEGER)]
+RULES = [RuleCreate(name="slow", condition=RuleCondition(field="latency", operator=RuleOperator.GT, value=990))]
+
+
+def _build(business_count):
+    setup = build_ingestion("b0", FIELDS, rules=RULES, series_store=TimeSeriesStore())
+    business_ids = [setup.business_id]
+    business_ids += [setup.add_business(f"b{i}", FIELDS, RULES) for i in range(1, business_count)]
+    return business_ids, setup.service
+
+
+def _run(threads, events_per_thread, business_count):
+    business_ids, service = _build(business_count)
+    barrier = threading.Barrier(threads + 1)
+
+    def ingest(business_id):
+        barrier.wait()
+        for i in range(events_per_thread):
+            service.ingest(business_id, EventIngestRequest(payload={"latency": i % 1000}))
+
+    workers = [
+        threading.Thread(target=ingest, args=(business_ids[i % business_count],)) for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    began = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * events_per_thread / (time.perf_counter() - began)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=5000, help="events per thread")
+    parser.add_argument("--businesses", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'events/s':>12} {'vs 1 thread':>12}")
+    baseline = None
+    for threads in (1, 2, 4, 8, 16):
+        rate = _run(threads, args.events, args.businesses)
+        baseline = baseline or rate
+        print(f"{threads:>7} {rate:>12,.0f} {rate / baseline:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Measure how many log lines per second the tail source worker ingests on one core.
+
+A temporary file of regex- or JSON-formatted lines is read to its end by a
+:class:`SourceWorker` feeding an in-process ingestion service with a
+time-series store, as in the API process.
+
+Usage: PYTHONPATH=src:. python scripts/bench_tail_source.py [--lines N] [--format regex|json]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.series import TimeSeriesStore
+from anom.modules.ingestion.tail_source import FileSourceConfig, SourceFormat, SourceWorker, SourceWorkerConfig
+from tests.factories import build_ingestion
+
+PATTERN = r"(?P<level>[A-Z]+) job=(?P<job>\S+) took=(?P<ms>\d+)ms"
+
+
+def _service():
+    setup = build_ingestion("bench", [("durationMs", FieldDataType.INTEGER)], series_store=TimeSeriesStore())
+    return setup.business_id, setup.service
+
+
+def _write(path, lines, source_format):
+    with open(path, "w") as handle:
+        for i in range(lines):
+            if source_format is SourceFormat.JSON:
+                handle.write(f'{{"level":"INFO","jobName":"j{i % 100}","durationMs":{i % 900}}}\n')
+            else:
+                handle.write(f"INFO job=j{i % 100} took={i % 900}ms\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--format", choices=[f.value for f in SourceFormat], default=SourceFormat.REGEX.value)
+    args = parser.parse_args()
+    source_format = SourceFormat(args.format)
+
+    business_id, service = _service()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.log")
+        _write(path, args.lines, source_format)
+        if source_format is SourceFormat.JSON:
+            source = FileSourceConfig(path=path, business_id=business_id)
+        else:
+            source = FileSourceConfig(
+                path=path,
+                business_id=business_id,
+                format=SourceFormat.REGEX,
+                pattern=PATTERN,
+                fields={"level": "level", "jobName": "job", "durationMs": "ms"},
+            )
+        worker = SourceWorker(SourceWorkerConfig(sources=[source]), service)
+        began = time.perf_counter()
+        lines = worker.drain()
+        elapsed = time.perf_counter() - began
+        worker.close()
+    print(f"{source_format.value}: {lines:,} lines in {elapsed:.2f}s = {lines / elapsed:,.0f} lines/s")
+    print(worker.stats.model_dump())
+
+
+if __name__ == "__main__":
+    main()
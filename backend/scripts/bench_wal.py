@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Measure event ingest throughput with and without the write-ahead log.
+
+Usage: PYTHONPATH=src python scripts/bench_wal.py [--events N] [--threads T]
+"""
+import argparse
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from anom.core.wal import FsyncPolicy, WriteAheadLog
+from anom.modules.ingestion.domain import EventRecord
+from anom.modules.ingestion.repo import EventRepository
+
+
+def _run(repo, events_per_thread, threads):
+    start = datetime.utcnow()
+
+    def ingest():
+        business_id = uuid4()
+        for i in range(events_per_thread):
+            repo.add_event(
+                EventRecord(
+                    id=uuid4(),
+                    business_id=business_id,
+                    payload={"latency_ms": i % 500, "status": "ok"},
+                    received_at=start + timedelta(microseconds=i),
+                )
+            )
+
+    workers = [threading.Thread(target=ingest) for _ in range(threads)]
+    began = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000, help="events per thread")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--group-commit-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    total = args.events * args.threads
+    print(f"{'mode':<10} {'events/s':>12} {'seconds':>9}")
+    elapsed = _run(EventRepository(), args.events, args.threads)
+    print(f"{'no-wal':<10} {total / elapsed:>12,.0f} {elapsed:>9.3f}")
+    for policy in FsyncPolicy:
+        events = args.events
+        if policy is FsyncPolicy.ALWAYS:
+            # one fsync per event: keep the run short
+            events = max(1, args.events // 20)
+        with tempfile.TemporaryDirectory() as directory:
+            wal = WriteAheadLog(directory, policy=policy, group_commit_ms=args.group_commit_ms)
+            elapsed = _run(EventRepository(wal), events, args.threads)
+            wal.close()
+        print(f"{policy.value:<10} {events * args.threads / elapsed:>12,.0f} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
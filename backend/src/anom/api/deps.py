@@ -2,16 +2,71 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
 
+from anom.core.config import get_settings
+from anom.core.serialization import EncodedCache
+from anom.core.snapshot import SnapshotManager
+from anom.core.wal import FsyncPolicy, WriteAheadLog
 from anom.modules.alerts.repo import AlertRepository
 from anom.modules.alerts.service import AlertService
 from anom.modules.business_def.repo import BusinessRepository
 from anom.modules.business_def.service import BusinessService
+from anom.modules.correlation.engine import CorrelationEngine
+from anom.modules.correlation.repo import CorrelationRepository
+from anom.modules.correlation.service import CorrelationService
+from anom.modules.ingestion.admission import AdmissionController, LoadMonitor
+from anom.modules.ingestion.dedup import IdempotencyIndex
+from anom.modules.ingestion.domain import AdmissionPolicy
+from anom.modules.ingestion.event_time import EventTimeProcessor
 from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.retention import RetentionService, RollupStore
+from anom.modules.ingestion.series import TimeSeriesStore
 from anom.modules.ingestion.service import IngestionService
+from anom.modules.ingestion.sketches import SketchStore
+from anom.modules.notifications.dispatcher import NotificationDispatcher
+from anom.modules.notifications.repo import DestinationRepository
+from anom.modules.notifications.service import NotificationService
+from anom.modules.rule_engine.backfill import BackfillService
 from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rule_engine.dryrun import DryRunEngine
+from anom.modules.rule_engine.stats import RuleStatsRecorder
 from anom.modules.rules.repo import RuleRepository
 from anom.modules.rules.service import RuleService
+from anom.modules.streaming.hub import StreamHub
+from anom.modules.views.repo import ViewRepository
+from anom.modules.views.service import ViewService
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def on_loop(provider: Callable[[], T]) -> Callable[[], Awaitable[T]]:
+    """Wrap a provider so FastAPI resolves it on the event loop.
+
+    FastAPI runs plain ``def`` dependencies in the threadpool. The providers
+    here return cached singletons, so for ``async def`` handlers that hop is
+    pure overhead.
+    """
+
+    async def provide() -> T:
+        return provider()
+
+    provide.__name__ = provider.__name__
+    return provide
+
+
+@lru_cache()
+def get_write_ahead_log() -> Optional[WriteAheadLog]:
+    settings = get_settings()
+    if not settings.wal_dir:
+        return None
+    return WriteAheadLog(
+        settings.wal_dir,
+        policy=FsyncPolicy(settings.wal_fsync),
+        group_commit_ms=settings.wal_group_commit_ms,
+        group_commit_records=settings.wal_group_commit_records,
+    )
 
 
 @lru_cache()
@@ -26,12 +81,55 @@ def get_rule_repository() -> RuleRepository:
 
 @lru_cache()
 def get_alert_repository() -> AlertRepository:
-    return AlertRepository()
+    return AlertRepository(get_write_ahead_log())
 
 
 @lru_cache()
 def get_event_repository() -> EventRepository:
-    return EventRepository()
+    return EventRepository(get_write_ahead_log())
+
+
+@lru_cache()
+def get_time_series_store() -> TimeSeriesStore:
+    return TimeSeriesStore(max_fields=get_settings().series_max_fields_per_business)
+
+
+@lru_cache()
+def get_event_time_processor() -> EventTimeProcessor:
+    return EventTimeProcessor(late_capacity=get_settings().event_time_late_capacity)
+
+
+@lru_cache()
+def get_sketch_store() -> SketchStore:
+    settings = get_settings()
+    return SketchStore(
+        slot_seconds=settings.sketch_slot_seconds,
+        slots=settings.sketch_slots,
+        width=settings.sketch_width,
+        depth=settings.sketch_depth,
+        precision=settings.sketch_precision,
+        top_k=settings.sketch_top_k,
+    )
+
+
+@lru_cache()
+def get_rollup_store() -> RollupStore:
+    return RollupStore(minute_retention_seconds=get_settings().rollup_minute_retention_seconds)
+
+
+@lru_cache()
+def get_retention_service() -> RetentionService:
+    return RetentionService(get_event_repository(), get_rollup_store())
+
+
+@lru_cache()
+def get_view_repository() -> ViewRepository:
+    return ViewRepository()
+
+
+@lru_cache()
+def get_destination_repository() -> DestinationRepository:
+    return DestinationRepository()
 
 
 @lru_cache()
@@ -44,14 +142,123 @@ def get_rule_service() -> RuleService:
     return RuleService(get_rule_repository(), get_business_service())
 
 
+@lru_cache()
+def get_notification_service() -> NotificationService:
+    return NotificationService(
+        get_destination_repository(), delete_listeners=[get_notification_dispatcher().forget_destination]
+    )
+
+
+@lru_cache()
+def get_notification_dispatcher() -> NotificationDispatcher:
+    settings = get_settings()
+    return NotificationDispatcher(
+        get_destination_repository(),
+        get_alert_repository(),
+        max_attempts=settings.notification_max_attempts,
+        backoff_base_s=settings.notification_backoff_base_ms / 1000,
+        backoff_max_s=settings.notification_backoff_max_ms / 1000,
+        timeout_s=settings.notification_timeout_seconds,
+        max_connections=settings.notification_max_connections,
+        queue_capacity=settings.notification_queue_capacity,
+    )
+
+
 @lru_cache()
 def get_alert_service() -> AlertService:
-    return AlertService(get_alert_repository())
+    return AlertService(
+        get_alert_repository(),
+        listeners=[get_notification_dispatcher().enqueue, get_stream_hub().publish_alert],
+    )
+
+
+@lru_cache()
+def get_rule_stats_recorder() -> RuleStatsRecorder:
+    return RuleStatsRecorder()
 
 
 @lru_cache()
 def get_rule_dispatcher() -> RuleDispatcher:
-    return RuleDispatcher(get_rule_repository())
+    return RuleDispatcher(get_rule_repository(), get_rule_stats_recorder(), get_sketch_store())
+
+
+@lru_cache()
+def get_backfill_service() -> BackfillService:
+    settings = get_settings()
+    return BackfillService(
+        get_event_repository(),
+        get_rule_repository(),
+        get_alert_service(),
+        max_workers=settings.backfill_workers,
+        chunk_size=settings.backfill_chunk_size,
+    )
+
+
+@lru_cache()
+def get_dry_run_engine() -> DryRunEngine:
+    return DryRunEngine(get_event_repository())
+
+
+@lru_cache()
+def get_correlation_repository() -> CorrelationRepository:
+    return CorrelationRepository()
+
+
+@lru_cache()
+def get_correlation_engine() -> CorrelationEngine:
+    return CorrelationEngine(
+        get_correlation_repository(),
+        get_alert_service(),
+        max_pending=get_settings().correlation_max_pending,
+    )
+
+
+@lru_cache()
+def get_correlation_service() -> CorrelationService:
+    return CorrelationService(get_correlation_repository(), get_business_service(), get_correlation_engine())
+
+
+@lru_cache()
+def get_view_service() -> ViewService:
+    return ViewService(get_view_repository(), get_business_service(), get_event_repository())
+
+
+@lru_cache()
+def get_idempotency_index() -> IdempotencyIndex:
+    settings = get_settings()
+    return IdempotencyIndex(
+        window_seconds=settings.idempotency_window_seconds,
+        max_keys=settings.idempotency_max_keys,
+        bloom_capacity=settings.idempotency_bloom_capacity,
+        bloom_error_rate=settings.idempotency_bloom_error_rate,
+    )
+
+
+@lru_cache()
+def get_event_json_cache() -> EncodedCache:
+    """Encoded bytes of stored events, keyed by the event id as an int."""
+
+    return EncodedCache(get_settings().event_json_cache_entries)
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        default_policy=AdmissionPolicy(
+            rate_per_second=settings.admission_rate_per_second,
+            burst=settings.admission_burst,
+        ),
+        monitor=LoadMonitor(
+            latency_threshold_ms=settings.admission_latency_threshold_ms,
+            max_in_flight=settings.admission_max_in_flight,
+        ),
+    )
+
+
+@lru_cache()
+def get_stream_hub() -> StreamHub:
+    return StreamHub(get_settings().stream_buffer_capacity, event_cache=get_event_json_cache())
 
 
 @lru_cache()
@@ -61,12 +268,67 @@ def get_ingestion_service() -> IngestionService:
         get_event_repository(),
         get_rule_dispatcher(),
         get_alert_service(),
+        get_time_series_store(),
+        listeners=[get_view_service().on_event, get_stream_hub().publish_event],
+        idempotency_index=get_idempotency_index(),
+        admission=get_admission_controller(),
+        index_max_integer_values=get_settings().event_index_max_integer_values,
+        sketches=get_sketch_store(),
+        event_time=get_event_time_processor(),
+        alert_sources=[get_correlation_engine().observe],
+    )
+
+
+@lru_cache()
+def get_snapshot_manager() -> Optional[SnapshotManager]:
+    settings = get_settings()
+    if not settings.snapshot_path:
+        return None
+    return SnapshotManager(
+        settings.snapshot_path,
+        {
+            "businesses": get_business_repository(),
+            "rules": get_rule_repository(),
+            "views": get_view_repository(),
+            "destinations": get_destination_repository(),
+            "retention": get_retention_service(),
+            "rollups": get_rollup_store(),
+            "idempotency": get_ingestion_service(),
+            "admission": get_admission_controller(),
+            "alert_auto_close": get_alert_service(),
+            "correlations": get_correlation_repository(),
+            "event_time": get_event_time_processor(),
+            "events": get_event_repository(),
+            "alerts": get_alert_repository(),
+        },
+        interval_seconds=settings.snapshot_interval_seconds,
+        wal=get_write_ahead_log(),
     )
 
 
 __all__ = [
+    "on_loop",
     "get_business_service",
     "get_rule_service",
     "get_ingestion_service",
     "get_alert_service",
+    "get_rule_stats_recorder",
+    "get_rollup_store",
+    "get_retention_service",
+    "get_time_series_store",
+    "get_sketch_store",
+    "get_view_service",
+    "get_notification_service",
+    "get_notification_dispatcher",
+    "get_snapshot_manager",
+    "get_write_ahead_log",
+    "get_idempotency_index",
+    "get_event_json_cache",
+    "get_event_time_processor",
+    "get_stream_hub",
+    "get_backfill_service",
+    "get_dry_run_engine",
+    "get_admission_controller",
+    "get_correlation_engine",
+    "get_correlation_service",
 ]
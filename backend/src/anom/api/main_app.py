@@ -1,17 +1,104 @@
 """Application entry-point for the Anom Platform backend."""
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from anom.api.deps import (
+    get_alert_repository,
+    get_alert_service,
+    get_backfill_service,
+    get_correlation_engine,
+    get_event_repository,
+    get_ingestion_service,
+    get_notification_dispatcher,
+    get_retention_service,
+    get_snapshot_manager,
+    get_stream_hub,
+    get_write_ahead_log,
+)
+from anom.api.profiling import install_profiling
+from anom.core.config import get_settings
+from anom.core.wal import WriteAheadLog
 from anom.modules.alerts.api import router as alerts_router
+from anom.modules.alerts.service import AlertAutoCloser
 from anom.modules.business_def.api import router as business_router
+from anom.modules.correlation.api import router as correlation_router
+from anom.modules.correlation.engine import CorrelationSweeper
 from anom.modules.ingestion.api import router as ingestion_router
+from anom.modules.ingestion.retention import EventCompactor
+from anom.modules.ingestion.service import EventTimeFlusher
+from anom.modules.ingestion.tail_source import SourceWorker, load_config
+from anom.modules.notifications.api import router as notifications_router
 from anom.modules.rules.api import router as rules_router
+from anom.modules.streaming.api import router as streaming_router
+from anom.modules.views.api import router as views_router
+
+
+def _replay_write_ahead_log(wal: WriteAheadLog) -> None:
+    events = get_event_repository()
+    alerts = get_alert_repository()
+    event_rows = []
+    for kind, row in wal.replay():
+        if kind == "event":
+            event_rows.append(row)
+        elif kind == "alert":
+            alerts.restore_rows([row])
+    events.replay_rows(event_rows)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Anom Platform API", version="0.1.0")
+    # the providers in anom.api.deps read get_settings() too, so there is one source of settings
+    settings = get_settings()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        snapshots = get_snapshot_manager()
+        if snapshots is not None:
+            snapshots.load()
+        wal = get_write_ahead_log()
+        if wal is not None:
+            _replay_write_ahead_log(wal)
+        if snapshots is not None:
+            snapshots.start()
+        compactor = EventCompactor(get_retention_service(), settings.retention_interval_seconds)
+        compactor.start()
+        auto_closer = AlertAutoCloser(get_alert_service(), settings.alert_auto_close_interval_seconds)
+        auto_closer.start()
+        sweeper = CorrelationSweeper(get_correlation_engine(), settings.correlation_sweep_interval_seconds)
+        sweeper.start()
+        flusher = EventTimeFlusher(get_ingestion_service(), settings.event_time_flush_interval_seconds)
+        flusher.start()
+        notifier = get_notification_dispatcher()
+        await notifier.start()
+        hub = get_stream_hub()
+        await hub.start()
+        sources = None
+        if settings.source_config_path:
+            sources = SourceWorker(load_config(settings.source_config_path), get_ingestion_service())
+            sources.start()
+        try:
+            yield
+        finally:
+            if sources is not None:
+                sources.stop()
+            await hub.stop()
+            await notifier.stop()
+            get_backfill_service().shutdown()
+            compactor.stop()
+            auto_closer.stop()
+            sweeper.stop()
+            flusher.stop()
+            if snapshots is not None:
+                snapshots.stop()
+                snapshots.write()
+            if wal is not None:
+                wal.close()
+
+    app = FastAPI(title="Anom Platform API", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -26,9 +113,15 @@ def create_app() -> FastAPI:
         return {"status": "ok"}
 
     app.include_router(business_router, prefix="/businesses", tags=["businesses"])
+    app.include_router(views_router, prefix="/businesses", tags=["views"])
     app.include_router(ingestion_router, prefix="/ingest", tags=["ingestion"])
     app.include_router(rules_router, prefix="/rules", tags=["rules"])
     app.include_router(alerts_router, prefix="/alerts", tags=["alerts"])
+    app.include_router(correlation_router, prefix="/correlations", tags=["correlations"])
+    app.include_router(notifications_router, prefix="/notifications", tags=["notifications"])
+    app.include_router(streaming_router, prefix="/stream", tags=["streaming"])
+
+    install_profiling(app, settings)
 
     return app
 
@@ -0,0 +1,233 @@
+"""Opt-in request profiling middleware and admin endpoints.
+
+The middleware is only installed when profiling is enabled in
+:class:`~anom.core.config.Settings`, so a default deployment pays nothing.
+A request is profiled when it carries ``X-Anom-Profile: <profile_token>``
+or when it is picked by ``profile_sample_rate``. The admin endpoints always
+require the token; without one configured they answer 403.
+
+Neither mode isolates one request. ``cprofile`` only hooks the event-loop
+thread: sync handlers that FastAPI runs in its threadpool (view results, rule
+dry-runs, bulk alert operations) do not appear in the listing, while other
+requests the loop interleaves with the profiled one do. ``sample`` mode sees
+every thread, so it covers threadpool handlers but likewise attributes
+concurrent requests' stacks to the profile. Profile on a quiet instance, and
+prefer ``sample`` for sync endpoints.
+"""
+from __future__ import annotations
+
+import cProfile
+import hmac
+import io
+import logging
+import pstats
+import random
+import sys
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from itertools import count
+from time import perf_counter
+from typing import Awaitable, Callable, Deque, List, Optional
+
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Request, Response, status
+from pydantic import BaseModel
+
+from anom.core.config import Settings
+
+PROFILE_HEADER = "X-Anom-Profile"
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileSummary(BaseModel):
+    """Metadata describing one captured request profile."""
+
+    id: int
+    method: str
+    path: str
+    mode: str
+    started_at: datetime
+    duration_ms: float
+    status_code: int
+
+
+class ProfileRecord(ProfileSummary):
+    """Captured profile including its rendered output.
+
+    ``sample`` mode produces collapsed stacks (``frame;frame;frame count``),
+    ``cprofile`` mode produces a pstats listing sorted by cumulative time.
+    """
+
+    output: str
+
+
+class ProfileStore:
+    """Bounded in-memory ring of the most recent profiles."""
+
+    def __init__(self, max_size: int) -> None:
+        self._profiles: Deque[ProfileRecord] = deque(maxlen=max_size)
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, record: ProfileRecord) -> None:
+        with self._lock:
+            self._profiles.append(record)
+
+    def list(self) -> List[ProfileSummary]:
+        with self._lock:
+            profiles = list(self._profiles)
+        return [ProfileSummary(**p.model_dump(exclude={"output"})) for p in reversed(profiles)]
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+class _StackSampler:
+    """Samples every thread's Python stack on an interval.
+
+    Sync endpoints run in the threadpool, so sampling all threads (rather
+    than hooking the event-loop thread) is what actually sees handler code.
+    """
+
+    def __init__(self, interval_s: float) -> None:
+        self._interval_s = interval_s
+        self._stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="anom-profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stopped.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {hits}" for stack, hits in self._stacks.most_common())
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stopped.wait(self._interval_s):
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                frames: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.reverse()
+                self._stacks[";".join(frames)] += 1
+
+
+def install_profiling(app: FastAPI, settings: Settings) -> Optional[ProfileStore]:
+    """Attach the profiling middleware and admin router when enabled."""
+
+    if not settings.profiling_enabled:
+        return None
+
+    store = ProfileStore(settings.profile_ring_size)
+    if not settings.profile_token:
+        logger.warning("profiling enabled without ANOM_PROFILE_TOKEN; /admin/profiles will refuse every request")
+    # only one profile at a time: cProfile refuses concurrent sessions and
+    # overlapping samplers would attribute each other's stacks
+    active = threading.Lock()
+    app.state.profile_store = store
+
+    def wants_profile(request: Request) -> bool:
+        if request.url.path.startswith("/admin/profiles"):
+            return False
+        header = request.headers.get(PROFILE_HEADER)
+        if header is not None and settings.profile_token and header == settings.profile_token:
+            return True
+        return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+    @app.middleware("http")
+    async def profile_requests(
+        request: Request,
+        call_next: Callable[[Request], Awaitable[Response]],
+    ) -> Response:
+        if not wants_profile(request) or not active.acquire(blocking=False):
+            return await call_next(request)
+        try:
+            started_at = datetime.utcnow()
+            started = perf_counter()
+            if settings.profile_mode == "cprofile":
+                # loop thread only: threadpool handlers are invisible here (see module docstring)
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    response = await call_next(request)
+                finally:
+                    profiler.disable()
+                buffer = io.StringIO()
+                pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(50)
+                output = buffer.getvalue()
+            else:
+                sampler = _StackSampler(settings.profile_interval_ms / 1000)
+                sampler.start()
+                try:
+                    response = await call_next(request)
+                finally:
+                    output = sampler.stop()
+            record = ProfileRecord(
+                id=store.next_id(),
+                method=request.method,
+                path=request.url.path,
+                mode=settings.profile_mode,
+                started_at=started_at,
+                duration_ms=(perf_counter() - started) * 1000,
+                status_code=response.status_code,
+                output=output,
+            )
+            store.add(record)
+            response.headers["X-Anom-Profile-Id"] = str(record.id)
+            return response
+        finally:
+            active.release()
+
+    app.include_router(_build_admin_router(store, settings), prefix="/admin/profiles", tags=["admin"])
+    return store
+
+
+def _build_admin_router(store: ProfileStore, settings: Settings) -> APIRouter:
+    router = APIRouter()
+
+    def authorize(token: Optional[str]) -> None:
+        # profiles show other users' requests, so the admin endpoints never run unauthenticated
+        expected = settings.profile_token
+        if not expected or token is None or not hmac.compare_digest(token.encode(), expected.encode()):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid profile token")
+
+    @router.get("/", response_model=List[ProfileSummary])
+    def list_profiles(
+        token: Optional[str] = Header(default=None, alias=PROFILE_HEADER),
+    ) -> List[ProfileSummary]:
+        authorize(token)
+        return store.list()
+
+    @router.get("/{profile_id}", response_model=ProfileRecord)
+    def get_profile(
+        profile_id: int,
+        token: Optional[str] = Header(default=None, alias=PROFILE_HEADER),
+    ) -> ProfileRecord:
+        authorize(token)
+        record = store.get(profile_id)
+        if record is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+        return record
+
+    return router
+
+
+__all__ = ["install_profiling", "ProfileStore", "ProfileRecord", "ProfileSummary", "PROFILE_HEADER"]
@@ -1,4 +1,32 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 def utcnow() -> datetime:
     return datetime.now(tz=timezone.utc)
+
+
+def epoch_seconds(ts: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are treated as UTC."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def from_epoch_seconds(seconds: float) -> datetime:
+    """Naive UTC datetime, matching the ``datetime.utcnow()`` values we store."""
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def epoch_micros(ts: datetime) -> int:
+    """Exact integer microseconds since the epoch; naive datetimes are treated as UTC."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_micros(micros: int) -> datetime:
+    """Naive UTC datetime for :func:`epoch_micros` values."""
+    return _EPOCH + timedelta(microseconds=micros)
@@ -1 +1,118 @@
-# load settings/env here
+"""Runtime settings loaded from ``ANOM_*`` environment variables."""
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Mapping, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Settings(BaseModel):
+    """Process-wide configuration.
+
+    Every field can be overridden with an environment variable named
+    ``ANOM_<FIELD_NAME>`` (e.g. ``ANOM_PROFILE_SAMPLE_RATE=0.01``).
+    """
+
+    # request profiling
+    profile_token: Optional[str] = None
+    profile_sample_rate: float = Field(default=0.0, ge=0.0, le=1.0)
+    profile_mode: str = Field(default="sample", pattern="^(sample|cprofile)$")
+    profile_interval_ms: float = Field(default=1.0, gt=0.0)
+    profile_ring_size: int = Field(default=20, ge=1)
+
+    # event retention
+    retention_interval_seconds: float = Field(default=60.0, gt=0.0)
+    rollup_minute_retention_seconds: float = Field(default=7 * 86_400.0, gt=0.0)
+
+    # time series
+    series_max_fields_per_business: int = Field(default=64, ge=1)
+
+    # cross-business correlation
+    correlation_max_pending: int = Field(default=100_000, ge=1)
+    correlation_sweep_interval_seconds: float = Field(default=5.0, gt=0.0)
+
+    # alert auto-close
+    alert_auto_close_interval_seconds: float = Field(default=30.0, gt=0.0)
+
+    # event field indexes
+    event_index_max_integer_values: int = Field(default=10_000, ge=1)
+
+    # event-time reordering
+    event_time_late_capacity: int = Field(default=1_000, ge=1)
+    event_time_flush_interval_seconds: float = Field(default=5.0, gt=0.0)
+
+    # field sketches (heavy hitters and distinct counts)
+    sketch_slot_seconds: int = Field(default=60, ge=1)
+    sketch_slots: int = Field(default=60, ge=2)
+    sketch_width: int = Field(default=1024, ge=16)
+    sketch_depth: int = Field(default=4, ge=1, le=16)
+    sketch_precision: int = Field(default=11, ge=4, le=16)
+    sketch_top_k: int = Field(default=20, ge=1, le=1_000)
+
+    # live alert/event streams
+    stream_buffer_capacity: int = Field(default=10_000, ge=1)
+    stream_heartbeat_seconds: float = Field(default=15.0, gt=0.0)
+
+    # file tail sources (see anom.modules.ingestion.tail_source)
+    source_config_path: Optional[str] = None
+
+    # response serialization
+    event_json_cache_entries: int = Field(default=100_000, ge=1)
+
+    # ingest admission control (default limits apply to businesses without a policy)
+    admission_rate_per_second: Optional[float] = Field(default=None, gt=0.0)
+    admission_burst: Optional[int] = Field(default=None, ge=1)
+    admission_latency_threshold_ms: float = Field(default=250.0, gt=0.0)
+    admission_max_in_flight: int = Field(default=5_000, ge=1)
+
+    # idempotent ingestion
+    idempotency_window_seconds: float = Field(default=600.0, gt=0.0)
+    idempotency_max_keys: int = Field(default=100_000, ge=1)
+    idempotency_bloom_capacity: int = Field(default=1_000_000, ge=1)
+    idempotency_bloom_error_rate: float = Field(default=0.001, gt=0.0, lt=1.0)
+
+    # historical rule backfill (workers default to the CPU count)
+    backfill_workers: Optional[int] = Field(default=None, ge=1)
+    backfill_chunk_size: int = Field(default=5_000, ge=1)
+
+    # state snapshots (disabled unless a path is configured)
+    snapshot_path: Optional[str] = None
+    snapshot_interval_seconds: float = Field(default=300.0, gt=0.0)
+
+    # write-ahead log (disabled unless a directory is configured)
+    wal_dir: Optional[str] = None
+    wal_fsync: str = Field(default="group", pattern="^(always|group|interval|off)$")
+    wal_group_commit_ms: float = Field(default=5.0, gt=0.0)
+    wal_group_commit_records: int = Field(default=256, ge=1)
+
+    # alert notifications
+    notification_max_attempts: int = Field(default=5, ge=1)
+    notification_backoff_base_ms: float = Field(default=500.0, ge=0.0)
+    notification_backoff_max_ms: float = Field(default=30_000.0, ge=0.0)
+    notification_timeout_seconds: float = Field(default=10.0, gt=0.0)
+    notification_max_connections: int = Field(default=100, ge=1)
+    notification_queue_capacity: int = Field(default=10_000, ge=1)
+
+    @property
+    def profiling_enabled(self) -> bool:
+        return bool(self.profile_token) or self.profile_sample_rate > 0
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name in cls.model_fields:
+            raw = environ.get(f"ANOM_{name.upper()}")
+            if raw is not None and raw != "":
+                values[name] = raw
+        return cls(**values)
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    return Settings.from_env()
+
+
+__all__ = ["Settings", "get_settings"]
@@ -0,0 +1,47 @@
+"""Background threads that run a maintenance task on a fixed interval."""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """Daemon thread that calls ``fn`` every ``interval_seconds`` until stopped.
+
+    The first call happens one interval after :meth:`start`. A failing call
+    is logged and the worker keeps running; :meth:`stop` waits for a call
+    in progress to finish.
+    """
+
+    def __init__(self, fn: Callable[[], object], interval_seconds: float, name: str) -> None:
+        self._fn = fn
+        self._interval_seconds = interval_seconds
+        self._name = name
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval_seconds):
+            try:
+                self._fn()
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("periodic task %s failed", self._name)
+
+
+__all__ = ["PeriodicWorker"]
@@ -0,0 +1,181 @@
+"""Fast JSON encoding for hot response paths.
+
+FastAPI normally pushes handler return values through ``jsonable_encoder``,
+which re-inspects every object on every response. Here each pydantic model
+class gets an :class:`EncodingPlan` built once from its field annotations:
+scalar fields (str/int/float/bool/None, UUID, datetime, Enum) go straight to
+orjson, and only fields that hold nested models are walked. Immutable objects
+such as stored events can additionally keep their encoded bytes in an
+:class:`EncodedCache`, so paging through the same events twice encodes them
+once.
+"""
+from __future__ import annotations
+
+import threading
+import types
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+from anom.core.cache import LRUCache
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+Converter = Callable[[Any], Any]
+
+
+def dumps(value: Any) -> bytes:
+    """Encode ``value`` to JSON bytes, expanding pydantic models by plan."""
+
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+def _default(value: Any) -> Any:
+    # orjson calls this only for types it does not know natively
+    if isinstance(value, BaseModel):
+        return plan_for(type(value)).to_primitive(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class EncodingPlan:
+    """Per-model field list with converters for the fields that need one."""
+
+    __slots__ = ("model", "fields")
+
+    def __init__(self, model: Type[BaseModel]) -> None:
+        self.model = model
+        self.fields: Tuple[Tuple[str, Optional[Converter]], ...] = tuple(
+            (name, _converter_for(field.annotation)) for name, field in model.model_fields.items()
+        )
+
+    def to_primitive(self, obj: BaseModel) -> Dict[str, Any]:
+        data = obj.__dict__
+        out: Dict[str, Any] = {}
+        for name, convert in self.fields:
+            value = data.get(name)
+            out[name] = value if convert is None or value is None else convert(value)
+        return out
+
+
+_plans: Dict[Type[BaseModel], EncodingPlan] = {}
+_plans_lock = threading.Lock()
+
+
+def plan_for(model: Type[BaseModel]) -> EncodingPlan:
+    plan = _plans.get(model)
+    if plan is None:
+        with _plans_lock:
+            plan = _plans.get(model)
+            if plan is None:
+                plan = _plans[model] = EncodingPlan(model)
+    return plan
+
+
+def _converter_for(annotation: Any) -> Optional[Converter]:
+    """Return a converter for ``annotation`` or ``None`` if orjson handles it as-is."""
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: plan_for(type(value)).to_primitive(value)
+    origin = get_origin(annotation)
+    if origin is None:
+        return None
+    args = get_args(annotation)
+    if origin in (list, List, tuple, set, frozenset):
+        inner = _converter_for(args[0]) if args else None
+        if inner is None:
+            return None if origin in (list, List, tuple) else list
+        return lambda values: [None if item is None else inner(item) for item in values]
+    if origin in (dict, Dict):
+        inner = _converter_for(args[1]) if len(args) == 2 else None
+        if inner is None:
+            return None
+        return lambda mapping: {key: None if item is None else inner(item) for key, item in mapping.items()}
+    if origin is Union or origin is types.UnionType:
+        converters = [_converter_for(arg) for arg in args if arg is not type(None)]
+        if not any(converters):
+            return None
+        # unions holding models are rare; inspect the value instead of the annotation
+        return _convert_any
+    return None
+
+
+def _convert_any(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return plan_for(type(value)).to_primitive(value)
+    if isinstance(value, (list, tuple)):
+        return [_convert_any(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _convert_any(item) for key, item in value.items()}
+    return value
+
+
+def encode_model(obj: BaseModel) -> bytes:
+    return orjson.dumps(plan_for(type(obj)).to_primitive(obj), default=_default, option=_OPTIONS)
+
+
+def encode_models(objs: Iterable[BaseModel]) -> bytes:
+    return orjson.dumps([plan_for(type(obj)).to_primitive(obj) for obj in objs], default=_default, option=_OPTIONS)
+
+
+def join_array(parts: Iterable[bytes]) -> bytes:
+    """Join already-encoded JSON values into a JSON array."""
+
+    return b"[" + b",".join(parts) + b"]"
+
+
+class EncodedCache:
+    """Bounded cache of encoded bytes for objects that never change once stored."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._entries: LRUCache[Hashable, bytes] = LRUCache(max_entries)
+
+    def encode(self, key: Hashable, build: Callable[[], Any]) -> bytes:
+        encoded = self._entries.get(key)
+        if encoded is None:
+            encoded = dumps(build())
+            self._entries.put(key, encoded)
+        return encoded
+
+    def put(self, key: Hashable, encoded: bytes) -> None:
+        self._entries.put(key, encoded)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class JSONBytesResponse(Response):
+    """Response whose body is already JSON (bytes) or is encoded with :func:`dumps`."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return dumps(content)
+
+
+__all__ = [
+    "EncodedCache",
+    "EncodingPlan",
+    "JSONBytesResponse",
+    "dumps",
+    "encode_model",
+    "encode_models",
+    "join_array",
+    "plan_for",
+]
@@ -0,0 +1,163 @@
+"""Fixed-memory streaming sketches: count-min, top-K and HyperLogLog.
+
+Every sketch consumes the same 128-bit value hash (:func:`hash_value`): the
+count-min sketch derives its row positions from the low 64 bits and
+HyperLogLog uses the high 64 bits, so a value is hashed once per update.
+Sketches of equal dimensions merge by adding (count-min) or taking the
+register-wise maximum (HyperLogLog), which is what windowed reads do.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_MASK_32 = (1 << 32) - 1
+_MASK_64 = (1 << 64) - 1
+
+
+def hash_value(value: Any) -> int:
+    """Stable 128-bit hash of ``value``'s string form (independent of ``PYTHONHASHSEED``)."""
+
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=16).digest(), "little")
+
+
+class CountMinSketch:
+    """Approximate counts that never underestimate.
+
+    With ``width`` w and ``depth`` d an estimate exceeds the true count by at
+    most ``e/w * total`` with probability ``1 - e**-d``.
+    """
+
+    __slots__ = ("width", "depth", "table", "total")
+
+    def __init__(self, width: int = 1024, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = array("Q", bytes(8 * width * depth))
+        self.total = 0
+
+    def _cells(self, hashed: int) -> List[int]:
+        # Kirsch-Mitzenmacher double hashing: d positions from two 32-bit halves
+        first = hashed & _MASK_32
+        step = ((hashed >> 32) & _MASK_32) | 1
+        width = self.width
+        return [row * width + (first + row * step) % width for row in range(self.depth)]
+
+    def add(self, hashed: int, count: int = 1) -> int:
+        """Count ``hashed`` and return its new estimate."""
+
+        table = self.table
+        estimate = None
+        for cell in self._cells(hashed):
+            value = table[cell] + count
+            table[cell] = value
+            if estimate is None or value < estimate:
+                estimate = value
+        self.total += count
+        return estimate or 0
+
+    def estimate(self, hashed: int) -> int:
+        table = self.table
+        return min(table[cell] for cell in self._cells(hashed))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("cannot merge count-min sketches of different dimensions")
+        table = self.table
+        for cell, value in enumerate(other.table):
+            if value:
+                table[cell] += value
+        self.total += other.total
+
+
+class TopK:
+    """The ``k`` heaviest values seen so far, by their count-min estimate."""
+
+    __slots__ = ("k", "counts", "_floor")
+
+    def __init__(self, k: int = 20) -> None:
+        self.k = k
+        self.counts: Dict[Any, int] = {}
+        self._floor = 0
+
+    def offer(self, value: Any, estimate: int) -> None:
+        counts = self.counts
+        if value in counts or len(counts) < self.k:
+            counts[value] = estimate
+            return
+        # candidates only grow, so the cached floor is a lower bound of the true minimum
+        if estimate <= self._floor:
+            return
+        lightest = min(counts, key=counts.__getitem__)
+        self._floor = counts[lightest]
+        if estimate > self._floor:
+            del counts[lightest]
+            counts[value] = estimate
+
+    def items(self) -> List[Tuple[Any, int]]:
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+
+
+class HyperLogLog:
+    """Distinct-count estimate in ``2**precision`` one-byte registers (about 1.04/sqrt(m) error)."""
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = 11) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, hashed: int) -> None:
+        bits = (hashed >> 64) & _MASK_64
+        precision = self.precision
+        index = bits >> (64 - precision)
+        rest = bits & ((1 << (64 - precision)) - 1)
+        rank = 64 - precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> float:
+        return estimate_registers(self.registers)
+
+
+def estimate_registers(registers: bytes) -> float:
+    """HyperLogLog estimate with the small-range (linear counting) correction."""
+
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / sum(_INVERSE_POWERS[r] for r in registers)
+    zeros = registers.count(0)
+    if raw <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)
+    return raw
+
+
+def merge_registers(sketches: Iterable[HyperLogLog]) -> Optional[bytearray]:
+    """Register-wise maximum of ``sketches`` without modifying them; ``None`` if there are none."""
+
+    merged: Optional[bytearray] = None
+    for sketch in sketches:
+        merged = bytearray(sketch.registers) if merged is None else bytearray(map(max, merged, sketch.registers))
+    return merged
+
+
+_INVERSE_POWERS = [2.0**-rank for rank in range(66)]
+
+
+__all__ = [
+    "CountMinSketch",
+    "HyperLogLog",
+    "TopK",
+    "estimate_registers",
+    "hash_value",
+    "merge_registers",
+]
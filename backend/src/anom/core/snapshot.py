@@ -0,0 +1,178 @@
+"""Atomic, streamed snapshots of in-memory repository state.
+
+File layout: an 8-byte magic plus a 2-byte version, followed by a stream of
+pickled frames. Each frame is ``(section, rows)`` with at most
+``chunk_size`` rows, and the stream ends with an ``(END, total_rows)``
+frame so a truncated file is detected instead of half-loaded.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import threading
+from itertools import islice
+from typing import Any, Iterable, Iterator, Mapping, Optional, Protocol
+
+from anom.core.errors import AnomError
+from anom.core.periodic import PeriodicWorker
+from anom.core.wal import WriteAheadLog
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ANOMSNAP"
+VERSION = 2
+_HEADER = struct.Struct(">8sH")
+_END = "__end__"
+
+
+class Snapshottable(Protocol):
+    """State holder that can be dumped to and rebuilt from plain rows."""
+
+    def snapshot_rows(self) -> Iterator[Any]: ...
+
+    def restore_rows(self, rows: Iterable[Any]) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class SnapshotError(AnomError):
+    """Raised when a snapshot file is unreadable or incomplete."""
+
+    pass
+
+
+class SnapshotManager:
+    """Writes and loads snapshots for a fixed set of named sections.
+
+    Repositories hand out rows from a shallow copy of their containers, so
+    capturing state is a pointer copy and all encoding happens on the
+    caller's (typically background) thread rather than on the ingest path.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sections: Mapping[str, Snapshottable],
+        *,
+        interval_seconds: float = 300.0,
+        chunk_size: int = 10_000,
+        wal: Optional[WriteAheadLog] = None,
+    ) -> None:
+        self._path = path
+        self._sections = dict(sections)
+        self._chunk_size = chunk_size
+        self._wal = wal
+        self._write_lock = threading.Lock()
+        self._worker = PeriodicWorker(self.write, interval_seconds, "anom-snapshot")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def write(self) -> int:
+        """Write a snapshot atomically (temp file + rename); return the row count.
+
+        With a write-ahead log attached the snapshot doubles as a checkpoint:
+        the log is rotated before state is captured and the sealed segments
+        are purged once the snapshot is durable.
+        """
+
+        with self._write_lock:
+            checkpoint = self._wal.rotate() if self._wal is not None else None
+            directory = os.path.dirname(os.path.abspath(self._path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", suffix=".tmp", dir=directory)
+            total = 0
+            try:
+                with os.fdopen(fd, "wb", buffering=1 << 20) as handle:
+                    handle.write(_HEADER.pack(MAGIC, VERSION))
+                    for name, section in self._sections.items():
+                        rows_iter = section.snapshot_rows()
+                        while True:
+                            chunk = list(islice(rows_iter, self._chunk_size))
+                            if not chunk:
+                                break
+                            # one self-contained pickle per frame keeps memo tables per chunk
+                            pickle.dump((name, chunk), handle, protocol=pickle.HIGHEST_PROTOCOL)
+                            total += len(chunk)
+                    pickle.dump((_END, total), handle, protocol=pickle.HIGHEST_PROTOCOL)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(tmp_path, self._path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            _fsync_directory(directory)
+            if checkpoint is not None:
+                self._wal.purge_before(checkpoint)
+            return total
+
+    def load(self) -> int:
+        """Restore every section from the snapshot file; return the row count.
+
+        Returns 0 when no snapshot exists. Frames are streamed through a
+        buffered reader and restored chunk by chunk; if the file turns out
+        to be damaged every section is cleared again before raising.
+        """
+
+        if not os.path.exists(self._path):
+            return 0
+        try:
+            return self._load_frames()
+        except Exception:
+            for section in self._sections.values():
+                section.clear()
+            raise
+
+    def _load_frames(self) -> int:
+        with open(self._path, "rb", buffering=1 << 20) as handle:
+            header = handle.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise SnapshotError("snapshot header truncated")
+            magic, version = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise SnapshotError(f"unsupported snapshot format {magic!r} v{version}")
+            total = 0
+            while True:
+                try:
+                    name, payload = pickle.load(handle)
+                except (EOFError, pickle.UnpicklingError) as exc:
+                    raise SnapshotError("snapshot truncated before end marker") from exc
+                if name == _END:
+                    if payload != total:
+                        raise SnapshotError(f"snapshot row count mismatch: {total} != {payload}")
+                    return total
+                section = self._sections.get(name)
+                if section is not None:
+                    section.restore_rows(payload)
+                total += len(payload)
+
+    def start(self) -> None:
+        """Write a snapshot every ``interval_seconds`` on a background thread."""
+
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. platforms without directory fds
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover
+        pass
+    finally:
+        os.close(fd)
+
+
+__all__ = ["SnapshotManager", "Snapshottable", "SnapshotError"]
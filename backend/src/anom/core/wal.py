@@ -0,0 +1,458 @@
+"""Segmented write-ahead log with group commit.
+
+Records are framed as ``[u32 length][u32 crc32][pickle payload]`` and
+appended to numbered segment files (``wal-000001.log`` …). Replay stops at
+the first torn or corrupt frame of a segment, which is what a crash in the
+middle of a write leaves behind.
+
+Durability is selected with :class:`FsyncPolicy`:
+
+``always``
+    every append is written and fsynced before it returns (``append_later``
+    does the fsync on an executor thread).
+``group``
+    appends wait for the next group commit, which fsyncs once per
+    ``group_commit_ms`` or ``group_commit_records`` records, whichever
+    comes first.
+``interval``
+    appends return immediately; a background thread fsyncs every
+    ``group_commit_ms`` (bounded loss window).
+``off``
+    records are handed to the OS page cache without fsync.
+
+Coroutines use :meth:`WriteAheadLog.append_async` (or ``append_later``),
+which await the group commit through a future instead of blocking the
+event loop.
+Threads that log under a lock call :meth:`WriteAheadLog.enqueue` while
+holding it and :meth:`WriteAheadLog.wait_durable` after releasing it, so
+writers sharing the lock still share a group commit.
+
+Repositories hold :attr:`WriteAheadLog.gate` from appending a record until
+it is applied in memory. :meth:`WriteAheadLog.rotate` takes the gate
+exclusively, so once it returns every record of the sealed segments is
+visible to a snapshot and those segments may be purged.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from enum import Enum
+from typing import Any, AsyncIterator, BinaryIO, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from anom.core.errors import AnomError
+
+logger = logging.getLogger(__name__)
+
+_FRAME = struct.Struct(">II")
+_SEGMENT_RE = re.compile(r"^wal-(\d{6,})\.log$")
+
+
+class FsyncPolicy(str, Enum):
+    """How eagerly appended records are made durable."""
+
+    ALWAYS = "always"
+    GROUP = "group"
+    INTERVAL = "interval"
+    OFF = "off"
+
+
+class WriteAheadLogClosedError(AnomError):
+    """Raised when appending to a log that has been closed."""
+
+    pass
+
+
+def _segment_name(number: int) -> str:
+    return f"wal-{number:06d}.log"
+
+
+def _resolve(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+class CheckpointGate:
+    """Shared/exclusive gate between log writers and segment rotation.
+
+    ``with gate:`` is the shared side, held by a writer from append to
+    apply; :meth:`exclusive` waits for every such block to finish. A waiting
+    rotation holds back new writers so a busy log cannot starve it. Acquire
+    the gate before any repository lock, and never re-enter it. Coroutines
+    use ``async with gate.shared():``, which only leaves the loop thread
+    when a rotation is in progress.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._active = 0
+        self._waiting = 0
+        self._exclusive = False
+
+    def __enter__(self) -> None:
+        with self._cond:
+            while self._exclusive or self._waiting:
+                self._cond.wait()
+            self._active += 1
+
+    def _try_enter(self) -> bool:
+        with self._cond:
+            if self._exclusive or self._waiting:
+                return False
+            self._active += 1
+            return True
+
+    @asynccontextmanager
+    async def shared(self) -> AsyncIterator[None]:
+        """The shared side for coroutines: waits for a rotation on a worker thread, not on the loop."""
+
+        if not self._try_enter():
+            entering = asyncio.ensure_future(asyncio.to_thread(self.__enter__))
+            try:
+                await asyncio.shield(entering)
+            except asyncio.CancelledError:
+                # the thread still enters; leave again as soon as it does
+                entering.add_done_callback(lambda done: done.cancelled() or done.exception() or self.__exit__())
+                raise
+        try:
+            yield
+        finally:
+            self.__exit__()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        with self._cond:
+            self._active -= 1
+            if not self._active and self._waiting:
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._waiting += 1
+            while self._exclusive or self._active:
+                self._cond.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+class WriteAheadLog:
+    """Append-only log shared by every repository that needs durability."""
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        policy: FsyncPolicy = FsyncPolicy.GROUP,
+        group_commit_ms: float = 5.0,
+        group_commit_records: int = 256,
+    ) -> None:
+        self._directory = directory
+        self._policy = FsyncPolicy(policy)
+        self._group_commit_s = group_commit_ms / 1000
+        self._group_commit_records = max(1, group_commit_records)
+        os.makedirs(directory, exist_ok=True)
+
+        self._io_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # writers wait on _cond for durability; the committer waits on _work
+        self._cond = threading.Condition(self._lock)
+        self._work = threading.Condition(self._lock)
+        self._buffer: List[bytes] = []
+        self._appended = 0
+        self._durable = 0
+        self._closed = False
+        self._failure: Optional[BaseException] = None
+        self._async_waiters: Deque[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._gate = CheckpointGate()
+
+        # never append after a possibly torn tail: always start a new segment
+        existing = self.segments()
+        self._segment = (existing[-1] if existing else 0) + 1
+        self._file: BinaryIO = self._open_segment(self._segment)
+
+        self._committer: Optional[threading.Thread] = None
+        if self._policy is not FsyncPolicy.ALWAYS:
+            self._committer = threading.Thread(target=self._run_committer, name="anom-wal-commit", daemon=True)
+            self._committer.start()
+
+    @property
+    def policy(self) -> FsyncPolicy:
+        return self._policy
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def gate(self) -> CheckpointGate:
+        """Hold while appending records and applying them to memory."""
+
+        return self._gate
+
+    def segments(self) -> List[int]:
+        numbers = []
+        for name in os.listdir(self._directory):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    @staticmethod
+    def _frame(kind: str, row: Any) -> bytes:
+        payload = pickle.dumps((kind, row), protocol=pickle.HIGHEST_PROTOCOL)
+        return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _enqueue(self, frame: bytes) -> int:
+        # caller holds self._lock
+        if self._closed:
+            raise WriteAheadLogClosedError("write-ahead log is closed")
+        self._buffer.append(frame)
+        self._appended += 1
+        pending = len(self._buffer)
+        if pending == 1 or pending >= self._group_commit_records:
+            self._work.notify()
+        return self._appended
+
+    def append(self, kind: str, row: Any) -> None:
+        self.wait_durable(self.enqueue(kind, row))
+
+    def append_many(self, kind: str, rows: Iterable[Any]) -> None:
+        """Append several records of one kind and wait for them once.
+
+        Under ``always`` the batch costs a single fsync; under ``group`` the
+        caller waits for the commit covering the last record only.
+        """
+
+        sequence = self.enqueue_many(kind, rows)
+        if sequence is not None:
+            self.wait_durable(sequence)
+
+    def enqueue(self, kind: str, row: Any) -> int:
+        """Queue a record without waiting for it; pass the result to :meth:`wait_durable`.
+
+        Like :meth:`append_later` for threads: callers enqueue while holding a
+        lock, so log order equals memory order, and wait after releasing it.
+        """
+
+        frame = self._frame(kind, row)
+        with self._cond:
+            self._check_failure()
+            return self._enqueue(frame)
+
+    def enqueue_many(self, kind: str, rows: Iterable[Any]) -> Optional[int]:
+        """:meth:`enqueue` for several records; ``None`` when ``rows`` is empty."""
+
+        frames = [self._frame(kind, row) for row in rows]
+        if not frames:
+            return None
+        with self._cond:
+            self._check_failure()
+            for frame in frames:
+                sequence = self._enqueue(frame)
+        return sequence
+
+    def wait_durable(self, sequence: int) -> None:
+        """Block until record ``sequence`` is as durable as the policy promises."""
+
+        if self._policy is FsyncPolicy.ALWAYS:
+            # through the buffer, so frames queued by append_later keep their place;
+            # a concurrent writer's fsync may already cover this record
+            if self._durable < sequence:
+                self._commit_pending(fsync=True)
+            return
+        if self._policy is not FsyncPolicy.GROUP:
+            return
+        with self._cond:
+            while self._durable < sequence:
+                self._check_failure()
+                self._cond.wait()
+
+    def _check_failure(self) -> None:
+        # caller holds self._lock
+        if self._failure is not None:
+            raise AnomError("write-ahead log commit failed") from self._failure
+
+    def append_later(self, kind: str, row: Any) -> "asyncio.Future[None]":
+        """Enqueue a record now and return a future that resolves once it is durable.
+
+        Must be called on an event loop. The frame is queued synchronously,
+        so callers can enqueue while holding a lock (keeping log order equal
+        to memory order) and await the future after releasing it. Under the
+        ``always`` policy the write and fsync run on the loop's default
+        executor, never on the loop itself.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        frame = self._frame(kind, row)
+        waits = self._policy in (FsyncPolicy.GROUP, FsyncPolicy.ALWAYS)
+        with self._cond:
+            sequence = self._enqueue(frame)
+            if waits:
+                if self._failure is not None:
+                    raise AnomError("write-ahead log commit failed") from self._failure
+                self._async_waiters.append((sequence, loop, future))
+        if self._policy is FsyncPolicy.ALWAYS:
+            loop.run_in_executor(None, self._commit_for_waiters)
+        elif not waits:
+            future.set_result(None)
+        return future
+
+    def _commit_for_waiters(self) -> None:
+        try:
+            self._commit_pending(fsync=True)
+        except Exception:  # surfaced to the waiting futures by _commit_pending
+            logger.exception("WAL commit failed")
+
+    async def append_async(self, kind: str, row: Any) -> None:
+        """Append from a coroutine; waits for the group commit without blocking the loop."""
+
+        await self.append_later(kind, row)
+
+    def flush(self) -> None:
+        """Write and fsync everything appended so far, regardless of policy."""
+
+        self._commit_pending(fsync=True)
+
+    def rotate(self) -> int:
+        """Seal the current segment and start a new one; return the new segment number.
+
+        Waits for writers inside :attr:`gate`, so every record in the sealed
+        segments has been applied in memory when this returns.
+        """
+
+        with self._gate.exclusive():
+            self.flush()
+            with self._io_lock:
+                self._file.close()
+                self._segment += 1
+                self._file = self._open_segment(self._segment)
+                return self._segment
+
+    def purge_before(self, segment: int) -> None:
+        """Delete segments older than ``segment`` once a checkpoint covers them."""
+
+        for number in self.segments():
+            if number >= segment:
+                break
+            try:
+                os.unlink(os.path.join(self._directory, _segment_name(number)))
+            except FileNotFoundError:  # pragma: no cover - concurrent purge
+                pass
+
+    def replay(self) -> Iterator[Tuple[str, Any]]:
+        """Yield ``(kind, row)`` for every intact record in every sealed segment."""
+
+        for number in self.segments():
+            if number == self._segment:
+                continue
+            path = os.path.join(self._directory, _segment_name(number))
+            with open(path, "rb", buffering=1 << 20) as handle:
+                while True:
+                    header = handle.read(_FRAME.size)
+                    if len(header) < _FRAME.size:
+                        break
+                    length, checksum = _FRAME.unpack(header)
+                    payload = handle.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != checksum:
+                        logger.warning("ignoring torn tail of WAL segment %s", path)
+                        break
+                    yield pickle.loads(payload)
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            self._work.notify_all()
+        if self._committer is not None:
+            self._committer.join()
+        self._commit_pending(fsync=self._policy is not FsyncPolicy.OFF)
+        with self._io_lock:
+            self._file.close()
+
+    def _open_segment(self, number: int) -> BinaryIO:
+        return open(os.path.join(self._directory, _segment_name(number)), "ab", buffering=1 << 16)
+
+    def _commit_pending(self, *, fsync: bool) -> None:
+        # taking the buffer under the I/O lock keeps frames in append order
+        # even when a flush() races the committer thread
+        try:
+            with self._io_lock:
+                with self._cond:
+                    frames, self._buffer = self._buffer, []
+                    sequence = self._appended
+                if frames:
+                    self._file.write(b"".join(frames))
+                self._file.flush()
+                if fsync:
+                    os.fsync(self._file.fileno())
+        except BaseException as exc:
+            with self._cond:
+                self._failure = exc
+                self._cond.notify_all()
+                self._wake_async_waiters(None, exc)
+            raise
+        with self._cond:
+            if sequence > self._durable:
+                self._durable = sequence
+            self._cond.notify_all()
+            self._wake_async_waiters(self._durable, None)
+
+    def _wake_async_waiters(self, durable: Optional[int], failure: Optional[BaseException]) -> None:
+        # caller holds self._lock; waiters are queued in sequence order
+        waiters = self._async_waiters
+        while waiters and (durable is None or waiters[0][0] <= durable):
+            _, loop, future = waiters.popleft()
+            error = None
+            if failure is not None:
+                error = AnomError("write-ahead log commit failed")
+                error.__cause__ = failure
+            try:
+                loop.call_soon_threadsafe(_resolve, future, error)
+            except RuntimeError:  # pragma: no cover - the waiter's loop already closed
+                pass
+
+    def _run_committer(self) -> None:
+        fsync = self._policy is not FsyncPolicy.OFF
+        while True:
+            with self._work:
+                if self._policy is FsyncPolicy.GROUP:
+                    self._work.wait_for(lambda: self._buffer or self._closed)
+                    # give concurrent writers a short window to join this group
+                    self._work.wait_for(
+                        lambda: len(self._buffer) >= self._group_commit_records or self._closed,
+                        timeout=self._group_commit_s,
+                    )
+                else:
+                    self._work.wait_for(lambda: self._closed, timeout=self._group_commit_s)
+                if self._closed:
+                    return
+                if not self._buffer:
+                    continue
+            try:
+                self._commit_pending(fsync=fsync)
+            except Exception:  # pragma: no cover - surfaced to waiting writers
+                logger.exception("WAL group commit failed")
+                return
+
+
+__all__ = ["WriteAheadLog", "CheckpointGate", "FsyncPolicy", "WriteAheadLogClosedError"]
@@ -1,15 +1,27 @@
 """FastAPI router exposing alert operations."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 
-from anom.api.deps import get_alert_service
-from anom.modules.alerts.domain import Alert, AlertNotFoundError, AlertStatus
+from anom.api.deps import get_alert_service, get_business_service, on_loop
+from anom.core.serialization import JSONBytesResponse, encode_models
+from anom.modules.alerts.domain import (
+    Alert,
+    AlertAutoClosePolicy,
+    AlertBulkAction,
+    AlertBulkRequest,
+    AlertBulkResult,
+    AlertNotFoundError,
+    AlertStatus,
+)
 from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessNotFoundError
+from anom.modules.business_def.service import BusinessService
 
 router = APIRouter()
 
@@ -18,19 +30,77 @@ class AlertAcknowledgeRequest(BaseModel):
     actor: str = Field(..., min_length=1, max_length=120)
 
 
-@router.get("/", response_model=List[Alert])
+# unfiltered listings walk and encode many alerts, so this one stays in the threadpool
+@router.get("/", response_model=List[Alert], response_class=JSONBytesResponse)
 def list_alerts(
     business_id: Optional[UUID] = Query(default=None),
     status_param: Optional[AlertStatus] = Query(default=None, alias="status"),
+    after: Optional[UUID] = Query(default=None, description="Return alerts created after this alert id"),
+    since: Optional[datetime] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=10_000),
     service: AlertService = Depends(get_alert_service),
-) -> List[Alert]:
-    return service.list_alerts(business_id=business_id, status=status_param)
+) -> JSONBytesResponse:
+    alerts = service.list_alerts(business_id=business_id, status=status_param, after=after, since=since, limit=limit)
+    return JSONBytesResponse(encode_models(alerts))
+
+
+# bulk updates walk the alert index, so they run in the threadpool
+@router.post("/bulk/{action}", response_model=AlertBulkResult)
+def bulk_update_alerts(
+    action: AlertBulkAction,
+    payload: AlertBulkRequest,
+    service: AlertService = Depends(get_alert_service),
+) -> AlertBulkResult:
+    return service.bulk_update(action, payload)
+
+
+def _require_business(business_service: BusinessService, business_id: UUID) -> None:
+    try:
+        business_service.get_business(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.put("/auto-close/{business_id}", response_model=AlertAutoClosePolicy)
+async def set_auto_close_policy(
+    business_id: UUID,
+    policy: AlertAutoClosePolicy,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: AlertService = Depends(on_loop(get_alert_service)),
+) -> AlertAutoClosePolicy:
+    _require_business(business_service, business_id)
+    return service.set_auto_close_policy(business_id, policy)
+
+
+@router.get("/auto-close/{business_id}", response_model=AlertAutoClosePolicy)
+async def get_auto_close_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: AlertService = Depends(on_loop(get_alert_service)),
+) -> AlertAutoClosePolicy:
+    _require_business(business_service, business_id)
+    policy = service.get_auto_close_policy(business_id)
+    if policy is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auto-close policy not found")
+    return policy
+
+
+@router.delete("/auto-close/{business_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_auto_close_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: AlertService = Depends(on_loop(get_alert_service)),
+) -> Response:
+    _require_business(business_service, business_id)
+    if not service.delete_auto_close_policy(business_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Auto-close policy not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/{alert_id}", response_model=Alert)
-def get_alert(
+async def get_alert(
     alert_id: UUID,
-    service: AlertService = Depends(get_alert_service),
+    service: AlertService = Depends(on_loop(get_alert_service)),
 ) -> Alert:
     try:
         return service.get_alert(alert_id)
@@ -39,13 +109,13 @@ def get_alert(
 
 
 @router.post("/{alert_id}/ack", response_model=Alert)
-def acknowledge_alert(
+async def acknowledge_alert(
     alert_id: UUID,
     payload: AlertAcknowledgeRequest,
-    service: AlertService = Depends(get_alert_service),
+    service: AlertService = Depends(on_loop(get_alert_service)),
 ) -> Alert:
     try:
-        return service.acknowledge_alert(alert_id, payload.actor)
+        return await service.acknowledge_alert_async(alert_id, payload.actor)
     except AlertNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found") from exc
 
@@ -3,10 +3,10 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from anom.modules.rules.domain import SeverityLevel
 
@@ -19,6 +19,24 @@ class AlertStatus(str, Enum):
     CLOSED = "closed"
 
 
+class DeliveryStatus(str, Enum):
+    """Delivery state of an alert towards one notification destination."""
+
+    PENDING = "pending"
+    DELIVERED = "delivered"
+    FAILED = "failed"
+
+
+class AlertDelivery(BaseModel):
+    """Outcome of notifying one destination about an alert."""
+
+    destination_id: UUID
+    status: DeliveryStatus
+    attempts: int = 0
+    last_error: Optional[str] = None
+    updated_at: datetime
+
+
 class AlertCreate(BaseModel):
     """Payload needed to register an alert."""
 
@@ -27,6 +45,7 @@ class AlertCreate(BaseModel):
     event_id: UUID
     message: str = Field(..., min_length=1, max_length=500)
     severity: SeverityLevel
+    backfill_id: Optional[UUID] = None
 
 
 class Alert(AlertCreate):
@@ -37,6 +56,69 @@ class Alert(AlertCreate):
     status: AlertStatus = AlertStatus.OPEN
     acknowledged_at: Optional[datetime] = None
     acknowledged_by: Optional[str] = None
+    closed_at: Optional[datetime] = None
+    closed_by: Optional[str] = None
+    deliveries: List[AlertDelivery] = Field(default_factory=list)
+
+
+class AlertFilter(BaseModel):
+    """Selects alerts by business, rule, status and creation time (``since <= created_at < until``)."""
+
+    business_id: Optional[UUID] = None
+    rule_id: Optional[UUID] = None
+    status: Optional[AlertStatus] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+
+class AlertBulkAction(str, Enum):
+    """Lifecycle transition applied by a bulk request."""
+
+    ACK = "ack"
+    CLOSE = "close"
+
+
+class AlertBulkRequest(BaseModel):
+    """Either explicit ``alert_ids`` or a ``filter``, not both.
+
+    A filter must name its ``business_id`` unless ``all_businesses`` is set,
+    so an empty filter cannot ack or close every alert by accident.
+    """
+
+    actor: str = Field(..., min_length=1, max_length=120)
+    alert_ids: Optional[List[UUID]] = Field(default=None, max_length=100_000)
+    filter: Optional[AlertFilter] = None
+    all_businesses: bool = False
+
+    @model_validator(mode="after")
+    def _check_selector(self) -> "AlertBulkRequest":
+        if (self.alert_ids is None) == (self.filter is None):
+            raise ValueError("provide exactly one of alert_ids or filter")
+        if self.filter is None:
+            if self.all_businesses:
+                raise ValueError("all_businesses only applies to a filter")
+        elif (self.filter.business_id is None) != self.all_businesses:
+            raise ValueError("a filter needs either filter.business_id or all_businesses=true, not both")
+        return self
+
+
+class AlertBulkResult(BaseModel):
+    """How many alerts a bulk action selected and how many it changed."""
+
+    matched: int
+    updated: int
+
+
+class AlertAutoClosePolicy(BaseModel):
+    """Close a business's open or acked alerts once their rule has been quiet.
+
+    A rule is quiet when it has not raised an alert for ``quiet_seconds``.
+    ``rule_id`` and ``status`` narrow which alerts the policy may close.
+    """
+
+    quiet_seconds: int = Field(..., ge=1)
+    rule_id: Optional[UUID] = None
+    status: Optional[AlertStatus] = None
 
 
 class AlertNotFoundError(Exception):
@@ -1,39 +1,288 @@
 """In-memory repository for alerts."""
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import heapq
+from bisect import bisect_left
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 
-from anom.modules.alerts.domain import Alert, AlertStatus
+from anom.core.locks import StripedLock
+from anom.core.wal import WriteAheadLog
+from anom.modules.alerts.domain import Alert, AlertDelivery, AlertStatus
 
 
 class AlertRepository:
-    """Stores alerts keyed by their identifier."""
+    """Stores alerts keyed by their identifier.
 
-    def __init__(self) -> None:
+    Alert ids are time-ordered, so each business keeps a sorted list of id
+    ints; cursors and time ranges are bisected and cross-business listings
+    are a lazy k-way merge of those lists. Writes hold the business's lock
+    stripe, so read-modify-write updates of one alert never interleave.
+    Updates only queue their log record under the stripe, so log order is
+    memory order, and wait for the commit after releasing it.
+
+    Per business, the ids of alerts that are not closed are also kept by
+    rule, together with when each rule last raised an alert, so auto-close
+    only looks at open alerts instead of the whole history.
+    """
+
+    def __init__(self, wal: Optional[WriteAheadLog] = None, *, lock_stripes: int = 64) -> None:
         self._alerts: Dict[UUID, Alert] = {}
+        self._by_business: Dict[UUID, List[int]] = {}
+        # business -> rule -> ids of alerts not closed yet
+        self._open: Dict[UUID, Dict[UUID, Set[UUID]]] = {}
+        # business -> rule -> creation time of its latest alert
+        self._last_raised: Dict[UUID, Dict[UUID, datetime]] = {}
+        self._wal = wal
+        # held from log append to in-memory apply, always before a lock stripe
+        self._gate: AbstractContextManager = wal.gate if wal is not None else nullcontext()
+        self._locks = StripedLock(lock_stripes)
+
+    def _index(self, alert: Alert) -> None:
+        # caller holds the business's stripe
+        ids = self._by_business.setdefault(alert.business_id, [])
+        value = alert.id.int
+        if not ids or value > ids[-1]:
+            ids.append(value)
+        else:
+            position = bisect_left(ids, value)
+            if position == len(ids) or ids[position] != value:
+                ids.insert(position, value)
+        self._track(alert)
+
+    def _track(self, alert: Alert) -> None:
+        # caller holds the business's stripe
+        rules = self._open.setdefault(alert.business_id, {})
+        if alert.status is AlertStatus.CLOSED:
+            open_ids = rules.get(alert.rule_id)
+            if open_ids is not None:
+                open_ids.discard(alert.id)
+                if not open_ids:
+                    del rules[alert.rule_id]
+        else:
+            rules.setdefault(alert.rule_id, set()).add(alert.id)
+        raised = self._last_raised.setdefault(alert.business_id, {})
+        latest = raised.get(alert.rule_id)
+        if latest is None or alert.created_at > latest:
+            raised[alert.rule_id] = alert.created_at
 
     def add_alert(self, alert: Alert) -> Alert:
-        self._alerts[alert.id] = alert
+        with self._gate:
+            if self._wal is not None:
+                self._wal.append("alert", alert.model_dump())
+            return self._store(alert)
+
+    def add_alerts(self, alerts: List[Alert]) -> List[Alert]:
+        """Store a batch of alerts behind a single log write."""
+
+        with self._gate:
+            if self._wal is not None:
+                self._wal.append_many("alert", [alert.model_dump() for alert in alerts])
+            return [self._store(alert) for alert in alerts]
+
+    async def add_alert_async(self, alert: Alert) -> Alert:
+        """:meth:`add_alert` for coroutines: awaits the log instead of blocking on it."""
+
+        if self._wal is None:
+            return self._store(alert)
+        async with self._wal.gate.shared():
+            durable = self._wal.append_later("alert", alert.model_dump())
+            stored = self._store(alert)
+        await durable
+        return stored
+
+    def _store(self, alert: Alert) -> Alert:
+        with self._locks.for_key(alert.business_id):
+            self._alerts[alert.id] = alert
+            self._index(alert)
         return alert.model_copy()
 
-    def list_alerts(self, business_id: Optional[UUID] = None, status: Optional[AlertStatus] = None) -> List[Alert]:
-        alerts = self._alerts.values()
-        if business_id:
-            alerts = [a for a in alerts if a.business_id == business_id]
+    def _id_ranges(self, business_id: Optional[UUID], start: Optional[int], end: Optional[int]) -> List[List[int]]:
+        if business_id is not None:
+            lists = [self._by_business.get(business_id, [])]
         else:
-            alerts = list(alerts)
-        if status:
-            alerts = [a for a in alerts if a.status == status]
-        return [a.model_copy() for a in alerts]
+            lists = list(self._by_business.values())
+        ranges = []
+        for ids in lists:
+            lo = bisect_left(ids, start) if start is not None else 0
+            hi = bisect_left(ids, end, lo=lo) if end is not None else len(ids)
+            # the slice copy is atomic, so the merge never sees a list mid-insert
+            chunk = ids[lo:hi]
+            if chunk:
+                ranges.append(chunk)
+        return ranges
+
+    def iter_alerts(
+        self,
+        business_id: Optional[UUID] = None,
+        *,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Iterator[Alert]:
+        """Stored alerts with ``start <= id.int < end`` in id (creation) order."""
+
+        ranges = self._id_ranges(business_id, start, end)
+        merged = ranges[0] if len(ranges) == 1 else heapq.merge(*ranges)
+        alerts = self._alerts
+        for value in merged:
+            alert = alerts.get(UUID(int=value))
+            if alert is not None:
+                yield alert
+
+    def list_alerts(
+        self,
+        business_id: Optional[UUID] = None,
+        status: Optional[AlertStatus] = None,
+        *,
+        after: Optional[UUID] = None,
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Alert]:
+        """Alerts in creation order, after the ``after`` cursor and from id int ``since``."""
+
+        start = since
+        if after is not None:
+            start = max(start or 0, after.int + 1)
+        result: List[Alert] = []
+        for alert in self.iter_alerts(business_id, start=start):
+            if status and alert.status != status:
+                continue
+            result.append(alert.model_copy())
+            if limit is not None and len(result) >= limit:
+                break
+        return result
 
     def get_alert(self, alert_id: UUID) -> Optional[Alert]:
         alert = self._alerts.get(alert_id)
         return alert.model_copy() if alert else None
 
+    def _enqueue(self, alerts: List[Alert]) -> Optional[int]:
+        # caller holds the gate and the stripe; the commit is waited for after both are released
+        if self._wal is None:
+            return None
+        return self._wal.enqueue_many("alert", [alert.model_dump() for alert in alerts])
+
+    def _wait_durable(self, sequence: Optional[int]) -> None:
+        if sequence is not None:
+            self._wal.wait_durable(sequence)
+
     def update_alert(self, alert: Alert) -> Alert:
-        self._alerts[alert.id] = alert
+        with self._gate, self._locks.for_key(alert.business_id):
+            sequence = self._enqueue([alert])
+            self._alerts[alert.id] = alert
+            self._index(alert)
+        self._wait_durable(sequence)
         return alert.model_copy()
 
+    def modify_alert(self, alert_id: UUID, changes: Dict[str, Any]) -> Optional[Alert]:
+        """Atomically apply ``changes`` to the current version of an alert."""
+
+        alert = self._alerts.get(alert_id)
+        if alert is None:
+            return None
+        with self._gate, self._locks.for_key(alert.business_id):
+            updated = self._alerts[alert_id].model_copy(update=changes)
+            sequence = self._enqueue([updated])
+            self._alerts[alert_id] = updated
+            self._track(updated)
+        self._wait_durable(sequence)
+        return updated.model_copy()
+
+    async def modify_alert_async(self, alert_id: UUID, changes: Dict[str, Any]) -> Optional[Alert]:
+        """:meth:`modify_alert` for coroutines; the log write is queued under the stripe and awaited after it."""
+
+        alert = self._alerts.get(alert_id)
+        if alert is None:
+            return None
+        if self._wal is None:
+            return self.modify_alert(alert_id, changes)
+        async with self._wal.gate.shared():
+            with self._locks.for_key(alert.business_id):
+                updated = self._alerts[alert_id].model_copy(update=changes)
+                durable = self._wal.append_later("alert", updated.model_dump())
+                self._alerts[alert_id] = updated
+                self._track(updated)
+        await durable
+        return updated.model_copy()
+
+    def modify_many(
+        self,
+        alert_ids: Iterable[UUID],
+        changes: Dict[str, Any],
+        predicate: Callable[[Alert], bool],
+    ) -> Tuple[int, int]:
+        """Apply ``changes`` to every listed alert whose current version satisfies ``predicate``.
+
+        Alerts are grouped by business so each lock stripe is taken once and
+        each group is logged with a single write, queued before the group is
+        applied. Returns how many of the ids exist and how many changed.
+        """
+
+        groups: Dict[UUID, List[UUID]] = {}
+        found = 0
+        for alert_id in alert_ids:
+            alert = self._alerts.get(alert_id)
+            if alert is not None:
+                groups.setdefault(alert.business_id, []).append(alert_id)
+                found += 1
+        changed = 0
+        sequence: Optional[int] = None
+        for business_id, ids in groups.items():
+            with self._gate, self._locks.for_key(business_id):
+                alerts = self._alerts
+                updated = [
+                    alerts[alert_id].model_copy(update=changes) for alert_id in ids if predicate(alerts[alert_id])
+                ]
+                if not updated:
+                    continue
+                sequence = self._enqueue(updated)
+                for alert in updated:
+                    alerts[alert.id] = alert
+                    self._track(alert)
+                changed += len(updated)
+        # the last group's record covers every earlier one
+        self._wait_durable(sequence)
+        return found, changed
+
+    def open_alert_ids(self, business_id: UUID) -> Dict[UUID, List[UUID]]:
+        """Ids of the business's alerts that are not closed, by rule."""
+
+        with self._locks.for_key(business_id):
+            return {rule_id: list(ids) for rule_id, ids in self._open.get(business_id, {}).items()}
+
+    def last_raised(self, business_id: UUID, rule_id: UUID) -> Optional[datetime]:
+        """Creation time of the latest alert ``rule_id`` raised for the business."""
+
+        return self._last_raised.get(business_id, {}).get(rule_id)
+
+    def record_delivery(self, alert_ids: Iterable[UUID], delivery: AlertDelivery) -> None:
+        """Set ``delivery`` on each alert, replacing any previous state for that destination."""
+
+        for alert_id in alert_ids:
+            alert = self._alerts.get(alert_id)
+            if alert is None:
+                continue
+            with self._locks.for_key(alert.business_id):
+                alert = self._alerts[alert_id]
+                deliveries = [d for d in alert.deliveries if d.destination_id != delivery.destination_id]
+                deliveries.append(delivery)
+                self._alerts[alert_id] = alert.model_copy(update={"deliveries": deliveries})
+
+    def snapshot_rows(self) -> Iterator[Dict[str, Any]]:
+        for alert in list(self._alerts.values()):
+            yield alert.model_dump()
+
+    def restore_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for data in rows:
+            alert = Alert.model_validate(data)
+            with self._locks.for_key(alert.business_id):
+                self._alerts[alert.id] = alert
+                self._index(alert)
+
     def clear(self) -> None:
         self._alerts.clear()
+        self._by_business.clear()
+        self._open.clear()
+        self._last_raised.clear()
@@ -1,40 +1,99 @@
 """Application services for managing alerts."""
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List, Optional
-from uuid import UUID, uuid4
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
 
-from anom.modules.alerts.domain import Alert, AlertCreate, AlertNotFoundError, AlertStatus
+from anom.common_models.identifiers import id_floor, new_id
+from anom.core.periodic import PeriodicWorker
+from anom.modules.alerts.domain import (
+    Alert,
+    AlertAutoClosePolicy,
+    AlertBulkAction,
+    AlertBulkRequest,
+    AlertBulkResult,
+    AlertCreate,
+    AlertFilter,
+    AlertNotFoundError,
+    AlertStatus,
+)
 from anom.modules.alerts.repo import AlertRepository
 
+logger = logging.getLogger(__name__)
+
+AlertListener = Callable[[Alert], None]
+
+AUTO_CLOSE_ACTOR = "auto-close"
+
+# statuses each bulk action may move an alert out of
+_TRANSITIONS: Dict[AlertBulkAction, FrozenSet[AlertStatus]] = {
+    AlertBulkAction.ACK: frozenset({AlertStatus.OPEN}),
+    AlertBulkAction.CLOSE: frozenset({AlertStatus.OPEN, AlertStatus.ACKED}),
+}
+
 
 class AlertService:
     """Provides alert lifecycle operations."""
 
-    def __init__(self, repository: AlertRepository) -> None:
+    def __init__(self, repository: AlertRepository, listeners: Sequence[AlertListener] = ()) -> None:
         self._repository = repository
+        self._listeners = tuple(listeners)
+        self._auto_close: Dict[UUID, AlertAutoClosePolicy] = {}
 
     def create_alert(self, payload: AlertCreate) -> Alert:
-        alert = Alert(
-            id=uuid4(),
+        stored = self._repository.add_alert(self._new_alert(payload))
+        for listener in self._listeners:
+            listener(stored)
+        return stored
+
+    def create_alerts(self, payloads: Sequence[AlertCreate], *, notify: bool = True) -> List[Alert]:
+        """Create many alerts at once; ``notify=False`` skips the listeners (e.g. for historical backfills)."""
+
+        stored = self._repository.add_alerts([self._new_alert(payload) for payload in payloads])
+        if notify:
+            for alert in stored:
+                for listener in self._listeners:
+                    listener(alert)
+        return stored
+
+    async def create_alert_async(self, payload: AlertCreate) -> Alert:
+        stored = await self._repository.add_alert_async(self._new_alert(payload))
+        for listener in self._listeners:
+            listener(stored)
+        return stored
+
+    @staticmethod
+    def _new_alert(payload: AlertCreate) -> Alert:
+        return Alert(
+            id=new_id(),
             business_id=payload.business_id,
             rule_id=payload.rule_id,
             event_id=payload.event_id,
             message=payload.message,
             severity=payload.severity,
+            backfill_id=payload.backfill_id,
             created_at=datetime.utcnow(),
             status=AlertStatus.OPEN,
         )
-        return self._repository.add_alert(alert)
 
     def list_alerts(
         self,
         *,
         business_id: Optional[UUID] = None,
         status: Optional[AlertStatus] = None,
+        after: Optional[UUID] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
     ) -> List[Alert]:
-        return self._repository.list_alerts(business_id=business_id, status=status)
+        return self._repository.list_alerts(
+            business_id=business_id,
+            status=status,
+            after=after,
+            since=id_floor(since) if since is not None else None,
+            limit=limit,
+        )
 
     def get_alert(self, alert_id: UUID) -> Alert:
         alert = self._repository.get_alert(alert_id)
@@ -43,21 +102,140 @@ class AlertService:
         return alert
 
     def acknowledge_alert(self, alert_id: UUID, actor: str) -> Alert:
-        alert = self.get_alert(alert_id)
-        updated = alert.model_copy(
-            update={
-                "status": AlertStatus.ACKED,
-                "acknowledged_by": actor,
-                "acknowledged_at": datetime.utcnow(),
-            }
+        updated = self._repository.modify_alert(alert_id, self._ack_changes(actor))
+        if updated is None:
+            raise AlertNotFoundError(str(alert_id))
+        return updated
+
+    async def acknowledge_alert_async(self, alert_id: UUID, actor: str) -> Alert:
+        updated = await self._repository.modify_alert_async(alert_id, self._ack_changes(actor))
+        if updated is None:
+            raise AlertNotFoundError(str(alert_id))
+        return updated
+
+    def bulk_update(self, action: AlertBulkAction, request: AlertBulkRequest) -> AlertBulkResult:
+        """Acknowledge or close every selected alert in one pass.
+
+        Alerts already past the transition (e.g. closed alerts for ``ack``)
+        are counted as matched but left unchanged; unknown ids are not
+        counted at all.
+        """
+
+        if request.alert_ids is not None:
+            alert_ids = list(dict.fromkeys(request.alert_ids))
+            wanted = None
+        else:
+            alert_ids = self._select(request.filter)
+            wanted = request.filter.status
+        allowed = _TRANSITIONS[action]
+        if action is AlertBulkAction.ACK:
+            changes = self._ack_changes(request.actor)
+        else:
+            changes = self._close_changes(request.actor)
+        matched, updated = self._repository.modify_many(
+            alert_ids,
+            changes,
+            lambda alert: alert.status in allowed and (wanted is None or alert.status == wanted),
         )
-        return self._repository.update_alert(updated)
+        return AlertBulkResult(matched=matched, updated=updated)
+
+    def _select(self, alert_filter: AlertFilter) -> List[UUID]:
+        start = id_floor(alert_filter.since) if alert_filter.since is not None else None
+        end = id_floor(alert_filter.until) if alert_filter.until is not None else None
+        rule_id, status = alert_filter.rule_id, alert_filter.status
+        return [
+            alert.id
+            for alert in self._repository.iter_alerts(alert_filter.business_id, start=start, end=end)
+            if (rule_id is None or alert.rule_id == rule_id) and (status is None or alert.status == status)
+        ]
+
+    def set_auto_close_policy(self, business_id: UUID, policy: AlertAutoClosePolicy) -> AlertAutoClosePolicy:
+        self._auto_close[business_id] = policy
+        return policy.model_copy()
+
+    def get_auto_close_policy(self, business_id: UUID) -> Optional[AlertAutoClosePolicy]:
+        policy = self._auto_close.get(business_id)
+        return policy.model_copy() if policy else None
+
+    def delete_auto_close_policy(self, business_id: UUID) -> bool:
+        return self._auto_close.pop(business_id, None) is not None
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+        for business_id, policy in list(self._auto_close.items()):
+            yield business_id.bytes, policy.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[bytes, Dict[str, Any]]]) -> None:
+        for business_id, data in rows:
+            self._auto_close[UUID(bytes=business_id)] = AlertAutoClosePolicy.model_validate(data)
+
+    def clear(self) -> None:
+        self._auto_close.clear()
+
+    def run_auto_close(self, now: Optional[datetime] = None) -> int:
+        """Close alerts whose rule has been quiet for its policy's window; returns how many.
+
+        Only the repository's index of alerts that are not closed is read, so
+        a pass costs the number of open alerts, not the alert history.
+        """
+
+        now = now or datetime.utcnow()
+        repository = self._repository
+        allowed = _TRANSITIONS[AlertBulkAction.CLOSE]
+        closed = 0
+        for business_id, policy in list(self._auto_close.items()):
+            cutoff = now - timedelta(seconds=policy.quiet_seconds)
+
+            def is_quiet(rule_id: UUID) -> bool:
+                raised = repository.last_raised(business_id, rule_id)
+                return raised is not None and raised < cutoff
+
+            quiet = [
+                alert_id
+                for rule_id, alert_ids in repository.open_alert_ids(business_id).items()
+                if (policy.rule_id is None or rule_id == policy.rule_id) and is_quiet(rule_id)
+                for alert_id in alert_ids
+            ]
+            if quiet:
+                # re-checked per alert: the rule may have fired again meanwhile
+                closed += repository.modify_many(
+                    quiet,
+                    self._close_changes(AUTO_CLOSE_ACTOR),
+                    lambda alert: alert.status in allowed
+                    and (policy.status is None or alert.status == policy.status)
+                    and is_quiet(alert.rule_id),
+                )[1]
+        return closed
+
+    @staticmethod
+    def _ack_changes(actor: str) -> Dict[str, Any]:
+        return {
+            "status": AlertStatus.ACKED,
+            "acknowledged_by": actor,
+            "acknowledged_at": datetime.utcnow(),
+        }
+
+    @staticmethod
+    def _close_changes(actor: str) -> Dict[str, Any]:
+        return {
+            "status": AlertStatus.CLOSED,
+            "closed_by": actor,
+            "closed_at": datetime.utcnow(),
+        }
+
+
+class AlertAutoCloser(PeriodicWorker):
+    """Background thread that periodically runs :meth:`AlertService.run_auto_close`."""
+
+    def __init__(self, service: AlertService, interval_seconds: float) -> None:
+        super().__init__(service.run_auto_close, interval_seconds, "anom-alert-auto-close")
 
 
 __all__ = [
     "AlertService",
+    "AlertAutoCloser",
     "AlertCreate",
     "Alert",
     "AlertStatus",
     "AlertNotFoundError",
+    "AlertListener",
 ]
@@ -1,12 +1,13 @@
 """FastAPI router exposing business definition endpoints."""
 from __future__ import annotations
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from anom.api.deps import get_business_service
+from anom.api.deps import get_business_service, get_sketch_store, get_time_series_store, on_loop
 from anom.modules.business_def.domain import (
     BusinessDefinition,
     BusinessNotFoundError,
@@ -18,29 +19,32 @@ from anom.modules.business_def.service import (
     BusinessUpdate,
     FieldDefinitionCreate,
 )
+from anom.modules.ingestion.domain import FieldSketchSummary, SeriesPoint, SeriesResolution
+from anom.modules.ingestion.series import TimeSeriesStore
+from anom.modules.ingestion.sketches import SketchStore
 
 router = APIRouter()
 
 
 @router.post("/", response_model=BusinessDefinition, status_code=status.HTTP_201_CREATED)
-def create_business(
+async def create_business(
     payload: BusinessCreate,
-    service: BusinessService = Depends(get_business_service),
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> BusinessDefinition:
     return service.create_business(payload)
 
 
 @router.get("/", response_model=List[BusinessDefinition])
-def list_businesses(
-    service: BusinessService = Depends(get_business_service),
+async def list_businesses(
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> List[BusinessDefinition]:
     return service.list_businesses()
 
 
 @router.get("/{business_id}", response_model=BusinessDefinition)
-def get_business(
+async def get_business(
     business_id: UUID,
-    service: BusinessService = Depends(get_business_service),
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> BusinessDefinition:
     try:
         return service.get_business(business_id)
@@ -49,10 +53,10 @@ def get_business(
 
 
 @router.patch("/{business_id}", response_model=BusinessDefinition)
-def update_business(
+async def update_business(
     business_id: UUID,
     payload: BusinessUpdate,
-    service: BusinessService = Depends(get_business_service),
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> BusinessDefinition:
     try:
         return service.update_business(business_id, payload)
@@ -65,10 +69,10 @@ def update_business(
     response_model=FieldDefinition,
     status_code=status.HTTP_201_CREATED,
 )
-def add_field(
+async def add_field(
     business_id: UUID,
     payload: FieldDefinitionCreate,
-    service: BusinessService = Depends(get_business_service),
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> FieldDefinition:
     try:
         return service.add_field(business_id, payload)
@@ -77,9 +81,9 @@ def add_field(
 
 
 @router.get("/{business_id}/fields", response_model=List[FieldDefinition])
-def list_fields(
+async def list_fields(
     business_id: UUID,
-    service: BusinessService = Depends(get_business_service),
+    service: BusinessService = Depends(on_loop(get_business_service)),
 ) -> List[FieldDefinition]:
     try:
         return service.list_fields(business_id)
@@ -87,4 +91,38 @@ def list_fields(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
 
 
+@router.get("/{business_id}/series", response_model=List[SeriesPoint])
+async def get_series(
+    business_id: UUID,
+    field: str = Query(..., min_length=1, max_length=120),
+    resolution: SeriesResolution = Query(default=SeriesResolution.MINUTE),
+    since: Optional[datetime] = Query(default=None),
+    service: BusinessService = Depends(on_loop(get_business_service)),
+    series_store: TimeSeriesStore = Depends(on_loop(get_time_series_store)),
+) -> List[SeriesPoint]:
+    try:
+        service.get_business(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+    return series_store.series(business_id, field, resolution, since)
+
+
+@router.get("/{business_id}/sketches/{field}", response_model=FieldSketchSummary)
+async def get_field_sketch(
+    business_id: UUID,
+    field: str,
+    window_seconds: int = Query(default=300, ge=1, le=86400),
+    top: int = Query(default=10, ge=1, le=1_000),
+    service: BusinessService = Depends(on_loop(get_business_service)),
+    sketches: SketchStore = Depends(on_loop(get_sketch_store)),
+) -> FieldSketchSummary:
+    try:
+        fields = service.list_fields(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+    if not any(definition.name == field and definition.sketched for definition in fields):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sketched field not found")
+    return sketches.summary(business_id, field, window_seconds, top=top)
+
+
 __all__ = ["router"]
@@ -6,7 +6,7 @@ from enum import Enum
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class FieldDataType(str, Enum):
@@ -19,6 +19,11 @@ class FieldDataType(str, Enum):
     DATETIME = "datetime"
 
 
+# fields that can be indexed or sketched; integer indexes are capped in
+# cardinality (see anom.modules.ingestion.index)
+INDEXABLE_TYPES = frozenset({FieldDataType.STRING, FieldDataType.INTEGER})
+
+
 class BusinessCreate(BaseModel):
     """Payload required to create a business definition."""
 
@@ -47,6 +52,16 @@ class FieldDefinitionCreate(BaseModel):
     data_type: FieldDataType
     required: bool = True
     description: Optional[str] = Field(default=None, max_length=500)
+    indexed: bool = Field(default=False, description="Keep an inverted index for equality lookups on this field")
+    sketched: bool = Field(default=False, description="Keep windowed heavy-hitter and distinct-count sketches")
+
+    @model_validator(mode="after")
+    def _check_indexable(self) -> "FieldDefinitionCreate":
+        if self.indexed and self.data_type not in INDEXABLE_TYPES:
+            raise ValueError("only string and integer fields can be indexed")
+        if self.sketched and self.data_type not in INDEXABLE_TYPES:
+            raise ValueError("only string and integer fields can be sketched")
+        return self
 
 
 class FieldDefinition(FieldDefinitionCreate):
@@ -1,7 +1,7 @@
 """In-memory repository for business definitions and schema fields."""
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from uuid import UUID
 
 from anom.modules.business_def.domain import BusinessDefinition, FieldDefinition
@@ -19,7 +19,7 @@ class BusinessRepository:
         return business.model_copy()
 
     def list_businesses(self) -> List[BusinessDefinition]:
-        return [b.model_copy() for b in self._businesses.values()]
+        return [b.model_copy() for b in list(self._businesses.values())]
 
     def get_business(self, business_id: UUID) -> Optional[BusinessDefinition]:
         business = self._businesses.get(business_id)
@@ -36,14 +36,30 @@ class BusinessRepository:
 
     def list_fields(self, business_id: UUID) -> List[FieldDefinition]:
         fields = self._fields.get(business_id, {})
-        return [f.model_copy() for f in fields.values()]
+        return [f.model_copy() for f in list(fields.values())]
 
     def get_field(self, business_id: UUID, field_id: UUID) -> Optional[FieldDefinition]:
         field = self._fields.get(business_id, {}).get(field_id)
         return field.model_copy() if field else None
 
     def iter_fields(self, business_id: UUID) -> Iterable[FieldDefinition]:
-        yield from (f.model_copy() for f in self._fields.get(business_id, {}).values())
+        yield from (f.model_copy() for f in list(self._fields.get(business_id, {}).values()))
+
+    def snapshot_rows(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for business in list(self._businesses.values()):
+            yield "business", business.model_dump()
+        for fields in list(self._fields.values()):
+            for field in list(fields.values()):
+                yield "field", field.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        for kind, data in rows:
+            if kind == "business":
+                business = BusinessDefinition.model_validate(data)
+                self._businesses[business.id] = business
+            else:
+                field = FieldDefinition.model_validate(data)
+                self._fields.setdefault(field.business_id, {})[field.id] = field
 
     def clear(self) -> None:
         self._businesses.clear()
@@ -56,6 +56,8 @@ class BusinessService:
             data_type=payload.data_type,
             required=payload.required,
             description=payload.description,
+            indexed=payload.indexed,
+            sketched=payload.sketched,
             created_at=datetime.utcnow(),
         )
         return self._repository.add_field(field)
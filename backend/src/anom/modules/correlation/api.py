@@ -0,0 +1,75 @@
+"""FastAPI router exposing cross-business correlation rules."""
+from __future__ import annotations
+
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from anom.api.deps import get_correlation_service, on_loop
+from anom.modules.business_def.domain import BusinessNotFoundError
+from anom.modules.correlation.domain import (
+    CorrelationRule,
+    CorrelationRuleCreate,
+    CorrelationRuleNotFoundError,
+    CorrelationStats,
+)
+from anom.modules.correlation.service import CorrelationService
+
+router = APIRouter()
+
+
+@router.post("/", response_model=CorrelationRule, status_code=status.HTTP_201_CREATED)
+async def create_correlation_rule(
+    payload: CorrelationRuleCreate,
+    service: CorrelationService = Depends(on_loop(get_correlation_service)),
+) -> CorrelationRule:
+    try:
+        return service.create_rule(payload)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.get("/", response_model=List[CorrelationRule])
+async def list_correlation_rules(
+    business_id: Optional[UUID] = Query(default=None, description="Rules with this business on either side"),
+    service: CorrelationService = Depends(on_loop(get_correlation_service)),
+) -> List[CorrelationRule]:
+    return service.list_rules(business_id)
+
+
+@router.get("/{rule_id}", response_model=CorrelationRule)
+async def get_correlation_rule(
+    rule_id: UUID,
+    service: CorrelationService = Depends(on_loop(get_correlation_service)),
+) -> CorrelationRule:
+    try:
+        return service.get_rule(rule_id)
+    except CorrelationRuleNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Correlation rule not found") from exc
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_correlation_rule(
+    rule_id: UUID,
+    service: CorrelationService = Depends(on_loop(get_correlation_service)),
+) -> Response:
+    try:
+        service.delete_rule(rule_id)
+    except CorrelationRuleNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Correlation rule not found") from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{rule_id}/stats", response_model=CorrelationStats)
+async def get_correlation_stats(
+    rule_id: UUID,
+    service: CorrelationService = Depends(on_loop(get_correlation_service)),
+) -> CorrelationStats:
+    try:
+        return service.get_stats(rule_id)
+    except CorrelationRuleNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Correlation rule not found") from exc
+
+
+__all__ = ["router"]
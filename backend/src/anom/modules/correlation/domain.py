@@ -0,0 +1,70 @@
+"""Domain models for cross-business correlation rules."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from anom.modules.rules.domain import RuleCondition, SeverityLevel
+
+MAX_WINDOW_SECONDS = 7 * 86400
+
+
+class CorrelationRuleCreate(BaseModel):
+    """Expect every source event to be followed by a target event with the same key.
+
+    A source event (optionally filtered by ``source_condition``) waits up to
+    ``window_seconds`` for a target event whose ``target_key`` equals its
+    ``source_key``. An alert is raised when the window expires unmatched, and
+    when a match arrives later than ``latency_threshold_seconds``.
+    """
+
+    name: str = Field(..., min_length=1, max_length=120)
+    description: Optional[str] = Field(default=None, max_length=500)
+    source_business_id: UUID
+    target_business_id: UUID
+    source_key: str = Field(..., min_length=1, max_length=120)
+    target_key: Optional[str] = Field(default=None, min_length=1, max_length=120)
+    source_condition: Optional[RuleCondition] = None
+    target_condition: Optional[RuleCondition] = None
+    window_seconds: float = Field(..., gt=0, le=MAX_WINDOW_SECONDS)
+    latency_threshold_seconds: Optional[float] = Field(default=None, gt=0)
+    severity: SeverityLevel = SeverityLevel.WARNING
+
+    @model_validator(mode="after")
+    def _check_threshold(self) -> "CorrelationRuleCreate":
+        if self.latency_threshold_seconds is not None and self.latency_threshold_seconds >= self.window_seconds:
+            raise ValueError("latency_threshold_seconds must be shorter than window_seconds")
+        return self
+
+    @property
+    def join_key(self) -> str:
+        """Field read from target events (defaults to ``source_key``)."""
+
+        return self.target_key or self.source_key
+
+
+class CorrelationRule(CorrelationRuleCreate):
+    """Stored correlation rule."""
+
+    id: UUID
+    created_at: datetime
+
+
+class CorrelationStats(BaseModel):
+    """Live join state and outcome counters of one correlation rule."""
+
+    rule_id: UUID
+    pending: int
+    matched: int
+    late: int
+    expired: int
+    evicted: int
+
+
+class CorrelationRuleNotFoundError(Exception):
+    """Raised when an operation references an unknown correlation rule."""
+
+    pass
@@ -0,0 +1,296 @@
+"""Windowed hash joins between the event streams of two businesses.
+
+Each correlation rule owns an :class:`ExpiringJoinTable`: source events wait
+in a hash table keyed by their join value, and a queue in arrival order
+drives expiry. A target event takes the oldest pending source event with
+its key in O(1). Entries leave the table when they are matched or when the
+window passes, so state is bounded by the window (and ``max_pending``)
+rather than by history. A source event evicted to respect ``max_pending``
+raises the same "no match" alert as one whose window passed, only earlier.
+
+Expiry happens as events flow through :meth:`CorrelationEngine.observe`
+and on the :class:`CorrelationSweeper` tick, so quiet streams still raise
+their unmatched alerts. Join state lives in memory only and starts empty
+after a restart.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from anom.common_models.time import epoch_micros
+from anom.core.periodic import PeriodicWorker
+from anom.modules.alerts.domain import AlertCreate
+from anom.modules.alerts.service import AlertService
+from anom.modules.correlation.domain import CorrelationRule, CorrelationStats
+from anom.modules.correlation.repo import CorrelationRepository
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rule_engine.evaluator import match_condition
+from anom.modules.rules.domain import RuleCondition
+
+class PendingEvent:
+    """A source event waiting for its target."""
+
+    __slots__ = ("key", "event_id", "ts_us", "done")
+
+    def __init__(self, key: Any, event_id: UUID, ts_us: int) -> None:
+        self.key = key
+        self.event_id = event_id
+        self.ts_us = ts_us
+        self.done = False
+
+
+class ExpiringJoinTable:
+    """Pending events by join key, expiring ``window_us`` after they arrived.
+
+    Matched entries are only flagged in the expiry queue and skipped when
+    they reach its head, so both ``take`` and ``expire`` are amortized O(1).
+    Callers serialize access.
+    """
+
+    def __init__(self, window_us: int, max_entries: int) -> None:
+        self._window_us = window_us
+        self._max_entries = max_entries
+        self._by_key: Dict[Any, Deque[PendingEvent]] = {}
+        self._queue: Deque[PendingEvent] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pending: PendingEvent) -> Optional[PendingEvent]:
+        """Insert ``pending``; returns the oldest entry if it had to be evicted to make room."""
+
+        evicted = self._pop_oldest() if self._size >= self._max_entries else None
+        self._by_key.setdefault(pending.key, deque()).append(pending)
+        self._queue.append(pending)
+        self._size += 1
+        return evicted
+
+    def take(self, key: Any) -> Optional[PendingEvent]:
+        """Remove and return the oldest pending entry for ``key``."""
+
+        waiting = self._by_key.get(key)
+        if not waiting:
+            return None
+        pending = waiting.popleft()
+        if not waiting:
+            del self._by_key[key]
+        pending.done = True
+        self._size -= 1
+        return pending
+
+    def expire(self, now_us: int) -> List[PendingEvent]:
+        """Remove and return the entries whose window ended at or before ``now_us``."""
+
+        expired = []
+        queue = self._queue
+        cutoff = now_us - self._window_us
+        while queue and (queue[0].done or queue[0].ts_us <= cutoff):
+            pending = queue[0]
+            if pending.done:
+                queue.popleft()
+            else:
+                expired.append(self._pop_oldest())
+        return expired
+
+    def _pop_oldest(self) -> Optional[PendingEvent]:
+        queue = self._queue
+        while queue:
+            pending = queue.popleft()
+            if pending.done:
+                continue
+            # keys are FIFO too, so the oldest live entry heads its key's deque
+            self.take(pending.key)
+            return pending
+        return None
+
+
+def _matches(condition: Optional[RuleCondition], payload: Mapping[str, Any]) -> bool:
+    if condition is None:
+        return True
+    try:
+        return match_condition(condition, payload)
+    except TypeError:
+        return False
+
+
+def _key(payload: Mapping[str, Any], field: str) -> Any:
+    value = payload.get(field)
+    if value is None:
+        return None
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value
+
+
+class _RuleState:
+    __slots__ = ("rule", "table", "lock", "matched", "late", "expired", "evicted")
+
+    def __init__(self, rule: CorrelationRule, max_pending: int) -> None:
+        self.rule = rule
+        self.table = ExpiringJoinTable(int(rule.window_seconds * 1_000_000), max_pending)
+        self.lock = threading.Lock()
+        self.matched = self.late = self.expired = self.evicted = 0
+
+    def observe(self, event: StoredEvent, payload: Mapping[str, Any]) -> List[AlertCreate]:
+        rule = self.rule
+        with self.lock:
+            alerts = self._expire(event.ts_us)
+            if event.business_id == rule.target_business_id and _matches(rule.target_condition, payload):
+                key = _key(payload, rule.join_key)
+                pending = self.table.take(key) if key is not None else None
+                if pending is not None:
+                    self.matched += 1
+                    latency_s = (event.ts_us - pending.ts_us) / 1_000_000
+                    threshold = rule.latency_threshold_seconds
+                    if threshold is not None and latency_s > threshold:
+                        self.late += 1
+                        message = (
+                            f"Correlation '{rule.name}': key {key!r} matched after {latency_s:.1f}s "
+                            f"(threshold {threshold:g}s)"
+                        )
+                        alerts.append(self._alert(rule.target_business_id, event.id, message))
+                    # an event completes at most one join; it does not also open one
+                    return alerts
+            if event.business_id == rule.source_business_id and _matches(rule.source_condition, payload):
+                key = _key(payload, rule.source_key)
+                if key is not None:
+                    evicted = self.table.add(PendingEvent(key, event.id, event.ts_us))
+                    if evicted is not None:
+                        self.evicted += 1
+                        alerts.append(self._unmatched(evicted, " (evicted: too many pending joins)"))
+            return alerts
+
+    def expire(self, now_us: int) -> List[AlertCreate]:
+        with self.lock:
+            return self._expire(now_us)
+
+    def _expire(self, now_us: int) -> List[AlertCreate]:
+        alerts = []
+        for pending in self.table.expire(now_us):
+            self.expired += 1
+            alerts.append(self._unmatched(pending))
+        return alerts
+
+    def _unmatched(self, pending: PendingEvent, reason: str = "") -> AlertCreate:
+        rule = self.rule
+        message = f"Correlation '{rule.name}': no match for key {pending.key!r} within {rule.window_seconds:g}s{reason}"
+        return self._alert(rule.source_business_id, pending.event_id, message)
+
+    def _alert(self, business_id: UUID, event_id: UUID, message: str) -> AlertCreate:
+        return AlertCreate(
+            business_id=business_id,
+            rule_id=self.rule.id,
+            event_id=event_id,
+            message=message,
+            severity=self.rule.severity,
+        )
+
+    def stats(self) -> CorrelationStats:
+        with self.lock:
+            return CorrelationStats(
+                rule_id=self.rule.id,
+                pending=len(self.table),
+                matched=self.matched,
+                late=self.late,
+                expired=self.expired,
+                evicted=self.evicted,
+            )
+
+
+class CorrelationEngine:
+    """Feeds ingested events through every correlation rule that involves their business."""
+
+    def __init__(
+        self,
+        repository: CorrelationRepository,
+        alert_service: AlertService,
+        *,
+        max_pending: int = 100_000,
+    ) -> None:
+        self._repository = repository
+        self._alert_service = alert_service
+        self._max_pending = max_pending
+        self._refresh_lock = threading.Lock()
+        self._version = -1
+        self._states: Dict[UUID, _RuleState] = {}
+        self._by_business: Dict[UUID, Tuple[_RuleState, ...]] = {}
+
+    def _refresh(self) -> None:
+        if self._version == self._repository.version:
+            return
+        with self._refresh_lock:
+            version = self._repository.version
+            if version == self._version:
+                return
+            states: Dict[UUID, _RuleState] = {}
+            by_business: Dict[UUID, List[_RuleState]] = {}
+            for rule in self._repository.list_rules():
+                # keep the pending joins of rules that survived the change
+                state = self._states.get(rule.id)
+                if state is None:
+                    state = _RuleState(rule, self._max_pending)
+                states[rule.id] = state
+                for business_id in {rule.source_business_id, rule.target_business_id}:
+                    by_business.setdefault(business_id, []).append(state)
+            self._states = states
+            self._by_business = {business_id: tuple(group) for business_id, group in by_business.items()}
+            self._version = version
+
+    def observe(self, event: StoredEvent) -> List[AlertCreate]:
+        """Join ``event``; returns the alerts for expired or late pairs without creating them.
+
+        This is the ingestion service's alert source, so the alerts are
+        stored on its path (awaited, for ``ingest_async``) rather than
+        blocking the event loop on the log from inside a listener.
+        """
+
+        self._refresh()
+        states = self._by_business.get(event.business_id)
+        if not states:
+            return []
+        payload = event.payload
+        alerts: List[AlertCreate] = []
+        for state in states:
+            alerts.extend(state.observe(event, payload))
+        return alerts
+
+    def on_event(self, event: StoredEvent) -> None:
+        """:meth:`observe` for synchronous callers, creating the alerts right away."""
+
+        alerts = self.observe(event)
+        if alerts:
+            self._alert_service.create_alerts(alerts)
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Raise alerts for every source event whose window has passed; returns how many."""
+
+        self._refresh()
+        now_us = epoch_micros(now or datetime.utcnow())
+        alerts: List[AlertCreate] = []
+        for state in list(self._states.values()):
+            alerts.extend(state.expire(now_us))
+        if alerts:
+            self._alert_service.create_alerts(alerts)
+        return len(alerts)
+
+    def stats(self, rule_id: UUID) -> Optional[CorrelationStats]:
+        self._refresh()
+        state = self._states.get(rule_id)
+        return state.stats() if state is not None else None
+
+
+class CorrelationSweeper(PeriodicWorker):
+    """Background thread that periodically runs :meth:`CorrelationEngine.expire`."""
+
+    def __init__(self, engine: CorrelationEngine, interval_seconds: float) -> None:
+        super().__init__(engine.expire, interval_seconds, "anom-correlation-sweeper")
+
+
+__all__ = ["CorrelationEngine", "CorrelationSweeper", "ExpiringJoinTable", "PendingEvent"]
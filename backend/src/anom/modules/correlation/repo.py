@@ -0,0 +1,59 @@
+"""In-memory repository for correlation rules."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
+
+from anom.modules.correlation.domain import CorrelationRule
+
+
+class CorrelationRepository:
+    """Stores correlation rules by id.
+
+    ``version`` increases on every change so the engine can notice new or
+    removed rules with a single comparison per event.
+    """
+
+    def __init__(self) -> None:
+        self._rules: Dict[UUID, CorrelationRule] = {}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def add_rule(self, rule: CorrelationRule) -> CorrelationRule:
+        self._rules[rule.id] = rule
+        self._version += 1
+        return rule.model_copy()
+
+    def list_rules(self, business_id: Optional[UUID] = None) -> List[CorrelationRule]:
+        return [
+            rule.model_copy()
+            for rule in list(self._rules.values())
+            if business_id is None or business_id in (rule.source_business_id, rule.target_business_id)
+        ]
+
+    def get_rule(self, rule_id: UUID) -> Optional[CorrelationRule]:
+        rule = self._rules.get(rule_id)
+        return rule.model_copy() if rule else None
+
+    def delete_rule(self, rule_id: UUID) -> bool:
+        removed = self._rules.pop(rule_id, None) is not None
+        if removed:
+            self._version += 1
+        return removed
+
+    def snapshot_rows(self) -> Iterator[Dict[str, Any]]:
+        for rule in list(self._rules.values()):
+            yield rule.model_dump()
+
+    def restore_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for data in rows:
+            rule = CorrelationRule.model_validate(data)
+            self._rules[rule.id] = rule
+        self._version += 1
+
+    def clear(self) -> None:
+        self._rules.clear()
+        self._version += 1
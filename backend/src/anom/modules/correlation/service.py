@@ -0,0 +1,59 @@
+"""Application services for correlation rules."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from anom.modules.business_def.service import BusinessService
+from anom.modules.correlation.domain import (
+    CorrelationRule,
+    CorrelationRuleCreate,
+    CorrelationRuleNotFoundError,
+    CorrelationStats,
+)
+from anom.modules.correlation.engine import CorrelationEngine
+from anom.modules.correlation.repo import CorrelationRepository
+
+
+class CorrelationService:
+    """Validates and stores correlation rules; the engine picks changes up on its own."""
+
+    def __init__(
+        self,
+        repository: CorrelationRepository,
+        business_service: BusinessService,
+        engine: CorrelationEngine,
+    ) -> None:
+        self._repository = repository
+        self._business_service = business_service
+        self._engine = engine
+
+    def create_rule(self, payload: CorrelationRuleCreate) -> CorrelationRule:
+        # ensure both businesses exist
+        self._business_service.get_business(payload.source_business_id)
+        self._business_service.get_business(payload.target_business_id)
+        rule = CorrelationRule(id=uuid4(), created_at=datetime.utcnow(), **payload.model_dump())
+        return self._repository.add_rule(rule)
+
+    def list_rules(self, business_id: Optional[UUID] = None) -> List[CorrelationRule]:
+        return self._repository.list_rules(business_id)
+
+    def get_rule(self, rule_id: UUID) -> CorrelationRule:
+        rule = self._repository.get_rule(rule_id)
+        if rule is None:
+            raise CorrelationRuleNotFoundError(str(rule_id))
+        return rule
+
+    def delete_rule(self, rule_id: UUID) -> None:
+        if not self._repository.delete_rule(rule_id):
+            raise CorrelationRuleNotFoundError(str(rule_id))
+
+    def get_stats(self, rule_id: UUID) -> CorrelationStats:
+        stats = self._engine.stats(rule_id)
+        if stats is None:
+            raise CorrelationRuleNotFoundError(str(rule_id))
+        return stats
+
+
+__all__ = ["CorrelationService"]
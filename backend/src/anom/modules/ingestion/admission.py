@@ -0,0 +1,228 @@
+"""Per-business admission control and priority load shedding for ingestion.
+
+Every business (and optionally every producer of a business) gets a token
+bucket sized by its :class:`~anom.modules.ingestion.domain.AdmissionPolicy`.
+Buckets are refilled lazily on access, so idle businesses cost nothing. The
+:class:`LoadMonitor` watches the process as a whole: the number of ingests
+in flight and a moving average of their latency. Once either crosses its
+threshold, businesses are shed by priority, lowest first, while
+``critical`` ones keep flowing.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+from uuid import UUID
+
+from anom.core.cache import LRUCache
+from anom.core.locks import StripedLock
+from anom.modules.ingestion.domain import AdmissionPolicy, AdmissionPriority
+
+Clock = Callable[[], float]
+
+# priorities shed at each overload level (see LoadMonitor.shed_level)
+_SHED: Tuple[FrozenSet[AdmissionPriority], ...] = (
+    frozenset(),
+    frozenset({AdmissionPriority.LOW}),
+    frozenset({AdmissionPriority.LOW, AdmissionPriority.NORMAL}),
+    frozenset({AdmissionPriority.LOW, AdmissionPriority.NORMAL, AdmissionPriority.HIGH}),
+)
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when an ingest is rate limited or shed; ``retry_after`` is in seconds."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket; callers serialize access (see :class:`AdmissionController`)."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens; return 0 on success or the seconds until they are available."""
+
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def give_back(self, amount: float = 1.0) -> None:
+        self.tokens = min(self.burst, self.tokens + amount)
+
+
+class LoadMonitor:
+    """Process-wide ingest pressure: requests in flight and a latency EWMA.
+
+    The latency average only counts while samples keep arriving; after
+    ``stale_after_s`` without a completed ingest it is ignored, so shedding
+    everything cannot keep the process in overload forever.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_threshold_ms: float = 250.0,
+        max_in_flight: int = 5_000,
+        alpha: float = 0.2,
+        stale_after_s: float = 1.0,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self._latency_threshold_s = latency_threshold_ms / 1000
+        self._max_in_flight = max(1, max_in_flight)
+        self._alpha = alpha
+        self._stale_after_s = stale_after_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency_s = 0.0
+        self._sampled_at = float("-inf")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def latency_ms(self) -> float:
+        return self._latency_s * 1000
+
+    def begin(self) -> float:
+        with self._lock:
+            self._in_flight += 1
+        return self._clock()
+
+    def end(self, started: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._in_flight -= 1
+            self._latency_s += self._alpha * ((now - started) - self._latency_s)
+            self._sampled_at = now
+
+    def pressure(self) -> float:
+        """Load relative to the thresholds; ``>= 1`` means overloaded."""
+
+        queue = self._in_flight / self._max_in_flight
+        if self._clock() - self._sampled_at > self._stale_after_s:
+            return queue
+        return max(queue, self._latency_s / self._latency_threshold_s)
+
+    def shed_level(self) -> int:
+        """0 below the threshold, then 1/2/3 at 1x/2x/4x of it."""
+
+        pressure = self.pressure()
+        if pressure < 1:
+            return 0
+        if pressure < 2:
+            return 1
+        return 2 if pressure < 4 else 3
+
+
+class AdmissionController:
+    """Decides whether an ingest may proceed.
+
+    Bucket state is updated under the business's lock stripe; the critical
+    section is a handful of float operations. Per-source buckets live in a
+    bounded LRU so unbounded producer ids cannot grow memory; each remembers
+    the policy it was made for, so a policy change only resets the buckets
+    of its own business, lazily, as its sources come back.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_policy: Optional[AdmissionPolicy] = None,
+        monitor: Optional[LoadMonitor] = None,
+        max_sources: int = 100_000,
+        shed_retry_after_s: float = 1.0,
+        clock: Clock = time.monotonic,
+        lock_stripes: int = 64,
+    ) -> None:
+        self._default_policy = default_policy or AdmissionPolicy()
+        self._monitor = monitor if monitor is not None else LoadMonitor(clock=clock)
+        self._shed_retry_after_s = shed_retry_after_s
+        self._clock = clock
+        self._policies: Dict[UUID, AdmissionPolicy] = {}
+        self._buckets: Dict[UUID, TokenBucket] = {}
+        self._source_buckets: LRUCache[Tuple[UUID, str], Tuple[AdmissionPolicy, TokenBucket]] = LRUCache(max_sources)
+        self._locks = StripedLock(lock_stripes)
+
+    @property
+    def monitor(self) -> LoadMonitor:
+        return self._monitor
+
+    def set_policy(self, business_id: UUID, policy: AdmissionPolicy) -> AdmissionPolicy:
+        with self._locks.for_key(business_id):
+            self._policies[business_id] = policy
+            # start the new limits from a full bucket; source buckets notice the new policy in admit()
+            self._buckets.pop(business_id, None)
+        return policy.model_copy()
+
+    def get_policy(self, business_id: UUID) -> AdmissionPolicy:
+        return self._policies.get(business_id, self._default_policy).model_copy()
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+        for business_id, policy in list(self._policies.items()):
+            yield business_id.bytes, policy.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[bytes, Dict[str, Any]]]) -> None:
+        for business_id, data in rows:
+            self._policies[UUID(bytes=business_id)] = AdmissionPolicy.model_validate(data)
+
+    def clear(self) -> None:
+        self._policies.clear()
+        self._buckets.clear()
+        self._source_buckets.clear()
+
+    def admit(self, business_id: UUID, source: Optional[str] = None) -> None:
+        """Return if the ingest may proceed, else raise :class:`AdmissionRejectedError`."""
+
+        policy = self._policies.get(business_id, self._default_policy)
+        if policy.priority in _SHED[self._monitor.shed_level()]:
+            raise AdmissionRejectedError("overloaded", self._shed_retry_after_s)
+        if policy.rate_per_second is None and (source is None or policy.source_rate_per_second is None):
+            return
+
+        now = self._clock()
+        with self._locks.for_key(business_id):
+            source_bucket = None
+            if source is not None and policy.source_rate_per_second is not None:
+                entry = self._source_buckets.get((business_id, source))
+                if entry is not None and entry[0] is policy:
+                    source_bucket = entry[1]
+                else:
+                    source_bucket = _bucket(policy.source_rate_per_second, policy.source_burst, now)
+                    self._source_buckets.put((business_id, source), (policy, source_bucket))
+                wait = source_bucket.take(now)
+                if wait > 0:
+                    raise AdmissionRejectedError("source rate limit exceeded", wait)
+            if policy.rate_per_second is not None:
+                bucket = self._buckets.get(business_id)
+                if bucket is None:
+                    bucket = self._buckets[business_id] = _bucket(policy.rate_per_second, policy.burst, now)
+                wait = bucket.take(now)
+                if wait > 0:
+                    if source_bucket is not None:
+                        source_bucket.give_back()
+                    raise AdmissionRejectedError("rate limit exceeded", wait)
+
+
+def _bucket(rate: float, burst: Optional[int], now: float) -> TokenBucket:
+    return TokenBucket(rate, float(burst if burst is not None else max(1.0, rate)), now)
+
+
+__all__ = ["AdmissionController", "AdmissionRejectedError", "LoadMonitor", "TokenBucket"]
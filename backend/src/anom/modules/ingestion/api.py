@@ -1,35 +1,222 @@
 """FastAPI router for ingesting events."""
 from __future__ import annotations
 
-from typing import Any, Dict
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 
-from anom.api.deps import get_ingestion_service
-from anom.modules.ingestion.domain import EventIngestRequest
+from anom.api.deps import (
+    get_admission_controller,
+    get_business_service,
+    get_event_json_cache,
+    get_ingestion_service,
+    get_retention_service,
+    on_loop,
+)
+from anom.core.serialization import EncodedCache, JSONBytesResponse, dumps, join_array
+from anom.modules.business_def.domain import BusinessNotFoundError
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.admission import AdmissionController
+from anom.modules.ingestion.domain import (
+    AdmissionPolicy,
+    EventIngestRequest,
+    EventTimePolicy,
+    EventTimeStats,
+    IdempotencyPolicy,
+    LateEvent,
+    RetentionPolicy,
+    Rollup,
+    RollupResolution,
+)
+from anom.modules.ingestion.retention import RetentionService
 from anom.modules.ingestion.service import IngestionService
 
 router = APIRouter()
 
 
-@router.post("/{business_id}")
-def ingest_event(
+@router.post("/{business_id}", response_class=JSONBytesResponse)
+async def ingest_event(
     business_id: UUID,
     payload: EventIngestRequest,
-    service: IngestionService = Depends(get_ingestion_service),
-) -> Dict[str, Any]:
-    event, alerts = service.ingest(business_id, payload)
-    return {"event": event, "alerts": alerts}
+    idempotency_key: Optional[str] = Header(default=None, max_length=256),
+    source: Optional[str] = Header(default=None, alias="X-Anom-Source", max_length=256),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+    cache: EncodedCache = Depends(on_loop(get_event_json_cache)),
+) -> JSONBytesResponse:
+    event, alerts = await service.ingest_async(business_id, payload, idempotency_key, source)
+    # stored events never change, so the bytes encoded here serve later reads too
+    encoded = cache.encode(event.id.int, lambda: event)
+    return JSONBytesResponse(b'{"event":' + encoded + b',"alerts":' + dumps(alerts) + b"}")
 
 
-@router.get("/{business_id}")
+# filtered reads may scan events or build an index, so this one stays in the threadpool
+@router.get("/{business_id}", response_class=JSONBytesResponse)
 def list_events(
     business_id: UUID,
+    after: Optional[UUID] = Query(default=None, description="Return events after this event id"),
+    limit: Optional[int] = Query(default=None, ge=1, le=10_000),
+    where: List[str] = Query(
+        default=[],
+        description="Equality filter 'field:value' on a schema field; repeat to combine. Indexed fields avoid a scan.",
+    ),
     service: IngestionService = Depends(get_ingestion_service),
-) -> Dict[str, Any]:
-    events = service.list_events(business_id)
-    return {"events": events}
+    cache: EncodedCache = Depends(get_event_json_cache),
+) -> JSONBytesResponse:
+    if where:
+        conditions = []
+        for item in where:
+            name, separator, raw = item.partition(":")
+            if not separator or not name:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="where must be 'field:value'")
+            conditions.append((name, raw))
+        events = service.find_stored_events(business_id, conditions, after=after, limit=limit)
+    else:
+        events = service.list_stored_events(business_id, after=after, limit=limit)
+    next_after = events[-1].id if limit is not None and len(events) == limit else None
+    body = join_array(cache.encode(event.id_int, event.to_primitive) for event in events)
+    return JSONBytesResponse(b'{"events":' + body + b',"next_after":' + dumps(next_after) + b"}")
+
+
+def _ensure_business(business_id: UUID, business_service: BusinessService) -> None:
+    try:
+        business_service.get_business(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.put("/{business_id}/retention", response_model=RetentionPolicy)
+async def set_retention_policy(
+    business_id: UUID,
+    payload: RetentionPolicy,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: RetentionService = Depends(on_loop(get_retention_service)),
+) -> RetentionPolicy:
+    _ensure_business(business_id, business_service)
+    return service.set_policy(business_id, payload)
+
+
+@router.get("/{business_id}/retention", response_model=RetentionPolicy)
+async def get_retention_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: RetentionService = Depends(on_loop(get_retention_service)),
+) -> RetentionPolicy:
+    _ensure_business(business_id, business_service)
+    return service.get_policy(business_id) or RetentionPolicy()
+
+
+@router.put("/{business_id}/idempotency", response_model=IdempotencyPolicy)
+async def set_idempotency_policy(
+    business_id: UUID,
+    payload: IdempotencyPolicy,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> IdempotencyPolicy:
+    _ensure_business(business_id, business_service)
+    return service.set_idempotency_policy(business_id, payload)
+
+
+@router.get("/{business_id}/idempotency", response_model=IdempotencyPolicy)
+async def get_idempotency_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> IdempotencyPolicy:
+    _ensure_business(business_id, business_service)
+    return service.get_idempotency_policy(business_id)
+
+
+@router.put("/{business_id}/admission", response_model=AdmissionPolicy)
+async def set_admission_policy(
+    business_id: UUID,
+    payload: AdmissionPolicy,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    admission: AdmissionController = Depends(on_loop(get_admission_controller)),
+) -> AdmissionPolicy:
+    _ensure_business(business_id, business_service)
+    return admission.set_policy(business_id, payload)
+
+
+@router.get("/{business_id}/admission", response_model=AdmissionPolicy)
+async def get_admission_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    admission: AdmissionController = Depends(on_loop(get_admission_controller)),
+) -> AdmissionPolicy:
+    _ensure_business(business_id, business_service)
+    return admission.get_policy(business_id)
+
+
+@router.put("/{business_id}/event-time", response_model=EventTimePolicy)
+async def set_event_time_policy(
+    business_id: UUID,
+    payload: EventTimePolicy,
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> EventTimePolicy:
+    return service.set_event_time_policy(business_id, payload)
+
+
+@router.get("/{business_id}/event-time", response_model=EventTimePolicy)
+async def get_event_time_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> EventTimePolicy:
+    _ensure_business(business_id, business_service)
+    policy = service.get_event_time_policy(business_id)
+    if policy is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No event time policy")
+    return policy
+
+
+@router.delete("/{business_id}/event-time", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event_time_policy(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> Response:
+    _ensure_business(business_id, business_service)
+    if not service.delete_event_time_policy(business_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No event time policy")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/{business_id}/event-time/stats", response_model=EventTimeStats)
+async def get_event_time_stats(
+    business_id: UUID,
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> EventTimeStats:
+    _ensure_business(business_id, business_service)
+    stats = service.get_event_time_stats(business_id)
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No event time policy")
+    return stats
+
+
+@router.get("/{business_id}/late", response_model=List[LateEvent])
+async def list_late_events(
+    business_id: UUID,
+    limit: Optional[int] = Query(default=None, ge=1),
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: IngestionService = Depends(on_loop(get_ingestion_service)),
+) -> List[LateEvent]:
+    _ensure_business(business_id, business_service)
+    return service.list_late_events(business_id, limit)
+
+
+@router.get("/{business_id}/rollups", response_model=List[Rollup])
+async def list_rollups(
+    business_id: UUID,
+    resolution: RollupResolution = Query(default=RollupResolution.MINUTE),
+    since: Optional[datetime] = Query(default=None),
+    business_service: BusinessService = Depends(on_loop(get_business_service)),
+    service: RetentionService = Depends(on_loop(get_retention_service)),
+) -> List[Rollup]:
+    _ensure_business(business_id, business_service)
+    return service.list_rollups(business_id, resolution, since)
 
 
 __all__ = ["router"]
@@ -0,0 +1,186 @@
+"""Bounded idempotency index for event ingestion.
+
+Recent keys live in an insertion-ordered hash map together with the
+response that was produced for them, so a retry is answered in O(1).
+Keys age out of that map after ``window_seconds`` (or when it reaches
+``max_keys``) and are folded into a pair of rotating Bloom filters, which
+keep remembering that the key was seen without keeping its result. Memory
+is therefore fixed by configuration rather than by traffic.
+
+Requests claim their key with :meth:`IdempotencyIndex.reserve` before doing
+any work, so a retry that arrives while the original is still running (for
+example waiting on the write-ahead log) finds the key in flight instead of
+ingesting a second copy.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Callable, Generic, Optional, Set, Tuple, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(1, capacity)
+        bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self._bits = bytearray((bits + 7) // 8)
+        self._size = len(self._bits) * 8
+        self._hashes = max(1, round(bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self._size
+        return [(h1 + i * h2) % size for i in range(self._hashes)]
+
+    def add(self, key: bytes) -> None:
+        bits = self._bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class Reservation(str, Enum):
+    """Outcome of :meth:`IdempotencyIndex.reserve`."""
+
+    ACQUIRED = "acquired"
+    COMPLETED = "completed"
+    IN_FLIGHT = "in_flight"
+    EXPIRED = "expired"
+
+
+class IdempotencyIndex(Generic[T]):
+    """Remembers idempotency keys per business with bounded memory.
+
+    :meth:`lookup` returns ``(hit, result)``: ``(True, result)`` for a key
+    still inside the window, ``(True, None)`` for an older key that only
+    the Bloom filters remember (or a false positive, at ``error_rate``),
+    and ``(False, None)`` for a key that has not been seen.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_seconds: float = 600.0,
+        max_keys: int = 100_000,
+        bloom_capacity: int = 1_000_000,
+        bloom_error_rate: float = 0.001,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window_seconds = window_seconds
+        self._max_keys = max(1, max_keys)
+        self._bloom_capacity = bloom_capacity
+        self._bloom_error_rate = bloom_error_rate
+        self._clock = clock
+        self._recent: "OrderedDict[bytes, Tuple[float, T]]" = OrderedDict()
+        # the newer filter takes evicted keys; when it is full the older one
+        # is dropped, so keys are remembered for one to two filter lifetimes
+        self._current = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._previous: Optional[BloomFilter] = None
+        self._in_flight: Set[bytes] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(business_id: UUID, key: str) -> bytes:
+        return business_id.bytes + key.encode("utf-8")
+
+    def lookup(self, business_id: UUID, key: str) -> Tuple[bool, Optional[T]]:
+        composite = self._key(business_id, key)
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._recent.get(composite)
+            if entry is not None:
+                return True, entry[1]
+            if composite in self._current or (self._previous is not None and composite in self._previous):
+                return True, None
+        return False, None
+
+    def reserve(self, business_id: UUID, key: str) -> Tuple[Reservation, Optional[T]]:
+        """Claim ``key`` for a request that is about to run.
+
+        ``ACQUIRED`` means the caller owns the key and must finish with
+        :meth:`record` or :meth:`release`. ``COMPLETED`` comes with the stored
+        result, ``IN_FLIGHT`` means another request holds the key right now,
+        and ``EXPIRED`` means the key was used before but its result is gone.
+        """
+
+        composite = self._key(business_id, key)
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._recent.get(composite)
+            if entry is not None:
+                return Reservation.COMPLETED, entry[1]
+            if composite in self._in_flight:
+                return Reservation.IN_FLIGHT, None
+            if composite in self._current or (self._previous is not None and composite in self._previous):
+                return Reservation.EXPIRED, None
+            self._in_flight.add(composite)
+        return Reservation.ACQUIRED, None
+
+    def release(self, business_id: UUID, key: str) -> None:
+        """Give up a reservation whose request failed, so the key can be retried."""
+
+        with self._lock:
+            self._in_flight.discard(self._key(business_id, key))
+
+    def record(self, business_id: UUID, key: str, result: T) -> None:
+        composite = self._key(business_id, key)
+        with self._lock:
+            self._in_flight.discard(composite)
+            now = self._clock()
+            self._recent[composite] = (now, result)
+            self._recent.move_to_end(composite)
+            self._expire(now)
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._in_flight.clear()
+            self._current = BloomFilter(self._bloom_capacity, self._bloom_error_rate)
+            self._previous = None
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self._window_seconds
+        recent = self._recent
+        while recent:
+            composite, (inserted_at, _) = next(iter(recent.items()))
+            if inserted_at > cutoff and len(recent) <= self._max_keys:
+                break
+            recent.popitem(last=False)
+            self._remember(composite)
+
+    def _remember(self, composite: bytes) -> None:
+        if self._current.full:
+            self._previous = self._current
+            self._current = BloomFilter(self._bloom_capacity, self._bloom_error_rate)
+        self._current.add(composite)
+
+
+__all__ = ["BloomFilter", "IdempotencyIndex", "Reservation"]
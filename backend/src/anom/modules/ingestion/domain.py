@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict
+from enum import Enum
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -21,3 +22,150 @@ class EventRecord(BaseModel):
     business_id: UUID
     payload: Dict[str, Any]
     received_at: datetime
+
+
+class BatchIngestResult(BaseModel):
+    """Outcome of an in-process batch; ``errors`` holds the first few rejection reasons."""
+
+    accepted: int
+    rejected: int
+    alerts: int
+    errors: List[str] = Field(default_factory=list)
+
+
+class RetentionPolicy(BaseModel):
+    """How much raw event history a business keeps in memory."""
+
+    max_age_seconds: Optional[int] = Field(default=None, ge=1)
+    max_events: Optional[int] = Field(default=None, ge=1)
+
+
+class IdempotencyPolicy(BaseModel):
+    """Where a business's producers put their idempotency key.
+
+    The ``Idempotency-Key`` header is always honoured; ``key_field`` names a
+    top-level payload field to fall back to when the header is absent.
+    """
+
+    key_field: Optional[str] = Field(default=None, min_length=1)
+
+
+class AdmissionPriority(str, Enum):
+    """Shedding order under overload; ``critical`` businesses are never shed."""
+
+    CRITICAL = "critical"
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class AdmissionPolicy(BaseModel):
+    """Ingest rate limits of a business, in events per second.
+
+    ``source_*`` limits apply to each producer identified by the
+    ``X-Anom-Source`` header. A missing burst defaults to one second's worth
+    of events; a missing rate means unlimited.
+    """
+
+    rate_per_second: Optional[float] = Field(default=None, gt=0)
+    burst: Optional[int] = Field(default=None, ge=1)
+    source_rate_per_second: Optional[float] = Field(default=None, gt=0)
+    source_burst: Optional[int] = Field(default=None, ge=1)
+    priority: AdmissionPriority = AdmissionPriority.NORMAL
+
+
+class EventTimePolicy(BaseModel):
+    """Which DATETIME field carries a business's event time, and how late it may arrive.
+
+    The watermark trails the newest event time seen by
+    ``allowed_lateness_seconds``; buffered events are released to the
+    time-series and sketch aggregates in event-time order once the watermark
+    passes them. Events older than the watermark are late: they are stored and
+    evaluated by rules as usual but kept out of the aggregates.
+    """
+
+    field: str = Field(..., min_length=1)
+    allowed_lateness_seconds: float = Field(default=60.0, ge=0.0, le=86_400.0)
+    max_buffered: int = Field(default=10_000, ge=1, le=1_000_000)
+
+
+class LateEvent(BaseModel):
+    """An event that arrived behind the watermark and skipped the aggregates."""
+
+    event_id: UUID
+    event_time: datetime
+    watermark: datetime
+    received_at: datetime
+
+
+class EventTimeStats(BaseModel):
+    """Reordering state of one business."""
+
+    watermark: Optional[datetime]
+    buffered: int
+    released: int
+    late: int
+
+
+class RollupResolution(str, Enum):
+    """Bucket widths maintained for compacted events."""
+
+    MINUTE = "1m"
+    HOUR = "1h"
+
+
+class FieldRollup(BaseModel):
+    """Aggregate of one numeric field within a rollup bucket."""
+
+    count: int
+    sum: float
+    min: float
+    max: float
+
+
+class Rollup(BaseModel):
+    """Downsampled summary of events that were evicted from raw storage."""
+
+    business_id: UUID
+    resolution: RollupResolution
+    bucket_start: datetime
+    count: int
+    fields: Dict[str, FieldRollup]
+
+
+class SeriesResolution(str, Enum):
+    """Bucket widths pre-aggregated at ingest time."""
+
+    MINUTE = "1m"
+    FIVE_MINUTES = "5m"
+    HOUR = "1h"
+
+
+class SeriesPoint(BaseModel):
+    """Aggregate of one numeric field within a single time bucket."""
+
+    bucket_start: datetime
+    count: int
+    sum: float
+    min: float
+    max: float
+    last: float
+
+
+class HeavyHitter(BaseModel):
+    """One frequent value of a sketched field; ``count`` may overestimate."""
+
+    value: Any
+    count: int
+    share: float
+
+
+class FieldSketchSummary(BaseModel):
+    """Approximate traffic statistics of one sketched field over a window."""
+
+    field: str
+    window_start: datetime
+    window_end: datetime
+    total: int
+    distinct: int
+    top: List[HeavyHitter]
@@ -0,0 +1,203 @@
+"""Event-time watermarks and per-business reordering buffers.
+
+Businesses with an :class:`EventTimePolicy` have their time-series and sketch
+aggregates keyed by the event time carried in the payload instead of the
+server receive time. Each such business gets a min-heap of not yet released
+events; the watermark trails the newest event time seen by the allowed
+lateness, and events at or before the watermark leave the heap in event-time
+order. Events that arrive behind the watermark are counted and kept in a
+bounded side output rather than being folded into buckets that were already
+considered complete.
+"""
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.core.locks import StripedLock
+from anom.modules.ingestion.domain import EventTimePolicy, EventTimeStats, LateEvent
+from anom.modules.ingestion.records import StoredEvent
+
+Released = Tuple[int, Mapping[str, Any]]
+"""An event leaving the buffer: event time in epoch microseconds and its payload."""
+
+
+class _Reorderer:
+    __slots__ = (
+        "policy",
+        "lateness_us",
+        "heap",
+        "sequence",
+        "max_event_us",
+        "watermark_us",
+        "last_arrival_us",
+        "released",
+        "late",
+        "side",
+    )
+
+    def __init__(self, policy: EventTimePolicy, late_capacity: int) -> None:
+        self.policy = policy
+        self.lateness_us = round(policy.allowed_lateness_seconds * 1_000_000)
+        # (event time, arrival sequence, payload); the sequence keeps ties in arrival order
+        self.heap: List[Tuple[int, int, Mapping[str, Any]]] = []
+        self.sequence = 0
+        self.max_event_us: Optional[int] = None
+        self.watermark_us: Optional[int] = None
+        self.last_arrival_us = 0
+        self.released = 0
+        self.late = 0
+        self.side: Deque[LateEvent] = deque(maxlen=late_capacity)
+
+    def offer(self, event: StoredEvent, event_us: int, payload: Mapping[str, Any]) -> List[Released]:
+        self.last_arrival_us = event.ts_us
+        watermark = self.watermark_us
+        if watermark is not None and event_us < watermark:
+            self.late += 1
+            self.side.append(
+                LateEvent(
+                    event_id=event.id,
+                    event_time=from_epoch_micros(event_us),
+                    watermark=from_epoch_micros(watermark),
+                    received_at=event.received_at,
+                )
+            )
+            return []
+        heapq.heappush(self.heap, (event_us, self.sequence, payload))
+        self.sequence += 1
+        if self.max_event_us is None or event_us > self.max_event_us:
+            self.max_event_us = event_us
+        candidate = self.max_event_us - self.lateness_us
+        if watermark is None or candidate > watermark:
+            self.watermark_us = candidate
+        released = self._release(self.watermark_us)
+        while len(self.heap) > self.policy.max_buffered:
+            # a full buffer pushes the watermark forward rather than growing
+            event_us, _, payload = heapq.heappop(self.heap)
+            self.watermark_us = max(self.watermark_us, event_us)
+            released.append((event_us, payload))
+            self.released += 1
+        return released
+
+    def drain(self) -> List[Released]:
+        if self.max_event_us is not None and (self.watermark_us is None or self.max_event_us > self.watermark_us):
+            self.watermark_us = self.max_event_us
+        return self._release(None)
+
+    def _release(self, watermark_us: Optional[int]) -> List[Released]:
+        heap = self.heap
+        released: List[Released] = []
+        while heap and (watermark_us is None or heap[0][0] <= watermark_us):
+            event_us, _, payload = heapq.heappop(heap)
+            released.append((event_us, payload))
+        self.released += len(released)
+        return released
+
+
+class EventTimeProcessor:
+    """Event-time policies and reordering state of every business."""
+
+    def __init__(self, *, late_capacity: int = 1_000, lock_stripes: int = 64) -> None:
+        self._late_capacity = late_capacity
+        self._states: Dict[UUID, _Reorderer] = {}
+        self._locks = StripedLock(lock_stripes)
+
+    def set_policy(self, business_id: UUID, policy: EventTimePolicy) -> List[Released]:
+        """Install ``policy``; returns whatever the previous policy still had buffered."""
+
+        with self._locks.for_key(business_id):
+            previous = self._states.get(business_id)
+            self._states[business_id] = _Reorderer(policy.model_copy(), self._late_capacity)
+        return previous.drain() if previous is not None else []
+
+    def has_policy(self, business_id: UUID) -> bool:
+        return business_id in self._states
+
+    def get_policy(self, business_id: UUID) -> Optional[EventTimePolicy]:
+        state = self._states.get(business_id)
+        return state.policy.model_copy() if state is not None else None
+
+    def delete_policy(self, business_id: UUID) -> Optional[List[Released]]:
+        """Drop the policy; returns the buffered events, or ``None`` if there was no policy."""
+
+        with self._locks.for_key(business_id):
+            state = self._states.pop(business_id, None)
+        return state.drain() if state is not None else None
+
+    def offer(
+        self, business_id: UUID, event: StoredEvent, payload: Mapping[str, Any]
+    ) -> Optional[Tuple[List[Released], int]]:
+        """Buffer ``event``; returns the events now released and the current watermark.
+
+        Returns ``None`` for businesses without a policy. Events whose payload
+        lacks the event-time field fall back to their receive time.
+        """
+
+        state = self._states.get(business_id)
+        if state is None:
+            return None
+        value = payload.get(state.policy.field)
+        event_us = epoch_micros(value) if isinstance(value, datetime) else event.ts_us
+        with self._locks.for_key(business_id):
+            released = state.offer(event, event_us, payload)
+            return released, state.watermark_us
+
+    def flush_idle(self, now: Optional[datetime] = None) -> Dict[UUID, List[Released]]:
+        """Release the buffers of businesses that have received nothing for their allowed lateness.
+
+        Without this, the tail of a burst would wait for the next event to move
+        the watermark.
+        """
+
+        now_us = epoch_micros(now or datetime.utcnow())
+        flushed: Dict[UUID, List[Released]] = {}
+        for business_id, state in list(self._states.items()):
+            if not state.heap or now_us - state.last_arrival_us < state.lateness_us:
+                continue
+            with self._locks.for_key(business_id):
+                released = state.drain()
+            if released:
+                flushed[business_id] = released
+        return flushed
+
+    def stats(self, business_id: UUID) -> Optional[EventTimeStats]:
+        state = self._states.get(business_id)
+        if state is None:
+            return None
+        with self._locks.for_key(business_id):
+            return EventTimeStats(
+                watermark=from_epoch_micros(state.watermark_us) if state.watermark_us is not None else None,
+                buffered=len(state.heap),
+                released=state.released,
+                late=state.late,
+            )
+
+    def late_events(self, business_id: UUID, limit: Optional[int] = None) -> List[LateEvent]:
+        """Most recent late events of ``business_id``, oldest first."""
+
+        state = self._states.get(business_id)
+        if state is None:
+            return []
+        with self._locks.for_key(business_id):
+            late = list(state.side)
+        return late[-limit:] if limit else late
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+        for business_id, state in list(self._states.items()):
+            yield business_id.bytes, state.policy.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[bytes, Dict[str, Any]]]) -> None:
+        for business_id, data in rows:
+            self._states[UUID(bytes=business_id)] = _Reorderer(
+                EventTimePolicy.model_validate(data), self._late_capacity
+            )
+
+    def clear(self) -> None:
+        self._states.clear()
+
+
+__all__ = ["EventTimeProcessor", "Released"]
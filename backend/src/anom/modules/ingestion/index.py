@@ -0,0 +1,115 @@
+"""Inverted indexes for equality lookups on event payload fields.
+
+A field declared with ``indexed=True`` gets, per business, a map from each
+value to a posting list: the id ints of the events carrying that value, in
+id order. The ints are the events' own ``id_int`` objects, so an entry costs
+one list slot. Lookups walk a posting list and locate each event by bisect,
+so they cost O(matches) rather than O(history).
+
+Integer fields are only worth indexing while their cardinality stays low;
+once a field exceeds ``max_values`` distinct values its postings are
+discarded and lookups on it fall back to a scan.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from anom.modules.ingestion.records import PayloadShape, StoredEvent
+
+DEFAULT_MAX_INTEGER_VALUES = 10_000
+
+
+class FieldPostings:
+    """Posting lists of one field of one business."""
+
+    __slots__ = ("max_values", "postings", "overflowed")
+
+    def __init__(self, max_values: Optional[int] = None) -> None:
+        self.max_values = max_values
+        self.postings: Dict[Any, List[int]] = {}
+        self.overflowed = False
+
+    def add(self, value: Any, id_int: int) -> None:
+        if self.overflowed:
+            return
+        try:
+            posting = self.postings.get(value)
+        except TypeError:  # unhashable payload value: never matched by equality lookups
+            return
+        if posting is None:
+            if self.max_values is not None and len(self.postings) >= self.max_values:
+                self.overflowed = True
+                self.postings = {}
+                return
+            self.postings[value] = [id_int]
+        elif id_int > posting[-1]:
+            posting.append(id_int)
+        else:
+            insort(posting, id_int)
+
+    def trim(self, value: Any, first_id: int) -> None:
+        """Drop entries older than ``first_id`` from ``value``'s posting list."""
+
+        try:
+            posting = self.postings.get(value)
+        except TypeError:
+            return
+        if posting is None:
+            return
+        del posting[: bisect_left(posting, first_id)]
+        if not posting:
+            del self.postings[value]
+
+    def get(self, value: Any) -> List[int]:
+        try:
+            return self.postings.get(value, [])
+        except TypeError:
+            return []
+
+
+class BusinessIndex:
+    """The indexed fields of one business; callers hold the business's lock stripe."""
+
+    __slots__ = ("fields", "_positions")
+
+    def __init__(self) -> None:
+        self.fields: Dict[str, FieldPostings] = {}
+        # interned shape id -> (shape, [(field postings, value position)])
+        self._positions: Dict[int, Tuple[PayloadShape, List[Tuple[FieldPostings, int]]]] = {}
+
+    def add_field(self, name: str, max_values: Optional[int], events: Iterable[StoredEvent]) -> None:
+        postings = self.fields[name] = FieldPostings(max_values)
+        self._positions.clear()
+        for event in events:
+            if name in event.shape:
+                postings.add(event.values[event.shape.index(name)], event.id_int)
+
+    def _slots(self, shape: PayloadShape) -> List[Tuple[FieldPostings, int]]:
+        cached = self._positions.get(id(shape))
+        if cached is None or cached[0] is not shape:
+            slots = [(postings, shape.index(name)) for name, postings in self.fields.items() if name in shape]
+            cached = self._positions[id(shape)] = (shape, slots)
+        return cached[1]
+
+    def add(self, event: StoredEvent) -> None:
+        values = event.values
+        for postings, position in self._slots(event.shape):
+            postings.add(values[position], event.id_int)
+
+    def discard(self, dropped: Iterable[StoredEvent], first_id: int) -> None:
+        """Forget events removed from the front of the history; ``first_id`` is the oldest survivor."""
+
+        for event in dropped:
+            values = event.values
+            for postings, position in self._slots(event.shape):
+                postings.trim(values[position], first_id)
+
+    def postings(self, name: str) -> Optional[FieldPostings]:
+        """The field's postings, or ``None`` when it is not indexed (or overflowed)."""
+
+        postings = self.fields.get(name)
+        return None if postings is None or postings.overflowed else postings
+
+
+__all__ = ["BusinessIndex", "FieldPostings", "DEFAULT_MAX_INTEGER_VALUES"]
@@ -0,0 +1,134 @@
+"""Compact internal representation of stored events.
+
+:class:`~anom.modules.ingestion.domain.EventRecord` is the wire model; a
+stored event is a :class:`StoredEvent` instead. It keeps the time-ordered
+id as a plain int, the timestamp as integer microseconds, shares the business
+UUID with every other event of that business, and splits the payload into a
+key tuple (interned per payload shape by the repository) and a value tuple.
+Pydantic models are only built at the API boundary via
+:meth:`StoredEvent.to_model`.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+from uuid import UUID
+
+from anom.common_models.identifiers import new_id_int
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.modules.ingestion.domain import EventRecord
+
+PayloadShape = Tuple[str, ...]
+
+
+class StoredEvent:
+    """One stored event. Treat instances as immutable once stored."""
+
+    __slots__ = ("id_int", "business_id", "ts_us", "shape", "values")
+
+    def __init__(
+        self,
+        id_int: int,
+        business_id: UUID,
+        ts_us: int,
+        shape: PayloadShape,
+        values: Tuple[Any, ...],
+    ) -> None:
+        self.id_int = id_int
+        self.business_id = business_id
+        self.ts_us = ts_us
+        self.shape = shape
+        self.values = values
+
+    @classmethod
+    def create(
+        cls,
+        business_id: UUID,
+        payload: Mapping[str, Any],
+        received_at: datetime,
+        id: Optional[UUID] = None,
+    ) -> "StoredEvent":
+        return cls(
+            id.int if id is not None else new_id_int(),
+            business_id,
+            epoch_micros(received_at),
+            tuple(payload),
+            tuple(payload.values()),
+        )
+
+    @classmethod
+    def from_model(cls, event: EventRecord) -> "StoredEvent":
+        return cls.create(event.business_id, event.payload, event.received_at, event.id)
+
+    @property
+    def id(self) -> UUID:
+        return UUID(int=self.id_int)
+
+    @property
+    def received_at(self) -> datetime:
+        return from_epoch_micros(self.ts_us)
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """A fresh dict view of the payload."""
+
+        return dict(zip(self.shape, self.values))
+
+    def to_primitive(self) -> Dict[str, Any]:
+        """The :class:`EventRecord` fields as JSON-ready values."""
+
+        return {
+            "id": self.id,
+            "business_id": self.business_id,
+            "payload": self.payload,
+            "received_at": self.received_at,
+        }
+
+    def to_model(self) -> EventRecord:
+        return EventRecord.model_construct(
+            id=self.id,
+            business_id=self.business_id,
+            payload=self.payload,
+            received_at=self.received_at,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StoredEvent):
+            return NotImplemented
+        return self.id_int == other.id_int and self.ts_us == other.ts_us and self.payload == other.payload
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"StoredEvent(id={self.id}, business_id={self.business_id}, received_at={self.received_at!r})"
+
+
+class ShapeInterner:
+    """Shares one key tuple per distinct payload shape.
+
+    Most producers send the same keys in the same order, so a business
+    typically has a handful of shapes and each event only pays for its
+    value tuple.
+    """
+
+    def __init__(self) -> None:
+        self._shapes: Dict[PayloadShape, PayloadShape] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, shape: PayloadShape) -> PayloadShape:
+        shared = self._shapes.get(shape)
+        if shared is None:
+            with self._lock:
+                shared = self._shapes.setdefault(shape, tuple(sys.intern(key) for key in shape))
+        return shared
+
+    def __len__(self) -> int:
+        return len(self._shapes)
+
+    def clear(self) -> None:
+        self._shapes.clear()
+
+
+__all__ = ["StoredEvent", "ShapeInterner", "PayloadShape"]
@@ -1,25 +1,343 @@
 """In-memory repository for storing ingested events."""
 from __future__ import annotations
 
-from typing import Dict, List
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 
-from anom.modules.ingestion.domain import EventRecord
+from anom.common_models.time import epoch_micros
+from anom.core.locks import StripedLock
+from anom.core.wal import WriteAheadLog
+from anom.modules.ingestion.index import BusinessIndex
+from anom.modules.ingestion.records import PayloadShape, ShapeInterner, StoredEvent
+
+EventRow = Tuple[int, bytes, int, PayloadShape, Tuple[Any, ...]]
+
+
+def _event_row(event: StoredEvent) -> EventRow:
+    return event.id_int, event.business_id.bytes, event.ts_us, event.shape, event.values
+
+
+def _ts(event: StoredEvent) -> int:
+    return event.ts_us
+
+
+def _id(event: StoredEvent) -> int:
+    return event.id_int
+
+
+def _append_in_id_order(events: List[StoredEvent], event: StoredEvent) -> None:
+    if events and event.id_int < events[-1].id_int:
+        # a concurrent writer overtook this one between id generation and append
+        insort(events, event, key=_id)
+    else:
+        events.append(event)
+
+
+def _has_value(event: StoredEvent, field: str, value: Any) -> bool:
+    shape = event.shape
+    return field in shape and event.values[shape.index(field)] == value
 
 
 class EventRepository:
-    """Stores event records grouped by business."""
+    """Stores compact event records grouped by business, in arrival order.
+
+    Ids are time-ordered, so arrival order is also id order and both
+    ``received_at`` and id ranges are found with ``bisect``. Records are
+    returned as-is (no copies); callers must not mutate them.
+
+    Each business's list is guarded by a striped lock, so concurrent ingests
+    for different businesses do not contend; the registry lock is only taken
+    the first time a business is seen. Fields registered with
+    :meth:`ensure_indexes` are kept in a per-business inverted index
+    (:mod:`anom.modules.ingestion.index`) under the same stripe.
+    """
+
+    def __init__(self, wal: Optional[WriteAheadLog] = None, *, lock_stripes: int = 64) -> None:
+        self._events: Dict[UUID, List[StoredEvent]] = {}
+        self._business_ids: Dict[bytes, UUID] = {}
+        self._shapes = ShapeInterner()
+        self._wal = wal
+        # held from log append to in-memory apply so a checkpoint never falls between them
+        self._gate: AbstractContextManager = wal.gate if wal is not None else nullcontext()
+        self._locks = StripedLock(lock_stripes)
+        self._registry_lock = threading.Lock()
+        self._indexes: Dict[UUID, BusinessIndex] = {}
+
+    def _business_events(self, business_id: UUID) -> List[StoredEvent]:
+        events = self._events.get(business_id)
+        if events is None:
+            with self._registry_lock:
+                events = self._events.get(business_id)
+                if events is None:
+                    self._business_ids[business_id.bytes] = business_id
+                    events = self._events[business_id] = []
+        return events
+
+    def _shared_business_id(self, raw: bytes) -> UUID:
+        business_id = self._business_ids.get(raw)
+        if business_id is None:
+            business_id = UUID(bytes=raw)
+            self._business_events(business_id)
+        return business_id
+
+    def add_event(self, event: StoredEvent) -> StoredEvent:
+        with self._gate:
+            if self._wal is not None:
+                self._wal.append("event", _event_row(event))
+            return self._store(event)
+
+    def add_events(self, events: Sequence[StoredEvent]) -> List[StoredEvent]:
+        """Store a batch of events behind a single log write."""
+
+        stored: List[StoredEvent] = []
+        with self._gate:
+            if self._wal is not None:
+                self._wal.append_many("event", [_event_row(event) for event in events])
+            for business_id, group in groupby(events, key=lambda event: event.business_id):
+                stored.extend(self._store_group(business_id, list(group)))
+        return stored
+
+    async def add_event_async(self, event: StoredEvent) -> StoredEvent:
+        """:meth:`add_event` for coroutines: awaits the log instead of blocking on it."""
+
+        if self._wal is None:
+            return self._store(event)
+        async with self._wal.gate.shared():
+            durable = self._wal.append_later("event", _event_row(event))
+            stored = self._store(event)
+        await durable
+        return stored
+
+    def _store(self, event: StoredEvent) -> StoredEvent:
+        events = self._business_events(event.business_id)
+        # every record of a business shares the dict key's UUID and the interned key tuple
+        event.business_id = self._business_ids[event.business_id.bytes]
+        event.shape = self._shapes.intern(event.shape)
+        with self._locks.for_key(event.business_id):
+            _append_in_id_order(events, event)
+            index = self._indexes.get(event.business_id)
+            if index is not None:
+                index.add(event)
+        return event
+
+    def _store_group(self, business_id: UUID, events: List[StoredEvent]) -> List[StoredEvent]:
+        """:meth:`_store` for events of one business under a single lock acquisition."""
+
+        stored = self._business_events(business_id)
+        business_id = self._business_ids[business_id.bytes]
+        shapes: Dict[PayloadShape, PayloadShape] = {}
+        for event in events:
+            event.business_id = business_id
+            shape = shapes.get(event.shape)
+            if shape is None:
+                shape = shapes[event.shape] = self._shapes.intern(event.shape)
+            event.shape = shape
+        with self._locks.for_key(business_id):
+            index = self._indexes.get(business_id)
+            for event in events:
+                _append_in_id_order(stored, event)
+                if index is not None:
+                    index.add(event)
+        return events
+
+    def list_events(
+        self,
+        business_id: UUID,
+        *,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredEvent]:
+        """Events in id order, optionally only those after the ``after`` cursor."""
+
+        events = self._events.get(business_id)
+        if not events:
+            return []
+        with self._locks.for_key(business_id):
+            lo = bisect_right(events, after.int, key=_id) if after is not None else 0
+            hi = len(events) if limit is None else min(len(events), lo + limit)
+            return events[lo:hi]
+
+    def scan_ids(self, business_id: UUID, start: int, end: int) -> List[StoredEvent]:
+        """Stored events whose id int lies in ``[start, end)``."""
+
+        events = self._events.get(business_id)
+        if not events:
+            return []
+        with self._locks.for_key(business_id):
+            lo = bisect_left(events, start, key=_id)
+            hi = bisect_left(events, end, lo=lo, key=_id)
+            return events[lo:hi]
+
+    def scan_range(self, business_id: UUID, start: datetime, end: datetime) -> List[StoredEvent]:
+        """Stored events with ``start <= received_at < end``, located by bisect."""
+
+        events = self._events.get(business_id)
+        if not events:
+            return []
+        with self._locks.for_key(business_id):
+            lo = bisect_left(events, epoch_micros(start), key=_ts)
+            hi = bisect_left(events, epoch_micros(end), lo=lo, key=_ts)
+            return events[lo:hi]
+
+    def missing_indexes(self, business_id: UUID, fields: Iterable[str]) -> bool:
+        """Whether any of ``fields`` still has to be built by :meth:`ensure_indexes`."""
+
+        index = self._indexes.get(business_id)
+        return index is None or not set(fields) <= index.fields.keys()
+
+    def ensure_indexes(self, business_id: UUID, fields: Dict[str, Optional[int]]) -> None:
+        """Index ``fields`` (name -> max distinct values, ``None`` for no cap), building new ones from history."""
+
+        if not self.missing_indexes(business_id, fields):
+            return
+        events = self._business_events(business_id)
+        with self._locks.for_key(business_id):
+            index = self._indexes.get(business_id)
+            if index is None:
+                index = self._indexes[business_id] = BusinessIndex()
+            for name, max_values in fields.items():
+                if name not in index.fields:
+                    index.add_field(name, max_values, events)
+
+    def find_events(
+        self,
+        business_id: UUID,
+        conditions: Sequence[Tuple[str, Any]],
+        *,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredEvent]:
+        """Events in id order whose payload equals every ``(field, value)`` condition.
+
+        The shortest posting list among the indexed conditions drives the
+        lookup and the remaining conditions are checked per candidate;
+        without a usable index the history after ``after`` is scanned.
+        """
+
+        events = self._events.get(business_id)
+        if not events:
+            return []
+        start = after.int + 1 if after is not None else 0
+        result: List[StoredEvent] = []
+        with self._locks.for_key(business_id):
+            index = self._indexes.get(business_id)
+            driver: Optional[List[int]] = None
+            if index is not None:
+                for name, value in conditions:
+                    postings = index.postings(name)
+                    if postings is not None:
+                        ids = postings.get(value)
+                        if driver is None or len(ids) < len(driver):
+                            driver = ids
+            if driver is None:
+                candidates = events[bisect_left(events, start, key=_id) :]
+            else:
+                candidates = []
+                position = 0
+                for id_int in driver[bisect_left(driver, start) :]:
+                    # postings are sorted, so each search resumes where the last one ended
+                    position = bisect_left(events, id_int, lo=position, key=_id)
+                    if position < len(events) and events[position].id_int == id_int:
+                        candidates.append(events[position])
+        for event in candidates:
+            if all(_has_value(event, name, value) for name, value in conditions):
+                result.append(event)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def count_events(self, business_id: UUID) -> int:
+        return len(self._events.get(business_id, []))
+
+    def business_ids(self) -> List[UUID]:
+        return list(self._events)
+
+    def drop_oldest(
+        self,
+        business_id: UUID,
+        *,
+        before: Optional[datetime] = None,
+        keep_last: Optional[int] = None,
+    ) -> List[StoredEvent]:
+        """Remove the oldest events in one slice and return them.
+
+        Events are appended in ``received_at`` order, so the cut-off is found
+        with a binary search instead of scanning every event.
+        """
+
+        events = self._events.get(business_id)
+        if not events:
+            return []
+        with self._locks.for_key(business_id):
+            cut = 0
+            if before is not None:
+                cut = bisect_left(events, epoch_micros(before), key=_ts)
+            if keep_last is not None:
+                cut = max(cut, len(events) - keep_last)
+            if cut <= 0:
+                return []
+            dropped = events[:cut]
+            del events[:cut]
+            index = self._indexes.get(business_id)
+            if index is not None:
+                index.discard(dropped, events[0].id_int if events else dropped[-1].id_int + 1)
+            return dropped
+
+    def snapshot_rows(self) -> Iterator[EventRow]:
+        """Plain tuples in arrival order; pickling shares each interned shape per chunk."""
+
+        for business_id, events in list(self._events.items()):
+            with self._locks.for_key(business_id):
+                captured = events[:]
+            for event in captured:
+                yield _event_row(event)
+
+    def restore_rows(self, rows: Iterable[EventRow]) -> None:
+        # restored events bypass the indexes; the next ensure_indexes call rebuilds them
+        self._indexes.clear()
+        intern = self._shapes.intern
+        for id_int, business_id, ts_us, shape, values in rows:
+            business_uuid = self._shared_business_id(business_id)
+            event = StoredEvent(id_int, business_uuid, ts_us, intern(shape), values)
+            with self._locks.for_key(business_uuid):
+                _append_in_id_order(self._events[business_uuid], event)
 
-    def __init__(self) -> None:
-        self._events: Dict[UUID, List[EventRecord]] = {}
+    def replay_rows(self, rows: Iterable[EventRow]) -> int:
+        """Apply write-ahead-log rows, skipping events a snapshot already holds.
 
-    def add_event(self, event: EventRecord) -> EventRecord:
-        events_for_business = self._events.setdefault(event.business_id, [])
-        events_for_business.append(event)
-        return event.model_copy()
+        A snapshot may include events logged after its checkpoint, so each
+        business's tail (from the first replayed timestamp on) is checked by
+        id. Returns the number of events appended.
+        """
 
-    def list_events(self, business_id: UUID) -> List[EventRecord]:
-        return [event.model_copy() for event in self._events.get(business_id, [])]
+        self._indexes.clear()
+        intern = self._shapes.intern
+        seen: Dict[UUID, set] = {}
+        applied = 0
+        for id_int, business_id, ts_us, shape, values in rows:
+            business_uuid = self._shared_business_id(business_id)
+            events = self._events[business_uuid]
+            with self._locks.for_key(business_uuid):
+                ids = seen.get(business_uuid)
+                if ids is None:
+                    lo = bisect_left(events, ts_us, key=_ts)
+                    ids = seen[business_uuid] = {e.id_int for e in events[lo:]}
+                if id_int in ids:
+                    continue
+                ids.add(id_int)
+                # log order can differ slightly from id order: appends are logged before the stripe is taken
+                _append_in_id_order(events, StoredEvent(id_int, business_uuid, ts_us, intern(shape), values))
+            applied += 1
+        return applied
 
     def clear(self) -> None:
-        self._events.clear()
+        with self._registry_lock:
+            self._events.clear()
+            self._business_ids.clear()
+            self._indexes.clear()
+            self._shapes.clear()
@@ -0,0 +1,219 @@
+"""Retention policies, bulk eviction and downsampled rollups for events."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.core.periodic import PeriodicWorker
+from anom.modules.ingestion.domain import (
+    FieldRollup,
+    RetentionPolicy,
+    Rollup,
+    RollupResolution,
+)
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+
+def _bucket_start(ts: datetime, resolution: RollupResolution) -> datetime:
+    if resolution is RollupResolution.MINUTE:
+        return ts.replace(second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+class _FieldAccumulator:
+    __slots__ = ("count", "sum", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class _BucketAccumulator:
+    __slots__ = ("count", "fields")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.fields: Dict[str, _FieldAccumulator] = {}
+
+
+class RollupStore:
+    """Per-business minute and hour rollups of evicted events.
+
+    Minute buckets are dropped once they are ``minute_retention_seconds`` old;
+    the hour buckets keep the long-term history.
+    """
+
+    def __init__(self, minute_retention_seconds: Optional[float] = 7 * 86_400.0) -> None:
+        self._minute_retention = (
+            timedelta(seconds=minute_retention_seconds) if minute_retention_seconds is not None else None
+        )
+        self._buckets: Dict[Tuple[UUID, RollupResolution], Dict[datetime, _BucketAccumulator]] = {}
+
+    def fold(self, business_id: UUID, events: Iterable[StoredEvent]) -> None:
+        minute = self._buckets.setdefault((business_id, RollupResolution.MINUTE), {})
+        hour = self._buckets.setdefault((business_id, RollupResolution.HOUR), {})
+        for event in events:
+            numeric = [
+                (name, float(value))
+                for name, value in zip(event.shape, event.values)
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            ]
+            for buckets, resolution in ((minute, RollupResolution.MINUTE), (hour, RollupResolution.HOUR)):
+                start = _bucket_start(event.received_at, resolution)
+                bucket = buckets.get(start)
+                if bucket is None:
+                    bucket = buckets[start] = _BucketAccumulator()
+                bucket.count += 1
+                for name, value in numeric:
+                    acc = bucket.fields.get(name)
+                    if acc is None:
+                        acc = bucket.fields[name] = _FieldAccumulator()
+                    acc.add(value)
+
+    def list_rollups(
+        self,
+        business_id: UUID,
+        resolution: RollupResolution,
+        since: Optional[datetime] = None,
+    ) -> List[Rollup]:
+        buckets = self._buckets.get((business_id, resolution), {})
+        if since is not None:
+            # bucket starts are naive UTC; accept tz-aware query parameters too
+            since = from_epoch_micros(epoch_micros(since))
+        return [
+            Rollup(
+                business_id=business_id,
+                resolution=resolution,
+                bucket_start=start,
+                count=bucket.count,
+                fields={
+                    name: FieldRollup(count=acc.count, sum=acc.sum, min=acc.min, max=acc.max)
+                    for name, acc in bucket.fields.items()
+                },
+            )
+            for start, bucket in sorted(buckets.items())
+            if since is None or start >= since
+        ]
+
+    def prune(self, now: datetime) -> int:
+        """Drop minute buckets past their retention; returns how many were removed."""
+
+        if self._minute_retention is None:
+            return 0
+        cutoff = now - self._minute_retention
+        removed = 0
+        for (_, resolution), buckets in list(self._buckets.items()):
+            if resolution is not RollupResolution.MINUTE:
+                continue
+            expired = [start for start in buckets if start < cutoff]
+            for start in expired:
+                del buckets[start]
+            removed += len(expired)
+        return removed
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, str, int, int, List[Tuple[str, int, float, float, float]]]]:
+        for (business_id, resolution), buckets in list(self._buckets.items()):
+            for start, bucket in list(buckets.items()):
+                yield (
+                    business_id.bytes,
+                    resolution.value,
+                    epoch_micros(start),
+                    bucket.count,
+                    [(name, acc.count, acc.sum, acc.min, acc.max) for name, acc in bucket.fields.items()],
+                )
+
+    def restore_rows(
+        self, rows: Iterable[Tuple[bytes, str, int, int, List[Tuple[str, int, float, float, float]]]]
+    ) -> None:
+        for business_id, resolution, start_us, count, fields in rows:
+            bucket = _BucketAccumulator()
+            bucket.count = count
+            for name, field_count, total, low, high in fields:
+                acc = bucket.fields[name] = _FieldAccumulator()
+                acc.count, acc.sum, acc.min, acc.max = field_count, total, low, high
+            key = (UUID(bytes=business_id), RollupResolution(resolution))
+            self._buckets.setdefault(key, {})[from_epoch_micros(start_us)] = bucket
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class RetentionService:
+    """Holds per-business retention policies and compacts expired events.
+
+    Its snapshot rows are the policies only; the :class:`RollupStore` is a
+    snapshot section of its own.
+    """
+
+    def __init__(self, event_repository: EventRepository, rollups: Optional[RollupStore] = None) -> None:
+        self._event_repository = event_repository
+        self._rollups = rollups if rollups is not None else RollupStore()
+        self._policies: Dict[UUID, RetentionPolicy] = {}
+
+    def set_policy(self, business_id: UUID, policy: RetentionPolicy) -> RetentionPolicy:
+        self._policies[business_id] = policy
+        return policy.model_copy()
+
+    def get_policy(self, business_id: UUID) -> Optional[RetentionPolicy]:
+        policy = self._policies.get(business_id)
+        return policy.model_copy() if policy else None
+
+    def list_rollups(
+        self,
+        business_id: UUID,
+        resolution: RollupResolution,
+        since: Optional[datetime] = None,
+    ) -> List[Rollup]:
+        return self._rollups.list_rollups(business_id, resolution, since)
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+        for business_id, policy in list(self._policies.items()):
+            yield business_id.bytes, policy.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[bytes, Dict[str, Any]]]) -> None:
+        for business_id, data in rows:
+            self._policies[UUID(bytes=business_id)] = RetentionPolicy.model_validate(data)
+
+    def clear(self) -> None:
+        self._policies.clear()
+        self._rollups.clear()
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Evict events outside every business's policy; return how many were dropped."""
+
+        now = now or datetime.utcnow()
+        dropped_total = 0
+        for business_id, policy in list(self._policies.items()):
+            before = now - timedelta(seconds=policy.max_age_seconds) if policy.max_age_seconds else None
+            dropped = self._event_repository.drop_oldest(
+                business_id,
+                before=before,
+                keep_last=policy.max_events,
+            )
+            if dropped:
+                self._rollups.fold(business_id, dropped)
+                dropped_total += len(dropped)
+        self._rollups.prune(now)
+        return dropped_total
+
+
+class EventCompactor(PeriodicWorker):
+    """Background thread that periodically runs :meth:`RetentionService.compact`."""
+
+    def __init__(self, service: RetentionService, interval_seconds: float) -> None:
+        super().__init__(service.compact, interval_seconds, "anom-event-compactor")
+
+
+__all__ = ["RetentionService", "RollupStore", "EventCompactor"]
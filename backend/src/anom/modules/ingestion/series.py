@@ -0,0 +1,245 @@
+"""Per-field time-bucket aggregates maintained as events are ingested."""
+from __future__ import annotations
+
+import logging
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from anom.common_models.time import epoch_seconds, from_epoch_seconds
+from anom.core.locks import StripedLock
+from anom.modules.ingestion.domain import SeriesPoint, SeriesResolution
+
+_BUCKET_SECONDS: Dict[SeriesResolution, int] = {
+    SeriesResolution.MINUTE: 60,
+    SeriesResolution.FIVE_MINUTES: 300,
+    SeriesResolution.HOUR: 3600,
+}
+
+# one day of minutes, one week of 5-minute buckets, one month of hours
+DEFAULT_CAPACITY: Dict[SeriesResolution, int] = {
+    SeriesResolution.MINUTE: 1440,
+    SeriesResolution.FIVE_MINUTES: 2016,
+    SeriesResolution.HOUR: 720,
+}
+
+# each field costs roughly 200 KB of rings at the default capacities
+DEFAULT_MAX_FIELDS = 64
+
+logger = logging.getLogger(__name__)
+
+_RESOLUTION_SLOT: Dict[SeriesResolution, int] = {resolution: i for i, resolution in enumerate(SeriesResolution)}
+
+
+class _BucketRing:
+    """Fixed-size ring of buckets stored in flat typed arrays.
+
+    Slot ``i`` holds bucket number ``index`` where ``index % capacity == i``;
+    a slot whose stored index is older than the incoming one is recycled.
+    """
+
+    __slots__ = ("width", "capacity", "head", "index", "count", "sum", "min", "max", "last")
+
+    def __init__(self, width: int, capacity: int) -> None:
+        self.width = width
+        self.capacity = capacity
+        self.head = -1
+        self.index = array("q", [-1]) * capacity
+        self.count = array("q", [0]) * capacity
+        self.sum = array("d", [0.0]) * capacity
+        self.min = array("d", [0.0]) * capacity
+        self.max = array("d", [0.0]) * capacity
+        self.last = array("d", [0.0]) * capacity
+
+    def add(self, epoch: float, value: float) -> None:
+        index = int(epoch // self.width)
+        if index <= self.head - self.capacity:
+            return  # older than anything the ring still covers
+        slot = index % self.capacity
+        stored = self.index[slot]
+        if stored != index:
+            if stored > index:
+                return
+            self.index[slot] = index
+            self.count[slot] = 1
+            self.sum[slot] = value
+            self.min[slot] = value
+            self.max[slot] = value
+            self.last[slot] = value
+        else:
+            self.count[slot] += 1
+            self.sum[slot] += value
+            if value < self.min[slot]:
+                self.min[slot] = value
+            if value > self.max[slot]:
+                self.max[slot] = value
+            self.last[slot] = value
+        if index > self.head:
+            self.head = index
+
+    def merge(self, epoch: float, count: int, total: float, low: float, high: float, last: float) -> None:
+        """:meth:`add` for ``count`` values at once, given their sum, extremes and last value."""
+
+        index = int(epoch // self.width)
+        if index <= self.head - self.capacity:
+            return
+        slot = index % self.capacity
+        stored = self.index[slot]
+        if stored != index:
+            if stored > index:
+                return
+            self.index[slot] = index
+            self.count[slot] = count
+            self.sum[slot] = total
+            self.min[slot] = low
+            self.max[slot] = high
+        else:
+            self.count[slot] += count
+            self.sum[slot] += total
+            if low < self.min[slot]:
+                self.min[slot] = low
+            if high > self.max[slot]:
+                self.max[slot] = high
+        self.last[slot] = last
+        if index > self.head:
+            self.head = index
+
+    def points(self, since_epoch: Optional[float]) -> List[SeriesPoint]:
+        if self.head < 0:
+            return []
+        first = self.head - self.capacity + 1
+        if since_epoch is not None:
+            first = max(first, int(since_epoch // self.width))
+        points: List[SeriesPoint] = []
+        for index in range(first, self.head + 1):
+            slot = index % self.capacity
+            if self.index[slot] != index:
+                continue
+            points.append(
+                SeriesPoint(
+                    bucket_start=from_epoch_seconds(index * self.width),
+                    count=self.count[slot],
+                    sum=self.sum[slot],
+                    min=self.min[slot],
+                    max=self.max[slot],
+                    last=self.last[slot],
+                )
+            )
+        return points
+
+
+class TimeSeriesStore:
+    """Keeps ring-buffered aggregates per business, numeric field and resolution.
+
+    Only fields registered with :meth:`ensure_fields` (the declared INTEGER and
+    FLOAT fields) are aggregated, at most ``max_fields`` per business, so
+    undeclared payload keys cannot allocate rings. Memory is fixed per field
+    regardless of event volume, and reads cost O(buckets) instead of a scan
+    over raw events. Rings are guarded by a per-business lock stripe.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[Mapping[SeriesResolution, int]] = None,
+        *,
+        lock_stripes: int = 64,
+        max_fields: int = DEFAULT_MAX_FIELDS,
+    ) -> None:
+        self._capacity = dict(DEFAULT_CAPACITY)
+        if capacity:
+            self._capacity.update(capacity)
+        self._max_fields = max_fields
+        self._fields: Dict[UUID, Tuple[str, ...]] = {}
+        self._rings: Dict[Tuple[UUID, str], Tuple[_BucketRing, ...]] = {}
+        self._locks = StripedLock(lock_stripes)
+
+    def ensure_fields(self, business_id: UUID, fields: Iterable[str]) -> None:
+        """Aggregate ``fields`` of ``business_id`` from now on, dropping the rings of any others."""
+
+        wanted = tuple(dict.fromkeys(fields))
+        if self._fields.get(business_id) == wanted[: self._max_fields]:
+            return
+        if len(wanted) > self._max_fields:
+            logger.warning(
+                "business %s declares %d numeric fields; only the first %d get time series",
+                business_id,
+                len(wanted),
+                self._max_fields,
+            )
+            wanted = wanted[: self._max_fields]
+        with self._locks.for_key(business_id):
+            previous = self._fields.get(business_id, ())
+            self._fields[business_id] = wanted
+            for name in set(previous).difference(wanted):
+                self._rings.pop((business_id, name), None)
+
+    def _rings_for(self, business_id: UUID, name: str) -> Tuple[_BucketRing, ...]:
+        rings = self._rings.get((business_id, name))
+        if rings is None:
+            rings = self._rings[(business_id, name)] = tuple(
+                _BucketRing(_BUCKET_SECONDS[resolution], self._capacity[resolution])
+                for resolution in SeriesResolution
+            )
+        return rings
+
+    def record(self, business_id: UUID, received_at: datetime, payload: Mapping[str, Any]) -> None:
+        fields = self._fields.get(business_id)
+        if not fields:
+            return
+        epoch = epoch_seconds(received_at)
+        with self._locks.for_key(business_id):
+            for name in fields:
+                value = payload.get(name)
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                value = float(value)
+                for ring in self._rings_for(business_id, name):
+                    ring.add(epoch, value)
+
+    def record_many(self, business_id: UUID, received_at: datetime, payloads: Sequence[Mapping[str, Any]]) -> None:
+        """:meth:`record` for payloads sharing one timestamp; each field touches its rings once."""
+
+        fields = self._fields.get(business_id)
+        if not fields:
+            return
+        folded: Dict[str, List[float]] = {}
+        for payload in payloads:
+            for name in fields:
+                value = payload.get(name)
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                values = folded.get(name)
+                if values is None:
+                    folded[name] = [float(value)]
+                else:
+                    values.append(float(value))
+        if not folded:
+            return
+        epoch = epoch_seconds(received_at)
+        with self._locks.for_key(business_id):
+            for name, values in folded.items():
+                aggregate = (len(values), sum(values), min(values), max(values), values[-1])
+                for ring in self._rings_for(business_id, name):
+                    ring.merge(epoch, *aggregate)
+
+    def series(
+        self,
+        business_id: UUID,
+        field: str,
+        resolution: SeriesResolution,
+        since: Optional[datetime] = None,
+    ) -> List[SeriesPoint]:
+        rings = self._rings.get((business_id, field))
+        if rings is None:
+            return []
+        since_epoch = epoch_seconds(since) if since is not None else None
+        with self._locks.for_key(business_id):
+            return rings[_RESOLUTION_SLOT[resolution]].points(since_epoch)
+
+    def clear(self) -> None:
+        self._fields.clear()
+        self._rings.clear()
+
+
+__all__ = ["TimeSeriesStore", "DEFAULT_CAPACITY", "DEFAULT_MAX_FIELDS"]
@@ -1,20 +1,46 @@
 """Application service responsible for event ingestion."""
 from __future__ import annotations
 
+import asyncio
+import math
 from datetime import datetime
-from typing import List, Tuple
-from uuid import UUID, uuid4
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
 
 from fastapi import HTTPException, status
 
+from anom.common_models.identifiers import new_id_ints
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.core.periodic import PeriodicWorker
 from anom.modules.alerts.service import AlertCreate, AlertService
-from anom.modules.business_def.domain import BusinessNotFoundError
+from anom.modules.business_def.domain import BusinessNotFoundError, FieldDataType, FieldDefinition
 from anom.modules.business_def.service import BusinessService
-from anom.modules.ingestion.domain import EventIngestRequest, EventRecord
+from anom.modules.ingestion.admission import AdmissionController, AdmissionRejectedError
+from anom.modules.ingestion.dedup import IdempotencyIndex, Reservation
+from anom.modules.ingestion.domain import (
+    BatchIngestResult,
+    EventIngestRequest,
+    EventRecord,
+    EventTimePolicy,
+    EventTimeStats,
+    IdempotencyPolicy,
+    LateEvent,
+)
+from anom.modules.ingestion.event_time import EventTimeProcessor, Released
+from anom.modules.ingestion.index import DEFAULT_MAX_INTEGER_VALUES
+from anom.modules.ingestion.records import StoredEvent
 from anom.modules.ingestion.repo import EventRepository
-from anom.modules.ingestion.validators import normalize_payload
+from anom.modules.ingestion.series import TimeSeriesStore
+from anom.modules.ingestion.sketches import SketchStore
+from anom.modules.ingestion.validators import normalize_payload, parse_field_value, payload_normalizer
 from anom.modules.rule_engine.dispatcher import RuleDispatcher
 
+EventListener = Callable[[StoredEvent], None]
+AlertSource = Callable[[StoredEvent], Sequence[AlertCreate]]
+IngestResult = Tuple[EventRecord, List[str]]
+
+# rejection reasons kept per batch result
+MAX_BATCH_ERRORS = 10
 
 class IngestionService:
     """Validates events, stores them, and triggers rule evaluation."""
@@ -25,47 +51,409 @@ class IngestionService:
         event_repository: EventRepository,
         rule_dispatcher: RuleDispatcher,
         alert_service: AlertService,
+        series_store: Optional[TimeSeriesStore] = None,
+        listeners: Sequence[EventListener] = (),
+        idempotency_index: Optional[IdempotencyIndex[Tuple[StoredEvent, List[str]]]] = None,
+        admission: Optional[AdmissionController] = None,
+        index_max_integer_values: int = DEFAULT_MAX_INTEGER_VALUES,
+        sketches: Optional[SketchStore] = None,
+        event_time: Optional[EventTimeProcessor] = None,
+        alert_sources: Sequence[AlertSource] = (),
     ) -> None:
         self._business_service = business_service
         self._event_repository = event_repository
         self._rule_dispatcher = rule_dispatcher
         self._alert_service = alert_service
+        self._series_store = series_store
+        self._listeners = tuple(listeners)
+        # like listeners, but their alerts are created on the ingest path (awaited by ingest_async)
+        self._alert_sources = tuple(alert_sources)
+        self._idempotency_index = idempotency_index if idempotency_index is not None else IdempotencyIndex()
+        self._idempotency_policies: Dict[UUID, IdempotencyPolicy] = {}
+        self._admission = admission
+        self._index_max_integer_values = index_max_integer_values
+        self._sketches = sketches
+        self._event_time = event_time if event_time is not None else EventTimeProcessor()
+
+    def set_idempotency_policy(self, business_id: UUID, policy: IdempotencyPolicy) -> IdempotencyPolicy:
+        self._idempotency_policies[business_id] = policy
+        return policy.model_copy()
+
+    def get_idempotency_policy(self, business_id: UUID) -> IdempotencyPolicy:
+        policy = self._idempotency_policies.get(business_id)
+        return policy.model_copy() if policy else IdempotencyPolicy()
+
+    def snapshot_rows(self) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+        """Snapshot rows of the idempotency policies; the other state lives in repositories."""
+
+        for business_id, policy in list(self._idempotency_policies.items()):
+            yield business_id.bytes, policy.model_dump()
+
+    def restore_rows(self, rows: Iterable[Tuple[bytes, Dict[str, Any]]]) -> None:
+        for business_id, data in rows:
+            self._idempotency_policies[UUID(bytes=business_id)] = IdempotencyPolicy.model_validate(data)
+
+    def clear(self) -> None:
+        self._idempotency_policies.clear()
+
+    def set_event_time_policy(self, business_id: UUID, policy: EventTimePolicy) -> EventTimePolicy:
+        """Key the aggregates of ``business_id`` by ``policy.field``, which must be a DATETIME field."""
+
+        self._ensure_business(business_id)
+        field = next((f for f in self._business_service.list_fields(business_id) if f.name == policy.field), None)
+        if field is None or field.data_type is not FieldDataType.DATETIME:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Event time field '{policy.field}' must be a declared datetime field",
+            )
+        self._aggregate_released(business_id, self._event_time.set_policy(business_id, policy))
+        return policy.model_copy()
+
+    def get_event_time_policy(self, business_id: UUID) -> Optional[EventTimePolicy]:
+        return self._event_time.get_policy(business_id)
+
+    def delete_event_time_policy(self, business_id: UUID) -> bool:
+        """Go back to receive-time aggregation, releasing any buffered events first."""
+
+        released = self._event_time.delete_policy(business_id)
+        if released is None:
+            return False
+        self._aggregate_released(business_id, released)
+        return True
+
+    def get_event_time_stats(self, business_id: UUID) -> Optional[EventTimeStats]:
+        return self._event_time.stats(business_id)
+
+    def list_late_events(self, business_id: UUID, limit: Optional[int] = None) -> List[LateEvent]:
+        return self._event_time.late_events(business_id, limit)
+
+    def flush_event_time(self, now: Optional[datetime] = None) -> int:
+        """Release buffers that went idle; returns the number of events released."""
 
-    def ingest(self, business_id: UUID, payload: EventIngestRequest) -> Tuple[EventRecord, List[str]]:
+        flushed = self._event_time.flush_idle(now)
+        for business_id, released in flushed.items():
+            self._aggregate_released(business_id, released)
+        return sum(len(released) for released in flushed.values())
+
+    def _ensure_business(self, business_id: UUID) -> None:
         try:
-            business = self._business_service.get_business(business_id)
+            self._business_service.get_business(business_id)
         except BusinessNotFoundError as exc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
 
+    def _idempotency_key(
+        self, business_id: UUID, payload: EventIngestRequest, header_key: Optional[str]
+    ) -> Optional[str]:
+        if header_key:
+            return header_key
+        policy = self._idempotency_policies.get(business_id)
+        if policy is None or policy.key_field is None:
+            return None
+        value = payload.payload.get(policy.key_field)
+        return None if value is None else str(value)
+
+    def ingest(
+        self,
+        business_id: UUID,
+        payload: EventIngestRequest,
+        idempotency_key: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> IngestResult:
+        """Ingest one event; a repeated idempotency key returns the first result.
+
+        Retries inside the dedup window are answered from the stored result
+        without validating the payload or evaluating rules again. Keys that
+        have aged out of the window, or whose first request is still
+        running, are rejected with 409. With
+        admission control configured, rate-limited or shed requests are
+        rejected with 429 before any other work.
+        """
+
+        started = self._admit(business_id, source)
+        try:
+            key, replayed = self._check_idempotency(business_id, payload, idempotency_key)
+            if replayed is not None:
+                return replayed
+            try:
+                event, normalized_payload = self._prepare(business_id, payload)
+                stored_event = self._event_repository.add_event(event)
+                alert_payloads = self._after_store(stored_event, normalized_payload)
+                alert_messages = [self._alert_service.create_alert(p).message for p in alert_payloads]
+            except BaseException:
+                self._release_key(business_id, key)
+                raise
+            return self._finish(key, stored_event, alert_messages)
+        finally:
+            if started is not None:
+                self._admission.monitor.end(started)
+
+    async def ingest_async(
+        self,
+        business_id: UUID,
+        payload: EventIngestRequest,
+        idempotency_key: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> IngestResult:
+        """Coroutine variant of :meth:`ingest` that never blocks the event loop on storage."""
+
+        started = self._admit(business_id, source)
+        try:
+            key, replayed = self._check_idempotency(business_id, payload, idempotency_key)
+            if replayed is not None:
+                return replayed
+            try:
+                fields = self._list_fields(business_id)
+                indexed = self._index_limits(fields)
+                if indexed and self._event_repository.missing_indexes(business_id, indexed):
+                    # a new index is built from the business's whole history
+                    await asyncio.to_thread(self._event_repository.ensure_indexes, business_id, indexed)
+                event, normalized_payload = self._prepare(business_id, payload, fields)
+                stored_event = await self._event_repository.add_event_async(event)
+                alert_payloads = self._after_store(stored_event, normalized_payload)
+                alerts = await asyncio.gather(*(self._alert_service.create_alert_async(p) for p in alert_payloads))
+            except BaseException:
+                self._release_key(business_id, key)
+                raise
+            return self._finish(key, stored_event, [alert.message for alert in alerts])
+        finally:
+            if started is not None:
+                self._admission.monitor.end(started)
+
+    def ingest_batch(self, business_id: UUID, payloads: Sequence[Dict[str, Any]]) -> BatchIngestResult:
+        """Ingest many events of one business for in-process sources.
+
+        There is no admission control or idempotency here. The whole batch
+        shares one receive time, one id reservation and one log write, and
+        without an event-time policy its time-series buckets are updated once
+        per field and events are only dispatched one by one when there are
+        rules, listeners or alert sources to see them. Payloads that fail
+        validation are counted and skipped instead of failing the batch.
+        """
+
+        self._ensure_business(business_id)
         fields = self._business_service.list_fields(business_id)
+        self._sync_fields(business_id, fields)
+        normalize = payload_normalizer(fields)
+        received_at = datetime.utcnow()
+        ts_us = epoch_micros(received_at)
+        normalized: List[Dict[str, Any]] = []
+        errors: List[str] = []
+        rejected = 0
+        for payload in payloads:
+            try:
+                normalized.append(normalize(payload))
+            except HTTPException as exc:
+                rejected += 1
+                if len(errors) < MAX_BATCH_ERRORS:
+                    errors.append(str(exc.detail))
+        events = [
+            StoredEvent(id_int, business_id, ts_us, tuple(normalized_payload), tuple(normalized_payload.values()))
+            for id_int, normalized_payload in zip(new_id_ints(len(normalized)), normalized)
+        ]
+        stored = self._event_repository.add_events(events)
+
+        alert_payloads: List[AlertCreate] = []
+        if self._event_time.has_policy(business_id):
+            for stored_event, normalized_payload in zip(stored, normalized):
+                alert_payloads.extend(self._after_store(stored_event, normalized_payload))
+        else:
+            if self._series_store is not None:
+                self._series_store.record_many(business_id, received_at, normalized)
+            if self._sketches is not None and self._sketches.fields(business_id):
+                for normalized_payload in normalized:
+                    self._sketches.record(business_id, ts_us, normalized_payload)
+            if self._listeners or self._alert_sources or self._rule_dispatcher.has_rules(business_id):
+                for stored_event, normalized_payload in zip(stored, normalized):
+                    alert_payloads.extend(self._dispatch(stored_event, normalized_payload, None))
+        alerts = self._alert_service.create_alerts(alert_payloads) if alert_payloads else []
+        return BatchIngestResult(accepted=len(stored), rejected=rejected, alerts=len(alerts), errors=errors)
+
+    def _admit(self, business_id: UUID, source: Optional[str]) -> Optional[float]:
+        """Apply admission control; returns the load-monitor start mark to pass to ``end``."""
+
+        if self._admission is None:
+            return None
+        try:
+            self._admission.admit(business_id, source)
+        except AdmissionRejectedError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=exc.reason,
+                headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+            ) from exc
+        return self._admission.monitor.begin()
+
+    def _check_idempotency(
+        self, business_id: UUID, payload: EventIngestRequest, header_key: Optional[str]
+    ) -> Tuple[Optional[str], Optional[IngestResult]]:
+        key = self._idempotency_key(business_id, payload, header_key)
+        if key is None:
+            return None, None
+        reservation, result = self._idempotency_index.reserve(business_id, key)
+        if reservation is Reservation.COMPLETED:
+            event, alerts = result
+            return key, (event.to_model(), list(alerts))
+        if reservation is Reservation.IN_FLIGHT:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this idempotency key is still in progress",
+            )
+        if reservation is Reservation.EXPIRED:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Duplicate idempotency key")
+        return key, None
+
+    def _release_key(self, business_id: UUID, key: Optional[str]) -> None:
+        if key is not None:
+            self._idempotency_index.release(business_id, key)
+
+    def _sync_fields(self, business_id: UUID, fields: Sequence[FieldDefinition]) -> None:
+        """Keep the indexes, series and sketches of ``business_id`` in line with its declared fields."""
+
+        if self._series_store is not None:
+            self._series_store.ensure_fields(
+                business_id,
+                [field.name for field in fields if field.data_type in (FieldDataType.INTEGER, FieldDataType.FLOAT)],
+            )
+        if self._sketches is not None:
+            self._sketches.ensure_fields(business_id, [field.name for field in fields if field.sketched])
+        indexed = self._index_limits(fields)
+        if indexed:
+            self._event_repository.ensure_indexes(business_id, indexed)
+
+    def _index_limits(self, fields: Sequence[FieldDefinition]) -> Dict[str, Optional[int]]:
+        return {
+            field.name: self._index_max_integer_values if field.data_type is FieldDataType.INTEGER else None
+            for field in fields
+            if field.indexed
+        }
+
+    def _list_fields(self, business_id: UUID) -> List[FieldDefinition]:
+        try:
+            return self._business_service.list_fields(business_id)
+        except BusinessNotFoundError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+    def _prepare(
+        self,
+        business_id: UUID,
+        payload: EventIngestRequest,
+        fields: Optional[Sequence[FieldDefinition]] = None,
+    ) -> Tuple[StoredEvent, Dict[str, Any]]:
+        if fields is None:
+            fields = self._list_fields(business_id)
         normalized_payload = normalize_payload(payload.payload, fields)
+        self._sync_fields(business_id, fields)
+        return StoredEvent.create(business_id, normalized_payload, datetime.utcnow()), normalized_payload
 
-        event = EventRecord(
-            id=uuid4(),
-            business_id=business.id,
-            payload=normalized_payload,
-            received_at=datetime.utcnow(),
+    def _after_store(self, stored_event: StoredEvent, normalized_payload: Dict[str, Any]) -> List[AlertCreate]:
+        business_id = stored_event.business_id
+        # aggregates are fed before rule evaluation, so sketch rules see this event
+        ordered = self._event_time.offer(business_id, stored_event, normalized_payload)
+        if ordered is None:
+            watermark_us = None
+            if self._series_store is not None:
+                self._series_store.record(business_id, stored_event.received_at, normalized_payload)
+            if self._sketches is not None:
+                self._sketches.record(business_id, stored_event.ts_us, normalized_payload)
+        else:
+            released, watermark_us = ordered
+            self._aggregate_released(business_id, released)
+        return self._dispatch(stored_event, normalized_payload, watermark_us)
+
+    def _dispatch(
+        self, stored_event: StoredEvent, normalized_payload: Dict[str, Any], watermark_us: Optional[int]
+    ) -> List[AlertCreate]:
+        """Notify listeners, evaluate rules and collect alert-source alerts for an already aggregated event."""
+
+        business_id = stored_event.business_id
+        for listener in self._listeners:
+            listener(stored_event)
+
+        triggered_rules = self._rule_dispatcher.evaluate_event(
+            business_id, stored_event, normalized_payload, now_us=watermark_us
         )
-        stored_event = self._event_repository.add_event(event)
-
-        triggered_rules = self._rule_dispatcher.evaluate_event(business_id, stored_event)
-        alert_messages: List[str] = []
-        for rule in triggered_rules:
-            alert = self._alert_service.create_alert(
-                AlertCreate(
-                    business_id=business_id,
-                    rule_id=rule.id,
-                    event_id=stored_event.id,
-                    message=f"Rule '{rule.name}' triggered",
-                    severity=rule.severity,
-                )
+        alerts = [
+            AlertCreate(
+                business_id=business_id,
+                rule_id=rule.id,
+                event_id=stored_event.id,
+                message=f"Rule '{rule.name}' triggered",
+                severity=rule.severity,
             )
-            alert_messages.append(alert.message)
+            for rule in triggered_rules
+        ]
+        for source in self._alert_sources:
+            alerts.extend(source(stored_event))
+        return alerts
+
+    def _aggregate_released(self, business_id: UUID, released: Sequence[Released]) -> None:
+        for event_us, payload in released:
+            if self._series_store is not None:
+                self._series_store.record(business_id, from_epoch_micros(event_us), payload)
+            if self._sketches is not None:
+                self._sketches.record(business_id, event_us, payload)
+
+    def _finish(self, key: Optional[str], stored_event: StoredEvent, alert_messages: List[str]) -> IngestResult:
+        if key is not None:
+            self._idempotency_index.record(stored_event.business_id, key, (stored_event, list(alert_messages)))
+        return stored_event.to_model(), alert_messages
+
+    def list_events(
+        self,
+        business_id: UUID,
+        *,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[EventRecord]:
+        return [event.to_model() for event in self.list_stored_events(business_id, after=after, limit=limit)]
+
+    def list_stored_events(
+        self,
+        business_id: UUID,
+        *,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredEvent]:
+        """Like :meth:`list_events` but without building wire models."""
+
+        return self._event_repository.list_events(business_id, after=after, limit=limit)
+
+    def find_stored_events(
+        self,
+        business_id: UUID,
+        where: Sequence[Tuple[str, str]],
+        *,
+        after: Optional[UUID] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredEvent]:
+        """Events whose fields equal every ``(field, raw value)`` pair, served from indexes where declared."""
+
+        self._ensure_business(business_id)
+        fields = self._business_service.list_fields(business_id)
+        by_name = {field.name: field for field in fields}
+        conditions = []
+        for name, raw in where:
+            field = by_name.get(name)
+            if field is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field '{name}'")
+            conditions.append((name, parse_field_value(raw, field)))
+        self._sync_fields(business_id, fields)
+        return self._event_repository.find_events(business_id, conditions, after=after, limit=limit)
+
 
-        return stored_event, alert_messages
+class EventTimeFlusher(PeriodicWorker):
+    """Background thread that periodically runs :meth:`IngestionService.flush_event_time`."""
 
-    def list_events(self, business_id: UUID) -> List[EventRecord]:
-        return self._event_repository.list_events(business_id)
+    def __init__(self, service: IngestionService, interval_seconds: float) -> None:
+        super().__init__(service.flush_event_time, interval_seconds, "anom-event-time-flusher")
 
 
-__all__ = ["IngestionService", "EventIngestRequest", "EventRecord"]
+__all__ = [
+    "AlertSource",
+    "EventIngestRequest",
+    "EventListener",
+    "EventRecord",
+    "EventTimeFlusher",
+    "IngestResult",
+    "IngestionService",
+]
@@ -0,0 +1,210 @@
+"""Windowed heavy-hitter and distinct-count sketches of declared fields.
+
+Fields declared with ``sketched=True`` get, per business, a ring of time
+slots. Each slot holds a count-min sketch, a top-K candidate list and a
+HyperLogLog counter (see :mod:`anom.core.sketches`), so memory per field is
+fixed by the slot count and sketch dimensions, whatever the traffic. Window
+queries combine the slots they cover: counts are summed and HyperLogLog
+registers merged.
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+from uuid import UUID
+
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.core.locks import StripedLock
+from anom.core.sketches import CountMinSketch, HyperLogLog, TopK, estimate_registers, hash_value, merge_registers
+from anom.modules.ingestion.domain import FieldSketchSummary, HeavyHitter
+
+
+class _Slot:
+    __slots__ = ("index", "counts", "distinct", "top")
+
+    def __init__(self, index: int, width: int, depth: int, precision: int, top_k: int) -> None:
+        self.index = index
+        self.counts = CountMinSketch(width, depth)
+        self.distinct = HyperLogLog(precision)
+        self.top = TopK(top_k)
+
+
+class _SketchRing:
+    """Slot ``i`` holds time slot number ``index`` where ``index % capacity == i``."""
+
+    __slots__ = ("capacity", "dimensions", "slots", "head")
+
+    def __init__(self, capacity: int, dimensions: Tuple[int, int, int, int]) -> None:
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self.slots: List[Optional[_Slot]] = [None] * capacity
+        self.head = -1
+
+    def add(self, index: int, value: Any, hashed: int) -> None:
+        if index <= self.head - self.capacity:
+            return  # older than anything the ring still covers
+        position = index % self.capacity
+        slot = self.slots[position]
+        if slot is None or slot.index != index:
+            if slot is not None and slot.index > index:
+                return
+            slot = self.slots[position] = _Slot(index, *self.dimensions)
+        slot.top.offer(value, slot.counts.add(hashed))
+        slot.distinct.add(hashed)
+        if index > self.head:
+            self.head = index
+
+    def window(self, first: int, last: int) -> List[_Slot]:
+        first = max(first, last - self.capacity + 1)
+        found = []
+        for index in range(first, last + 1):
+            slot = self.slots[index % self.capacity]
+            if slot is not None and slot.index == index:
+                found.append(slot)
+        return found
+
+
+class SketchStore:
+    """Per-business, per-field sketch rings guarded by a business lock stripe.
+
+    With the defaults (60 one-minute slots, a 4x1024 count-min sketch and
+    2048 HyperLogLog registers) a fully populated field holds about 2 MB.
+    """
+
+    def __init__(
+        self,
+        *,
+        slot_seconds: int = 60,
+        slots: int = 60,
+        width: int = 1024,
+        depth: int = 4,
+        precision: int = 11,
+        top_k: int = 20,
+        lock_stripes: int = 64,
+    ) -> None:
+        self._slot_us = slot_seconds * 1_000_000
+        self._capacity = slots
+        self._dimensions = (width, depth, precision, top_k)
+        self._fields: Dict[UUID, FrozenSet[str]] = {}
+        self._rings: Dict[Tuple[UUID, str], _SketchRing] = {}
+        self._locks = StripedLock(lock_stripes)
+
+    @property
+    def slot_seconds(self) -> int:
+        return self._slot_us // 1_000_000
+
+    def ensure_fields(self, business_id: UUID, fields: Iterable[str]) -> None:
+        """Sketch ``fields`` of ``business_id`` from now on."""
+
+        wanted = frozenset(fields)
+        if self._fields.get(business_id) != wanted:
+            self._fields[business_id] = wanted
+
+    def fields(self, business_id: UUID) -> FrozenSet[str]:
+        return self._fields.get(business_id, frozenset())
+
+    def record(self, business_id: UUID, ts_us: int, payload: Mapping[str, Any]) -> None:
+        fields = self._fields.get(business_id)
+        if not fields:
+            return
+        index = ts_us // self._slot_us
+        with self._locks.for_key(business_id):
+            for name in fields:
+                value = payload.get(name)
+                if value is None:
+                    continue
+                ring = self._rings.get((business_id, name))
+                if ring is None:
+                    ring = self._rings[(business_id, name)] = _SketchRing(self._capacity, self._dimensions)
+                ring.add(index, value, hash_value(value))
+
+    def _slot_count(self, window_seconds: float, limit: int) -> int:
+        return max(1, min(limit, math.ceil(window_seconds * 1_000_000 / self._slot_us)))
+
+    def window_count(
+        self, business_id: UUID, field: str, value: Any, window_seconds: float, now_us: int
+    ) -> Tuple[int, int]:
+        """Estimated occurrences of ``value`` and total values of ``field`` in the window ending at ``now_us``."""
+
+        ring = self._rings.get((business_id, field))
+        if ring is None:
+            return 0, 0
+        last = now_us // self._slot_us
+        hashed = hash_value(value)
+        count = total = 0
+        with self._locks.for_key(business_id):
+            for slot in ring.window(last - self._slot_count(window_seconds, self._capacity) + 1, last):
+                count += slot.counts.estimate(hashed)
+                total += slot.counts.total
+        return count, total
+
+    def distinct_change(
+        self, business_id: UUID, field: str, window_seconds: float, now_us: int
+    ) -> Optional[Tuple[float, float]]:
+        """Distinct values in the previous and the latest complete window, or ``None`` without data.
+
+        The slot in progress is left out so a young slot does not read as a drop.
+        Windows are capped at half the ring.
+        """
+
+        ring = self._rings.get((business_id, field))
+        if ring is None:
+            return None
+        span = self._slot_count(window_seconds, max(1, self._capacity // 2))
+        current_last = now_us // self._slot_us - 1
+        with self._locks.for_key(business_id):
+            previous_slots = ring.window(current_last - 2 * span + 1, current_last - span)
+            current_slots = ring.window(current_last - span + 1, current_last)
+            previous = merge_registers(slot.distinct for slot in previous_slots)
+            current = merge_registers(slot.distinct for slot in current_slots)
+        if previous is None:
+            return None
+        return estimate_registers(previous), estimate_registers(current) if current is not None else 0.0
+
+    def summary(
+        self,
+        business_id: UUID,
+        field: str,
+        window_seconds: float,
+        *,
+        top: int = 10,
+        now: Optional[datetime] = None,
+    ) -> FieldSketchSummary:
+        now_us = epoch_micros(now or datetime.utcnow())
+        last = now_us // self._slot_us
+        span = self._slot_count(window_seconds, self._capacity)
+        window_start = from_epoch_micros((last - span + 1) * self._slot_us)
+        window_end = from_epoch_micros((last + 1) * self._slot_us)
+        ring = self._rings.get((business_id, field))
+        if ring is None:
+            return FieldSketchSummary(
+                field=field, window_start=window_start, window_end=window_end, total=0, distinct=0, top=[]
+            )
+        with self._locks.for_key(business_id):
+            slots = ring.window(last - span + 1, last)
+            total = sum(slot.counts.total for slot in slots)
+            registers = merge_registers(slot.distinct for slot in slots)
+            candidates = {value for slot in slots for value in slot.top.counts}
+            counted = []
+            for value in candidates:
+                hashed = hash_value(value)
+                counted.append((sum(slot.counts.estimate(hashed) for slot in slots), value))
+        counted.sort(key=lambda item: item[0], reverse=True)
+        return FieldSketchSummary(
+            field=field,
+            window_start=window_start,
+            window_end=window_end,
+            total=total,
+            distinct=round(estimate_registers(registers)) if registers is not None else 0,
+            top=[
+                HeavyHitter(value=value, count=count, share=count / total if total else 0.0)
+                for count, value in counted[:top]
+            ],
+        )
+
+    def clear(self) -> None:
+        self._rings.clear()
+
+
+__all__ = ["SketchStore"]
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Tuple
 
 from fastapi import HTTPException, status
 
@@ -17,43 +17,77 @@ _TYPE_CASTERS: Dict[FieldDataType, Any] = {
 }
 
 
-def _coerce_value(value: Any, data_type: FieldDataType) -> Any:
-    if data_type is FieldDataType.STRING:
-        if isinstance(value, str):
-            return value
-        raise TypeError("expected string")
-    if data_type is FieldDataType.INTEGER:
-        if isinstance(value, bool):  # pragma: no cover - defensive
-            raise TypeError("boolean is not a valid integer")
-        try:
-            return int(value)
-        except (TypeError, ValueError) as exc:  # pragma: no cover - defensive
-            raise TypeError("expected integer") from exc
-    if data_type is FieldDataType.FLOAT:
+def _to_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    raise TypeError("expected string")
+
+
+def _to_integer(value: Any) -> int:
+    if isinstance(value, bool):  # pragma: no cover - defensive
+        raise TypeError("boolean is not a valid integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError) as exc:  # pragma: no cover - defensive
+        raise TypeError("expected integer") from exc
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError) as exc:  # pragma: no cover - defensive
+        raise TypeError("expected float") from exc
+
+
+def _to_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in {"true", "1", "yes"}:
+            return True
+        if lowered in {"false", "0", "no"}:
+            return False
+    raise TypeError("expected boolean")
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
         try:
-            return float(value)
-        except (TypeError, ValueError) as exc:  # pragma: no cover - defensive
-            raise TypeError("expected float") from exc
-    if data_type is FieldDataType.BOOLEAN:
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            lowered = value.lower()
-            if lowered in {"true", "1", "yes"}:
-                return True
-            if lowered in {"false", "0", "no"}:
-                return False
-        raise TypeError("expected boolean")
-    if data_type is FieldDataType.DATETIME:
-        if isinstance(value, datetime):
-            return value
-        if isinstance(value, str):
-            try:
-                return datetime.fromisoformat(value)
-            except ValueError as exc:  # pragma: no cover - defensive
-                raise TypeError("expected ISO datetime string") from exc
-        raise TypeError("expected datetime")
-    raise TypeError(f"unsupported data type {data_type!s}")
+            return datetime.fromisoformat(value)
+        except ValueError as exc:  # pragma: no cover - defensive
+            raise TypeError("expected ISO datetime string") from exc
+    raise TypeError("expected datetime")
+
+
+_COERCERS: Dict[FieldDataType, Callable[[Any], Any]] = {
+    FieldDataType.STRING: _to_string,
+    FieldDataType.INTEGER: _to_integer,
+    FieldDataType.FLOAT: _to_float,
+    FieldDataType.BOOLEAN: _to_boolean,
+    FieldDataType.DATETIME: _to_datetime,
+}
+
+
+def _coerce_value(value: Any, data_type: FieldDataType) -> Any:
+    coerce = _COERCERS.get(data_type)
+    if coerce is None:
+        raise TypeError(f"unsupported data type {data_type!s}")
+    return coerce(value)
+
+
+def parse_field_value(raw: str, field: FieldDefinition) -> Any:
+    """Convert a query-string value to the field's stored type."""
+
+    try:
+        return _coerce_value(raw, field.data_type)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Field '{field.name}' expects {_TYPE_CASTERS[field.data_type].__name__}",
+        ) from exc
 
 
 def normalize_payload(
@@ -62,27 +96,44 @@ def normalize_payload(
 ) -> Dict[str, Any]:
     """Validate payload against schema and return normalized data."""
 
-    normalized: Dict[str, Any] = {}
-    defined_fields = {field.name: field for field in field_definitions}
+    return payload_normalizer(field_definitions)(payload)
+
 
+def payload_normalizer(field_definitions: list[FieldDefinition]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """:func:`normalize_payload` with the schema lookups done once, for validating many payloads.
+
+    Each declared field is bound to its coercer up front, and values that
+    already have the field's exact type are kept without a call.
+    """
+
+    # name -> (exact type kept as is, coercer, type name for errors)
+    fields: Dict[str, Tuple[type, Callable[[Any], Any], str]] = {}
     for field in field_definitions:
-        if field.required and field.name not in payload:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Missing required field '{field.name}'",
-            )
-
-    for key, value in payload.items():
-        field = defined_fields.get(key)
-        if not field:
-            # allow additional properties for now
-            normalized[key] = value
-            continue
-        try:
-            normalized[key] = _coerce_value(value, field.data_type)
-        except TypeError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Field '{key}' expects {_TYPE_CASTERS[field.data_type].__name__}",
-            ) from exc
-    return normalized
+        exact = _TYPE_CASTERS[field.data_type]
+        fields[field.name] = (exact, _COERCERS[field.data_type], exact.__name__)
+    required = [field.name for field in field_definitions if field.required]
+
+    def normalize(payload: Dict[str, Any]) -> Dict[str, Any]:
+        for name in required:
+            if name not in payload:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Missing required field '{name}'",
+                )
+
+        # undeclared keys are kept as sent (additional properties are allowed for now)
+        normalized = dict(payload)
+        for key, value in payload.items():
+            field = fields.get(key)
+            if field is None or type(value) is field[0]:
+                continue
+            try:
+                normalized[key] = field[1](value)
+            except TypeError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Field '{key}' expects {field[2]}",
+                ) from exc
+        return normalized
+
+    return normalize
@@ -0,0 +1,54 @@
+"""FastAPI router exposing notification destination management."""
+from __future__ import annotations
+
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from anom.api.deps import get_notification_service, on_loop
+from anom.modules.notifications.domain import Destination, DestinationCreate, DestinationNotFoundError
+from anom.modules.notifications.service import NotificationService
+
+router = APIRouter()
+
+
+@router.post("/destinations", response_model=Destination, status_code=status.HTTP_201_CREATED)
+async def create_destination(
+    payload: DestinationCreate,
+    service: NotificationService = Depends(on_loop(get_notification_service)),
+) -> Destination:
+    return service.create_destination(payload)
+
+
+@router.get("/destinations", response_model=List[Destination])
+async def list_destinations(
+    service: NotificationService = Depends(on_loop(get_notification_service)),
+) -> List[Destination]:
+    return service.list_destinations()
+
+
+@router.get("/destinations/{destination_id}", response_model=Destination)
+async def get_destination(
+    destination_id: UUID,
+    service: NotificationService = Depends(on_loop(get_notification_service)),
+) -> Destination:
+    try:
+        return service.get_destination(destination_id)
+    except DestinationNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found") from exc
+
+
+@router.delete("/destinations/{destination_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_destination(
+    destination_id: UUID,
+    service: NotificationService = Depends(on_loop(get_notification_service)),
+) -> Response:
+    try:
+        service.delete_destination(destination_id)
+    except DestinationNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found") from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+__all__ = ["router"]
@@ -0,0 +1,285 @@
+"""Asynchronous, batched delivery of newly created alerts."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import httpx
+
+from anom.modules.alerts.domain import Alert, AlertDelivery, DeliveryStatus
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.notifications.domain import Destination
+from anom.modules.notifications.repo import DestinationRepository
+from anom.modules.notifications.senders import DeliveryError, send_batch
+from anom.modules.rules.domain import SeverityLevel
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[httpx.AsyncClient, Destination, Sequence[Alert], float], Awaitable[None]]
+
+_SEVERITY_RANK: Dict[SeverityLevel, int] = {
+    SeverityLevel.INFO: 0,
+    SeverityLevel.WARNING: 1,
+    SeverityLevel.CRITICAL: 2,
+}
+
+
+class _DestinationWorker:
+    """Batches alerts for one destination and sends them under a concurrency cap."""
+
+    def __init__(self, dispatcher: "NotificationDispatcher", destination: Destination) -> None:
+        self.destination = destination
+        self.queue: asyncio.Queue[Alert] = asyncio.Queue(maxsize=dispatcher.queue_capacity)
+        self._dispatcher = dispatcher
+        self._slots = asyncio.Semaphore(destination.max_concurrency)
+        self._sends: set[asyncio.Task[None]] = set()
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        window = self.destination.batch_window_ms / 1000
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + window
+            while len(batch) < self.destination.batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            send = loop.create_task(self._deliver(batch))
+            self._sends.add(send)
+            send.add_done_callback(self._sends.discard)
+
+    async def _deliver(self, batch: List[Alert]) -> None:
+        dispatcher = self._dispatcher
+        attempts = 0
+        error: Optional[str] = None
+        try:
+            while True:
+                attempts += 1
+                try:
+                    await dispatcher.sender(dispatcher.client, self.destination, batch, dispatcher.timeout_s)
+                    error = None
+                    break
+                except DeliveryError as exc:
+                    error = str(exc)
+                    if not exc.retryable:
+                        break
+                except Exception as exc:
+                    # a sender bug must still leave a delivery state on the alerts
+                    logger.exception("notification sender for %s raised", self.destination.name)
+                    error = f"{type(exc).__name__}: {exc}"
+                    break
+                if attempts >= dispatcher.max_attempts:
+                    break
+                # "full jitter" exponential backoff
+                cap = min(dispatcher.backoff_max_s, dispatcher.backoff_base_s * 2 ** (attempts - 1))
+                await asyncio.sleep(random.uniform(0, cap))
+            if error is not None:
+                logger.warning(
+                    "notification to %s failed after %d attempts: %s", self.destination.name, attempts, error
+                )
+            dispatcher.alerts.record_delivery(
+                [alert.id for alert in batch],
+                AlertDelivery(
+                    destination_id=self.destination.id,
+                    status=DeliveryStatus.FAILED if error else DeliveryStatus.DELIVERED,
+                    attempts=attempts,
+                    last_error=error,
+                    updated_at=datetime.utcnow(),
+                ),
+            )
+        finally:
+            self._slots.release()
+            for _ in batch:
+                self.queue.task_done()
+
+    async def close(self, reason: str) -> None:
+        """Stop the worker; alerts still queued are recorded as failed with ``reason``."""
+
+        self.task.cancel()
+        for send in list(self._sends):
+            send.cancel()
+        await asyncio.gather(self.task, *self._sends, return_exceptions=True)
+        abandoned: List[UUID] = []
+        while not self.queue.empty():
+            abandoned.append(self.queue.get_nowait().id)
+            self.queue.task_done()
+        if abandoned:
+            self._dispatcher.alerts.record_delivery(
+                abandoned,
+                AlertDelivery(
+                    destination_id=self.destination.id,
+                    status=DeliveryStatus.FAILED,
+                    last_error=reason,
+                    updated_at=datetime.utcnow(),
+                ),
+            )
+
+
+class NotificationDispatcher:
+    """Fans new alerts out to matching destinations without blocking ingestion.
+
+    :meth:`enqueue` may be called from any thread; it only schedules a
+    callback on the dispatcher's event loop. Each destination gets its own
+    queue, batching window and concurrency limit, and all HTTP traffic
+    shares one keep-alive connection pool.
+
+    Queues hold at most ``queue_capacity`` alerts; alerts that do not fit, or
+    that arrive while the dispatcher is not running, are counted in
+    :attr:`dropped` and logged rather than buffered without bound.
+    """
+
+    def __init__(
+        self,
+        destinations: DestinationRepository,
+        alerts: AlertRepository,
+        *,
+        max_attempts: int = 5,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 30.0,
+        timeout_s: float = 10.0,
+        max_connections: int = 100,
+        queue_capacity: int = 10_000,
+        sender: Sender = send_batch,
+    ) -> None:
+        self.alerts = alerts
+        self.queue_capacity = queue_capacity
+        self.dropped = 0
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.sender = sender
+        self._destinations = destinations
+        self._max_connections = max_connections
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._workers: Dict[UUID, _DestinationWorker] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("NotificationDispatcher is not started")
+        return self._client
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self) -> None:
+        if self._loop is not None:
+            return
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_s,
+            limits=httpx.Limits(
+                max_connections=self._max_connections,
+                max_keepalive_connections=self._max_connections,
+            ),
+        )
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        if self._loop is None:
+            return
+        self._loop = None
+        workers = list(self._workers.values())
+        self._workers.clear()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(w.queue.join() for w in workers)), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("notification queues not drained within %.1fs", drain_timeout)
+        for worker in workers:
+            await worker.close("dispatcher stopped before delivery")
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def drain(self) -> None:
+        """Wait until every queued alert has been delivered or given up on."""
+
+        await asyncio.gather(*(w.queue.join() for w in list(self._workers.values())))
+
+    def enqueue(self, alert: Alert) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._drop("alert %s not notified: dispatcher is not running", alert.id)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            # async handlers run on the dispatcher's loop: skip the cross-thread wakeup
+            self._accept(alert)
+        else:
+            loop.call_soon_threadsafe(self._accept, alert)
+
+    def forget_destination(self, destination_id: UUID) -> None:
+        """Stop the worker of a deleted destination; safe to call from any thread."""
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._retire(destination_id)
+        else:
+            loop.call_soon_threadsafe(self._retire, destination_id)
+
+    def _retire(self, destination_id: UUID) -> None:
+        worker = self._workers.pop(destination_id, None)
+        if worker is not None and self._loop is not None:
+            self._loop.create_task(worker.close("destination deleted"))
+
+    def _drop(self, message: str, *args: object) -> None:
+        self.dropped += 1
+        if self.dropped == 1 or self.dropped % 1000 == 0:
+            logger.warning(message + " (%d alert notifications dropped so far)", *args, self.dropped)
+
+    def _accept(self, alert: Alert) -> None:
+        if self._loop is None:
+            self._drop("alert %s not notified: dispatcher stopped", alert.id)
+            return
+        rank = _SEVERITY_RANK[alert.severity]
+        for destination in self._destinations.current_destinations():
+            if destination.business_id is not None and destination.business_id != alert.business_id:
+                continue
+            if rank < _SEVERITY_RANK[destination.min_severity]:
+                continue
+            worker = self._workers.get(destination.id)
+            if worker is None:
+                worker = self._workers[destination.id] = _DestinationWorker(self, destination)
+            try:
+                worker.queue.put_nowait(alert)
+            except asyncio.QueueFull:
+                self._drop("alert %s not queued for %s: queue full", alert.id, destination.name)
+                status, error = DeliveryStatus.FAILED, "notification queue full"
+            else:
+                status, error = DeliveryStatus.PENDING, None
+            self.alerts.record_delivery(
+                [alert.id],
+                AlertDelivery(
+                    destination_id=destination.id,
+                    status=status,
+                    last_error=error,
+                    updated_at=datetime.utcnow(),
+                ),
+            )
+
+
+__all__ = ["NotificationDispatcher"]
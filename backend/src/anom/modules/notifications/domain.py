@@ -0,0 +1,61 @@
+"""Domain models for alert notification destinations."""
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from anom.modules.rules.domain import SeverityLevel
+
+
+class NotificationChannel(str, Enum):
+    """Transports alerts can be delivered over."""
+
+    WEBHOOK = "webhook"
+    SLACK = "slack"
+    EMAIL = "email"
+
+
+class DestinationCreate(BaseModel):
+    """Payload required to register a notification destination."""
+
+    name: str = Field(..., min_length=1, max_length=120)
+    channel: NotificationChannel
+    business_id: Optional[UUID] = Field(default=None, description="Only notify for this business")
+    min_severity: SeverityLevel = SeverityLevel.INFO
+    # webhook / slack
+    url: Optional[str] = Field(default=None, max_length=2000)
+    # email
+    smtp_host: Optional[str] = Field(default=None, max_length=255)
+    smtp_port: int = Field(default=25, ge=1, le=65535)
+    sender: Optional[str] = Field(default=None, max_length=255)
+    recipients: List[str] = Field(default_factory=list)
+    # batching / flow control
+    batch_size: int = Field(default=50, ge=1, le=1000)
+    batch_window_ms: int = Field(default=200, ge=0, le=60_000)
+    max_concurrency: int = Field(default=4, ge=1, le=64)
+
+    @model_validator(mode="after")
+    def _check_channel_settings(self) -> "DestinationCreate":
+        if self.channel is NotificationChannel.EMAIL:
+            if not (self.smtp_host and self.sender and self.recipients):
+                raise ValueError("email destinations require smtp_host, sender and recipients")
+        elif not self.url:
+            raise ValueError(f"{self.channel.value} destinations require a url")
+        return self
+
+
+class Destination(DestinationCreate):
+    """Stored notification destination."""
+
+    id: UUID
+    created_at: datetime
+
+
+class DestinationNotFoundError(Exception):
+    """Raised when an operation references an unknown destination."""
+
+    pass
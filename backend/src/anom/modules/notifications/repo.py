@@ -0,0 +1,65 @@
+"""In-memory repository for notification destinations."""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from anom.modules.notifications.domain import Destination
+
+
+class DestinationRepository:
+    """Stores notification destinations keyed by their identifier.
+
+    Writers also publish an immutable tuple of the destinations, so the
+    notification dispatcher can read them for every alert without copying.
+    """
+
+    def __init__(self) -> None:
+        self._destinations: Dict[UUID, Destination] = {}
+        self._current: Tuple[Destination, ...] = ()
+        self._write_lock = threading.Lock()
+
+    def _publish(self) -> None:
+        # caller holds the write lock
+        self._current = tuple(self._destinations.values())
+
+    def add_destination(self, destination: Destination) -> Destination:
+        with self._write_lock:
+            self._destinations[destination.id] = destination
+            self._publish()
+        return destination.model_copy()
+
+    def list_destinations(self) -> List[Destination]:
+        return [d.model_copy() for d in self._current]
+
+    def current_destinations(self) -> Tuple[Destination, ...]:
+        """The stored destinations themselves; shared with the repository and must not be mutated."""
+
+        return self._current
+
+    def get_destination(self, destination_id: UUID) -> Optional[Destination]:
+        destination = self._destinations.get(destination_id)
+        return destination.model_copy() if destination else None
+
+    def delete_destination(self, destination_id: UUID) -> bool:
+        with self._write_lock:
+            deleted = self._destinations.pop(destination_id, None) is not None
+            self._publish()
+        return deleted
+
+    def snapshot_rows(self) -> Iterator[Dict[str, Any]]:
+        for destination in list(self._destinations.values()):
+            yield destination.model_dump()
+
+    def restore_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        with self._write_lock:
+            for data in rows:
+                destination = Destination.model_validate(data)
+                self._destinations[destination.id] = destination
+            self._publish()
+
+    def clear(self) -> None:
+        with self._write_lock:
+            self._destinations.clear()
+            self._publish()
@@ -0,0 +1,74 @@
+"""Transport implementations delivering a batch of alerts to one destination."""
+from __future__ import annotations
+
+import asyncio
+import smtplib
+from email.message import EmailMessage
+from typing import List, Sequence
+
+import httpx
+
+from anom.modules.alerts.domain import Alert
+from anom.modules.notifications.domain import Destination, NotificationChannel
+
+
+class DeliveryError(Exception):
+    """Raised when a destination rejects or cannot receive a batch.
+
+    ``retryable`` is false when sending the same batch again cannot help,
+    e.g. a 4xx response other than 408 or 429.
+    """
+
+    def __init__(self, message: str, *, retryable: bool = True) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _summary_lines(alerts: Sequence[Alert]) -> List[str]:
+    return [
+        f"[{alert.severity.value}] {alert.message} (business {alert.business_id}, alert {alert.id})"
+        for alert in alerts
+    ]
+
+
+async def _post_json(client: httpx.AsyncClient, url: str, body: dict) -> None:
+    try:
+        response = await client.post(url, json=body)
+    except httpx.HTTPError as exc:
+        raise DeliveryError(f"{type(exc).__name__}: {exc}") from exc
+    code = response.status_code
+    if code >= 300:
+        raise DeliveryError(f"HTTP {code}", retryable=code in (408, 429) or code >= 500)
+
+
+def _send_email(destination: Destination, alerts: Sequence[Alert], timeout: float) -> None:
+    message = EmailMessage()
+    message["Subject"] = f"[anom] {len(alerts)} alert(s)"
+    message["From"] = destination.sender
+    message["To"] = ", ".join(destination.recipients)
+    message.set_content("\n".join(_summary_lines(alerts)))
+    try:
+        with smtplib.SMTP(destination.smtp_host, destination.smtp_port, timeout=timeout) as smtp:
+            smtp.send_message(message)
+    except (OSError, smtplib.SMTPException) as exc:
+        raise DeliveryError(f"{type(exc).__name__}: {exc}") from exc
+
+
+async def send_batch(
+    client: httpx.AsyncClient,
+    destination: Destination,
+    alerts: Sequence[Alert],
+    timeout: float,
+) -> None:
+    """Deliver ``alerts`` in a single request/message, raising :class:`DeliveryError` on failure."""
+
+    if destination.channel is NotificationChannel.WEBHOOK:
+        await _post_json(client, destination.url, {"alerts": [a.model_dump(mode="json") for a in alerts]})
+    elif destination.channel is NotificationChannel.SLACK:
+        await _post_json(client, destination.url, {"text": "\n".join(_summary_lines(alerts))})
+    else:
+        # smtplib is blocking; keep it off the event loop
+        await asyncio.to_thread(_send_email, destination, alerts, timeout)
+
+
+__all__ = ["send_batch", "DeliveryError"]
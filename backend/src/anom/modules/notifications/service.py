@@ -0,0 +1,43 @@
+"""Application services for managing notification destinations."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, List, Sequence
+from uuid import UUID, uuid4
+
+from anom.modules.notifications.domain import Destination, DestinationCreate, DestinationNotFoundError
+from anom.modules.notifications.repo import DestinationRepository
+
+
+class NotificationService:
+    """Registers and removes the destinations alerts are delivered to."""
+
+    def __init__(
+        self,
+        repository: DestinationRepository,
+        delete_listeners: Sequence[Callable[[UUID], None]] = (),
+    ) -> None:
+        self._repository = repository
+        self._delete_listeners = tuple(delete_listeners)
+
+    def create_destination(self, payload: DestinationCreate) -> Destination:
+        destination = Destination(id=uuid4(), created_at=datetime.utcnow(), **payload.model_dump())
+        return self._repository.add_destination(destination)
+
+    def list_destinations(self) -> List[Destination]:
+        return self._repository.list_destinations()
+
+    def get_destination(self, destination_id: UUID) -> Destination:
+        destination = self._repository.get_destination(destination_id)
+        if destination is None:
+            raise DestinationNotFoundError(str(destination_id))
+        return destination
+
+    def delete_destination(self, destination_id: UUID) -> None:
+        if not self._repository.delete_destination(destination_id):
+            raise DestinationNotFoundError(str(destination_id))
+        for listener in self._delete_listeners:
+            listener(destination_id)
+
+
+__all__ = ["NotificationService", "Destination", "DestinationCreate", "DestinationNotFoundError"]
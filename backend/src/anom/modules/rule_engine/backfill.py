@@ -0,0 +1,309 @@
+"""Historical rule backfill: evaluate rules against a business's stored events.
+
+A backfill job slices the selected time range into chunks of raw event rows
+and evaluates them in a process pool, so a large history does not compete
+with ingestion for the GIL. A coordinator thread per job collects chunk
+results, publishes progress on the job model and honours cancellation
+between chunks. When requested, matches are materialized as alerts in one
+batch, all tagged with the job id as ``backfill_id`` and without notifying
+destinations.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from anom.common_models.identifiers import new_id
+from anom.modules.alerts.domain import AlertCreate
+from anom.modules.alerts.service import AlertService
+from anom.modules.ingestion.records import PayloadShape
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rule_engine.evaluator import comparator_for
+from anom.modules.rules.domain import InvalidRuleError, RuleDefinition, RuleKind, RuleNotFoundError, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+
+logger = logging.getLogger(__name__)
+
+RuleSpec = Tuple[str, str, Any]
+ChunkRow = Tuple[int, PayloadShape, Tuple[Any, ...]]
+
+
+class BackfillStatus(str, Enum):
+    """Lifecycle of a backfill job."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class BackfillRequest(BaseModel):
+    """Rules and time range to replay."""
+
+    rule_ids: List[UUID] = Field(..., min_length=1, max_length=100)
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    create_alerts: bool = False
+
+
+class BackfillJob(BaseModel):
+    """Progress and outcome of one backfill."""
+
+    id: UUID
+    business_id: UUID
+    rule_ids: List[UUID]
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    create_alerts: bool = False
+    status: BackfillStatus = BackfillStatus.RUNNING
+    total_events: int = 0
+    processed_events: int = 0
+    total_chunks: int = 0
+    completed_chunks: int = 0
+    matches: Dict[UUID, int] = Field(default_factory=dict)
+    alerts_created: int = 0
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class BackfillJobNotFoundError(Exception):
+    """Raised when a backfill job id is unknown."""
+
+    pass
+
+
+def evaluate_chunk(rules: Sequence[RuleSpec], rows: Sequence[ChunkRow]) -> List[Tuple[int, int]]:
+    """Return ``(rule index, event id int)`` for every match in ``rows``.
+
+    Runs in worker processes, so it only takes plain picklable data: rules as
+    ``(field, operator, operand)`` and events as ``(id int, shape, values)``.
+    """
+
+    compiled = [(field, comparator_for(RuleOperator(operator)), operand) for field, operator, operand in rules]
+    matches: List[Tuple[int, int]] = []
+    for id_int, shape, values in rows:
+        payload = dict(zip(shape, values))
+        for index, (field, comparator, operand) in enumerate(compiled):
+            if field not in payload:
+                continue
+            try:
+                matched = comparator(payload[field], operand)
+            except TypeError:
+                matched = False
+            if matched:
+                matches.append((index, id_int))
+    return matches
+
+
+class _RunningJob:
+    __slots__ = ("job", "rules", "cancelled", "finished", "lock")
+
+    def __init__(self, job: BackfillJob, rules: List[RuleDefinition]) -> None:
+        self.job = job
+        self.rules = rules
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.lock = threading.Lock()
+
+    def update(self, **changes: Any) -> None:
+        with self.lock:
+            self.job = self.job.model_copy(update=changes)
+
+
+class BackfillService:
+    """Starts, tracks and cancels backfill jobs.
+
+    The process pool is created on first use and shared by all jobs. Pass
+    ``executor`` to supply another :class:`~concurrent.futures.Executor`.
+    Only the most recent ``max_jobs`` jobs are remembered.
+    """
+
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        rule_repository: RuleRepository,
+        alert_service: AlertService,
+        *,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 5_000,
+        executor: Optional[Executor] = None,
+        max_jobs: int = 100,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self._events = event_repository
+        self._rules = rule_repository
+        self._alerts = alert_service
+        self._max_workers = max_workers
+        self._chunk_size = chunk_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._max_jobs = max_jobs
+        self._jobs: "OrderedDict[UUID, _RunningJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs server threads can copy held locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def start(self, business_id: UUID, request: BackfillRequest) -> BackfillJob:
+        snapshot = self._rules.snapshot(business_id)
+        rules = []
+        for rule_id in dict.fromkeys(request.rule_ids):
+            rule = snapshot.get(rule_id)
+            if rule is None:
+                raise RuleNotFoundError(str(rule_id))
+            if rule.kind is not RuleKind.CONDITION:
+                # sketch rules read live windows, which history does not reproduce
+                raise InvalidRuleError(f"{rule.kind.value} rules cannot be backfilled")
+            rules.append(rule)
+        job = BackfillJob(
+            id=new_id(),
+            business_id=business_id,
+            rule_ids=[rule.id for rule in rules],
+            since=request.since,
+            until=request.until,
+            create_alerts=request.create_alerts,
+            matches={rule.id: 0 for rule in rules},
+            started_at=datetime.utcnow(),
+        )
+        running = _RunningJob(job, rules)
+        with self._lock:
+            self._jobs[job.id] = running
+            while len(self._jobs) > self._max_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.finished.is_set():
+                    break
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(running,), name=f"anom-backfill-{job.id}", daemon=True).start()
+        return job
+
+    def get_job(self, job_id: UUID) -> BackfillJob:
+        return self._running(job_id).job
+
+    def list_jobs(self, business_id: UUID) -> List[BackfillJob]:
+        with self._lock:
+            running = list(self._jobs.values())
+        return [state.job for state in running if state.job.business_id == business_id]
+
+    def cancel(self, job_id: UUID) -> BackfillJob:
+        running = self._running(job_id)
+        running.cancelled.set()
+        return running.job
+
+    def wait(self, job_id: UUID, timeout: Optional[float] = None) -> BackfillJob:
+        running = self._running(job_id)
+        running.finished.wait(timeout)
+        return running.job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for running in self._jobs.values():
+                running.cancelled.set()
+            executor, self._executor = (self._executor, None) if self._owns_executor else (None, self._executor)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _running(self, job_id: UUID) -> _RunningJob:
+        with self._lock:
+            running = self._jobs.get(job_id)
+        if running is None:
+            raise BackfillJobNotFoundError(str(job_id))
+        return running
+
+    def _run(self, running: _RunningJob) -> None:
+        try:
+            self._execute(running)
+        except Exception as exc:
+            logger.exception("backfill %s failed", running.job.id)
+            if isinstance(exc, BrokenProcessPool) and self._owns_executor:
+                # a crashed worker poisons the pool; the next job gets a fresh one
+                with self._lock:
+                    self._executor = None
+            running.update(status=BackfillStatus.FAILED, error=str(exc), finished_at=datetime.utcnow())
+        finally:
+            running.finished.set()
+
+    def _execute(self, running: _RunningJob) -> None:
+        job = running.job
+        events = self._events.scan_range(job.business_id, job.since or datetime.min, job.until or datetime.max)
+        size = self._chunk_size
+        running.update(total_events=len(events), total_chunks=-(-len(events) // size))
+        specs = [(rule.condition.field, rule.condition.operator.value, rule.condition.value) for rule in running.rules]
+        # bound the chunks in flight so a long history is not pickled all at once
+        in_flight = 2 * (self._max_workers or multiprocessing.cpu_count())
+        starts = iter(range(0, len(events), size))
+        pending: Dict[Future, int] = {}
+        found: List[Tuple[int, int]] = []
+        while True:
+            if running.cancelled.is_set():
+                for future in pending:
+                    future.cancel()
+                running.update(status=BackfillStatus.CANCELLED, finished_at=datetime.utcnow())
+                return
+            for start in starts:
+                rows = [(event.id_int, event.shape, event.values) for event in events[start : start + size]]
+                pending[self._pool().submit(evaluate_chunk, specs, rows)] = len(rows)
+                if len(pending) >= in_flight:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                rows_done = pending.pop(future)
+                chunk_matches = future.result()
+                found.extend(chunk_matches)
+                counts = dict(running.job.matches)
+                for index, _ in chunk_matches:
+                    counts[running.rules[index].id] += 1
+                running.update(
+                    processed_events=running.job.processed_events + rows_done,
+                    completed_chunks=running.job.completed_chunks + 1,
+                    matches=counts,
+                )
+
+        if running.cancelled.is_set():
+            running.update(status=BackfillStatus.CANCELLED, finished_at=datetime.utcnow())
+            return
+        created = 0
+        if job.create_alerts and found:
+            found.sort(key=lambda match: (match[1], match[0]))
+            payloads = [
+                AlertCreate(
+                    business_id=job.business_id,
+                    rule_id=running.rules[index].id,
+                    event_id=UUID(int=id_int),
+                    message=f"Rule '{running.rules[index].name}' matched during backfill",
+                    severity=running.rules[index].severity,
+                    backfill_id=job.id,
+                )
+                for index, id_int in found
+            ]
+            created = len(self._alerts.create_alerts(payloads, notify=False))
+        running.update(status=BackfillStatus.COMPLETED, alerts_created=created, finished_at=datetime.utcnow())
+
+
+__all__ = [
+    "BackfillJob",
+    "BackfillJobNotFoundError",
+    "BackfillRequest",
+    "BackfillService",
+    "BackfillStatus",
+    "evaluate_chunk",
+]
@@ -1,27 +1,124 @@
 """Coordinates rule evaluation for incoming events."""
 from __future__ import annotations
 
-from typing import List
+import threading
+from time import perf_counter_ns
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from uuid import UUID
 
-from anom.modules.ingestion.domain import EventRecord
-from anom.modules.rule_engine.evaluator import evaluate_rule
-from anom.modules.rules.domain import RuleDefinition
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.sketches import SketchStore
+from anom.modules.rule_engine.stats import RuleStatsRecorder
+from anom.modules.rules.domain import RuleDefinition, RuleKind
 from anom.modules.rules.repo import RuleRepository
 
 
 class RuleDispatcher:
-    """Fetches rules for a business and evaluates them against events."""
+    """Evaluates the current rule snapshot of a business against events.
 
-    def __init__(self, repository: RuleRepository) -> None:
+    Sketch rules (see :class:`~anom.modules.rules.domain.RuleKind`) read the
+    field sketches the ingestion service has just updated. Heavy-hitter rules
+    check the event's own value, which is the one that can have just crossed
+    the threshold; cardinality rules are checked once per sketch slot. After
+    firing, a sketch rule stays quiet for its cooldown.
+    """
+
+    def __init__(
+        self,
+        repository: RuleRepository,
+        stats: Optional[RuleStatsRecorder] = None,
+        sketches: Optional[SketchStore] = None,
+    ) -> None:
         self._repository = repository
+        self._stats = stats if stats is not None else RuleStatsRecorder()
+        self._sketches = sketches
+        # rule id -> [next cardinality check, quiet until], in event-time microseconds
+        self._sketch_clocks: Dict[UUID, List[int]] = {}
+        self._sketch_lock = threading.Lock()
+
+    @property
+    def stats(self) -> RuleStatsRecorder:
+        return self._stats
+
+    def has_rules(self, business_id: UUID) -> bool:
+        """Whether :meth:`evaluate_event` has any rule to check for ``business_id``."""
+
+        snapshot = self._repository.snapshot(business_id)
+        return bool(snapshot.compiled) or (bool(snapshot.sketch_rules) and self._sketches is not None)
+
+    def evaluate_event(
+        self,
+        business_id: UUID,
+        event: StoredEvent,
+        payload: Optional[Mapping[str, Any]] = None,
+        now_us: Optional[int] = None,
+    ) -> List[RuleDefinition]:
+        """Rules of ``business_id`` matching ``event``; pass ``payload`` if the caller already has it as a dict.
+
+        Sketch rule windows end at ``now_us`` (the event-time watermark for
+        businesses that have one) and at the event's receive time otherwise.
+        The returned rules are shared with the rule snapshot and must not be mutated.
+        """
 
-    def evaluate_event(self, business_id: UUID, event: EventRecord) -> List[RuleDefinition]:
         triggered: List[RuleDefinition] = []
-        for rule in self._repository.list_rules(business_id):
-            if evaluate_rule(rule, event.payload):
-                triggered.append(rule)
+        errors: List[UUID] = []
+        stats = self._stats
+        sampled = stats.sample(business_id)
+        timings: List[Tuple[UUID, int]] = []
+        if payload is None:
+            payload = event.payload
+        # one snapshot for the whole event, even if rules change meanwhile
+        snapshot = self._repository.snapshot(business_id)
+        for compiled in snapshot.compiled:
+            started = perf_counter_ns() if sampled else 0
+            try:
+                if compiled.matches(payload):
+                    triggered.append(compiled.rule)
+            except TypeError:
+                errors.append(compiled.rule.id)
+            if sampled:
+                timings.append((compiled.rule.id, perf_counter_ns() - started))
+        if snapshot.sketch_rules and self._sketches is not None:
+            now = event.ts_us if now_us is None else now_us
+            for rule in snapshot.sketch_rules:
+                started = perf_counter_ns() if sampled else 0
+                if self._sketch_fires(rule, business_id, now, payload):
+                    triggered.append(rule)
+                if sampled:
+                    timings.append((rule.id, perf_counter_ns() - started))
+        if sampled or triggered or errors:
+            stats.record_event(business_id, evaluated=timings, matched=[rule.id for rule in triggered], errors=errors)
         return triggered
 
+    def _sketch_fires(self, rule: RuleDefinition, business_id: UUID, now: int, payload: Mapping[str, Any]) -> bool:
+        spec = rule.sketch
+        sketches = self._sketches
+        clock = self._sketch_clocks.get(rule.id)
+        if clock is None:
+            clock = self._sketch_clocks.setdefault(rule.id, [0, 0])
+        if now < clock[1]:
+            return False
+        if rule.kind is RuleKind.HEAVY_HITTER:
+            value = payload.get(spec.field)
+            if value is None:
+                return False
+            count, total = sketches.window_count(business_id, spec.field, value, spec.window_seconds, now)
+            fired = total >= spec.min_count and count > spec.threshold * total
+        else:
+            if now < clock[0]:
+                return False
+            slot_us = sketches.slot_seconds * 1_000_000
+            clock[0] = (now // slot_us + 1) * slot_us
+            change = sketches.distinct_change(business_id, spec.field, spec.window_seconds, now)
+            fired = change is not None and change[0] >= spec.min_count and change[1] <= spec.threshold * change[0]
+        if not fired:
+            return False
+        with self._sketch_lock:
+            # concurrent ingests may both see the condition; only one of them fires
+            if now < clock[1]:
+                return False
+            clock[1] = now + spec.cooldown_seconds * 1_000_000
+        return True
+
 
 __all__ = ["RuleDispatcher"]
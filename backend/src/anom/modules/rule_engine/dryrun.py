@@ -0,0 +1,371 @@
+"""Rule dry-runs: how often would a condition have matched the stored history?
+
+With NumPy installed (``pip install anom-platform-backend[columnar]``) the
+engine keeps, per business, an id list, a timestamp array and one column per
+field that has been dry-run. Columns are extended incrementally from the
+event repository on every call and trimmed when retention drops old events,
+so after the first run only new events are converted. A condition becomes a
+boolean mask over its column; counts, time buckets and samples are array
+reductions. String columns are dictionary-encoded: the condition is
+evaluated once per distinct string and the result looked up by code.
+
+Without NumPy the same result is computed with a plain loop over the stored
+events.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import datetime
+from enum import Enum
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from anom.common_models.time import epoch_micros, from_epoch_micros
+from anom.core.cache import LRUCache
+from anom.core.locks import StripedLock
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rule_engine.evaluator import comparator_for, match_condition
+from anom.modules.rules.domain import RuleCondition, RuleOperator
+
+try:  # optional dependency, see module docstring
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+_ALL_IDS = 1 << 128
+
+
+class DryRunResolution(str, Enum):
+    """Bucket width of the dry-run match-rate series."""
+
+    MINUTE = "1m"
+    HOUR = "1h"
+    DAY = "1d"
+
+
+_BUCKET_MICROS = {
+    DryRunResolution.MINUTE: 60_000_000,
+    DryRunResolution.HOUR: 3_600_000_000,
+    DryRunResolution.DAY: 86_400_000_000,
+}
+
+
+class DryRunRequest(BaseModel):
+    """Condition to test and the slice of history to test it on."""
+
+    condition: RuleCondition
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    resolution: DryRunResolution = DryRunResolution.HOUR
+    sample_size: int = Field(default=20, ge=0, le=1_000)
+
+
+class DryRunBucket(BaseModel):
+    start: datetime
+    events: int
+    matches: int
+    match_rate: float
+
+
+class DryRunResult(BaseModel):
+    """Hit statistics of a condition over stored events."""
+
+    total_events: int
+    matched_events: int
+    match_rate: float
+    buckets: List[DryRunBucket]
+    sample_event_ids: List[UUID]
+    engine: str
+    elapsed_ms: float
+
+
+def _kind_of(values: Sequence[Any], present: Sequence[bool]) -> str:
+    """Narrowest column kind holding every present value: ``int``, ``float``, ``str`` or ``object``."""
+
+    kind = "int"
+    numeric = strings = False
+    for value, has in zip(values, present):
+        if not has:
+            continue
+        if isinstance(value, str):
+            strings = True
+        elif isinstance(value, int):  # includes bool
+            numeric = True
+            if not _INT64_MIN <= value <= _INT64_MAX:
+                return "object"
+        elif isinstance(value, float):
+            numeric = True
+            kind = "float"
+        else:
+            return "object"
+        if strings and numeric:
+            return "object"
+    return "str" if strings else kind
+
+
+_WIDER = {
+    ("int", "int"): "int",
+    ("int", "float"): "float",
+    ("float", "int"): "float",
+    ("float", "float"): "float",
+    ("str", "str"): "str",
+}
+
+
+def _extract(events: Sequence[StoredEvent], field: str) -> Tuple[List[Any], List[bool]]:
+    positions: Dict[int, int] = {}
+    values: List[Any] = []
+    present: List[bool] = []
+    for event in events:
+        shape = event.shape
+        position = positions.get(id(shape))
+        if position is None:
+            position = positions[id(shape)] = shape.index(field) if field in shape else -1
+        if position < 0:
+            values.append(0)
+            present.append(False)
+        else:
+            values.append(event.values[position])
+            present.append(True)
+    return values, present
+
+
+class _Column:
+    __slots__ = ("kind", "values", "present", "labels")
+
+    def __init__(self, values: List[Any], present: List[bool]) -> None:
+        self.kind = _kind_of(values, present)
+        # str columns: distinct string -> code; ``values`` then holds the codes
+        self.labels: Dict[str, int] = {}
+        self.values = self._array(values, present, self.kind)
+        self.present = np.array(present, dtype=bool)
+
+    def _array(self, values: List[Any], present: List[bool], kind: str) -> Any:
+        if kind == "str":
+            labels = self.labels
+            codes = [labels.setdefault(value, len(labels)) if has else 0 for value, has in zip(values, present)]
+            return np.array(codes, dtype=np.int32)
+        dtype = {"int": np.int64, "float": np.float64}.get(kind, object)
+        if dtype is object:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+        return np.array(values, dtype=dtype)
+
+    def extend(self, values: List[Any], present: List[bool]) -> bool:
+        """Append rows; ``False`` when they do not fit the column kind (caller rebuilds)."""
+
+        if not values:
+            return True
+        # rows without the field fit any column
+        incoming = _kind_of(values, present) if any(present) else self.kind
+        kind = _WIDER.get((self.kind, incoming), "object")
+        if kind != self.kind:
+            return False
+        self.values = np.concatenate([self.values, self._array(values, present, kind)])
+        self.present = np.concatenate([self.present, np.array(present, dtype=bool)])
+        return True
+
+    def trim(self, count: int) -> None:
+        self.values = self.values[count:]
+        self.present = self.present[count:]
+
+    def mask(self, operator: RuleOperator, operand: Any) -> Any:
+        comparator = comparator_for(operator)
+        if self.kind == "str":
+            return self.present & self._label_hits(comparator, operator, operand)[self.values]
+        if self.kind != "object":
+            if isinstance(operand, (int, float)) and not (isinstance(operand, int) and abs(operand) > _INT64_MAX):
+                return self.present & comparator(self.values, operand)
+            # a number never equals a non-number and cannot be ordered against one
+            return self.present.copy() if operator is RuleOperator.NE else np.zeros(len(self.present), dtype=bool)
+        # mixed values: keep the evaluator's per-value semantics (TypeError -> no match)
+        matched = np.zeros(len(self.present), dtype=bool)
+        for index in np.flatnonzero(self.present):
+            try:
+                matched[index] = bool(comparator(self.values[index], operand))
+            except TypeError:
+                pass
+        return matched
+
+    def _label_hits(self, comparator: Any, operator: RuleOperator, operand: Any) -> Any:
+        """Whether the condition holds, indexed by label code."""
+
+        hits = np.zeros(len(self.labels), dtype=bool)
+        if operator in (RuleOperator.EQ, RuleOperator.NE):
+            code = self.labels.get(operand) if isinstance(operand, str) else None
+            if operator is RuleOperator.NE:
+                hits[:] = True
+            if code is not None:
+                hits[code] = operator is RuleOperator.EQ
+            return hits
+        for label, code in self.labels.items():
+            try:
+                hits[code] = bool(comparator(label, operand))
+            except TypeError:
+                pass
+        return hits
+
+
+class _BusinessColumns:
+    __slots__ = ("ids", "ts", "fields")
+
+    def __init__(self) -> None:
+        self.ids: List[int] = []
+        self.ts = np.empty(0, dtype=np.int64)
+        self.fields: Dict[str, _Column] = {}
+
+    def sync(self, events: List[StoredEvent]) -> None:
+        """Align with ``events`` (the business's full history in id order)."""
+
+        ids = self.ids
+        if events and ids:
+            dropped = bisect_left(ids, events[0].id_int)
+            kept = len(ids) - dropped
+            if kept <= len(events) and (kept == 0 or events[kept - 1].id_int == ids[-1]):
+                if dropped:
+                    del ids[:dropped]
+                    self.ts = self.ts[dropped:]
+                    for column in self.fields.values():
+                        column.trim(dropped)
+                fresh = events[kept:]
+                ids.extend(event.id_int for event in fresh)
+                self.ts = np.concatenate([self.ts, np.fromiter((e.ts_us for e in fresh), np.int64, len(fresh))])
+                for name, column in list(self.fields.items()):
+                    if not column.extend(*_extract(fresh, name)):
+                        self.fields[name] = _Column(*_extract(events, name))
+                return
+        # first use, emptied history or an out-of-order insert: rebuild
+        self.ids = [event.id_int for event in events]
+        self.ts = np.fromiter((event.ts_us for event in events), np.int64, len(events))
+        self.fields = {name: _Column(*_extract(events, name)) for name in self.fields}
+
+    def column(self, field: str, events: List[StoredEvent]) -> _Column:
+        column = self.fields.get(field)
+        if column is None:
+            column = self.fields[field] = _Column(*_extract(events, field))
+        return column
+
+
+class DryRunEngine:
+    """Evaluates conditions over a business's stored events without creating alerts."""
+
+    def __init__(self, event_repository: EventRepository, *, max_businesses: int = 64, lock_stripes: int = 64) -> None:
+        self._events = event_repository
+        self._columns: LRUCache[UUID, _BusinessColumns] = LRUCache(max_businesses)
+        self._locks = StripedLock(lock_stripes)
+
+    @property
+    def engine(self) -> str:
+        return "numpy" if np is not None else "python"
+
+    def run(self, business_id: UUID, request: DryRunRequest) -> DryRunResult:
+        started = perf_counter()
+        events = self._events.scan_ids(business_id, 0, _ALL_IDS)
+        if np is not None:
+            total, matched, buckets, sample = self._run_columnar(business_id, events, request)
+        else:
+            total, matched, buckets, sample = self._run_python(events, request)
+        return DryRunResult(
+            total_events=total,
+            matched_events=matched,
+            match_rate=matched / total if total else 0.0,
+            buckets=[
+                DryRunBucket.model_construct(
+                    start=from_epoch_micros(start), events=count, matches=hits, match_rate=hits / count
+                )
+                for start, count, hits in buckets
+            ],
+            sample_event_ids=[UUID(int=value) for value in sample],
+            engine=self.engine,
+            elapsed_ms=(perf_counter() - started) * 1000,
+        )
+
+    @staticmethod
+    def _range(request: DryRunRequest) -> Tuple[Optional[int], Optional[int]]:
+        since = epoch_micros(request.since) if request.since is not None else None
+        until = epoch_micros(request.until) if request.until is not None else None
+        return since, until
+
+    def _run_columnar(
+        self, business_id: UUID, events: List[StoredEvent], request: DryRunRequest
+    ) -> Tuple[int, int, List[Tuple[int, int, int]], List[int]]:
+        condition = request.condition
+        # columns are mutated in place by the next sync, so read them under the stripe too
+        with self._locks.for_key(business_id):
+            columns = self._columns.get(business_id)
+            if columns is None:
+                columns = _BusinessColumns()
+                self._columns.put(business_id, columns)
+            columns.sync(events)
+            mask = columns.column(condition.field, events).mask(condition.operator, condition.value)
+            ts = columns.ts
+
+            since, until = self._range(request)
+            in_range = np.ones(len(ts), dtype=bool)
+            if since is not None:
+                in_range &= ts >= since
+            if until is not None:
+                in_range &= ts < until
+            mask &= in_range
+
+            width = _BUCKET_MICROS[request.resolution]
+            keys = ts[in_range] // width
+            hits_in_range = mask[in_range]
+            if len(keys) and int(keys.max() - keys.min()) <= 4 * len(keys):
+                # dense bucket range: counting beats sorting
+                first = int(keys.min())
+                counts = np.bincount(keys - first)
+                hits = np.bincount(keys - first, weights=hits_in_range, minlength=len(counts))
+                starts = np.flatnonzero(counts)
+                buckets = [(int(k + first) * width, int(counts[k]), int(hits[k])) for k in starts]
+            else:
+                starts, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+                hits = np.bincount(inverse, weights=hits_in_range, minlength=len(starts))
+                buckets = [(int(s) * width, int(c), int(h)) for s, c, h in zip(starts, counts, hits)]
+            sample = [columns.ids[i] for i in np.flatnonzero(mask)[: request.sample_size]]
+            return int(in_range.sum()), int(mask.sum()), buckets, sample
+
+    def _run_python(
+        self, events: List[StoredEvent], request: DryRunRequest
+    ) -> Tuple[int, int, List[Tuple[int, int, int]], List[int]]:
+        since, until = self._range(request)
+        width = _BUCKET_MICROS[request.resolution]
+        per_bucket: Dict[int, List[int]] = {}
+        total = matched = 0
+        sample: List[int] = []
+        for event in events:
+            if (since is not None and event.ts_us < since) or (until is not None and event.ts_us >= until):
+                continue
+            total += 1
+            bucket = per_bucket.setdefault(event.ts_us // width, [0, 0])
+            bucket[0] += 1
+            try:
+                hit = match_condition(request.condition, dict(zip(event.shape, event.values)))
+            except TypeError:
+                hit = False
+            if hit:
+                matched += 1
+                bucket[1] += 1
+                if len(sample) < request.sample_size:
+                    sample.append(event.id_int)
+        buckets = [(start * width, count, hits) for start, (count, hits) in sorted(per_bucket.items())]
+        return total, matched, buckets, sample
+
+    def forget(self, business_id: UUID) -> None:
+        self._columns.pop(business_id)
+
+
+__all__ = [
+    "DryRunBucket",
+    "DryRunEngine",
+    "DryRunRequest",
+    "DryRunResolution",
+    "DryRunResult",
+]
@@ -1,7 +1,7 @@
 """Helpers for evaluating rules against events."""
 from __future__ import annotations
 
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Mapping
 
 from anom.modules.rules.domain import RuleCondition, RuleDefinition, RuleOperator
 
@@ -15,17 +15,53 @@ _OPERATOR_FUNCS: Dict[RuleOperator, Callable[[Any, Any], bool]] = {
 }
 
 
-def evaluate_rule(rule: RuleDefinition, payload: Dict[str, Any]) -> bool:
-    """Return True if the rule condition matches the event payload."""
+def comparator_for(operator: RuleOperator) -> Callable[[Any, Any], bool]:
+    """The two-argument comparison behind ``operator`` (``payload value``, ``operand``)."""
+
+    return _OPERATOR_FUNCS[operator]
+
+
+def match_condition(condition: RuleCondition, payload: Dict[str, Any]) -> bool:
+    """Return True if ``condition`` holds for ``payload``; comparison ``TypeError``s propagate."""
 
-    condition: RuleCondition = rule.condition
     if condition.field not in payload:
         return False
     comparator = _OPERATOR_FUNCS[condition.operator]
+    return comparator(payload[condition.field], condition.value)
+
+
+def match_rule(rule: RuleDefinition, payload: Dict[str, Any]) -> bool:
+    """Like :func:`evaluate_rule` but lets comparison ``TypeError``s propagate."""
+
+    return match_condition(rule.condition, payload)
+
+
+class CompiledRule:
+    """A rule with its condition resolved to a field name, comparator and operand."""
+
+    __slots__ = ("rule", "field", "comparator", "value")
+
+    def __init__(self, rule: RuleDefinition) -> None:
+        self.rule = rule
+        self.field = rule.condition.field
+        self.comparator = _OPERATOR_FUNCS[rule.condition.operator]
+        self.value = rule.condition.value
+
+    def matches(self, payload: Mapping[str, Any]) -> bool:
+        """Same semantics as :func:`match_rule`."""
+
+        if self.field not in payload:
+            return False
+        return self.comparator(payload[self.field], self.value)
+
+
+def evaluate_rule(rule: RuleDefinition, payload: Dict[str, Any]) -> bool:
+    """Return True if the rule condition matches the event payload."""
+
     try:
-        return comparator(payload[condition.field], condition.value)
+        return match_rule(rule, payload)
     except TypeError:  # pragma: no cover - defensive
         return False
 
 
-__all__ = ["evaluate_rule"]
+__all__ = ["CompiledRule", "comparator_for", "evaluate_rule", "match_condition", "match_rule"]
@@ -0,0 +1,129 @@
+"""Sampled per-rule cost and hit accounting for the rule dispatcher."""
+from __future__ import annotations
+
+import itertools
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from anom.core.locks import StripedLock
+
+
+class RuleStats(BaseModel):
+    """Evaluation statistics collected for a single rule."""
+
+    rule_id: UUID
+    business_id: UUID
+    evaluations: int
+    matches: int
+    errors: int
+    sampled_evaluations: int
+    total_time_ms: float
+    avg_time_ms: float
+    max_time_ms: float
+
+
+class _RuleCounters:
+    __slots__ = ("business_id", "matches", "errors", "sampled", "sampled_ns", "max_ns")
+
+    def __init__(self, business_id: UUID) -> None:
+        self.business_id = business_id
+        self.matches = 0
+        self.errors = 0
+        self.sampled = 0
+        self.sampled_ns = 0
+        self.max_ns = 0
+
+
+class RuleStatsRecorder:
+    """Keeps per-rule counters, sampling one event in N per business.
+
+    On a sampled event every rule is timed and counted; ``evaluations`` and
+    the cumulative time are extrapolated from those samples. Matches and
+    errors are rare, so they are counted exactly on every event. Each event's
+    results are folded in under one acquisition of the business's lock
+    stripe, so an unsampled event with no matches costs no locking at all.
+    """
+
+    def __init__(self, sample_every: int = 8) -> None:
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        self._sample_every = sample_every
+        self._counters: Dict[UUID, _RuleCounters] = {}
+        self._events: Dict[UUID, Iterator[int]] = {}
+        self._locks = StripedLock()
+
+    def sample(self, business_id: UUID) -> bool:
+        """Whether the next event of ``business_id`` is timed and counted."""
+
+        events = self._events.get(business_id)
+        if events is None:
+            events = self._events.setdefault(business_id, itertools.count())
+        # next() on a count is atomic under the GIL
+        return next(events) % self._sample_every == 0
+
+    def record_event(
+        self,
+        business_id: UUID,
+        *,
+        evaluated: Sequence[Tuple[UUID, int]] = (),
+        matched: Sequence[UUID] = (),
+        errors: Sequence[UUID] = (),
+    ) -> None:
+        """Fold in one event: ``evaluated`` holds (rule id, elapsed ns) for every rule of a sampled event."""
+
+        if not (evaluated or matched or errors):
+            return
+        counters = self._counters
+        with self._locks.for_key(business_id):
+            for rule_id, elapsed_ns in evaluated:
+                rule = counters.get(rule_id) or counters.setdefault(rule_id, _RuleCounters(business_id))
+                rule.sampled += 1
+                rule.sampled_ns += elapsed_ns
+                if elapsed_ns > rule.max_ns:
+                    rule.max_ns = elapsed_ns
+            for rule_id in matched:
+                rule = counters.get(rule_id) or counters.setdefault(rule_id, _RuleCounters(business_id))
+                rule.matches += 1
+            for rule_id in errors:
+                rule = counters.get(rule_id) or counters.setdefault(rule_id, _RuleCounters(business_id))
+                rule.errors += 1
+
+    def get_stats(self, rule_id: UUID, business_id: UUID) -> RuleStats:
+        counters = self._counters.get(rule_id) or _RuleCounters(business_id)
+        return self._to_stats(rule_id, counters)
+
+    def top_costliest(self, business_id: Optional[UUID] = None, limit: int = 10) -> List[RuleStats]:
+        stats = [
+            self._to_stats(rule_id, counters)
+            for rule_id, counters in list(self._counters.items())
+            if business_id is None or counters.business_id == business_id
+        ]
+        stats.sort(key=lambda s: s.total_time_ms, reverse=True)
+        return stats[:limit]
+
+    def forget(self, rule_id: UUID) -> None:
+        self._counters.pop(rule_id, None)
+
+    def clear(self) -> None:
+        self._counters.clear()
+        self._events.clear()
+
+    def _to_stats(self, rule_id: UUID, counters: _RuleCounters) -> RuleStats:
+        avg_ns = counters.sampled_ns / counters.sampled if counters.sampled else 0.0
+        evaluations = counters.sampled * self._sample_every
+        return RuleStats(
+            rule_id=rule_id,
+            business_id=counters.business_id,
+            evaluations=evaluations,
+            matches=counters.matches,
+            errors=counters.errors,
+            sampled_evaluations=counters.sampled,
+            total_time_ms=avg_ns * evaluations / 1_000_000,
+            avg_time_ms=avg_ns / 1_000_000,
+            max_time_ms=counters.max_ns / 1_000_000,
+        )
+
+
+__all__ = ["RuleStats", "RuleStatsRecorder"]
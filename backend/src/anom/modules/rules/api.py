@@ -4,11 +4,25 @@ from __future__ import annotations
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from anom.api.deps import get_rule_service
+from anom.api.deps import (
+    get_backfill_service,
+    get_dry_run_engine,
+    get_rule_service,
+    get_rule_stats_recorder,
+    on_loop,
+)
 from anom.modules.business_def.domain import BusinessNotFoundError
-from anom.modules.rules.domain import RuleDefinition, RuleNotFoundError
+from anom.modules.rule_engine.backfill import (
+    BackfillJob,
+    BackfillJobNotFoundError,
+    BackfillRequest,
+    BackfillService,
+)
+from anom.modules.rule_engine.dryrun import DryRunEngine, DryRunRequest, DryRunResult
+from anom.modules.rule_engine.stats import RuleStats, RuleStatsRecorder
+from anom.modules.rules.domain import InvalidRuleError, RuleDefinition, RuleNotFoundError
 from anom.modules.rules.service import RuleCreate, RuleService
 
 router = APIRouter()
@@ -19,21 +33,23 @@ router = APIRouter()
     response_model=RuleDefinition,
     status_code=status.HTTP_201_CREATED,
 )
-def create_rule(
+async def create_rule(
     business_id: UUID,
     payload: RuleCreate,
-    service: RuleService = Depends(get_rule_service),
+    service: RuleService = Depends(on_loop(get_rule_service)),
 ) -> RuleDefinition:
     try:
         return service.create_rule(business_id, payload)
     except BusinessNotFoundError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+    except InvalidRuleError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
 @router.get("/{business_id}", response_model=List[RuleDefinition])
-def list_rules(
+async def list_rules(
     business_id: UUID,
-    service: RuleService = Depends(get_rule_service),
+    service: RuleService = Depends(on_loop(get_rule_service)),
 ) -> List[RuleDefinition]:
     try:
         return service.list_rules(business_id)
@@ -41,11 +57,114 @@ def list_rules(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
 
 
+def _ensure_business(business_id: UUID, service: RuleService) -> None:
+    try:
+        service.list_rules(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.get("/{business_id}/stats/top", response_model=List[RuleStats])
+async def top_costliest_rules(
+    business_id: UUID,
+    limit: int = Query(default=10, ge=1, le=100),
+    service: RuleService = Depends(on_loop(get_rule_service)),
+    stats: RuleStatsRecorder = Depends(on_loop(get_rule_stats_recorder)),
+) -> List[RuleStats]:
+    _ensure_business(business_id, service)
+    return stats.top_costliest(business_id, limit=limit)
+
+
+def _get_backfill(business_id: UUID, job_id: UUID, backfills: BackfillService) -> BackfillJob:
+    try:
+        job = backfills.get_job(job_id)
+    except BackfillJobNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backfill not found") from exc
+    if job.business_id != business_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Backfill not found")
+    return job
+
+
+# column syncs and the pure-Python fallback scan events, so this one stays in the threadpool
+@router.post("/{business_id}/dry-run", response_model=DryRunResult)
+def dry_run_rule(
+    business_id: UUID,
+    payload: DryRunRequest,
+    service: RuleService = Depends(get_rule_service),
+    engine: DryRunEngine = Depends(get_dry_run_engine),
+) -> DryRunResult:
+    _ensure_business(business_id, service)
+    return engine.run(business_id, payload)
+
+
+@router.post(
+    "/{business_id}/backfills",
+    response_model=BackfillJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def start_backfill(
+    business_id: UUID,
+    payload: BackfillRequest,
+    service: RuleService = Depends(on_loop(get_rule_service)),
+    backfills: BackfillService = Depends(on_loop(get_backfill_service)),
+) -> BackfillJob:
+    _ensure_business(business_id, service)
+    try:
+        return backfills.start(business_id, payload)
+    except RuleNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule not found") from exc
+    except InvalidRuleError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.get("/{business_id}/backfills", response_model=List[BackfillJob])
+async def list_backfills(
+    business_id: UUID,
+    service: RuleService = Depends(on_loop(get_rule_service)),
+    backfills: BackfillService = Depends(on_loop(get_backfill_service)),
+) -> List[BackfillJob]:
+    _ensure_business(business_id, service)
+    return backfills.list_jobs(business_id)
+
+
+@router.get("/{business_id}/backfills/{job_id}", response_model=BackfillJob)
+async def get_backfill(
+    business_id: UUID,
+    job_id: UUID,
+    backfills: BackfillService = Depends(on_loop(get_backfill_service)),
+) -> BackfillJob:
+    return _get_backfill(business_id, job_id, backfills)
+
+
+@router.post("/{business_id}/backfills/{job_id}/cancel", response_model=BackfillJob)
+async def cancel_backfill(
+    business_id: UUID,
+    job_id: UUID,
+    backfills: BackfillService = Depends(on_loop(get_backfill_service)),
+) -> BackfillJob:
+    _get_backfill(business_id, job_id, backfills)
+    return backfills.cancel(job_id)
+
+
+@router.get("/{business_id}/{rule_id}/stats", response_model=RuleStats)
+async def get_rule_stats(
+    business_id: UUID,
+    rule_id: UUID,
+    service: RuleService = Depends(on_loop(get_rule_service)),
+    stats: RuleStatsRecorder = Depends(on_loop(get_rule_stats_recorder)),
+) -> RuleStats:
+    try:
+        rule = service.get_rule(business_id, rule_id)
+    except RuleNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Rule not found") from exc
+    return stats.get_stats(rule.id, rule.business_id)
+
+
 @router.get("/{business_id}/{rule_id}", response_model=RuleDefinition)
-def get_rule(
+async def get_rule(
     business_id: UUID,
     rule_id: UUID,
-    service: RuleService = Depends(get_rule_service),
+    service: RuleService = Depends(on_loop(get_rule_service)),
 ) -> RuleDefinition:
     try:
         return service.get_rule(business_id, rule_id)
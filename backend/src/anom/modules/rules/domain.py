@@ -6,7 +6,7 @@ from enum import Enum
 from typing import Any, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class SeverityLevel(str, Enum):
@@ -36,14 +36,54 @@ class RuleCondition(BaseModel):
     value: Any
 
 
+class RuleKind(str, Enum):
+    """How a rule is evaluated.
+
+    ``condition`` rules test each event on its own. The sketch kinds read the
+    windowed field sketches instead: ``heavy_hitter`` fires when one value
+    exceeds ``threshold`` of the field's traffic, ``cardinality_drop`` when
+    the distinct count of the latest window falls to ``threshold`` times the
+    previous window's or below.
+    """
+
+    CONDITION = "condition"
+    HEAVY_HITTER = "heavy_hitter"
+    CARDINALITY_DROP = "cardinality_drop"
+
+
+class SketchRuleSpec(BaseModel):
+    """Parameters of a sketch-based rule."""
+
+    field: str = Field(..., min_length=1, max_length=120)
+    window_seconds: int = Field(default=300, ge=1, le=86400)
+    threshold: float = Field(..., gt=0.0, le=1.0)
+    min_count: int = Field(
+        default=100,
+        ge=1,
+        description="Events in the window (heavy_hitter) or distinct values before the drop (cardinality_drop)",
+    )
+    cooldown_seconds: int = Field(default=300, ge=0)
+
+
 class RuleCreate(BaseModel):
     """Payload required to create a rule definition."""
 
     name: str = Field(..., min_length=1, max_length=120)
     description: Optional[str] = Field(default=None, max_length=500)
-    condition: RuleCondition
+    kind: RuleKind = RuleKind.CONDITION
+    condition: Optional[RuleCondition] = None
+    sketch: Optional[SketchRuleSpec] = None
     severity: SeverityLevel = SeverityLevel.WARNING
 
+    @model_validator(mode="after")
+    def _check_kind(self) -> "RuleCreate":
+        if self.kind is RuleKind.CONDITION:
+            if self.condition is None or self.sketch is not None:
+                raise ValueError("condition rules need a condition and no sketch")
+        elif self.sketch is None or self.condition is not None:
+            raise ValueError(f"{self.kind.value} rules need a sketch and no condition")
+        return self
+
 
 class RuleDefinition(RuleCreate):
     """Stored rule definition."""
@@ -57,3 +97,9 @@ class RuleNotFoundError(Exception):
     """Raised when an operation references an unknown rule."""
 
     pass
+
+
+class InvalidRuleError(ValueError):
+    """Raised when a rule does not fit the business's schema."""
+
+    pass
@@ -1,33 +1,106 @@
-"""In-memory repository for rule definitions."""
+"""In-memory repository for rule definitions.
+
+Rules are read on every ingested event but written rarely, so each business
+publishes an immutable :class:`RuleSnapshot`. Writers build a new snapshot
+from the current one and swap it in with a single dict assignment; readers
+grab whatever snapshot is current without locking or copying, and keep a
+consistent rule set for as long as they hold it.
+"""
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 from uuid import UUID
 
-from anom.modules.rules.domain import RuleDefinition
+from anom.core.locks import StripedLock
+from anom.modules.rule_engine.evaluator import CompiledRule
+from anom.modules.rules.domain import RuleDefinition, RuleKind
+
+
+class RuleSnapshot:
+    """Versioned, read-only rule set of one business.
+
+    The contained rules are shared by every reader; do not mutate them.
+    """
+
+    __slots__ = ("business_id", "version", "rules", "compiled", "sketch_rules", "_by_id")
+
+    def __init__(self, business_id: Optional[UUID], version: int, rules: Mapping[UUID, RuleDefinition]) -> None:
+        self.business_id = business_id
+        self.version = version
+        self.rules: Tuple[RuleDefinition, ...] = tuple(rules.values())
+        self.compiled: Tuple[CompiledRule, ...] = tuple(
+            CompiledRule(rule) for rule in self.rules if rule.kind is RuleKind.CONDITION
+        )
+        self.sketch_rules: Tuple[RuleDefinition, ...] = tuple(
+            rule for rule in self.rules if rule.kind is not RuleKind.CONDITION
+        )
+        self._by_id: Dict[UUID, RuleDefinition] = dict(rules)
+
+    def get(self, rule_id: UUID) -> Optional[RuleDefinition]:
+        return self._by_id.get(rule_id)
+
+    def with_rule(self, rule: RuleDefinition) -> "RuleSnapshot":
+        rules = dict(self._by_id)
+        rules[rule.id] = rule
+        return RuleSnapshot(rule.business_id, self.version + 1, rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __repr__(self) -> str:
+        return f"RuleSnapshot(business_id={self.business_id}, version={self.version}, rules={len(self.rules)})"
+
+
+EMPTY_SNAPSHOT = RuleSnapshot(None, 0, {})
 
 
 class RuleRepository:
     """Stores rules keyed by their parent business."""
 
-    def __init__(self) -> None:
-        self._rules: Dict[UUID, Dict[UUID, RuleDefinition]] = {}
+    def __init__(self, *, lock_stripes: int = 64) -> None:
+        self._snapshots: Dict[UUID, RuleSnapshot] = {}
+        self._locks = StripedLock(lock_stripes)
+
+    def snapshot(self, business_id: UUID) -> RuleSnapshot:
+        """The current rule set of ``business_id``; lock-free."""
+
+        return self._snapshots.get(business_id, EMPTY_SNAPSHOT)
 
     def add_rule(self, rule: RuleDefinition) -> RuleDefinition:
-        rules_for_business = self._rules.setdefault(rule.business_id, {})
-        rules_for_business[rule.id] = rule
-        return rule.model_copy()
+        stored = rule.model_copy()
+        with self._locks.for_key(rule.business_id):
+            self._snapshots[rule.business_id] = self.snapshot(rule.business_id).with_rule(stored)
+        return stored.model_copy()
 
     def list_rules(self, business_id: UUID) -> List[RuleDefinition]:
-        rules = self._rules.get(business_id, {})
-        return [r.model_copy() for r in rules.values()]
+        return [rule.model_copy() for rule in self.snapshot(business_id).rules]
 
     def get_rule(self, business_id: UUID, rule_id: UUID) -> Optional[RuleDefinition]:
-        rule = self._rules.get(business_id, {}).get(rule_id)
+        rule = self.snapshot(business_id).get(rule_id)
         return rule.model_copy() if rule else None
 
     def all_rules(self) -> List[RuleDefinition]:
-        return [rule.model_copy() for rules in self._rules.values() for rule in rules.values()]
+        return [rule.model_copy() for snapshot in list(self._snapshots.values()) for rule in snapshot.rules]
+
+    def snapshot_rows(self) -> Iterator[Dict[str, Any]]:
+        for snapshot in list(self._snapshots.values()):
+            for rule in snapshot.rules:
+                yield rule.model_dump()
+
+    def restore_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        grouped: Dict[UUID, Dict[UUID, RuleDefinition]] = {}
+        for data in rows:
+            rule = RuleDefinition.model_validate(data)
+            grouped.setdefault(rule.business_id, {})[rule.id] = rule
+        for business_id, rules in grouped.items():
+            with self._locks.for_key(business_id):
+                current = self.snapshot(business_id)
+                merged = {rule.id: rule for rule in current.rules}
+                merged.update(rules)
+                self._snapshots[business_id] = RuleSnapshot(business_id, current.version + 1, merged)
 
     def clear(self) -> None:
-        self._rules.clear()
+        self._snapshots.clear()
+
+
+__all__ = ["RuleRepository", "RuleSnapshot", "EMPTY_SNAPSHOT"]
@@ -7,7 +7,7 @@ from uuid import UUID, uuid4
 
 from anom.modules.business_def.domain import BusinessNotFoundError
 from anom.modules.business_def.service import BusinessService
-from anom.modules.rules.domain import RuleCreate, RuleDefinition, RuleNotFoundError
+from anom.modules.rules.domain import InvalidRuleError, RuleCreate, RuleDefinition, RuleNotFoundError
 from anom.modules.rules.repo import RuleRepository
 
 
@@ -21,12 +21,18 @@ class RuleService:
     def create_rule(self, business_id: UUID, payload: RuleCreate) -> RuleDefinition:
         # ensure business exists
         self._business_service.get_business(business_id)
+        if payload.sketch is not None:
+            sketched = {field.name for field in self._business_service.list_fields(business_id) if field.sketched}
+            if payload.sketch.field not in sketched:
+                raise InvalidRuleError(f"Field '{payload.sketch.field}' is not sketched")
         rule = RuleDefinition(
             id=uuid4(),
             business_id=business_id,
             name=payload.name,
             description=payload.description,
+            kind=payload.kind,
             condition=payload.condition,
+            sketch=payload.sketch,
             severity=payload.severity,
             created_at=datetime.utcnow(),
         )
@@ -44,4 +50,11 @@ class RuleService:
         return rule
 
 
-__all__ = ["RuleService", "RuleCreate", "RuleDefinition", "RuleNotFoundError", "BusinessNotFoundError"]
+__all__ = [
+    "RuleService",
+    "RuleCreate",
+    "RuleDefinition",
+    "RuleNotFoundError",
+    "InvalidRuleError",
+    "BusinessNotFoundError",
+]
@@ -0,0 +1,114 @@
+"""Server-Sent Events and WebSocket endpoints streaming new alerts and events."""
+from __future__ import annotations
+
+from typing import AsyncIterator, FrozenSet, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from anom.api.deps import get_stream_hub, on_loop
+from anom.core.config import get_settings
+from anom.core.serialization import dumps
+from anom.modules.streaming.domain import StreamKind, StreamOverflowError, StreamStats
+from anom.modules.streaming.hub import StreamHub
+
+router = APIRouter()
+
+# close code sent to WebSocket subscribers that fell behind the ring ("try again later")
+OVERFLOW_CLOSE_CODE = 1013
+
+
+def _filters(business_ids: List[UUID], events: bool) -> Tuple[Optional[FrozenSet[UUID]], FrozenSet[StreamKind]]:
+    kinds = frozenset(StreamKind) if events else frozenset({StreamKind.ALERT})
+    return (frozenset(business_ids) or None), kinds
+
+
+@router.get("/sse")
+async def stream_sse(
+    business_id: List[UUID] = Query(default=[], description="Only messages of these businesses"),
+    events: bool = Query(default=False, description="Stream ingested events as well as alerts"),
+    after: Optional[int] = Query(default=None, ge=0, description="Resume after this sequence number"),
+    last_event_id: Optional[str] = Header(default=None),
+    hub: StreamHub = Depends(on_loop(get_stream_hub)),
+) -> StreamingResponse:
+    """Stream messages as ``text/event-stream``; each event's ``id`` is its sequence number.
+
+    Browsers reconnect with ``Last-Event-ID`` and resume where they left off as
+    long as the message is still buffered; otherwise an ``overflow`` event
+    carrying the oldest resumable sequence number ends the stream.
+    """
+
+    if after is None and last_event_id:
+        try:
+            after = int(last_event_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID") from exc
+    business_ids, kinds = _filters(business_id, events)
+    subscription = hub.subscribe(
+        after=after,
+        business_ids=business_ids,
+        kinds=kinds,
+        heartbeat_seconds=get_settings().stream_heartbeat_seconds,
+    )
+
+    async def frames() -> AsyncIterator[bytes]:
+        with subscription:
+            try:
+                async for batch in subscription:
+                    yield b"".join(message.sse_frame() for message in batch) if batch else b": keep-alive\n\n"
+            except StreamOverflowError as exc:
+                yield b"event: overflow\ndata: %s\n\n" % dumps({"oldest_seq": exc.oldest_seq})
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_websocket(
+    websocket: WebSocket,
+    business_id: List[UUID] = Query(default=[]),
+    events: bool = Query(default=False),
+    after: Optional[int] = Query(default=None, ge=0),
+    hub: StreamHub = Depends(on_loop(get_stream_hub)),
+) -> None:
+    """Stream messages as JSON text frames ``{"seq", "kind", "data"}``.
+
+    Idle connections get ``{"kind": "heartbeat"}`` frames. A subscriber that
+    falls behind receives ``{"kind": "overflow", "oldest_seq": ...}`` and is
+    closed with code 1013; it can reconnect with ``after``.
+    """
+
+    business_ids, kinds = _filters(business_id, events)
+    # subscribe before the handshake completes so the client misses nothing sent after it
+    with hub.subscribe(
+        after=after,
+        business_ids=business_ids,
+        kinds=kinds,
+        heartbeat_seconds=get_settings().stream_heartbeat_seconds,
+    ) as subscription:
+        await websocket.accept()
+        try:
+            async for batch in subscription:
+                if not batch:
+                    await websocket.send_text('{"kind":"heartbeat"}')
+                for message in batch:
+                    await websocket.send_text(message.envelope())
+        except StreamOverflowError as exc:
+            await websocket.send_text(dumps({"kind": "overflow", "oldest_seq": exc.oldest_seq}).decode())
+            await websocket.close(code=OVERFLOW_CLOSE_CODE)
+        except WebSocketDisconnect:
+            return
+        else:
+            await websocket.close()
+
+
+@router.get("/stats", response_model=StreamStats)
+async def get_stream_stats(hub: StreamHub = Depends(on_loop(get_stream_hub))) -> StreamStats:
+    return hub.stats()
+
+
+__all__ = ["router"]
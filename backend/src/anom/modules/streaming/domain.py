@@ -0,0 +1,35 @@
+"""Domain models for live alert and event streams."""
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class StreamKind(str, Enum):
+    """What a stream message carries."""
+
+    ALERT = "alert"
+    EVENT = "event"
+
+
+class StreamStats(BaseModel):
+    """State of the in-process stream buffer.
+
+    ``oldest_seq`` is the oldest message a subscriber can still resume from;
+    ``last_seq`` is the newest published one (0 before the first message).
+    """
+
+    oldest_seq: int
+    last_seq: int
+    capacity: int
+    subscribers: int
+    dropped: int
+
+
+class StreamOverflowError(Exception):
+    """Raised when a subscriber's cursor points at messages the ring already overwrote."""
+
+    def __init__(self, oldest_seq: int) -> None:
+        super().__init__(f"cursor is older than the oldest buffered message {oldest_seq}")
+        self.oldest_seq = oldest_seq
@@ -0,0 +1,273 @@
+"""In-process ring buffer that fans alerts and events out to stream subscribers.
+
+Publishers (alert creation and the ingestion listeners) encode each message
+once and drop it into a fixed-size ring under a short lock; they never wait
+for subscribers. Every subscriber owns a cursor, the sequence number of the
+next message it wants, and reads the ring at its own pace on the event loop.
+A subscriber that falls more than the ring's capacity behind gets a
+:class:`StreamOverflowError` and is disconnected; it may reconnect from the
+oldest buffered message or start over live.
+
+Events are only published while some subscriber asked for them, so
+ingestion pays nothing for streaming when nobody is listening.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import Counter
+from typing import FrozenSet, List, Optional, Tuple
+from uuid import UUID
+
+from anom.core.serialization import EncodedCache, dumps, encode_model
+from anom.modules.alerts.domain import Alert
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.streaming.domain import StreamKind, StreamOverflowError, StreamStats
+
+
+class StreamMessage:
+    """One published alert or event; wire frames are built on first use and shared by all subscribers."""
+
+    __slots__ = ("seq", "business_id", "kind", "data", "_sse", "_envelope")
+
+    def __init__(self, seq: int, business_id: UUID, kind: StreamKind, data: bytes) -> None:
+        self.seq = seq
+        self.business_id = business_id
+        self.kind = kind
+        self.data = data
+        self._sse: Optional[bytes] = None
+        self._envelope: Optional[str] = None
+
+    def sse_frame(self) -> bytes:
+        frame = self._sse
+        if frame is None:
+            frame = self._sse = b"id: %d\nevent: %s\ndata: %s\n\n" % (self.seq, self.kind.value.encode(), self.data)
+        return frame
+
+    def envelope(self) -> str:
+        """``{"seq": ..., "kind": ..., "data": ...}`` as sent in WebSocket text frames."""
+
+        frame = self._envelope
+        if frame is None:
+            frame = self._envelope = '{"seq":%d,"kind":"%s","data":%s}' % (
+                self.seq,
+                self.kind.value,
+                self.data.decode(),
+            )
+        return frame
+
+
+class StreamHub:
+    """Fixed-capacity message ring with cursor-based, non-blocking readers."""
+
+    def __init__(self, capacity: int = 10_000, *, event_cache: Optional[EncodedCache] = None) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._capacity = capacity
+        self._ring: List[Optional[StreamMessage]] = [None] * capacity
+        self._next_seq = 1
+        self._lock = threading.Lock()
+        self._event_cache = event_cache
+        # business id (None: every business) -> subscribers that want its events
+        self._event_interest: Counter = Counter()
+        self._subscribers = 0
+        self._dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._wake_pending = False
+        self._closed = False
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    async def stop(self) -> None:
+        """Wake every subscriber so its stream ends."""
+
+        self._closed = True
+        self._wake()
+        self._loop = None
+
+    @property
+    def next_seq(self) -> int:
+        return self._next_seq
+
+    def oldest_seq(self) -> int:
+        return max(1, self._next_seq - self._capacity)
+
+    def publish_alert(self, alert: Alert) -> None:
+        self._publish(alert.business_id, StreamKind.ALERT, encode_model(alert))
+
+    def publish_event(self, event: StoredEvent) -> None:
+        interest = self._event_interest
+        if not interest or (not interest[None] and not interest[event.business_id]):
+            return
+        cache = self._event_cache
+        data = cache.encode(event.id_int, event.to_primitive) if cache is not None else dumps(event.to_primitive())
+        self._publish(event.business_id, StreamKind.EVENT, data)
+
+    def _publish(self, business_id: UUID, kind: StreamKind, data: bytes) -> None:
+        with self._lock:
+            seq = self._next_seq
+            self._ring[seq % self._capacity] = StreamMessage(seq, business_id, kind, data)
+            self._next_seq = seq + 1
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._wake_pending = False
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        self._wake_pending = False
+        wakeup = self._wakeup
+        if wakeup is not None:
+            # waiters hold the old event; new waiters pick up the fresh one
+            self._wakeup = asyncio.Event()
+            wakeup.set()
+
+    def read(
+        self,
+        cursor: int,
+        *,
+        business_ids: Optional[FrozenSet[UUID]] = None,
+        kinds: FrozenSet[StreamKind] = frozenset(StreamKind),
+        limit: int = 256,
+    ) -> Tuple[List[StreamMessage], int]:
+        """Matching messages from ``cursor`` on (scanning at most ``limit``) and the next cursor."""
+
+        next_seq = self._next_seq
+        end = min(next_seq, cursor + limit)
+        oldest = max(1, next_seq - self._capacity)
+        if cursor < oldest:
+            raise StreamOverflowError(oldest)
+        ring, capacity = self._ring, self._capacity
+        found: List[StreamMessage] = []
+        for seq in range(cursor, end):
+            message = ring[seq % capacity]
+            if message is None or message.seq != seq:
+                # overwritten by a publisher while we were reading
+                raise StreamOverflowError(self.oldest_seq())
+            if message.kind in kinds and (business_ids is None or message.business_id in business_ids):
+                found.append(message)
+        return found, end
+
+    def subscribe(
+        self,
+        *,
+        after: Optional[int] = None,
+        business_ids: Optional[FrozenSet[UUID]] = None,
+        kinds: FrozenSet[StreamKind] = frozenset({StreamKind.ALERT}),
+        heartbeat_seconds: float = 15.0,
+        batch: int = 256,
+    ) -> "Subscription":
+        """Subscribe to matching messages published after sequence ``after`` (default: from now on).
+
+        The cursor is fixed here, so nothing published between subscribing and
+        the first read is missed. Close the subscription (or use it as a
+        context manager) when done.
+        """
+
+        cursor = self._next_seq if after is None else after + 1
+        subscription = Subscription(self, cursor, business_ids, kinds, heartbeat_seconds, batch)
+        self._subscribers += 1
+        if subscription.wants_events:
+            self._event_interest.update(subscription.interest)
+        return subscription
+
+    def _unsubscribe(self, subscription: "Subscription") -> None:
+        self._subscribers -= 1
+        if subscription.wants_events:
+            self._event_interest.subtract(subscription.interest)
+            self._event_interest += Counter()  # drop zero counts
+
+    def stats(self) -> StreamStats:
+        return StreamStats(
+            oldest_seq=self.oldest_seq(),
+            last_seq=self._next_seq - 1,
+            capacity=self._capacity,
+            subscribers=self._subscribers,
+            dropped=self._dropped,
+        )
+
+
+class Subscription:
+    """Async iterator over batches of one subscriber's messages.
+
+    An empty batch is yielded every ``heartbeat_seconds`` without traffic so
+    transports can detect dead connections. Raises
+    :class:`StreamOverflowError` when the subscriber falls behind the ring.
+    """
+
+    def __init__(
+        self,
+        hub: StreamHub,
+        cursor: int,
+        business_ids: Optional[FrozenSet[UUID]],
+        kinds: FrozenSet[StreamKind],
+        heartbeat_seconds: float,
+        batch: int,
+    ) -> None:
+        self.cursor = cursor
+        self.business_ids = business_ids
+        self.kinds = kinds
+        self.wants_events = StreamKind.EVENT in kinds
+        self.interest: List[Optional[UUID]] = [None] if business_ids is None else list(business_ids)
+        self._hub = hub
+        self._heartbeat_seconds = heartbeat_seconds
+        self._batch = batch
+        self._closed = False
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> List[StreamMessage]:
+        hub = self._hub
+        while not (self._closed or hub._closed):
+            wakeup = hub._wakeup
+            try:
+                messages, self.cursor = hub.read(
+                    self.cursor, business_ids=self.business_ids, kinds=self.kinds, limit=self._batch
+                )
+            except StreamOverflowError:
+                hub._dropped += 1
+                self.close()
+                raise
+            if messages:
+                return messages
+            if self.cursor < hub.next_seq:
+                # scanned a full batch of other businesses' messages; let other tasks run
+                await asyncio.sleep(0)
+                continue
+            if wakeup is None:
+                raise RuntimeError("stream hub is not started")
+            try:
+                await asyncio.wait_for(wakeup.wait(), self._heartbeat_seconds)
+            except asyncio.TimeoutError:
+                return []
+        self.close()
+        raise StopAsyncIteration
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._hub._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+__all__ = ["StreamHub", "StreamMessage", "Subscription"]
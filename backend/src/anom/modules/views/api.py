@@ -1,2 +1,82 @@
-# /businesses/{id}/views (placeholder)
-router = None
+"""FastAPI router exposing saved views under ``/businesses/{id}/views``."""
+from __future__ import annotations
+
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from anom.api.deps import get_view_service, on_loop
+from anom.modules.business_def.domain import BusinessNotFoundError
+from anom.modules.views.domain import ViewCreate, ViewDefinition, ViewNotFoundError, ViewResult
+from anom.modules.views.service import ViewService
+
+router = APIRouter()
+
+
+@router.post(
+    "/{business_id}/views",
+    response_model=ViewDefinition,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_view(
+    business_id: UUID,
+    payload: ViewCreate,
+    service: ViewService = Depends(on_loop(get_view_service)),
+) -> ViewDefinition:
+    try:
+        return service.create_view(business_id, payload)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.get("/{business_id}/views", response_model=List[ViewDefinition])
+async def list_views(
+    business_id: UUID,
+    service: ViewService = Depends(on_loop(get_view_service)),
+) -> List[ViewDefinition]:
+    try:
+        return service.list_views(business_id)
+    except BusinessNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Business not found") from exc
+
+
+@router.get("/{business_id}/views/{view_id}", response_model=ViewDefinition)
+async def get_view(
+    business_id: UUID,
+    view_id: UUID,
+    service: ViewService = Depends(on_loop(get_view_service)),
+) -> ViewDefinition:
+    try:
+        return service.get_view(business_id, view_id)
+    except ViewNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found") from exc
+
+
+@router.delete("/{business_id}/views/{view_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_view(
+    business_id: UUID,
+    view_id: UUID,
+    service: ViewService = Depends(on_loop(get_view_service)),
+) -> Response:
+    try:
+        service.delete_view(business_id, view_id)
+    except ViewNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found") from exc
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# cache misses scan raw events, so this one stays in the threadpool
+@router.get("/{business_id}/views/{view_id}/results", response_model=ViewResult)
+def get_view_results(
+    business_id: UUID,
+    view_id: UUID,
+    service: ViewService = Depends(get_view_service),
+) -> ViewResult:
+    try:
+        return service.execute_view(business_id, view_id)
+    except ViewNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="View not found") from exc
+
+
+__all__ = ["router"]
@@ -1 +1,76 @@
-# UI view configs (placeholder)
+"""Domain models for saved dashboard views."""
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from anom.modules.rules.domain import RuleCondition
+
+MAX_VIEW_BUCKETS = 10_000
+
+
+class ViewAggregation(str, Enum):
+    """Aggregations a view can compute per time bucket and group."""
+
+    COUNT = "count"
+    SUM = "sum"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+
+
+class ViewCreate(BaseModel):
+    """Payload describing a saved query over a business's events."""
+
+    name: str = Field(..., min_length=1, max_length=120)
+    description: Optional[str] = Field(default=None, max_length=500)
+    filters: List[RuleCondition] = Field(default_factory=list)
+    group_by: Optional[str] = Field(default=None, min_length=1, max_length=120)
+    aggregation: ViewAggregation = ViewAggregation.COUNT
+    field: Optional[str] = Field(default=None, min_length=1, max_length=120)
+    bucket_seconds: int = Field(default=60, ge=1, le=86400)
+    range_seconds: int = Field(default=3600, ge=1, le=90 * 86400)
+
+    @model_validator(mode="after")
+    def _check_aggregation_and_range(self) -> "ViewCreate":
+        if self.aggregation is not ViewAggregation.COUNT and not self.field:
+            raise ValueError(f"aggregation '{self.aggregation.value}' requires a field")
+        if self.range_seconds // self.bucket_seconds > MAX_VIEW_BUCKETS:
+            raise ValueError(f"range_seconds / bucket_seconds must not exceed {MAX_VIEW_BUCKETS}")
+        return self
+
+
+class ViewDefinition(ViewCreate):
+    """Stored view definition."""
+
+    id: UUID
+    business_id: UUID
+    created_at: datetime
+
+
+class ViewResultPoint(BaseModel):
+    """Aggregated value for one time bucket and group."""
+
+    bucket_start: datetime
+    group: Optional[str] = None
+    count: int
+    value: Optional[float] = None
+
+
+class ViewResult(BaseModel):
+    """Result of executing a view over its time range."""
+
+    view_id: UUID
+    start: datetime
+    end: datetime
+    points: List[ViewResultPoint]
+
+
+class ViewNotFoundError(Exception):
+    """Raised when an operation references an unknown view."""
+
+    pass
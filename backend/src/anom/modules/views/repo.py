@@ -1 +1,47 @@
-# DB access for views (placeholder)
+"""In-memory repository for view definitions."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from uuid import UUID
+
+from anom.modules.views.domain import ViewDefinition
+
+
+class ViewRepository:
+    """Stores views keyed by their parent business."""
+
+    def __init__(self) -> None:
+        self._views: Dict[UUID, Dict[UUID, ViewDefinition]] = {}
+
+    def add_view(self, view: ViewDefinition) -> ViewDefinition:
+        views_for_business = self._views.setdefault(view.business_id, {})
+        views_for_business[view.id] = view
+        return view.model_copy()
+
+    def list_views(self, business_id: UUID) -> List[ViewDefinition]:
+        return [v.model_copy() for v in list(self._views.get(business_id, {}).values())]
+
+    def get_view(self, business_id: UUID, view_id: UUID) -> Optional[ViewDefinition]:
+        view = self._views.get(business_id, {}).get(view_id)
+        return view.model_copy() if view else None
+
+    def bucket_widths(self, business_id: UUID) -> Dict[UUID, int]:
+        """``bucket_seconds`` of each view of ``business_id``, without copying the views."""
+
+        return {view_id: view.bucket_seconds for view_id, view in list(self._views.get(business_id, {}).items())}
+
+    def delete_view(self, business_id: UUID, view_id: UUID) -> bool:
+        return self._views.get(business_id, {}).pop(view_id, None) is not None
+
+    def snapshot_rows(self) -> Iterator[Dict[str, Any]]:
+        for views in list(self._views.values()):
+            for view in list(views.values()):
+                yield view.model_dump()
+
+    def restore_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for data in rows:
+            view = ViewDefinition.model_validate(data)
+            self._views.setdefault(view.business_id, {})[view.id] = view
+
+    def clear(self) -> None:
+        self._views.clear()
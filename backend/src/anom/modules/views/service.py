@@ -1 +1,186 @@
-# create/list view (placeholder)
+"""Application services for saved views and their cached execution."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from anom.common_models.time import epoch_seconds, from_epoch_seconds
+from anom.core.cache import LRUCache
+from anom.core.locks import StripedLock
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rule_engine.evaluator import match_condition
+from anom.modules.views.domain import (
+    ViewAggregation,
+    ViewCreate,
+    ViewDefinition,
+    ViewNotFoundError,
+    ViewResult,
+    ViewResultPoint,
+)
+from anom.modules.views.repo import ViewRepository
+
+# per group: [count, sum, min, max]
+_BucketPartial = Dict[Optional[str], List[float]]
+
+
+class ViewService:
+    """Creates views and executes them with per-bucket result caching.
+
+    Each view's time range is split into aligned buckets of
+    ``bucket_seconds``. Partial aggregates are cached per ``(view, bucket)``
+    and an ingested event only evicts the bucket it falls into, so repeated
+    refreshes only recompute the buckets that actually changed.
+
+    Eviction also bumps a generation counter (striped by cache key), and a
+    freshly computed bucket is only cached if its generation did not move
+    while it was scanned, so an event stored mid-scan cannot leave a partial
+    that misses it in the cache.
+    """
+
+    def __init__(
+        self,
+        repository: ViewRepository,
+        business_service: BusinessService,
+        event_repository: EventRepository,
+        cache: Optional[LRUCache[Tuple[UUID, int], _BucketPartial]] = None,
+        *,
+        lock_stripes: int = 64,
+    ) -> None:
+        self._repository = repository
+        self._business_service = business_service
+        self._event_repository = event_repository
+        self._cache: LRUCache[Tuple[UUID, int], _BucketPartial] = (
+            cache if cache is not None else LRUCache(max_entries=100_000)
+        )
+        self._locks = StripedLock(lock_stripes)
+        self._generations = [0] * len(self._locks)
+
+    def create_view(self, business_id: UUID, payload: ViewCreate) -> ViewDefinition:
+        self._business_service.get_business(business_id)
+        view = ViewDefinition(
+            id=uuid4(),
+            business_id=business_id,
+            created_at=datetime.utcnow(),
+            **payload.model_dump(),
+        )
+        return self._repository.add_view(view)
+
+    def list_views(self, business_id: UUID) -> List[ViewDefinition]:
+        self._business_service.get_business(business_id)
+        return self._repository.list_views(business_id)
+
+    def get_view(self, business_id: UUID, view_id: UUID) -> ViewDefinition:
+        view = self._repository.get_view(business_id, view_id)
+        if view is None:
+            raise ViewNotFoundError(str(view_id))
+        return view
+
+    def delete_view(self, business_id: UUID, view_id: UUID) -> None:
+        if not self._repository.delete_view(business_id, view_id):
+            raise ViewNotFoundError(str(view_id))
+
+    def execute_view(self, business_id: UUID, view_id: UUID, now: Optional[datetime] = None) -> ViewResult:
+        view = self.get_view(business_id, view_id)
+        now_epoch = epoch_seconds(now or datetime.utcnow())
+        width = view.bucket_seconds
+        first = int((now_epoch - view.range_seconds) // width) + 1
+        last = int(now_epoch // width)
+
+        points: List[ViewResultPoint] = []
+        for index in range(first, last + 1):
+            key = (view.id, index)
+            partial = self._cache.get(key)
+            if partial is None:
+                stripe = hash(key) % len(self._generations)
+                generation = self._generations[stripe]
+                events = self._event_repository.scan_range(
+                    business_id,
+                    from_epoch_seconds(index * width),
+                    from_epoch_seconds((index + 1) * width),
+                )
+                partial = _aggregate_bucket(view, events)
+                with self._locks.for_key(key):
+                    if self._generations[stripe] == generation:
+                        self._cache.put(key, partial)
+            bucket_start = from_epoch_seconds(index * width)
+            for group in sorted(partial, key=lambda g: (g is not None, g or "")):
+                count, total, low, high = partial[group]
+                points.append(
+                    ViewResultPoint(
+                        bucket_start=bucket_start,
+                        group=group,
+                        count=int(count),
+                        value=_finalize(view.aggregation, count, total, low, high),
+                    )
+                )
+        return ViewResult(
+            view_id=view.id,
+            start=from_epoch_seconds(first * width),
+            end=from_epoch_seconds((last + 1) * width),
+            points=points,
+        )
+
+    def on_event(self, event: StoredEvent) -> None:
+        """Invalidate the cached bucket each of the business's views holds for ``event``."""
+
+        # read from the repository so views restored from a snapshot are invalidated too
+        widths = self._repository.bucket_widths(event.business_id)
+        if not widths:
+            return
+        epoch = event.ts_us / 1_000_000
+        for view_id, width in widths.items():
+            key = (view_id, int(epoch // width))
+            with self._locks.for_key(key):
+                self._generations[hash(key) % len(self._generations)] += 1
+                self._cache.pop(key)
+
+
+def _aggregate_bucket(view: ViewDefinition, events: List[StoredEvent]) -> _BucketPartial:
+    partial: _BucketPartial = {}
+    counting = view.aggregation is ViewAggregation.COUNT
+    for event in events:
+        payload = event.payload
+        try:
+            if not all(match_condition(condition, payload) for condition in view.filters):
+                continue
+        except TypeError:
+            continue
+        if counting:
+            value = 0.0
+        else:
+            raw = payload.get(view.field)
+            if not isinstance(raw, (int, float)) or isinstance(raw, bool):
+                continue
+            value = float(raw)
+        group = None
+        if view.group_by is not None and view.group_by in payload:
+            group = str(payload[view.group_by])
+        acc = partial.get(group)
+        if acc is None:
+            partial[group] = [1, value, value, value]
+        else:
+            acc[0] += 1
+            acc[1] += value
+            if value < acc[2]:
+                acc[2] = value
+            if value > acc[3]:
+                acc[3] = value
+    return partial
+
+
+def _finalize(aggregation: ViewAggregation, count: float, total: float, low: float, high: float) -> Optional[float]:
+    if aggregation is ViewAggregation.COUNT:
+        return float(count)
+    if aggregation is ViewAggregation.SUM:
+        return total
+    if aggregation is ViewAggregation.AVG:
+        return total / count if count else None
+    if aggregation is ViewAggregation.MIN:
+        return low
+    return high
+
+
+__all__ = ["ViewService", "ViewCreate", "ViewDefinition", "ViewResult", "ViewNotFoundError"]
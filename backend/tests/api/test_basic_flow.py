@@ -1,5 +1,8 @@
-from fastapi.testclient import TestClient
+import asyncio
+
+import httpx
 import pytest
+from fastapi.testclient import TestClient
 
 from anom.api import deps
 from anom.api.main_app import create_app
@@ -8,14 +11,37 @@ from anom.modules.rules.domain import RuleOperator, SeverityLevel
 
 @pytest.fixture()
 def client() -> TestClient:
+    deps.get_snapshot_manager.cache_clear()
+    deps.get_write_ahead_log.cache_clear()
     deps.get_ingestion_service.cache_clear()
+    deps.get_event_json_cache.cache_clear()
+    deps.get_backfill_service.cache_clear()
+    deps.get_dry_run_engine.cache_clear()
+    deps.get_admission_controller.cache_clear()
+    deps.get_idempotency_index.cache_clear()
+    deps.get_correlation_service.cache_clear()
+    deps.get_correlation_engine.cache_clear()
+    deps.get_correlation_repository.cache_clear()
     deps.get_alert_service.cache_clear()
+    deps.get_notification_dispatcher.cache_clear()
+    deps.get_notification_service.cache_clear()
+    deps.get_destination_repository.cache_clear()
     deps.get_rule_service.cache_clear()
+    deps.get_rule_dispatcher.cache_clear()
+    deps.get_rule_stats_recorder.cache_clear()
+    deps.get_view_service.cache_clear()
     deps.get_business_service.cache_clear()
+    deps.get_retention_service.cache_clear()
+    deps.get_rollup_store.cache_clear()
+    deps.get_time_series_store.cache_clear()
+    deps.get_sketch_store.cache_clear()
+    deps.get_event_time_processor.cache_clear()
+    deps.get_stream_hub.cache_clear()
     deps.get_event_repository.cache_clear()
     deps.get_alert_repository.cache_clear()
     deps.get_rule_repository.cache_clear()
     deps.get_business_repository.cache_clear()
+    deps.get_view_repository.cache_clear()
     app = create_app()
     test_client = TestClient(app)
     try:
@@ -112,3 +138,33 @@ def test_ingestion_missing_required_field_returns_error(client: TestClient):
     )
     assert error_resp.status_code == 400
     assert "Missing required field" in error_resp.json()["detail"]
+
+
+def test_auto_close_routes_report_unknown_businesses_and_policies(client: TestClient):
+    missing = "00000000-0000-0000-0000-000000000000"
+    for method in ("get", "delete"):
+        response = client.request(method, f"/alerts/auto-close/{missing}")
+        assert (response.status_code, response.json()["detail"]) == (404, "Business not found")
+
+    business_id = client.post("/businesses/", json={"name": "Quiet Biz"}).json()["id"]
+    assert client.delete(f"/alerts/auto-close/{business_id}").json()["detail"] == "Auto-close policy not found"
+    assert client.put(f"/alerts/auto-close/{business_id}", json={"quiet_seconds": 60}).status_code == 200
+    assert client.get(f"/alerts/auto-close/{business_id}").json()["quiet_seconds"] == 60
+    assert client.delete(f"/alerts/auto-close/{business_id}").status_code == 204
+    assert client.get(f"/alerts/auto-close/{business_id}").status_code == 404
+
+
+def test_concurrent_requests_through_async_handlers(client: TestClient):
+    async def scenario():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            business = (await async_client.post("/businesses/", json={"name": "shop"})).json()
+            responses = await asyncio.gather(
+                *(async_client.post(f"/ingest/{business['id']}", json={"payload": {"n": i}}) for i in range(300))
+            )
+            listing = await async_client.get(f"/ingest/{business['id']}")
+        return responses, listing
+
+    responses, listing = asyncio.run(scenario())
+    assert {r.status_code for r in responses} == {200}
+    assert len(listing.json()["events"]) == 300
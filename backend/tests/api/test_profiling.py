@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from anom.api.main_app import create_app
+from anom.api.profiling import PROFILE_HEADER
+from anom.core.config import Settings, get_settings
+
+
+@pytest.fixture()
+def make_app(monkeypatch):
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(f"ANOM_{name.upper()}", str(value))
+        get_settings.cache_clear()
+        return create_app()
+
+    yield make
+    get_settings.cache_clear()
+
+
+def test_profiling_disabled_by_default(make_app):
+    app = make_app()
+    assert not hasattr(app.state, "profile_store")
+    with TestClient(app) as client:
+        assert client.get("/admin/profiles/").status_code == 404
+
+
+def test_settings_read_from_environment():
+    settings = Settings.from_env({"ANOM_PROFILE_SAMPLE_RATE": "0.5", "ANOM_PROFILE_MODE": "cprofile"})
+    assert settings.profile_sample_rate == 0.5
+    assert settings.profile_mode == "cprofile"
+    assert settings.profiling_enabled
+
+
+def test_profile_captured_for_authorized_header(make_app):
+    for mode in ("sample", "cprofile"):
+        app = make_app(profile_token="secret", profile_mode=mode, profile_ring_size=2)
+        with TestClient(app) as client:
+            assert "X-Anom-Profile-Id" not in client.get("/health").headers
+            assert "X-Anom-Profile-Id" not in client.get("/health", headers={PROFILE_HEADER: "wrong"}).headers
+
+            for _ in range(3):
+                response = client.get("/health", headers={PROFILE_HEADER: "secret"})
+                assert response.status_code == 200
+            profile_id = response.headers["X-Anom-Profile-Id"]
+
+            assert client.get("/admin/profiles/").status_code == 403
+            listing = client.get("/admin/profiles/", headers={PROFILE_HEADER: "secret"}).json()
+            assert [p["id"] for p in listing] == [3, 2]
+
+            detail = client.get(f"/admin/profiles/{profile_id}", headers={PROFILE_HEADER: "secret"}).json()
+            assert detail["path"] == "/health"
+            assert detail["mode"] == mode
+            assert client.get("/admin/profiles/1", headers={PROFILE_HEADER: "secret"}).status_code == 404
+
+
+def test_admin_endpoints_require_a_configured_token(make_app):
+    app = make_app(profile_sample_rate=1.0)
+    with TestClient(app) as client:
+        response = client.get("/health")
+        assert "X-Anom-Profile-Id" in response.headers
+        assert client.get("/admin/profiles/").status_code == 403
+        assert client.get("/admin/profiles/", headers={PROFILE_HEADER: ""}).status_code == 403
+        assert client.get(f"/admin/profiles/{response.headers['X-Anom-Profile-Id']}").status_code == 403
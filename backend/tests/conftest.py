@@ -0,0 +1,10 @@
+import pytest
+
+from tests.factories import build_ingestion
+
+
+@pytest.fixture()
+def make_ingestion():
+    """Factory fixture: ``make_ingestion(name, fields, rules=..., wal=..., **service_kwargs)``."""
+
+    return build_ingestion
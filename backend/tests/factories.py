@@ -0,0 +1,80 @@
+"""Builders shared by the tests and the benchmark scripts."""
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from anom.core.wal import WriteAheadLog
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate, FieldDataType, FieldDefinitionCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.service import IngestionService
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCreate
+from anom.modules.rules.repo import RuleRepository
+from anom.modules.rules.service import RuleService
+
+# a full declaration, or (name, data type) for a field with the default options
+FieldSpec = Union[FieldDefinitionCreate, Tuple[str, FieldDataType]]
+
+
+@dataclass
+class IngestionSetup:
+    """An ingestion service over fresh in-memory stores and the business it was built for."""
+
+    business_id: UUID
+    service: IngestionService
+    business_service: BusinessService
+    rules: RuleRepository
+    events: EventRepository
+    alerts: AlertRepository
+
+    def add_business(self, name: str, fields: Sequence[FieldSpec] = (), rules: Sequence[RuleCreate] = ()) -> UUID:
+        """Another business served by the same service."""
+
+        return _create_business(self.business_service, self.rules, name, fields, rules)
+
+
+def _create_business(
+    business_service: BusinessService,
+    rules_repository: RuleRepository,
+    name: str,
+    fields: Sequence[FieldSpec],
+    rules: Sequence[RuleCreate],
+) -> UUID:
+    business = business_service.create_business(BusinessCreate(name=name))
+    for field in fields:
+        if not isinstance(field, FieldDefinitionCreate):
+            field = FieldDefinitionCreate(name=field[0], data_type=field[1])
+        business_service.add_field(business.id, field)
+    rule_service = RuleService(rules_repository, business_service)
+    for rule in rules:
+        rule_service.create_rule(business.id, rule)
+    return business.id
+
+
+def build_ingestion(
+    name: str = "test",
+    fields: Sequence[FieldSpec] = (),
+    *,
+    rules: Sequence[RuleCreate] = (),
+    wal: Optional[WriteAheadLog] = None,
+    **service_kwargs: Any,
+) -> IngestionSetup:
+    """Create a business with ``fields`` and ``rules`` and an ingestion service for it.
+
+    ``wal`` backs the event and alert repositories; ``service_kwargs`` go to
+    :class:`IngestionService` (``series_store``, ``admission``, ...).
+    """
+
+    business_service = BusinessService(BusinessRepository())
+    rules_repository = RuleRepository()
+    business_id = _create_business(business_service, rules_repository, name, fields, rules)
+    events = EventRepository(wal)
+    alerts = AlertRepository(wal)
+    service = IngestionService(
+        business_service, events, RuleDispatcher(rules_repository), AlertService(alerts), **service_kwargs
+    )
+    return IngestionSetup(business_id, service, business_service, rules_repository, events, alerts)
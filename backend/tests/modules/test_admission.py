@@ -0,0 +1,113 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.admission import AdmissionController, AdmissionRejectedError, LoadMonitor
+from anom.modules.ingestion.domain import AdmissionPolicy, AdmissionPriority, EventIngestRequest
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.service import IngestionService
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.repo import RuleRepository
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_buckets_per_business_and_source():
+    clock = _Clock()
+    controller = AdmissionController(clock=clock)
+    noisy, quiet = uuid4(), uuid4()
+    controller.set_policy(noisy, AdmissionPolicy(rate_per_second=10, burst=5, source_rate_per_second=1, source_burst=2))
+
+    for _ in range(5):
+        controller.admit(noisy)
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        controller.admit(noisy)
+    assert rejected.value.retry_after == pytest.approx(0.1)
+    for _ in range(100):
+        controller.admit(quiet)  # no policy: unlimited
+
+    clock.now += 10
+    controller.admit(noisy, source="pod-a")
+    controller.admit(noisy, source="pod-a")
+    with pytest.raises(AdmissionRejectedError, match="source"):
+        controller.admit(noisy, source="pod-a")
+    controller.admit(noisy, source="pod-b")
+
+
+def test_policy_change_resets_only_that_businesses_source_buckets():
+    controller = AdmissionController(clock=_Clock())
+    first, second = uuid4(), uuid4()
+    policy = AdmissionPolicy(source_rate_per_second=1, source_burst=1)
+    controller.set_policy(first, policy)
+    controller.set_policy(second, policy)
+    controller.admit(first, source="pod")
+    controller.admit(second, source="pod")
+
+    controller.set_policy(second, AdmissionPolicy(source_rate_per_second=1, source_burst=1))
+    with pytest.raises(AdmissionRejectedError, match="source"):
+        controller.admit(first, source="pod")
+    controller.admit(second, source="pod")  # restarted full under the new policy
+
+
+def test_overload_sheds_by_priority():
+    clock = _Clock()
+    monitor = LoadMonitor(max_in_flight=10, clock=clock)
+    controller = AdmissionController(monitor=monitor, clock=clock)
+    by_priority = {}
+    for priority in AdmissionPriority:
+        by_priority[priority] = uuid4()
+        controller.set_policy(by_priority[priority], AdmissionPolicy(priority=priority))
+
+    def admitted():
+        accepted = set()
+        for priority, business_id in by_priority.items():
+            try:
+                controller.admit(business_id)
+                accepted.add(priority)
+            except AdmissionRejectedError:
+                pass
+        return accepted
+
+    assert admitted() == set(AdmissionPriority)
+    marks = [monitor.begin() for _ in range(25)]  # 2.5x the in-flight limit
+    assert monitor.shed_level() == 2
+    assert admitted() == {AdmissionPriority.CRITICAL, AdmissionPriority.HIGH}
+    marks += [monitor.begin() for _ in range(20)]
+    assert admitted() == {AdmissionPriority.CRITICAL}
+    for mark in marks:
+        monitor.end(mark)
+    assert admitted() == set(AdmissionPriority)
+
+
+def test_ingest_rejects_with_429_and_retry_after():
+    business_service = BusinessService(BusinessRepository())
+    business = business_service.create_business(BusinessCreate(name="shop"))
+    clock = _Clock()
+    admission = AdmissionController(clock=clock)
+    admission.set_policy(business.id, AdmissionPolicy(rate_per_second=0.5, burst=1))
+    service = IngestionService(
+        business_service,
+        EventRepository(),
+        RuleDispatcher(RuleRepository()),
+        AlertService(AlertRepository()),
+        admission=admission,
+    )
+
+    service.ingest(business.id, EventIngestRequest(payload={"n": 1}))
+    with pytest.raises(HTTPException) as rejected:
+        service.ingest(business.id, EventIngestRequest(payload={"n": 2}))
+    assert rejected.value.status_code == 429
+    assert rejected.value.headers == {"Retry-After": "2"}
+    assert admission.monitor.in_flight == 0
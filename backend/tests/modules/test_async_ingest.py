@@ -0,0 +1,50 @@
+import asyncio
+
+from anom.core.wal import FsyncPolicy, WriteAheadLog
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.domain import EventIngestRequest
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+
+
+def test_async_ingest_awaits_group_commit_without_blocking_the_loop(tmp_path, make_ingestion):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.GROUP, group_commit_ms=20)
+    setup = make_ingestion(
+        "shop",
+        [("latency", FieldDataType.INTEGER)],
+        rules=[RuleCreate(name="slow", condition=RuleCondition(field="latency", operator=RuleOperator.GT, value=900))],
+        wal=wal,
+    )
+    business_id, service, events = setup.business_id, setup.service, setup.events
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(
+            *(service.ingest_async(business_id, EventIngestRequest(payload={"latency": i})) for i in range(1000))
+        )
+        done.set()
+        await beat
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    wal.close()
+
+    assert len(results) == 1000
+    assert sum(len(messages) for _, messages in results) == 99
+    assert ticks > 1  # the loop kept running while commits were pending
+    assert len(events.list_events(business_id)) == 1000
+
+    replayed = WriteAheadLog(str(tmp_path))
+    kinds = [kind for kind, _ in replayed.replay()]
+    replayed.close()
+    assert kinds.count("event") == 1000
+    assert kinds.count("alert") == 99
+
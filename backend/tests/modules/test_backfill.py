@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate, FieldDataType, FieldDefinitionCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rule_engine.backfill import BackfillRequest, BackfillService, BackfillStatus
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleNotFoundError, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+from anom.modules.rules.service import RuleService
+
+
+@pytest.fixture()
+def history():
+    business_service = BusinessService(BusinessRepository())
+    business = business_service.create_business(BusinessCreate(name="shop"))
+    business_service.add_field(business.id, FieldDefinitionCreate(name="latency", data_type=FieldDataType.INTEGER))
+    rules = RuleRepository()
+    rule = RuleService(rules, business_service).create_rule(
+        business.id,
+        RuleCreate(name="slow", condition=RuleCondition(field="latency", operator=RuleOperator.GT, value=899)),
+    )
+    events = EventRepository()
+    start = datetime(2024, 1, 1)
+    for i in range(1000):
+        events.add_event(StoredEvent.create(business.id, {"latency": i}, start + timedelta(seconds=i)))
+    alerts = AlertRepository()
+    return business.id, rule, events, rules, alerts, start
+
+
+def test_backfill_evaluates_history_in_processes_and_bulk_creates_alerts(history):
+    business_id, rule, events, rules, alerts, start = history
+    service = BackfillService(events, rules, AlertService(alerts), max_workers=2, chunk_size=100)
+    try:
+        job = service.start(business_id, BackfillRequest(rule_ids=[rule.id], create_alerts=True))
+        job = service.wait(job.id, timeout=60)
+        assert job.status is BackfillStatus.COMPLETED
+        assert (job.total_events, job.processed_events, job.completed_chunks) == (1000, 1000, 10)
+        assert job.matches == {rule.id: 100}
+        assert job.alerts_created == 100
+        created = alerts.list_alerts(business_id)
+        assert len(created) == 100
+        assert {alert.backfill_id for alert in created} == {job.id}
+
+        ranged = service.start(
+            business_id,
+            BackfillRequest(rule_ids=[rule.id], since=start + timedelta(seconds=950), until=start + timedelta(seconds=960)),
+        )
+        ranged = service.wait(ranged.id, timeout=60)
+        assert (ranged.total_events, ranged.matches, ranged.alerts_created) == (10, {rule.id: 10}, 0)
+        assert [j.id for j in service.list_jobs(business_id)] == [job.id, ranged.id]
+    finally:
+        service.shutdown()
+
+    with pytest.raises(RuleNotFoundError):
+        service.start(business_id, BackfillRequest(rule_ids=[business_id]))
+
+
+def test_cancelled_backfill_stops_between_chunks_and_creates_nothing(history):
+    business_id, rule, events, rules, alerts, _ = history
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(release.wait)  # occupy the only worker so chunks stay queued
+    service = BackfillService(events, rules, AlertService(alerts), executor=executor, chunk_size=10)
+    try:
+        job = service.start(business_id, BackfillRequest(rule_ids=[rule.id], create_alerts=True))
+        service.cancel(job.id)
+        release.set()
+        job = service.wait(job.id, timeout=10)
+    finally:
+        executor.shutdown()
+
+    assert job.status is BackfillStatus.CANCELLED
+    assert job.processed_events < job.total_events == 1000
+    assert alerts.list_alerts(business_id) == []
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from time import perf_counter
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from anom.modules.alerts.domain import (
+    AlertAutoClosePolicy,
+    AlertBulkAction,
+    AlertBulkRequest,
+    AlertCreate,
+    AlertFilter,
+    AlertStatus,
+)
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AUTO_CLOSE_ACTOR, AlertService
+from anom.modules.rules.domain import SeverityLevel
+
+
+def _payloads(business_id, rule_id, count):
+    return [
+        AlertCreate(
+            business_id=business_id,
+            rule_id=rule_id,
+            event_id=uuid4(),
+            message=f"alert {i}",
+            severity=SeverityLevel.CRITICAL,
+        )
+        for i in range(count)
+    ]
+
+
+def test_bulk_ack_by_filter_touches_only_matching_alerts():
+    service = AlertService(AlertRepository())
+    business_id, noisy, other = uuid4(), uuid4(), uuid4()
+    service.create_alerts(_payloads(business_id, noisy, 10_000))
+    kept = service.create_alerts(_payloads(business_id, other, 10))
+
+    started = perf_counter()
+    result = service.bulk_update(
+        AlertBulkAction.ACK,
+        AlertBulkRequest(actor="ops", filter=AlertFilter(business_id=business_id, rule_id=noisy)),
+    )
+    elapsed = perf_counter() - started
+
+    assert (result.matched, result.updated) == (10_000, 10_000)
+    assert elapsed < 2.0
+    acked = service.list_alerts(business_id=business_id, status=AlertStatus.ACKED)
+    assert len(acked) == 10_000
+    assert {alert.acknowledged_by for alert in acked} == {"ops"}
+    assert all(service.get_alert(alert.id).status is AlertStatus.OPEN for alert in kept)
+
+    again = service.bulk_update(
+        AlertBulkAction.ACK,
+        AlertBulkRequest(actor="ops", filter=AlertFilter(business_id=business_id, rule_id=noisy)),
+    )
+    assert (again.matched, again.updated) == (10_000, 0)
+
+
+def test_bulk_close_by_ids_skips_closed_and_unknown_alerts():
+    service = AlertService(AlertRepository())
+    business_id, rule_id = uuid4(), uuid4()
+    alerts = service.create_alerts(_payloads(business_id, rule_id, 3))
+    service.acknowledge_alert(alerts[0].id, "ops")
+
+    ids = [alert.id for alert in alerts] + [uuid4()]
+    result = service.bulk_update(AlertBulkAction.CLOSE, AlertBulkRequest(actor="ops", alert_ids=ids))
+    assert (result.matched, result.updated) == (3, 3)
+    closed = service.get_alert(alerts[0].id)
+    assert (closed.status, closed.closed_by, closed.acknowledged_by) == (AlertStatus.CLOSED, "ops", "ops")
+
+    assert service.bulk_update(AlertBulkAction.ACK, AlertBulkRequest(actor="ops", alert_ids=ids)).updated == 0
+    with pytest.raises(ValidationError):
+        AlertBulkRequest(actor="ops")
+    with pytest.raises(ValidationError):
+        AlertBulkRequest(actor="ops", alert_ids=ids, filter=AlertFilter())
+
+
+def test_filtered_bulk_requests_must_scope_the_business():
+    with pytest.raises(ValidationError):
+        AlertBulkRequest.model_validate({"actor": "ops", "filter": {}})
+    with pytest.raises(ValidationError):
+        AlertBulkRequest(actor="ops", filter=AlertFilter(business_id=uuid4()), all_businesses=True)
+    with pytest.raises(ValidationError):
+        AlertBulkRequest(actor="ops", alert_ids=[uuid4()], all_businesses=True)
+
+    service = AlertService(AlertRepository())
+    rule_id = uuid4()
+    for business_id in (uuid4(), uuid4()):
+        service.create_alerts(_payloads(business_id, rule_id, 2))
+    request = AlertBulkRequest(actor="ops", filter=AlertFilter(rule_id=rule_id), all_businesses=True)
+    assert service.bulk_update(AlertBulkAction.ACK, request).updated == 4
+
+
+def test_auto_close_waits_for_the_rule_to_go_quiet():
+    service = AlertService(AlertRepository())
+    business_id, quiet_rule, busy_rule = uuid4(), uuid4(), uuid4()
+    quiet = service.create_alerts(_payloads(business_id, quiet_rule, 2))
+    busy = service.create_alerts(_payloads(business_id, busy_rule, 2))
+    service.set_auto_close_policy(business_id, AlertAutoClosePolicy(quiet_seconds=60, rule_id=quiet_rule))
+
+    assert service.run_auto_close() == 0
+    assert service.run_auto_close(now=datetime.utcnow() + timedelta(minutes=5)) == 2
+    assert {service.get_alert(alert.id).closed_by for alert in quiet} == {AUTO_CLOSE_ACTOR}
+    assert {service.get_alert(alert.id).status for alert in busy} == {AlertStatus.OPEN}
+
+    rows = list(service.snapshot_rows())
+    restored = AlertService(AlertRepository())
+    restored.restore_rows(rows)
+    assert restored.get_auto_close_policy(business_id).rule_id == quiet_rule
+
+
+def test_auto_close_reads_only_open_alerts_and_survives_a_restore():
+    repo = AlertRepository()
+    service = AlertService(repo)
+    business_id, rule_id = uuid4(), uuid4()
+    old = service.create_alerts(_payloads(business_id, rule_id, 3))
+    service.bulk_update(AlertBulkAction.CLOSE, AlertBulkRequest(actor="ops", alert_ids=[old[0].id]))
+    service.set_auto_close_policy(business_id, AlertAutoClosePolicy(quiet_seconds=60))
+
+    restored_repo = AlertRepository()
+    restored = AlertService(restored_repo)
+    restored.restore_rows(list(service.snapshot_rows()))
+    restored_repo.restore_rows(list(repo.snapshot_rows()))
+    [open_ids] = restored_repo.open_alert_ids(business_id).values()
+    assert sorted(open_ids) == sorted([old[1].id, old[2].id])
+
+    # the history is never walked, only the open index
+    restored_repo.iter_alerts = None
+    later = datetime.utcnow() + timedelta(minutes=5)
+    assert restored.run_auto_close(now=later) == 2
+    assert restored_repo.open_alert_ids(business_id) == {}
+    # a rule that fired again within the window keeps its alerts open
+    [fresh] = restored.create_alerts(_payloads(business_id, rule_id, 1))
+    assert restored.run_auto_close() == 0
+    assert restored.get_alert(fresh.id).status is AlertStatus.OPEN
@@ -0,0 +1,76 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate, FieldDataType, FieldDefinitionCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.domain import EventIngestRequest, SeriesResolution
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.series import TimeSeriesStore
+from anom.modules.ingestion.service import IngestionService
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+from anom.modules.rules.service import RuleService
+
+EVENTS_PER_THREAD = 300
+
+
+def _build(business_count):
+    business_service = BusinessService(BusinessRepository())
+    rules = RuleRepository()
+    rule_service = RuleService(rules, business_service)
+    business_ids = []
+    for i in range(business_count):
+        business = business_service.create_business(BusinessCreate(name=f"b{i}"))
+        business_service.add_field(business.id, FieldDefinitionCreate(name="value", data_type=FieldDataType.INTEGER))
+        rule_service.create_rule(
+            business.id,
+            RuleCreate(name="any", condition=RuleCondition(field="value", operator=RuleOperator.GT, value=-1)),
+        )
+        business_ids.append(business.id)
+    events = EventRepository(lock_stripes=8)
+    alerts = AlertRepository(lock_stripes=8)
+    series = TimeSeriesStore(lock_stripes=8)
+    service = IngestionService(business_service, events, RuleDispatcher(rules), AlertService(alerts), series)
+    return business_ids, service, events, alerts, series
+
+
+@pytest.mark.parametrize("threads", [1, 4, 16])
+def test_concurrent_ingest_loses_nothing(threads):
+    # two threads per business so same-business writers contend too
+    business_ids, service, events, alerts, series = _build(max(1, threads // 2))
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def ingest(business_id):
+        barrier.wait()
+        try:
+            for i in range(EVENTS_PER_THREAD):
+                service.ingest(business_id, EventIngestRequest(payload={"value": i}))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    workers = [threading.Thread(target=ingest, args=(business_ids[i % len(business_ids)],)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert errors == []
+    total = 0
+    for business_id in business_ids:
+        stored = events.list_events(business_id)
+        writers = sum(1 for i in range(threads) if business_ids[i % len(business_ids)] == business_id)
+        assert len(stored) == writers * EVENTS_PER_THREAD
+        assert [e.id_int for e in stored] == sorted(e.id_int for e in stored)
+        since = datetime.utcnow() - timedelta(hours=1)
+        points = series.series(business_id, "value", SeriesResolution.HOUR, since)
+        assert sum(p.count for p in points) == len(stored)
+        total += len(stored)
+    assert total == threads * EVENTS_PER_THREAD
+    assert len(alerts.list_alerts()) == total
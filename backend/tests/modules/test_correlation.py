@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from anom.common_models.time import epoch_micros
+from anom.core.wal import FsyncPolicy, WriteAheadLog
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.correlation.domain import CorrelationRuleCreate
+from anom.modules.correlation.engine import CorrelationEngine, ExpiringJoinTable, PendingEvent
+from anom.modules.correlation.repo import CorrelationRepository
+from anom.modules.correlation.service import CorrelationService
+from anom.modules.ingestion.domain import EventIngestRequest
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.service import IngestionService
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCondition, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+
+START = datetime(2024, 5, 1)
+
+
+@pytest.fixture()
+def flow():
+    businesses = BusinessService(BusinessRepository())
+    sftp = businesses.create_business(BusinessCreate(name="sftp"))
+    processor = businesses.create_business(BusinessCreate(name="processor"))
+    alerts = AlertRepository()
+    repository = CorrelationRepository()
+    engine = CorrelationEngine(repository, AlertService(alerts), max_pending=1_000)
+    service = CorrelationService(repository, businesses, engine)
+    rule = service.create_rule(
+        CorrelationRuleCreate(
+            name="file processed",
+            source_business_id=sftp.id,
+            target_business_id=processor.id,
+            source_key="fileName",
+            target_key="file",
+            source_condition=RuleCondition(field="type", operator=RuleOperator.EQ, value="received"),
+            window_seconds=600,
+            latency_threshold_seconds=60,
+        )
+    )
+
+    def send(business, seconds, payload):
+        engine.on_event(StoredEvent.create(business.id, payload, START + timedelta(seconds=seconds)))
+
+    return sftp, processor, rule, service, engine, alerts, send
+
+
+def test_joins_flag_late_matches_and_expired_sources(flow):
+    sftp, processor, rule, service, engine, alerts, send = flow
+    send(sftp, 0, {"type": "received", "fileName": "a.csv"})
+    send(sftp, 1, {"type": "received", "fileName": "b.csv"})
+    send(sftp, 2, {"type": "received", "fileName": "c.csv"})
+    send(sftp, 3, {"type": "deleted", "fileName": "d.csv"})  # filtered out
+    send(processor, 30, {"file": "a.csv"})  # on time
+    send(processor, 200, {"file": "b.csv"})  # late
+    send(processor, 201, {"file": "zzz"})  # no source
+
+    stats = service.get_stats(rule.id)
+    assert (stats.pending, stats.matched, stats.late, stats.expired) == (1, 2, 1, 0)
+    late = alerts.list_alerts(processor.id)
+    assert len(late) == 1 and "'b.csv' matched after 199.0s" in late[0].message
+
+    assert engine.expire(START + timedelta(seconds=601)) == 0
+    assert engine.expire(START + timedelta(seconds=602)) == 1
+    expired = alerts.list_alerts(sftp.id)
+    assert len(expired) == 1 and "'c.csv'" in expired[0].message
+    assert expired[0].rule_id == rule.id
+    assert service.get_stats(rule.id).pending == 0
+
+
+def test_state_is_bounded_by_window_and_capacity():
+    table = ExpiringJoinTable(window_us=10_000_000, max_entries=3)
+    for i in range(3):
+        table.add(PendingEvent(f"k{i}", None, i * 1_000_000))
+    assert table.take("k1").key == "k1"
+    evicted = [table.add(PendingEvent(f"k{i}", None, i * 1_000_000)) for i in range(3, 5)]
+    assert [e.key if e else None for e in evicted] == [None, "k0"]
+    assert len(table) == 3
+    assert [p.key for p in table.expire(epoch_micros(datetime(1970, 1, 1, 0, 0, 13)))] == ["k2", "k3"]
+    assert len(table) == 1 and table.take("k4") is not None
+
+
+def test_evicted_sources_raise_the_no_match_alert(flow):
+    sftp, processor, rule, service, engine, alerts, send = flow
+    for i in range(1_001):  # one over max_pending
+        send(sftp, i / 1000, {"type": "received", "fileName": f"f{i}.csv"})
+
+    [evicted] = alerts.list_alerts(sftp.id)
+    assert "no match for key 'f0.csv'" in evicted.message and "evicted" in evicted.message
+    stats = service.get_stats(rule.id)
+    assert (stats.pending, stats.evicted, stats.expired) == (1_000, 1, 0)
+
+
+def test_rule_validation_and_deletion(flow):
+    sftp, processor, rule, service, engine, alerts, send = flow
+    with pytest.raises(ValidationError):
+        CorrelationRuleCreate(
+            name="bad",
+            source_business_id=sftp.id,
+            target_business_id=processor.id,
+            source_key="f",
+            window_seconds=10,
+            latency_threshold_seconds=10,
+        )
+    send(sftp, 0, {"type": "received", "fileName": "a.csv"})
+    assert [r.id for r in service.list_rules(processor.id)] == [rule.id]
+    service.delete_rule(rule.id)
+    assert engine.expire(START + timedelta(days=1)) == 0
+    assert service.list_rules() == []
+
+
+def test_async_ingest_creates_correlation_alerts_without_blocking(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.GROUP, group_commit_ms=5)
+    businesses = BusinessService(BusinessRepository())
+    sftp = businesses.create_business(BusinessCreate(name="sftp"))
+    processor = businesses.create_business(BusinessCreate(name="processor"))
+    alerts = AlertRepository(wal)
+    alert_service = AlertService(alerts)
+    repository = CorrelationRepository()
+    engine = CorrelationEngine(repository, alert_service)
+    CorrelationService(repository, businesses, engine).create_rule(
+        CorrelationRuleCreate(
+            name="file processed",
+            source_business_id=sftp.id,
+            target_business_id=processor.id,
+            source_key="fileName",
+            target_key="file",
+            window_seconds=600,
+            latency_threshold_seconds=0.001,
+        )
+    )
+    ingestion = IngestionService(
+        businesses,
+        EventRepository(wal),
+        RuleDispatcher(RuleRepository()),
+        alert_service,
+        alert_sources=[engine.observe],
+    )
+
+    def blocking_create(*args, **kwargs):
+        raise AssertionError("correlation alerts must not take the blocking path")
+
+    alert_service.create_alerts = blocking_create
+
+    async def scenario():
+        await ingestion.ingest_async(sftp.id, EventIngestRequest(payload={"fileName": "a.csv"}))
+        await asyncio.sleep(0.01)
+        return await ingestion.ingest_async(processor.id, EventIngestRequest(payload={"file": "a.csv"}))
+
+    _, messages = asyncio.run(scenario())
+    wal.close()
+    assert len(messages) == 1
+    assert [alert.business_id for alert in alerts.list_alerts()] == [processor.id]
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rule_engine import dryrun
+from anom.modules.rule_engine.dryrun import DryRunEngine, DryRunRequest, DryRunResolution
+from anom.modules.rules.domain import RuleCondition, RuleOperator
+
+START = datetime(2024, 3, 1)
+
+
+def _history(business_id, count, offset=0):
+    events = []
+    for i in range(offset, offset + count):
+        payload = {"latency": i % 100, "path": "/a" if i % 2 else "/b"}
+        if i % 10 == 0:
+            payload = {"path": "/health"}  # no latency field
+        events.append(StoredEvent.create(business_id, payload, START + timedelta(minutes=i)))
+    return events
+
+
+def _request(field="latency", operator=RuleOperator.GTE, value=90, **kwargs):
+    return DryRunRequest(condition=RuleCondition(field=field, operator=operator, value=value), **kwargs)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(dryrun, "np", None)
+    repo = EventRepository()
+    return repo, DryRunEngine(repo), request.param
+
+
+def test_dry_run_counts_buckets_and_samples(engine):
+    repo, runner, name = engine
+    business_id = uuid4()
+    for event in _history(business_id, 600):
+        repo.add_event(event)
+
+    result = runner.run(business_id, _request(resolution=DryRunResolution.HOUR, sample_size=3))
+
+    assert result.engine == name
+    assert (result.total_events, result.matched_events) == (600, 54)
+    expected = [sum(1 for i in range(h * 60, h * 60 + 60) if i % 100 > 90) for h in range(10)]
+    assert [(b.events, b.matches) for b in result.buckets] == [(60, hits) for hits in expected]
+    assert result.buckets[1].start == START + timedelta(hours=1)
+    assert len(result.sample_event_ids) == 3
+    assert runner.run(business_id, _request(value="x")).matched_events == 0
+    assert runner.run(business_id, _request(operator=RuleOperator.NE, value="x")).matched_events == 540
+    assert runner.run(business_id, _request(field="path", operator=RuleOperator.EQ, value="/a")).matched_events == 300
+    ranged = runner.run(business_id, _request(since=START, until=START + timedelta(minutes=100)))
+    assert (ranged.total_events, ranged.matched_events) == (100, 9)
+
+
+def test_columns_follow_appends_retention_and_type_changes(engine):
+    repo, runner, _ = engine
+    business_id = uuid4()
+    for event in _history(business_id, 200):
+        repo.add_event(event)
+    assert runner.run(business_id, _request()).matched_events == 18
+
+    for event in _history(business_id, 100, offset=200):
+        repo.add_event(event)
+    repo.drop_oldest(business_id, keep_last=250)
+    result = runner.run(business_id, _request())
+    assert (result.total_events, result.matched_events) == (250, 27)
+
+    repo.add_event(StoredEvent.create(business_id, {"latency": 95.5}, START + timedelta(days=1)))
+    assert runner.run(business_id, _request()).matched_events == 28
+
+
+def test_string_columns_match_like_the_evaluator(engine):
+    repo, runner, _ = engine
+    business_id = uuid4()
+    for event in _history(business_id, 200):
+        repo.add_event(event)
+
+    def matches(operator, value):
+        return runner.run(business_id, _request(field="path", operator=operator, value=value)).matched_events
+
+    assert matches(RuleOperator.EQ, "/health") == 20
+    assert matches(RuleOperator.NE, "/a") == 100
+    assert matches(RuleOperator.EQ, "/missing") == 0
+    assert matches(RuleOperator.NE, 5) == 200
+    assert matches(RuleOperator.GT, "/b") == 20
+    assert matches(RuleOperator.LTE, "/b") == 180
+    assert matches(RuleOperator.GT, 5) == 0
+
+    # new strings and rows without the field extend the encoded column
+    repo.add_event(StoredEvent.create(business_id, {"path": "/c"}, START + timedelta(days=1)))
+    repo.add_event(StoredEvent.create(business_id, {"latency": 1}, START + timedelta(days=1)))
+    assert matches(RuleOperator.EQ, "/c") == 1
+    assert matches(RuleOperator.NE, "/a") == 101
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from anom.modules.business_def.domain import FieldDataType, FieldDefinitionCreate
+from anom.modules.ingestion.domain import EventIngestRequest
+from anom.modules.ingestion.records import StoredEvent
+
+
+@pytest.fixture()
+def indexed(make_ingestion):
+    setup = make_ingestion(
+        "files",
+        [
+            FieldDefinitionCreate(name="fileName", data_type=FieldDataType.STRING, required=False, indexed=True),
+            FieldDefinitionCreate(name="routeId", data_type=FieldDataType.INTEGER, required=False, indexed=True),
+            ("size", FieldDataType.INTEGER),
+        ],
+        index_max_integer_values=5,
+    )
+    return setup.business_id, setup.service, setup.events
+
+
+def test_lookups_use_postings_and_combine_conditions(indexed):
+    business_id, service, events = indexed
+    for i in range(300):
+        service.ingest(business_id, EventIngestRequest(payload={"fileName": f"f{i % 30}", "routeId": i % 4, "size": i}))
+
+    hits = service.find_stored_events(business_id, [("fileName", "f7")])
+    assert [event.payload["size"] for event in hits] == list(range(7, 300, 30))
+    both = service.find_stored_events(business_id, [("fileName", "f7"), ("routeId", "1")])
+    assert [event.payload["size"] for event in both] == [37, 97, 157, 217, 277]
+    page = service.find_stored_events(business_id, [("fileName", "f7")], after=hits[2].id, limit=2)
+    assert page == hits[3:5]
+    # not indexed: same answer from a scan
+    assert len(service.find_stored_events(business_id, [("size", "42")])) == 1
+
+    with pytest.raises(HTTPException) as bad_value:
+        service.find_stored_events(business_id, [("routeId", "x")])
+    assert bad_value.value.status_code == 400
+    with pytest.raises(HTTPException):
+        service.find_stored_events(business_id, [("missing", "x")])
+
+
+def test_index_is_built_from_history_and_follows_retention(indexed):
+    business_id, service, events = indexed
+    start = datetime(2024, 1, 1)
+    for i in range(100):
+        events.add_event(StoredEvent.create(business_id, {"fileName": f"f{i % 10}"}, start + timedelta(seconds=i)))
+
+    assert len(service.find_stored_events(business_id, [("fileName", "f3")])) == 10
+    events.drop_oldest(business_id, keep_last=45)
+    postings = events._indexes[business_id].fields["fileName"].postings
+    assert sum(len(ids) for ids in postings.values()) == 45
+    assert [e.payload for e in service.find_stored_events(business_id, [("fileName", "f3")])] == [{"fileName": "f3"}] * 4
+
+
+def test_async_ingest_builds_a_missing_index_off_the_event_loop(indexed):
+    business_id, service, events = indexed
+    start = datetime(2024, 1, 1)
+    # restored history, no index built yet
+    for i in range(50):
+        events.add_event(StoredEvent.create(business_id, {"fileName": f"f{i % 5}"}, start + timedelta(seconds=i)))
+    build_threads = []
+    ensure_indexes = events.ensure_indexes
+
+    def recording_ensure(*args):
+        build_threads.append(threading.get_ident())
+        ensure_indexes(*args)
+
+    events.ensure_indexes = recording_ensure
+
+    async def scenario():
+        await service.ingest_async(business_id, EventIngestRequest(payload={"fileName": "f1", "size": 1}))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert build_threads and build_threads[0] != loop_thread
+    assert len(service.find_stored_events(business_id, [("fileName", "f1")])) == 11
+
+
+def test_high_cardinality_integer_index_falls_back_to_scan(indexed):
+    business_id, service, events = indexed
+    for i in range(20):
+        service.ingest(business_id, EventIngestRequest(payload={"routeId": i, "size": i}))
+
+    assert events._indexes[business_id].postings("routeId") is None
+    assert [e.payload["size"] for e in service.find_stored_events(business_id, [("routeId", "12")])] == [12]
+    with pytest.raises(ValidationError):
+        FieldDefinitionCreate(name="ratio", data_type=FieldDataType.FLOAT, indexed=True)
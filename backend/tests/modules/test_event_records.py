@@ -0,0 +1,58 @@
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from anom.modules.ingestion.domain import EventRecord
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+
+START = datetime(2024, 1, 1)
+COUNT = 5000
+
+
+def _payload(i):
+    return {"durationMs": 100 + i, "route": "/checkout", "status": "ok", "retries": i % 3}
+
+
+def _traced_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert kept
+    return current
+
+
+def test_stored_event_round_trips_to_model():
+    event = EventRecord(id=uuid4(), business_id=uuid4(), payload=_payload(1), received_at=START)
+    stored = StoredEvent.from_model(event)
+    assert stored.to_model() == event
+    assert stored.received_at == START
+    assert StoredEvent.create(uuid4(), {}, START + timedelta(microseconds=999_999)).received_at.microsecond == 999_999
+
+
+def test_stored_events_use_a_third_of_the_memory():
+    business_id = uuid4()
+    payloads = [_payload(i) for i in range(COUNT)]
+    times = [START + timedelta(milliseconds=i) for i in range(COUNT)]
+
+    def as_models():
+        # what the repository used to keep: a validated pydantic model per event
+        return [
+            EventRecord(id=uuid4(), business_id=business_id, payload=dict(p), received_at=t)
+            for p, t in zip(payloads, times)
+        ]
+
+    def as_stored():
+        repo = EventRepository()
+        for p, t in zip(payloads, times):
+            repo.add_event(StoredEvent.create(business_id, p, t))
+        return repo
+
+    model_bytes = _traced_bytes(as_models)
+    stored_bytes = _traced_bytes(as_stored)
+    assert model_bytes / stored_bytes >= 3, (model_bytes / COUNT, stored_bytes / COUNT)
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.domain import EventIngestRequest, EventTimePolicy, SeriesResolution
+from anom.modules.ingestion.event_time import EventTimeProcessor
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.series import TimeSeriesStore
+
+START = datetime(2024, 7, 1)
+
+
+@pytest.fixture()
+def flow(make_ingestion):
+    series = TimeSeriesStore()
+    setup = make_ingestion(
+        "payments",
+        [("occurredAt", FieldDataType.DATETIME), ("amount", FieldDataType.INTEGER)],
+        series_store=series,
+    )
+
+    def send(seconds, amount):
+        occurred = (START + timedelta(seconds=seconds)).isoformat()
+        setup.service.ingest(setup.business_id, EventIngestRequest(payload={"occurredAt": occurred, "amount": amount}))
+
+    return setup.business_id, setup.service, series, setup.events, send
+
+
+def test_reorders_by_event_time_and_diverts_late_events(flow):
+    business_id, service, series, events, send = flow
+    service.set_event_time_policy(business_id, EventTimePolicy(field="occurredAt", allowed_lateness_seconds=30))
+    send(0, 1)
+    send(50, 2)  # watermark 20s: releases the first event
+    send(10, 3)  # behind the watermark
+    send(40, 4)
+    send(100, 5)  # watermark 70s: releases 40s and 50s
+
+    stats = service.get_event_time_stats(business_id)
+    assert (stats.released, stats.buffered, stats.late) == (3, 1, 1)
+    assert stats.watermark == START + timedelta(seconds=70)
+    [late] = service.list_late_events(business_id)
+    assert late.event_time == START + timedelta(seconds=10) and late.watermark == START + timedelta(seconds=20)
+    assert len(events.list_events(business_id)) == 5  # late events are still stored
+
+    [minute] = series.series(business_id, "amount", SeriesResolution.MINUTE)
+    assert (minute.bucket_start, minute.count, minute.sum, minute.last) == (START, 3, 7.0, 2.0)
+
+    assert service.flush_event_time(datetime.utcnow()) == 0  # not idle for the allowed lateness yet
+    assert service.flush_event_time(datetime.utcnow() + timedelta(minutes=1)) == 1
+    points = series.series(business_id, "amount", SeriesResolution.MINUTE)
+    assert [(p.bucket_start, p.count) for p in points] == [(START, 3), (START + timedelta(minutes=1), 1)]
+
+
+def test_policy_requires_a_datetime_field(flow):
+    business_id, service, series, events, send = flow
+    with pytest.raises(HTTPException) as exc:
+        service.set_event_time_policy(business_id, EventTimePolicy(field="amount"))
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException) as exc:
+        service.set_event_time_policy(uuid4(), EventTimePolicy(field="occurredAt"))
+    assert exc.value.status_code == 404
+
+    service.set_event_time_policy(business_id, EventTimePolicy(field="occurredAt", allowed_lateness_seconds=600))
+    send(0, 1)
+    assert series.series(business_id, "amount", SeriesResolution.MINUTE) == []
+    assert service.delete_event_time_policy(business_id)  # releases what was buffered
+    assert series.series(business_id, "amount", SeriesResolution.MINUTE)[0].bucket_start == START
+    assert not service.delete_event_time_policy(business_id)
+
+
+def test_full_buffer_advances_the_watermark():
+    business_id = uuid4()
+    processor = EventTimeProcessor()
+    processor.set_policy(
+        business_id, EventTimePolicy(field="at", allowed_lateness_seconds=3_600, max_buffered=2)
+    )
+
+    def offer(seconds):
+        at = START + timedelta(seconds=seconds)
+        return processor.offer(business_id, StoredEvent.create(business_id, {"at": at}, START), {"at": at})
+
+    assert offer(30)[0] == [] and offer(10)[0] == []
+    released, _ = offer(20)
+    assert [payload["at"] for _, payload in released] == [START + timedelta(seconds=10)]
+    assert offer(5)[0] == []  # now behind the forced watermark
+    assert processor.stats(business_id).late == 1
+    assert processor.offer(uuid4(), StoredEvent.create(business_id, {}, START), {}) is None
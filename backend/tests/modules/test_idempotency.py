@@ -0,0 +1,122 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from anom.core.wal import FsyncPolicy, WriteAheadLog
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.dedup import BloomFilter, IdempotencyIndex
+from anom.modules.ingestion.domain import EventIngestRequest, IdempotencyPolicy
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f"key-{i}".encode())
+    assert all(f"key-{i}".encode() in bloom for i in range(10_000))
+    false_positives = sum(f"other-{i}".encode() in bloom for i in range(10_000))
+    assert false_positives < 300
+    assert bloom.nbytes < 13_000
+
+
+def test_index_ages_keys_into_bloom_filter_and_stays_bounded():
+    clock = _Clock()
+    index = IdempotencyIndex(window_seconds=60, max_keys=100, bloom_capacity=1000, clock=clock)
+    business_id = uuid4()
+
+    index.record(business_id, "a", "first")
+    assert index.lookup(business_id, "a") == (True, "first")
+    assert index.lookup(uuid4(), "a") == (False, None)
+
+    clock.now = 61
+    assert index.lookup(business_id, "a") == (True, None)
+    assert len(index) == 0
+
+    for i in range(500):
+        index.record(business_id, f"k{i}", i)
+    assert len(index) == 100
+    assert index.lookup(business_id, "k499") == (True, 499)
+    assert index.lookup(business_id, "k0") == (True, None)
+
+
+@pytest.fixture()
+def ingestion(make_ingestion):
+    clock = _Clock()
+    setup = make_ingestion(
+        "shop",
+        [("durationMs", FieldDataType.INTEGER)],
+        rules=[RuleCreate(name="slow", condition=RuleCondition(field="durationMs", operator=RuleOperator.GT, value=100))],
+        idempotency_index=IdempotencyIndex(window_seconds=60, clock=clock),
+    )
+    return setup.business_id, setup.service, setup.events, setup.alerts, clock
+
+
+def test_retry_with_header_key_returns_stored_result(ingestion):
+    business_id, service, events, alerts, _ = ingestion
+    request = EventIngestRequest(payload={"durationMs": 250})
+
+    first_event, first_alerts = service.ingest(business_id, request, idempotency_key="req-1")
+    retry_event, retry_alerts = service.ingest(business_id, request, idempotency_key="req-1")
+
+    assert retry_event == first_event
+    assert retry_alerts == first_alerts == ["Rule 'slow' triggered"]
+    assert len(events.list_events(business_id)) == 1
+    assert len(alerts.list_alerts()) == 1
+
+    service.ingest(business_id, request, idempotency_key="req-2")
+    service.ingest(business_id, request)
+    assert len(events.list_events(business_id)) == 3
+
+
+def test_payload_key_field_and_expired_key_conflict(ingestion):
+    business_id, service, events, _, clock = ingestion
+    service.set_idempotency_policy(business_id, IdempotencyPolicy(key_field="requestId"))
+
+    # a retry is answered before validation, so even a now-invalid payload replays
+    first, _ = service.ingest(business_id, EventIngestRequest(payload={"durationMs": 5, "requestId": 7}))
+    retry, _ = service.ingest(business_id, EventIngestRequest(payload={"durationMs": "bad", "requestId": 7}))
+    assert retry.id == first.id
+
+    clock.now = 120
+    with pytest.raises(HTTPException) as exc_info:
+        service.ingest(business_id, EventIngestRequest(payload={"durationMs": 5, "requestId": 7}))
+    assert exc_info.value.status_code == 409
+    assert len(events.list_events(business_id)) == 1
+
+
+def test_concurrent_retries_do_not_ingest_twice(tmp_path, make_ingestion):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.GROUP, group_commit_ms=20)
+    setup = make_ingestion("retries", wal=wal)
+    business_id, service, events = setup.business_id, setup.service, setup.events
+    request = EventIngestRequest(payload={"durationMs": 1})
+
+    async def scenario():
+        attempts = [service.ingest_async(business_id, request, idempotency_key="same") for _ in range(5)]
+        return await asyncio.gather(*attempts, return_exceptions=True)
+
+    outcomes = asyncio.run(scenario())
+    wal.close()
+    assert len(events.list_events(business_id)) == 1
+    assert sum(not isinstance(outcome, Exception) for outcome in outcomes) == 1
+    assert all(outcome.status_code == 409 for outcome in outcomes if isinstance(outcome, Exception))
+    # once the first request has finished, retries get its result
+    assert service.ingest(business_id, request, idempotency_key="same")[0].id == events.list_events(business_id)[0].id
+
+
+def test_failed_request_releases_its_key(ingestion):
+    business_id, service, events, _, _ = ingestion
+    with pytest.raises(HTTPException) as exc_info:
+        service.ingest(business_id, EventIngestRequest(payload={"durationMs": "bad"}), idempotency_key="k")
+    assert exc_info.value.status_code == 400
+    service.ingest(business_id, EventIngestRequest(payload={"durationMs": 5}), idempotency_key="k")
+    assert len(events.list_events(business_id)) == 1
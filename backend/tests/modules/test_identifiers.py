@@ -0,0 +1,100 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from anom.common_models.identifiers import TimeOrderedIdGenerator, id_datetime, id_floor, new_id
+from anom.modules.alerts.domain import AlertCreate
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rules.domain import SeverityLevel
+
+
+def test_ids_are_unique_and_strictly_increasing_across_threads():
+    generator = TimeOrderedIdGenerator()
+    per_thread = []
+
+    def generate():
+        per_thread.append([generator.new() for _ in range(5000)])
+
+    threads = [threading.Thread(target=generate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for ids in per_thread:
+        assert ids == sorted(ids)
+    all_ids = [i for ids in per_thread for i in ids]
+    assert len(set(all_ids)) == len(all_ids)
+    assert {i.version for i in all_ids} == {7}
+
+
+def test_batched_ids_continue_the_sequence_across_milliseconds():
+    generator = TimeOrderedIdGenerator()
+    # more than one millisecond's worth of counters, so the batch carries
+    ids = [generator.new_int(), *generator.new_ints(10_000), generator.new_int()]
+    assert ids == sorted(set(ids))
+    assert {UUID(int=value).version for value in ids} == {7}
+    assert generator.new_ints(0) == []
+
+
+def test_id_encodes_creation_time():
+    before = datetime.utcnow() - timedelta(milliseconds=1)
+    value = new_id()
+    assert before <= id_datetime(value) <= datetime.utcnow()
+    assert id_floor(id_datetime(value)) <= value.int
+    assert id_floor(id_datetime(value) + timedelta(milliseconds=1)) > value.int
+
+
+def test_event_cursor_pages_by_id():
+    repo = EventRepository()
+    business_id = uuid4()
+    start = datetime(2024, 1, 1)
+    for i in range(25):
+        repo.add_event(StoredEvent.create(business_id, {"i": i}, start + timedelta(seconds=i)))
+
+    pages, after = [], None
+    while True:
+        page = repo.list_events(business_id, after=after, limit=10)
+        if not page:
+            break
+        pages.append([e.payload["i"] for e in page])
+        after = page[-1].id
+    assert pages == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+
+    events = repo.list_events(business_id)
+    assert [e.payload["i"] for e in repo.scan_ids(business_id, events[5].id_int, events[8].id_int)] == [5, 6, 7]
+
+
+def test_alerts_merge_across_businesses_in_creation_order():
+    service = AlertService(AlertRepository())
+    businesses = [uuid4() for _ in range(3)]
+    created = []
+    for i in range(12):
+        created.append(
+            service.create_alert(
+                AlertCreate(
+                    business_id=businesses[i % 3],
+                    rule_id=uuid4(),
+                    event_id=uuid4(),
+                    message=f"alert {i}",
+                    severity=SeverityLevel.WARNING,
+                )
+            )
+        )
+        if i == 5:
+            time.sleep(0.002)
+            midpoint = datetime.utcnow()
+            time.sleep(0.002)
+
+    assert [a.id for a in service.list_alerts()] == [a.id for a in created]
+    assert [a.message for a in service.list_alerts(limit=4, after=created[3].id)] == [
+        f"alert {i}" for i in range(4, 8)
+    ]
+    assert [a.id for a in service.list_alerts(since=midpoint)] == [a.id for a in created[6:]]
+    assert [a.id for a in service.list_alerts(business_id=businesses[1], after=created[1].id)] == [
+        a.id for a in created[4::3]
+    ]
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import socketserver
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+import pytest
+
+from anom.modules.alerts.domain import AlertCreate, DeliveryStatus
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.notifications.dispatcher import NotificationDispatcher
+from anom.modules.notifications.domain import DestinationCreate, NotificationChannel
+from anom.modules.notifications.repo import DestinationRepository
+from anom.modules.notifications.service import NotificationService
+from anom.modules.rules.domain import SeverityLevel
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802 - http.server API
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.attempts += 1
+            fail = server.attempts <= server.fail_first
+            if not fail:
+                server.batches.append(body)
+        self.send_response(server.fail_status if fail else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.wfile.write(b"220 stand-in ESMTP\r\n")
+        in_data = False
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.server.messages.append(b"".join(lines).decode())
+                    self.wfile.write(b"250 queued\r\n")
+                else:
+                    lines.append(line)
+                continue
+            command = line[:4].upper()
+            if command == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 go ahead\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+@pytest.fixture()
+def webhook_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookHandler)
+    server.lock = threading.Lock()
+    server.attempts = 0
+    server.fail_first = 0
+    server.fail_status = 503
+    server.batches = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _alert_payload(business_id, severity=SeverityLevel.WARNING):
+    return AlertCreate(
+        business_id=business_id,
+        rule_id=uuid4(),
+        event_id=uuid4(),
+        message="Rule 'slow' triggered",
+        severity=severity,
+    )
+
+
+def _setup(**dispatcher_kwargs):
+    alerts = AlertRepository()
+    destinations = DestinationRepository()
+    dispatcher = NotificationDispatcher(destinations, alerts, backoff_base_s=0.01, **dispatcher_kwargs)
+    alert_service = AlertService(alerts, listeners=[dispatcher.enqueue])
+    return alerts, NotificationService(destinations), dispatcher, alert_service
+
+
+def test_webhook_batches_with_retry(webhook_server):
+    webhook_server.fail_first = 1
+    alerts, notifications, dispatcher, alert_service = _setup()
+    business_id = uuid4()
+    destination = notifications.create_destination(
+        DestinationCreate(
+            name="hook",
+            channel=NotificationChannel.WEBHOOK,
+            url=f"http://127.0.0.1:{webhook_server.server_port}/hook",
+            batch_size=10,
+            batch_window_ms=50,
+        )
+    )
+
+    async def scenario():
+        await dispatcher.start()
+        try:
+            # created from a worker thread, like sync FastAPI handlers do
+            await asyncio.to_thread(lambda: [alert_service.create_alert(_alert_payload(business_id)) for _ in range(5)])
+            await asyncio.sleep(0)
+            await dispatcher.drain()
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert webhook_server.attempts == 2
+    assert len(webhook_server.batches) == 1
+    assert len(webhook_server.batches[0]["alerts"]) == 5
+    for alert in alerts.list_alerts():
+        [delivery] = alert.deliveries
+        assert delivery.destination_id == destination.id
+        assert delivery.status is DeliveryStatus.DELIVERED
+        assert delivery.attempts == 2
+
+
+def test_failed_delivery_and_severity_filter(webhook_server):
+    webhook_server.fail_first = 100
+    alerts, notifications, dispatcher, alert_service = _setup(max_attempts=3)
+    business_id = uuid4()
+    notifications.create_destination(
+        DestinationCreate(
+            name="critical only",
+            channel=NotificationChannel.SLACK,
+            url=f"http://127.0.0.1:{webhook_server.server_port}/slack",
+            min_severity=SeverityLevel.CRITICAL,
+            batch_window_ms=0,
+        )
+    )
+
+    async def scenario():
+        await dispatcher.start()
+        try:
+            alert_service.create_alert(_alert_payload(business_id, SeverityLevel.WARNING))
+            alert_service.create_alert(_alert_payload(business_id, SeverityLevel.CRITICAL))
+            await asyncio.sleep(0)
+            await dispatcher.drain()
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    by_severity = {a.severity: a for a in alerts.list_alerts()}
+    assert by_severity[SeverityLevel.WARNING].deliveries == []
+    [delivery] = by_severity[SeverityLevel.CRITICAL].deliveries
+    assert delivery.status is DeliveryStatus.FAILED
+    assert delivery.attempts == 3
+    assert delivery.last_error == "HTTP 503"
+
+
+def test_client_errors_are_not_retried_and_sender_bugs_still_record_a_failure(webhook_server):
+    webhook_server.fail_first, webhook_server.fail_status = 100, 404
+    alerts, notifications, dispatcher, alert_service = _setup()
+    notifications.create_destination(
+        DestinationCreate(
+            name="gone",
+            channel=NotificationChannel.WEBHOOK,
+            url=f"http://127.0.0.1:{webhook_server.server_port}/gone",
+            batch_window_ms=0,
+        )
+    )
+
+    async def scenario(service):
+        await dispatcher.start()
+        try:
+            service.create_alert(_alert_payload(uuid4()))
+            await asyncio.sleep(0)
+            await dispatcher.drain()
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario(alert_service))
+    [delivery] = alerts.list_alerts()[0].deliveries
+    assert (delivery.status, delivery.attempts, delivery.last_error) == (DeliveryStatus.FAILED, 1, "HTTP 404")
+    assert webhook_server.attempts == 1
+
+    async def broken_sender(client, destination, batch, timeout):
+        raise RuntimeError("boom")
+
+    alerts, notifications, dispatcher, alert_service = _setup(sender=broken_sender)
+    notifications.create_destination(
+        DestinationCreate(name="hook", channel=NotificationChannel.WEBHOOK, url="http://127.0.0.1:1/hook")
+    )
+    asyncio.run(scenario(alert_service))
+    [delivery] = alerts.list_alerts()[0].deliveries
+    assert (delivery.status, delivery.attempts, delivery.last_error) == (DeliveryStatus.FAILED, 1, "RuntimeError: boom")
+
+
+def test_email_destination(smtp_server):
+    alerts, notifications, dispatcher, alert_service = _setup()
+    notifications.create_destination(
+        DestinationCreate(
+            name="ops mail",
+            channel=NotificationChannel.EMAIL,
+            smtp_host="127.0.0.1",
+            smtp_port=smtp_server.server_address[1],
+            sender="anom@example.com",
+            recipients=["ops@example.com"],
+            batch_window_ms=50,
+        )
+    )
+
+    async def scenario():
+        await dispatcher.start()
+        try:
+            for _ in range(3):
+                alert_service.create_alert(_alert_payload(uuid4()))
+            await asyncio.sleep(0)
+            await dispatcher.drain()
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert len(smtp_server.messages) == 1
+    assert "Subject: [anom] 3 alert(s)" in smtp_server.messages[0]
+    assert all(a.deliveries[0].status is DeliveryStatus.DELIVERED for a in alerts.list_alerts())
+
+
+def test_enqueue_is_noop_when_not_started(caplog):
+    alerts, notifications, dispatcher, alert_service = _setup()
+    notifications.create_destination(
+        DestinationCreate(name="hook", channel=NotificationChannel.WEBHOOK, url="http://127.0.0.1:9/")
+    )
+    alert = alert_service.create_alert(_alert_payload(uuid4()))
+    assert alert.created_at <= datetime.utcnow()
+    assert alerts.get_alert(alert.id).deliveries == []
+    assert dispatcher.dropped == 1
+    assert "dispatcher is not running" in caplog.text
+
+
+def test_full_queue_drops_and_deleted_destination_stops_its_worker():
+    alerts, _, dispatcher, alert_service = _setup(queue_capacity=2)
+    destinations = DestinationRepository()
+    dispatcher._destinations = destinations
+    notifications = NotificationService(destinations, delete_listeners=[dispatcher.forget_destination])
+    stalled = asyncio.Event()
+
+    async def never_sends(client, destination, batch, timeout):
+        await stalled.wait()
+
+    dispatcher.sender = never_sends
+    destination = notifications.create_destination(
+        DestinationCreate(
+            name="slow",
+            channel=NotificationChannel.WEBHOOK,
+            url="http://127.0.0.1:9/",
+            batch_size=1,
+            max_concurrency=1,
+        )
+    )
+
+    async def scenario():
+        await dispatcher.start()
+        try:
+            for _ in range(5):
+                alert_service.create_alert(_alert_payload(uuid4()))
+                await asyncio.sleep(0)
+            worker = dispatcher._workers[destination.id]
+            notifications.delete_destination(destination.id)
+            await asyncio.sleep(0.01)
+            assert destination.id not in dispatcher._workers
+            assert worker.task.done()
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    statuses = [a.deliveries[0] for a in alerts.list_alerts()]
+    assert dispatcher.dropped == len([d for d in statuses if d.last_error == "notification queue full"]) > 0
+    assert all(d.status is DeliveryStatus.FAILED for d in statuses if d.last_error is not None)
+    assert any(d.last_error == "destination deleted" for d in statuses)
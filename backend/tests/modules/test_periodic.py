@@ -0,0 +1,26 @@
+import threading
+
+from anom.core.periodic import PeriodicWorker
+
+
+def test_worker_keeps_running_after_a_failure_and_stops_cleanly():
+    calls = []
+    third_call = threading.Event()
+
+    def task():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        if len(calls) == 3:
+            third_call.set()
+
+    worker = PeriodicWorker(task, 0.001, "anom-test-worker")
+    worker.start()
+    worker.start()  # already running: no second thread
+    assert third_call.wait(5)
+    worker.stop()
+    stopped_at = len(calls)
+    assert set(calls) == {"anom-test-worker"}
+    assert not any(thread.name == "anom-test-worker" for thread in threading.enumerate())
+    threading.Event().wait(0.02)
+    assert len(calls) == stopped_at
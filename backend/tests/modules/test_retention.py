@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from anom.modules.ingestion.domain import RetentionPolicy, RollupResolution
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.retention import RetentionService, RollupStore
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _fill(repo, business_id, count):
+    for i in range(count):
+        repo.add_event(
+            StoredEvent.create(
+                business_id=business_id,
+                payload={"durationMs": i, "route": "a", "ok": True},
+                received_at=NOW - timedelta(seconds=count - i),
+            )
+        )
+
+
+def test_compaction_by_age_folds_into_rollups():
+    repo = EventRepository()
+    business_id = uuid4()
+    _fill(repo, business_id, 180)
+    service = RetentionService(repo)
+    service.set_policy(business_id, RetentionPolicy(max_age_seconds=60))
+
+    assert service.compact(now=NOW) == 120
+    remaining = repo.list_events(business_id)
+    assert len(remaining) == 60
+    assert min(e.received_at for e in remaining) >= NOW - timedelta(seconds=60)
+
+    minutes = service.list_rollups(business_id, RollupResolution.MINUTE)
+    assert [r.bucket_start for r in minutes] == [datetime(2024, 1, 1, 11, 57), datetime(2024, 1, 1, 11, 58)]
+    assert sum(r.count for r in minutes) == 120
+    first = minutes[0].fields["durationMs"]
+    assert (first.count, first.min, first.max, first.sum) == (60, 0.0, 59.0, float(sum(range(60))))
+    assert "route" not in minutes[0].fields and "ok" not in minutes[0].fields
+
+    hours = service.list_rollups(business_id, RollupResolution.HOUR)
+    assert len(hours) == 1 and hours[0].count == 120
+
+    assert service.compact(now=NOW) == 0
+
+
+def test_compaction_by_count_keeps_latest_events():
+    repo = EventRepository()
+    business_id = uuid4()
+    other_id = uuid4()
+    _fill(repo, business_id, 50)
+    _fill(repo, other_id, 50)
+    service = RetentionService(repo)
+    service.set_policy(business_id, RetentionPolicy(max_events=10))
+
+    assert service.compact(now=NOW) == 40
+    assert [e.payload["durationMs"] for e in repo.list_events(business_id)] == list(range(40, 50))
+    assert repo.count_events(other_id) == 50
+
+
+def test_rollup_since_accepts_aware_datetimes_and_minutes_expire():
+    repo = EventRepository()
+    business_id = uuid4()
+    _fill(repo, business_id, 180)
+    service = RetentionService(repo, RollupStore(minute_retention_seconds=3600))
+    service.set_policy(business_id, RetentionPolicy(max_age_seconds=60))
+    service.compact(now=NOW)
+
+    since = datetime(2024, 1, 1, 11, 58, tzinfo=timezone.utc)
+    minutes = service.list_rollups(business_id, RollupResolution.MINUTE, since)
+    assert [r.bucket_start for r in minutes] == [datetime(2024, 1, 1, 11, 58)]
+
+    service.compact(now=NOW + timedelta(hours=1))
+    assert service.list_rollups(business_id, RollupResolution.MINUTE) == []
+    assert service.list_rollups(business_id, RollupResolution.HOUR)[0].count == 180
@@ -0,0 +1,55 @@
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCondition, RuleDefinition, RuleOperator
+from anom.modules.rules.repo import EMPTY_SNAPSHOT, RuleRepository
+
+
+def _rule(business_id, threshold):
+    return RuleDefinition(
+        id=uuid4(),
+        business_id=business_id,
+        name=f"over {threshold}",
+        condition=RuleCondition(field="value", operator=RuleOperator.GT, value=threshold),
+        created_at=datetime.utcnow(),
+    )
+
+
+def test_writes_publish_new_versions_and_leave_held_snapshots_alone():
+    business_id = uuid4()
+    repo = RuleRepository()
+    assert repo.snapshot(business_id) is EMPTY_SNAPSHOT
+
+    repo.add_rule(_rule(business_id, 10))
+    held = repo.snapshot(business_id)
+    repo.add_rule(_rule(business_id, 20))
+    current = repo.snapshot(business_id)
+
+    assert (held.version, len(held)) == (1, 1)
+    assert (current.version, len(current)) == (2, 2)
+    assert current.rules[0] is held.rules[0]
+
+    event = StoredEvent.create(business_id, {"value": 15}, datetime.utcnow())
+    assert [rule.name for rule in RuleDispatcher(repo).evaluate_event(business_id, event)] == ["over 10"]
+
+
+def test_concurrent_writers_lose_no_rules():
+    business_id = uuid4()
+    repo = RuleRepository(lock_stripes=4)
+
+    def write():
+        for i in range(50):
+            repo.add_rule(_rule(business_id, i))
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = repo.snapshot(business_id)
+    assert snapshot.version == 400
+    assert len(snapshot) == len(repo.list_rules(business_id)) == 400
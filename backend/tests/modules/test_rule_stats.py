@@ -0,0 +1,62 @@
+from datetime import datetime
+from uuid import uuid4
+
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rule_engine.stats import RuleStatsRecorder
+from anom.modules.rules.domain import RuleCondition, RuleDefinition, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+
+
+def _rule(business_id, value, name="rule"):
+    return RuleDefinition(
+        id=uuid4(),
+        business_id=business_id,
+        name=name,
+        condition=RuleCondition(field="durationMs", operator=RuleOperator.GT, value=value),
+        created_at=datetime.utcnow(),
+    )
+
+
+def _event(business_id, payload):
+    return StoredEvent.create(business_id=business_id, payload=payload, received_at=datetime.utcnow())
+
+
+def test_dispatcher_counts_evaluations_matches_and_errors():
+    business_id = uuid4()
+    repo = RuleRepository()
+    numeric = repo.add_rule(_rule(business_id, 5000, "numeric"))
+    broken = repo.add_rule(_rule(business_id, "not-a-number", "broken"))
+    recorder = RuleStatsRecorder(sample_every=2)
+    dispatcher = RuleDispatcher(repo, recorder)
+
+    for duration in (1000, 7000, 9000, 100):
+        dispatcher.evaluate_event(business_id, _event(business_id, {"durationMs": duration}))
+
+    numeric_stats = recorder.get_stats(numeric.id, business_id)
+    assert numeric_stats.evaluations == 4
+    assert numeric_stats.matches == 2
+    assert numeric_stats.errors == 0
+    assert numeric_stats.sampled_evaluations == 2
+
+    broken_stats = recorder.get_stats(broken.id, business_id)
+    assert broken_stats.matches == 0
+    assert broken_stats.errors == 4
+
+    top = recorder.top_costliest(business_id, limit=1)
+    assert len(top) == 1
+    assert recorder.top_costliest(uuid4()) == []
+
+
+def test_matches_are_exact_while_evaluations_are_sampled_per_event():
+    business_id = uuid4()
+    repo = RuleRepository()
+    rule = repo.add_rule(_rule(business_id, 5000))
+    recorder = RuleStatsRecorder(sample_every=4)
+    dispatcher = RuleDispatcher(repo, recorder)
+
+    for duration in (100, 7000, 8000, 9000, 200):
+        dispatcher.evaluate_event(business_id, _event(business_id, {"durationMs": duration}))
+
+    stats = recorder.get_stats(rule.id, business_id)
+    assert (stats.matches, stats.sampled_evaluations, stats.evaluations) == (3, 2, 8)
@@ -0,0 +1,50 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+from anom.core.serialization import EncodedCache, dumps, encode_model, encode_models
+from anom.modules.alerts.domain import Alert, AlertDelivery, AlertStatus, DeliveryStatus
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rules.domain import SeverityLevel
+
+
+def _alert(**changes):
+    values = dict(
+        id=uuid4(),
+        business_id=uuid4(),
+        rule_id=uuid4(),
+        event_id=uuid4(),
+        message="latency above 900",
+        severity=SeverityLevel.CRITICAL,
+        created_at=datetime(2024, 5, 1, 12, 30, 0, 125),
+        status=AlertStatus.ACKED,
+        acknowledged_by="ops",
+        deliveries=[
+            AlertDelivery(destination_id=uuid4(), status=DeliveryStatus.FAILED, attempts=2, updated_at=datetime.now())
+        ],
+    )
+    values.update(changes)
+    return Alert(**values)
+
+
+def test_plan_encoding_matches_pydantic_json():
+    alert = _alert()
+    assert json.loads(encode_model(alert)) == json.loads(alert.model_dump_json())
+    alerts = [alert, _alert(deliveries=[], acknowledged_by=None)]
+    assert json.loads(encode_models(alerts)) == [json.loads(a.model_dump_json()) for a in alerts]
+    assert json.loads(dumps({"alerts": alerts, "next": None})) == {
+        "alerts": [json.loads(a.model_dump_json()) for a in alerts],
+        "next": None,
+    }
+
+
+def test_stored_event_bytes_are_cached_and_match_the_wire_model():
+    event = StoredEvent.create(uuid4(), {"latency": 12, "path": "/checkout", "ok": True}, datetime(2024, 1, 2, 3, 4))
+    cache = EncodedCache(max_entries=10)
+
+    first = cache.encode(event.id_int, event.to_primitive)
+    second = cache.encode(event.id_int, event.to_primitive)
+
+    assert first is second
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert json.loads(first) == json.loads(event.to_model().model_dump_json())
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from anom.modules.ingestion.domain import SeriesResolution
+from anom.modules.ingestion.series import TimeSeriesStore
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def test_series_aggregates_per_resolution():
+    store = TimeSeriesStore()
+    business_id = uuid4()
+    store.ensure_fields(business_id, ["durationMs"])
+    for second in range(0, 600, 30):
+        store.record(business_id, START + timedelta(seconds=second), {"durationMs": second, "route": "a", "ok": True})
+
+    minutes = store.series(business_id, "durationMs", SeriesResolution.MINUTE)
+    assert len(minutes) == 10
+    assert minutes[0].bucket_start == START
+    assert (minutes[0].count, minutes[0].sum, minutes[0].min, minutes[0].max, minutes[0].last) == (2, 30.0, 0.0, 30.0, 30.0)
+
+    five = store.series(business_id, "durationMs", SeriesResolution.FIVE_MINUTES)
+    assert [p.count for p in five] == [10, 10]
+
+    hour = store.series(business_id, "durationMs", SeriesResolution.HOUR)
+    assert len(hour) == 1 and hour[0].count == 20 and hour[0].last == 570.0
+
+    since = store.series(business_id, "durationMs", SeriesResolution.MINUTE, since=START + timedelta(minutes=8))
+    assert [p.bucket_start for p in since] == [START + timedelta(minutes=8), START + timedelta(minutes=9)]
+
+    assert store.series(business_id, "route", SeriesResolution.MINUTE) == []
+    assert store.series(business_id, "ok", SeriesResolution.MINUTE) == []
+
+
+def test_ring_recycles_old_buckets():
+    store = TimeSeriesStore(capacity={SeriesResolution.MINUTE: 3})
+    business_id = uuid4()
+    store.ensure_fields(business_id, ["v"])
+    for minute in range(5):
+        store.record(business_id, START + timedelta(minutes=minute), {"v": minute})
+    # too old for the ring: ignored
+    store.record(business_id, START, {"v": 100})
+
+    points = store.series(business_id, "v", SeriesResolution.MINUTE)
+    assert [p.last for p in points] == [2.0, 3.0, 4.0]
+
+
+def test_only_declared_fields_get_rings_up_to_the_cap():
+    store = TimeSeriesStore(max_fields=2)
+    business_id = uuid4()
+    store.record(business_id, START, {"a": 1})
+    assert store.series(business_id, "a", SeriesResolution.MINUTE) == []
+
+    store.ensure_fields(business_id, ["a", "b", "c"])
+    store.record_many(business_id, START, [{"a": 1, "b": 2, "c": 3, "junk": 4}, {"a": 5}])
+    assert [p.count for p in store.series(business_id, "a", SeriesResolution.MINUTE)] == [2]
+    assert len(store.series(business_id, "b", SeriesResolution.MINUTE)) == 1
+    assert store.series(business_id, "c", SeriesResolution.MINUTE) == []
+    assert store.series(business_id, "junk", SeriesResolution.MINUTE) == []
+
+    store.ensure_fields(business_id, ["b"])
+    assert store.series(business_id, "a", SeriesResolution.MINUTE) == []
+    assert len(store.series(business_id, "b", SeriesResolution.MINUTE)) == 1
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from anom.common_models.time import epoch_micros
+from anom.core.sketches import CountMinSketch, HyperLogLog, hash_value
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.sketches import SketchStore
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCreate, RuleDefinition, RuleKind, SketchRuleSpec
+from anom.modules.rules.repo import RuleRepository
+
+START = datetime(2024, 6, 1)
+
+
+def test_sketches_estimate_and_merge():
+    counts = CountMinSketch(width=512, depth=4)
+    for i in range(20_000):
+        counts.add(hash_value(f"route-{i % 200}"))
+    for _ in range(5_000):
+        counts.add(hash_value("hot"))
+    assert 5_000 <= counts.estimate(hash_value("hot")) < 5_000 + 0.01 * counts.total
+
+    left, right = HyperLogLog(11), HyperLogLog(11)
+    for i in range(30_000):
+        (left if i % 2 else right).add(hash_value(i))
+    assert left.estimate() == pytest.approx(15_000, rel=0.06)
+    left.merge(right)
+    assert left.estimate() == pytest.approx(30_000, rel=0.06)
+
+
+def _rule(business_id, kind, **spec):
+    payload = RuleCreate(name=kind.value, kind=kind, sketch=SketchRuleSpec(field="host", **spec))
+    return RuleDefinition(id=uuid4(), business_id=business_id, created_at=START, **payload.model_dump())
+
+
+def _feed(store, dispatcher, business_id, seconds, host):
+    event = StoredEvent.create(business_id, {"host": host}, START + timedelta(seconds=seconds))
+    store.record(business_id, event.ts_us, event.payload)
+    return dispatcher.evaluate_event(business_id, event)
+
+
+def test_heavy_hitter_rule_fires_once_per_cooldown():
+    business_id = uuid4()
+    store = SketchStore(slot_seconds=60, slots=10)
+    store.ensure_fields(business_id, ["host"])
+    rules = RuleRepository()
+    rule = rules.add_rule(_rule(business_id, RuleKind.HEAVY_HITTER, threshold=0.3, min_count=50, window_seconds=120))
+    dispatcher = RuleDispatcher(rules, sketches=store)
+
+    fired = []
+    for i in range(400):
+        host = "h-hot" if i >= 200 and i % 4 else f"h{i % 50}"
+        if _feed(store, dispatcher, business_id, i * 0.1, host):
+            fired.append(i)
+    # the hot host crosses 30% of the window once; the cooldown swallows the rest
+    assert len(fired) == 1 and 300 < fired[0] < 350
+    assert dispatcher.stats.get_stats(rule.id, business_id).matches == 1
+
+    summary = store.summary(business_id, "host", 120, top=3, now=START + timedelta(seconds=30))
+    assert summary.total == 400
+    assert summary.top[0].value == "h-hot" and summary.top[0].count >= 150
+    assert summary.distinct == pytest.approx(51, abs=2)
+
+
+def test_cardinality_drop_compares_complete_windows():
+    business_id = uuid4()
+    store = SketchStore(slot_seconds=60, slots=10)
+    store.ensure_fields(business_id, ["host"])
+    rules = RuleRepository()
+    rules.add_rule(_rule(business_id, RuleKind.CARDINALITY_DROP, threshold=0.5, min_count=20, window_seconds=120))
+    dispatcher = RuleDispatcher(rules, sketches=store)
+
+    fired = []
+    for minute in range(8):
+        hosts = 40 if minute < 4 else 15  # half the fleet disappears after four minutes
+        for i in range(hosts):
+            if _feed(store, dispatcher, business_id, minute * 60 + i, f"h{i}"):
+                fired.append(minute)
+    assert fired == [6]
+    assert store.distinct_change(business_id, "host", 120, epoch_micros(START + timedelta(minutes=6)))[0] > 35
+
+
+def test_rule_kind_validation():
+    with pytest.raises(ValidationError):
+        RuleCreate(name="x", kind=RuleKind.HEAVY_HITTER)
+    with pytest.raises(ValidationError):
+        RuleCreate(name="x", sketch=SketchRuleSpec(field="host", threshold=0.5))
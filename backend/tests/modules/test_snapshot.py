@@ -0,0 +1,162 @@
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from anom.core.snapshot import SnapshotError, SnapshotManager
+from anom.modules.alerts.domain import AlertCreate
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.business_def.domain import BusinessCreate, FieldDataType, FieldDefinitionCreate
+from anom.modules.business_def.repo import BusinessRepository
+from anom.modules.business_def.service import BusinessService
+from anom.modules.ingestion.admission import AdmissionController
+from anom.modules.ingestion.domain import (
+    AdmissionPolicy,
+    IdempotencyPolicy,
+    RetentionPolicy,
+    RollupResolution,
+)
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.ingestion.retention import RetentionService, RollupStore
+from anom.modules.ingestion.service import IngestionService
+from anom.modules.rule_engine.dispatcher import RuleDispatcher
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+from anom.modules.rules.repo import RuleRepository
+from anom.modules.rules.service import RuleService
+from anom.modules.views.domain import ViewCreate
+from anom.modules.views.repo import ViewRepository
+from anom.modules.views.service import ViewService
+
+
+def _sections():
+    events = EventRepository()
+    return {
+        "businesses": BusinessRepository(),
+        "rules": RuleRepository(),
+        "events": events,
+        "alerts": AlertRepository(),
+        "retention": RetentionService(events),
+    }
+
+
+def _populate(sections):
+    businesses = BusinessService(sections["businesses"])
+    business = businesses.create_business(BusinessCreate(name="snap"))
+    businesses.add_field(business.id, FieldDefinitionCreate(name="durationMs", data_type=FieldDataType.INTEGER))
+    rule = RuleService(sections["rules"], businesses).create_rule(
+        business.id,
+        RuleCreate(name="slow", condition=RuleCondition(field="durationMs", operator=RuleOperator.GT, value=5)),
+    )
+    start = datetime(2024, 1, 1)
+    for i in range(2500):
+        sections["events"].add_event(
+            StoredEvent.create(
+                business_id=business.id,
+                payload={"durationMs": i, "tags": ["a", i]},
+                received_at=start + timedelta(seconds=i),
+            )
+        )
+    AlertService(sections["alerts"]).create_alert(
+        AlertCreate(business_id=business.id, rule_id=rule.id, event_id=uuid4(), message="m", severity=rule.severity)
+    )
+    sections["retention"].set_policy(business.id, RetentionPolicy(max_events=10_000))
+    return business.id
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "state" / "anom.snap")
+    source = _sections()
+    business_id = _populate(source)
+    written = SnapshotManager(path, source, chunk_size=1000).write()
+    assert written == 2500 + 1 + 1 + 1 + 1 + 1
+    assert os.listdir(tmp_path / "state") == ["anom.snap"]
+
+    target = _sections()
+    assert SnapshotManager(path, target).load() == written
+
+    assert target["businesses"].list_businesses() == source["businesses"].list_businesses()
+    assert target["businesses"].list_fields(business_id) == source["businesses"].list_fields(business_id)
+    assert target["rules"].list_rules(business_id) == source["rules"].list_rules(business_id)
+    assert target["alerts"].list_alerts() == source["alerts"].list_alerts()
+    assert target["retention"].get_policy(business_id) == RetentionPolicy(max_events=10_000)
+    restored = target["events"].list_events(business_id)
+    original = source["events"].list_events(business_id)
+    assert [e.to_model() for e in restored] == [e.to_model() for e in original]
+
+
+def test_missing_snapshot_loads_nothing(tmp_path):
+    assert SnapshotManager(str(tmp_path / "none.snap"), _sections()).load() == 0
+
+
+def test_truncated_snapshot_is_rejected_and_cleared(tmp_path):
+    path = str(tmp_path / "anom.snap")
+    source = _sections()
+    business_id = _populate(source)
+    SnapshotManager(path, source, chunk_size=500).write()
+    with open(path, "r+b") as handle:
+        handle.truncate(os.path.getsize(path) // 2)
+
+    target = _sections()
+    with pytest.raises(SnapshotError):
+        SnapshotManager(path, target).load()
+    assert target["events"].count_events(business_id) == 0
+    assert target["businesses"].list_businesses() == []
+
+
+def test_policies_rollups_and_views_survive_a_restore(tmp_path):
+    path = str(tmp_path / "anom.snap")
+
+    def sections():
+        business_repository = BusinessRepository()
+        businesses = BusinessService(business_repository)
+        events = EventRepository()
+        rollups = RollupStore()
+        views = ViewRepository()
+        ingestion = IngestionService(
+            businesses, events, RuleDispatcher(RuleRepository()), AlertService(AlertRepository())
+        )
+        return {
+            "businesses": business_repository,
+            "views": views,
+            "retention": RetentionService(events, rollups),
+            "rollups": rollups,
+            "idempotency": ingestion,
+            "admission": AdmissionController(),
+            "events": events,
+        }, ViewService(views, businesses, events)
+
+    source, _ = sections()
+    business = BusinessService(source["businesses"]).create_business(BusinessCreate(name="policies"))
+    source["idempotency"].set_idempotency_policy(business.id, IdempotencyPolicy(key_field="requestId"))
+    source["admission"].set_policy(business.id, AdmissionPolicy(rate_per_second=5))
+    source["retention"].set_policy(business.id, RetentionPolicy(max_events=1))
+    now = datetime(2024, 1, 1, 12, 0, 30)
+    for i in range(3):
+        source["events"].add_event(
+            StoredEvent.create(business_id=business.id, payload={"durationMs": i}, received_at=now)
+        )
+    source["retention"].compact(now=now)
+    SnapshotManager(path, source).write()
+
+    target, views = sections()
+    SnapshotManager(path, target).load()
+    assert target["idempotency"].get_idempotency_policy(business.id).key_field == "requestId"
+    assert target["admission"].get_policy(business.id).rate_per_second == 5
+    [rollup] = target["retention"].list_rollups(business.id, RollupResolution.MINUTE)
+    assert (rollup.count, rollup.fields["durationMs"].max) == (2, 1.0)
+
+    # a view created before the snapshot still has its cached buckets invalidated afterwards
+    view = ViewService(source["views"], BusinessService(source["businesses"]), source["events"]).create_view(
+        business.id, ViewCreate(name="count", bucket_seconds=60, range_seconds=60)
+    )
+    SnapshotManager(path, source).write()
+    target, views = sections()
+    SnapshotManager(path, target).load()
+    assert [p.count for p in views.execute_view(business.id, view.id, now=now).points] == [1]
+    event = StoredEvent.create(business_id=business.id, payload={"durationMs": 9}, received_at=now)
+    target["events"].add_event(event)
+    views.on_event(event)
+    assert [p.count for p in views.execute_view(business.id, view.id, now=now).points] == [2]
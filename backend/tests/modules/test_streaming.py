@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from anom.api import deps
+from anom.api.main_app import create_app
+from anom.modules.alerts.domain import Alert
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rules.domain import SeverityLevel
+from anom.modules.streaming.domain import StreamKind, StreamOverflowError
+from anom.modules.streaming.hub import StreamHub
+
+
+def _alert(business_id, message="boom"):
+    return Alert(
+        id=uuid4(),
+        business_id=business_id,
+        rule_id=uuid4(),
+        event_id=uuid4(),
+        message=message,
+        severity=SeverityLevel.WARNING,
+        created_at=datetime(2024, 8, 1),
+    )
+
+
+def test_subscribers_share_one_ring_and_filter_by_business():
+    first, second = uuid4(), uuid4()
+    hub = StreamHub(capacity=100)
+
+    async def collect(subscription, count):
+        received = []
+        with subscription:
+            async for batch in subscription:
+                received.extend(batch)
+                if len(received) >= count:
+                    return received
+
+    async def scenario():
+        await hub.start()
+        everything = asyncio.create_task(collect(hub.subscribe(), 3))
+        only_first = asyncio.create_task(
+            collect(hub.subscribe(business_ids=frozenset({first}), kinds=frozenset(StreamKind)), 3)
+        )
+        await asyncio.sleep(0)
+        # alerts are usually created in threadpool handlers, off the event loop
+        publisher = threading.Thread(target=lambda: [hub.publish_alert(_alert(b)) for b in (first, second, first)])
+        publisher.start()
+        publisher.join()
+        hub.publish_event(StoredEvent.create(second, {"x": 1}, datetime(2024, 8, 1)))
+        hub.publish_event(StoredEvent.create(first, {"x": 2}, datetime(2024, 8, 1)))
+        return await asyncio.wait_for(asyncio.gather(everything, only_first), 5)
+
+    everything, only_first = asyncio.run(scenario())
+    assert [m.kind for m in everything] == [StreamKind.ALERT] * 3
+    assert [(m.seq, m.kind.value) for m in only_first] == [(1, "alert"), (3, "alert"), (4, "event")]
+    # the event of the unwatched business was never published
+    assert hub.stats().last_seq == 4 and hub.stats().subscribers == 0
+    assert only_first[0] is everything[0]
+    frame = everything[0].sse_frame()
+    assert frame.startswith(b"id: 1\nevent: alert\ndata: {") and frame.endswith(b"\n\n")
+    assert json.loads(everything[0].envelope())["data"]["message"] == "boom"
+
+
+def test_slow_subscriber_is_dropped_and_resumes_by_cursor():
+    business_id = uuid4()
+    hub = StreamHub(capacity=4)
+    for i in range(10):
+        hub.publish_alert(_alert(business_id, f"a{i}"))
+
+    with pytest.raises(StreamOverflowError) as exc:
+        hub.read(2)
+    assert exc.value.oldest_seq == 7
+    messages, cursor = hub.read(exc.value.oldest_seq)
+    assert [m.seq for m in messages] == [7, 8, 9, 10] and cursor == 11
+
+    async def scenario():
+        await hub.start()
+        with pytest.raises(StreamOverflowError):
+            async for _ in hub.subscribe(after=1):
+                pass  # pragma: no cover
+        await hub.stop()
+
+    asyncio.run(scenario())
+    assert hub.stats().dropped == 1
+
+
+def test_websocket_streams_alerts_of_a_business():
+    for provider in (deps.get_stream_hub, deps.get_alert_service, deps.get_ingestion_service):
+        provider.cache_clear()
+    with TestClient(create_app()) as client:
+        business_id = client.post("/businesses/", json={"name": "stream"}).json()["id"]
+        client.post(f"/businesses/{business_id}/fields", json={"name": "n", "data_type": "integer"})
+        client.post(
+            f"/rules/{business_id}",
+            json={"name": "big", "condition": {"field": "n", "operator": "gt", "value": 10}},
+        )
+        with client.websocket_connect(f"/stream/ws?business_id={business_id}&events=true") as websocket:
+            client.post(f"/ingest/{business_id}", json={"payload": {"n": 50}})
+            event, alert = websocket.receive_json(), websocket.receive_json()
+        assert event["kind"] == "event" and event["data"]["payload"] == {"n": 50}
+        assert alert["kind"] == "alert" and alert["data"]["message"] == "Rule 'big' triggered"
+        assert alert["seq"] == event["seq"] + 1
+        assert client.get("/stream/stats").json()["last_seq"] == alert["seq"]
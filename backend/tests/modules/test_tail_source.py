@@ -0,0 +1,158 @@
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from anom.modules.business_def.domain import FieldDataType
+from anom.modules.ingestion.tail_source import (
+    FileSourceConfig,
+    FileTailer,
+    SourceFormat,
+    SourceWorker,
+    SourceWorkerConfig,
+)
+from anom.modules.rules.domain import RuleCondition, RuleCreate, RuleOperator
+from anom.modules.rules.service import RuleService
+
+PATTERN = r"(?P<level>[A-Z]+) job=(?P<job>\S+) took=(?P<ms>\d+)ms"
+
+
+@pytest.fixture()
+def ingestion(make_ingestion):
+    setup = make_ingestion("jobs", [("durationMs", FieldDataType.INTEGER)])
+    return setup.business_id, setup.service, setup.events
+
+
+def _append(path, text):
+    with open(path, "a") as handle:
+        handle.write(text)
+
+
+def test_regex_and_json_lines_are_mapped_and_batched(tmp_path, ingestion):
+    business_id, service, events = ingestion
+    regex_log, json_log = tmp_path / "jobs.log", tmp_path / "jobs.jsonl"
+    _append(regex_log, "INFO job=a took=12ms\nnot a job line\nWARN job=b took=340ms\n\n")
+    _append(json_log, '{"ms": 7, "job": "c"}\n[1, 2]\n{"ms": "x", "job": "d"}\n')
+    config = SourceWorkerConfig(
+        batch_size=2,
+        sources=[
+            FileSourceConfig(
+                path=str(regex_log),
+                business_id=business_id,
+                format=SourceFormat.REGEX,
+                pattern=PATTERN,
+                fields={"level": "level", "jobName": "job", "durationMs": "ms"},
+            ),
+            FileSourceConfig(
+                path=str(json_log), business_id=business_id, fields={"durationMs": "ms", "jobName": "job"}
+            ),
+        ],
+    )
+    worker = SourceWorker(config, service)
+    assert worker.drain() == 7
+
+    payloads = [event.payload for event in events.list_events(business_id)]
+    assert {"level": "WARN", "jobName": "b", "durationMs": 340} in payloads
+    assert {"durationMs": 7, "jobName": "c"} in payloads
+    stats = worker.stats
+    assert (stats.lines, stats.ingested, stats.unparsed, stats.rejected) == (7, 3, 2, 1)
+
+    with pytest.raises(ValidationError):
+        FileSourceConfig(
+            path="x", business_id=business_id, format=SourceFormat.REGEX, pattern=PATTERN, fields={"a": "b"}
+        )
+
+
+def test_batches_skip_per_event_dispatch_until_there_is_a_rule(make_ingestion, monkeypatch):
+    setup = make_ingestion("jobs", [("durationMs", FieldDataType.INTEGER)])
+    business_id, service, events = setup.business_id, setup.service, setup.events
+    dispatch = service._dispatch
+    dispatched = []
+
+    def counting_dispatch(*args):
+        dispatched.append(args[0].id)
+        return dispatch(*args)
+
+    monkeypatch.setattr(service, "_dispatch", counting_dispatch)
+    assert service.ingest_batch(business_id, [{"durationMs": i} for i in range(100)]).accepted == 100
+    assert dispatched == []
+
+    rule = RuleCreate(name="slow", condition=RuleCondition(field="durationMs", operator=RuleOperator.GT, value=97))
+    RuleService(setup.rules, setup.business_service).create_rule(business_id, rule)
+    result = service.ingest_batch(business_id, [{"durationMs": i} for i in range(100)])
+    assert (result.accepted, result.alerts, len(dispatched)) == (100, 2, 100)
+    assert len({event.id for event in events.list_events(business_id)}) == 200
+
+
+def test_tailer_follows_partial_lines_rotation_and_truncation(tmp_path):
+    path = tmp_path / "app.log"
+    _append(path, "one\ntw")
+    tailer = FileTailer(str(path), chunk_bytes=4096)
+    assert tailer.read_lines() == ["one"] and tailer.offset == 4
+    _append(path, "o\n")
+    assert tailer.read_lines() == ["two"] and tailer.read_lines() == []
+
+    _append(path, "tail-without-newline")
+    os.rename(path, tmp_path / "app.log.1")
+    _append(path, "fresh\n")
+    assert tailer.read_lines() == []  # picks up the pending partial line first
+    assert tailer.read_lines() == ["tail-without-newline"]
+    assert tailer.read_lines() == ["fresh"] and tailer.offset == 6
+
+    with open(path, "w") as handle:
+        handle.write("new\n")
+    assert tailer.read_lines() == []  # notices the truncation
+    assert tailer.read_lines() == ["new"]
+
+
+def test_checkpoint_resumes_after_restart(tmp_path, ingestion):
+    business_id, service, events = ingestion
+    log, checkpoint = tmp_path / "app.jsonl", tmp_path / "offsets.json"
+    _append(log, "".join(f'{{"durationMs": {i}}}\n' for i in range(5)))
+    config = SourceWorkerConfig(
+        checkpoint_path=str(checkpoint),
+        sources=[FileSourceConfig(path=str(log), business_id=business_id)],
+    )
+    first = SourceWorker(config, service)
+    assert first.drain() == 5
+    first.close()
+
+    _append(log, '{"durationMs": 5}\n')
+    second = SourceWorker(config, service)
+    assert second.drain() == 1
+    assert [event.payload["durationMs"] for event in events.list_events(business_id)] == list(range(6))
+
+
+def test_refused_batches_are_retried_before_the_checkpoint_moves(tmp_path, ingestion, monkeypatch):
+    business_id, service, events = ingestion
+    log, checkpoint = tmp_path / "app.jsonl", tmp_path / "offsets.json"
+    _append(log, "".join(f'{{"durationMs": {i}}}\n' for i in range(3)))
+    ingest_batch = service.ingest_batch
+    calls = []
+
+    def refuse_once(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise HTTPException(status_code=404, detail="Business not found")
+        return ingest_batch(*args, **kwargs)
+
+    monkeypatch.setattr(service, "ingest_batch", refuse_once)
+    config = SourceWorkerConfig(
+        checkpoint_path=str(checkpoint),
+        poll_interval_seconds=0.05,
+        sources=[FileSourceConfig(path=str(log), business_id=business_id)],
+    )
+    worker = SourceWorker(config, service)
+    assert worker.drain() == 3
+    assert not checkpoint.exists() and events.list_events(business_id) == []
+    assert (worker.stats.retries, worker.stats.rejected) == (1, 0)
+
+    _append(log, '{"durationMs": 3}\n')
+    assert worker.poll() == 0  # still backing off
+    time.sleep(0.06)
+    assert worker.poll() == 3  # the held batch, before any new line
+    assert worker.drain() == 1
+    assert [event.payload["durationMs"] for event in events.list_events(business_id)] == list(range(4))
+    assert checkpoint.exists()
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pydantic import ValidationError
+
+from anom.core.cache import LRUCache
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.rules.domain import RuleCondition, RuleOperator
+from anom.modules.views.domain import ViewAggregation, ViewCreate
+from anom.modules.views.repo import ViewRepository
+from anom.modules.views.service import ViewService
+
+NOW = datetime(2024, 1, 1, 12, 0, 30)
+
+
+@pytest.fixture()
+def views(make_ingestion):
+    setup = make_ingestion("views")
+    cache = LRUCache(max_entries=1000)
+    service = ViewService(ViewRepository(), setup.business_service, setup.events, cache)
+    return setup.business_id, setup.events, cache, service
+
+
+def _ingest(events, service, business_id, received_at, payload):
+    event = StoredEvent.create(business_id=business_id, payload=payload, received_at=received_at)
+    events.add_event(event)
+    service.on_event(event)
+
+
+def test_view_groups_filters_and_aggregates(views):
+    business_id, events, _, service = views
+    view = service.create_view(
+        business_id,
+        ViewCreate(
+            name="avg by route",
+            filters=[RuleCondition(field="status", operator=RuleOperator.EQ, value="ok")],
+            group_by="route",
+            aggregation=ViewAggregation.AVG,
+            field="durationMs",
+            bucket_seconds=60,
+            range_seconds=180,
+        ),
+    )
+    for offset, route, duration, state in [
+        (-4000, "a", 1, "ok"),
+        (-150, "a", 100, "ok"),
+        (-140, "a", 300, "ok"),
+        (-130, "b", 50, "ok"),
+        (-120, "a", 9999, "failed"),
+        (-10, "b", 70, "ok"),
+    ]:
+        payload = {"route": route, "durationMs": duration, "status": state}
+        _ingest(events, service, business_id, NOW + timedelta(seconds=offset), payload)
+
+    result = service.execute_view(business_id, view.id, now=NOW)
+    points = [(p.bucket_start.minute, p.group, p.count, p.value) for p in result.points]
+    assert points == [(58, "a", 2, 200.0), (58, "b", 1, 50.0), (0, "b", 1, 70.0)]
+
+
+def test_ingest_invalidates_only_touched_bucket(views):
+    business_id, events, cache, service = views
+    view = service.create_view(business_id, ViewCreate(name="count", bucket_seconds=60, range_seconds=600))
+    _ingest(events, service, business_id, NOW - timedelta(minutes=5), {"x": 1})
+
+    first = service.execute_view(business_id, view.id, now=NOW)
+    assert sum(p.count for p in first.points) == 1
+    misses = cache.misses
+
+    _ingest(events, service, business_id, NOW, {"x": 2})
+    second = service.execute_view(business_id, view.id, now=NOW)
+    assert sum(p.count for p in second.points) == 2
+    assert cache.misses == misses + 1
+
+
+def test_numeric_aggregation_requires_field():
+    with pytest.raises(ValidationError):
+        ViewCreate(name="bad", aggregation=ViewAggregation.SUM)
+    with pytest.raises(ValidationError):
+        ViewCreate(name="bad", bucket_seconds=1, range_seconds=86400)
+
+
+def test_event_stored_during_a_scan_is_not_cached_stale(views):
+    business_id, events, cache, service = views
+    view = service.create_view(business_id, ViewCreate(name="count", bucket_seconds=60, range_seconds=60))
+    scan_range = events.scan_range
+
+    def racing_scan(*args):
+        scanned = scan_range(*args)
+        events.scan_range = scan_range
+        _ingest(events, service, business_id, NOW, {"route": "a"})  # lands after the scan, before the put
+        return scanned
+
+    events.scan_range = racing_scan
+    assert service.execute_view(business_id, view.id, now=NOW).points == []
+    assert len(cache) == 0
+    assert [p.count for p in service.execute_view(business_id, view.id, now=NOW).points] == [1]
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from anom.core.snapshot import SnapshotManager
+from anom.core.wal import FsyncPolicy, WriteAheadLog, WriteAheadLogClosedError
+from anom.modules.alerts.domain import AlertCreate, AlertStatus
+from anom.modules.alerts.repo import AlertRepository
+from anom.modules.alerts.service import AlertService
+from anom.modules.ingestion.records import StoredEvent
+from anom.modules.ingestion.repo import EventRepository
+from anom.modules.rules.domain import SeverityLevel
+
+START = datetime(2024, 1, 1)
+
+
+def _event(business_id, i):
+    return StoredEvent.create(business_id=business_id, payload={"i": i}, received_at=START + timedelta(seconds=i))
+
+
+@pytest.mark.parametrize("policy", list(FsyncPolicy))
+def test_concurrent_appends_replay_after_restart(tmp_path, policy):
+    wal = WriteAheadLog(str(tmp_path), policy=policy, group_commit_ms=1, group_commit_records=16)
+    repo = EventRepository(wal)
+    business_ids = [uuid4() for _ in range(4)]
+
+    def ingest(business_id):
+        for i in range(200):
+            repo.add_event(_event(business_id, i))
+
+    threads = [threading.Thread(target=ingest, args=(b,)) for b in business_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wal.close()
+
+    restarted = WriteAheadLog(str(tmp_path), policy=policy)
+    recovered = EventRepository()
+    assert recovered.replay_rows(row for kind, row in restarted.replay() if kind == "event") == 800
+    for business_id in business_ids:
+        assert [e.payload["i"] for e in recovered.list_events(business_id)] == list(range(200))
+    restarted.close()
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.ALWAYS)
+    for i in range(10):
+        wal.append("event", i)
+    wal.close()
+    [segment] = [name for name in os.listdir(tmp_path) if name.endswith(".log")]
+    path = tmp_path / segment
+    with open(path, "r+b") as handle:
+        handle.truncate(os.path.getsize(path) - 3)
+
+    restarted = WriteAheadLog(str(tmp_path))
+    assert [row for _, row in restarted.replay()] == list(range(9))
+    restarted.close()
+
+
+def test_snapshot_checkpoint_purges_segments_and_replay_skips_duplicates(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    snapshot_path = str(tmp_path / "anom.snap")
+    wal = WriteAheadLog(wal_dir, policy=FsyncPolicy.GROUP, group_commit_ms=1)
+    repo = EventRepository(wal)
+    business_id = uuid4()
+    for i in range(50):
+        repo.add_event(_event(business_id, i))
+    snapshots = SnapshotManager(snapshot_path, {"events": repo}, wal=wal)
+    snapshots.write()
+    assert wal.segments() == [2]
+    for i in range(50, 60):
+        repo.add_event(_event(business_id, i))
+    wal.close()
+
+    restarted = WriteAheadLog(wal_dir)
+    recovered = EventRepository(restarted)
+    SnapshotManager(snapshot_path, {"events": recovered}, wal=restarted).load()
+    # replaying twice must not duplicate anything
+    rows = [row for kind, row in restarted.replay() if kind == "event"]
+    assert recovered.replay_rows(rows) == 10
+    assert recovered.replay_rows(rows) == 0
+    assert [e.payload["i"] for e in recovered.list_events(business_id)] == list(range(60))
+    restarted.close()
+
+
+def test_checkpoint_waits_for_logged_records_to_be_applied(tmp_path):
+    wal_dir = str(tmp_path / "wal")
+    snapshot_path = str(tmp_path / "anom.snap")
+    wal = WriteAheadLog(wal_dir, policy=FsyncPolicy.GROUP, group_commit_ms=1)
+    repo = EventRepository(wal)
+    business_id = uuid4()
+    logged = threading.Event()
+    store = repo._store
+
+    def slow_store(event):
+        logged.set()  # the record is in the log but not yet in memory
+        threading.Event().wait(0.1)
+        return store(event)
+
+    repo._store = slow_store
+    writer = threading.Thread(target=repo.add_event, args=(_event(business_id, 0),))
+    writer.start()
+    logged.wait()
+    SnapshotManager(snapshot_path, {"events": repo}, wal=wal).write()
+    writer.join()
+    wal.close()
+
+    restarted = WriteAheadLog(wal_dir)
+    recovered = EventRepository(restarted)
+    SnapshotManager(snapshot_path, {"events": recovered}, wal=restarted).load()
+    recovered.replay_rows(row for kind, row in restarted.replay() if kind == "event")
+    assert [e.payload["i"] for e in recovered.list_events(business_id)] == [0]
+    restarted.close()
+
+
+def test_append_later_under_always_fsyncs_off_the_event_loop(tmp_path, monkeypatch):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.ALWAYS)
+    fsync_threads = []
+    real_fsync = os.fsync
+
+    def recording_fsync(fd):
+        fsync_threads.append(threading.get_ident())
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", recording_fsync)
+
+    async def scenario():
+        await asyncio.gather(*(wal.append_later("event", i) for i in range(10)))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert fsync_threads and loop_thread not in fsync_threads
+    wal.close()
+
+    restarted = WriteAheadLog(str(tmp_path))
+    assert [row for _, row in restarted.replay()] == list(range(10))
+    restarted.close()
+
+
+def test_alert_updates_wait_for_the_commit_outside_the_lock_stripe(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.GROUP, group_commit_ms=1)
+    repo = AlertRepository(wal, lock_stripes=1)
+    business_id = uuid4()
+    alerts = AlertService(repo).create_alerts(
+        [
+            AlertCreate(
+                business_id=business_id,
+                rule_id=uuid4(),
+                event_id=uuid4(),
+                message=f"a{i}",
+                severity=SeverityLevel.WARNING,
+            )
+            for i in range(3)
+        ]
+    )
+    stripe = repo._locks.for_key(business_id)
+    free_while_waiting = []
+    wait_durable = wal.wait_durable
+
+    def checking_wait(sequence):
+        free_while_waiting.append(stripe.acquire(blocking=False))
+        if free_while_waiting[-1]:
+            stripe.release()
+        wait_durable(sequence)
+
+    wal.wait_durable = checking_wait
+    repo.modify_alert(alerts[0].id, {"status": AlertStatus.ACKED})
+    repo.update_alert(alerts[1].model_copy(update={"status": AlertStatus.CLOSED}))
+    ids = [alert.id for alert in alerts]
+    assert repo.modify_many(ids, {"message": "bulk"}, lambda alert: alert.status is AlertStatus.OPEN) == (3, 1)
+    assert free_while_waiting == [True, True, True]
+
+    wal.close()
+    # a record that cannot be logged is not applied either
+    with pytest.raises(WriteAheadLogClosedError):
+        repo.modify_many(ids, {"message": "lost"}, lambda alert: True)
+    assert {alert.message for alert in repo.list_alerts()} == {"a0", "a1", "bulk"}
+
+
+def test_async_writers_wait_for_a_rotation_off_the_event_loop(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), policy=FsyncPolicy.GROUP, group_commit_ms=1)
+    repo = EventRepository(wal)
+    business_id = uuid4()
+    rotating = threading.Event()
+
+    def rotate_slowly():
+        with wal.gate.exclusive():
+            rotating.set()
+            threading.Event().wait(0.2)
+
+    async def scenario():
+        rotator = threading.Thread(target=rotate_slowly)
+        rotator.start()
+        rotating.wait()
+        ticks = 0
+        write = asyncio.ensure_future(repo.add_event_async(_event(business_id, 0)))
+        while not write.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        await write
+        rotator.join()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+    assert [e.payload["i"] for e in repo.list_events(business_id)] == [0]
+    wal.close()